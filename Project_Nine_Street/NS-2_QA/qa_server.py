@@ -15,19 +15,31 @@ Port: 9229 (QA) | PROD: 9228
 """
 
 import os
+import sys
 import json
 import warnings
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
+from pathlib import Path
 
-import numpy as np
-import pandas as pd
-import yfinance as yf
+# repo root on sys.path so the shared metrics/profiler resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
-from sklearn.preprocessing import StandardScaler
-from hmmlearn import hmm
-from scipy import stats as sp_stats
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+
+# the numeric stack loads with the first signal request, not at process start
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance")
+preprocessing = lazy_import("sklearn.preprocessing")
+hmm = lazy_import("hmmlearn.hmm")
+sp_stats = lazy_import("scipy.stats")
+
+metrics.init("ns2")
 
 warnings.filterwarnings("ignore")
 
@@ -293,7 +305,7 @@ def fit_hmm_ensemble(df):
         return None, None, None, None
 
     X = features.values
-    scaler = StandardScaler()
+    scaler = preprocessing.StandardScaler()
     X_scaled = scaler.fit_transform(X)
 
     all_regimes = []
@@ -910,7 +922,8 @@ def apply_acceptance_gate(ticker, signal_label):
 # HTTP SERVER
 # ═══════════════════════════════════════════════════════════════════════════════
 
-class NS2Handler(SimpleHTTPRequestHandler):
+class NS2Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 SimpleHTTPRequestHandler):
     def _json(self, code, data):
         self.send_response(code)
         self.send_header("Content-Type", "application/json")
@@ -931,6 +944,9 @@ class NS2Handler(SimpleHTTPRequestHandler):
         path = parsed.path
         qs = parse_qs(parsed.query)
 
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
+
         # Dashboard
         if path in ("/", "/index.html"):
             if os.path.exists(DASHBOARD_PATH):
@@ -1122,7 +1138,7 @@ if __name__ == "__main__":
     print()
 
     server = HTTPServer(("0.0.0.0", PORT), NS2Handler)
-    print(f"✓ Listening on http://localhost:{PORT}")
+    print(f"✓ Listening on http://localhost:{PORT} (ready in {metrics.mark_ready()['ready_s']:.3f}s)")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
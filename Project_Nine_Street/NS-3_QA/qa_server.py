@@ -12,13 +12,30 @@ Tier 3: deterministic stock picks: 26w relative strength percentile vs the
         conviction (HMM scales confidence, never hard-gates; validated).
 Exact API match with dashboard: tier1, tier2, tier3.
 """
+from __future__ import annotations
+
 import os
+import sys
 import json
-import yfinance as yf
-import pandas as pd
-import numpy as np
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from datetime import datetime, timedelta
+from pathlib import Path
+
+# repo root on sys.path so the shared cache, metrics and Yahoo gate resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics, profiler  # noqa: E402
+from common.data.yahoo import limited_yf as yf  # noqa: E402
+from common.lazy import available, lazy_import  # noqa: E402
+from common.utils import TTLCache  # noqa: E402
+
+# pandas/numpy load with the first tier request, not at process start
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+metrics.init("ns3")
 
 dashboard_path = os.path.join(os.path.dirname(__file__), "ns3_dashboard.html")
 PORT = int(os.environ.get('PORT', 9237))
@@ -62,16 +79,13 @@ PIOTROSKI_MIN = 7             # minimum Piotroski F-Score to pass Tier 3 screen
 TA_SCORE_MIN = 3              # minimum TA score for BUY in Tier 3
 TIER3_TOP = 5                 # stocks returned per sector
 
-_cache = {}
 CACHE_TTL = 300
+_cache = TTLCache(ttl_seconds=CACHE_TTL, max_entries=64, name="ns3_weekly")
 
 # ── HMM (guarded import: absent -> explicit "unavailable", never silent fake) ──
-try:
-    from hmmlearn.hmm import GaussianHMM
-    HMM_AVAILABLE = True
-except ImportError:
-    GaussianHMM = None
-    HMM_AVAILABLE = False
+# Presence is checked without importing; hmmlearn (+ sklearn/scipy) loads on
+# the first fit.
+HMM_AVAILABLE = available("hmmlearn")
 
 
 def fit_hmm_bull_prob(close: pd.Series):
@@ -82,6 +96,7 @@ def fit_hmm_bull_prob(close: pd.Series):
     if len(returns) < 20:
         return None
     import contextlib, io
+    from hmmlearn.hmm import GaussianHMM
     model = GaussianHMM(n_components=2, covariance_type="full",
                         n_iter=500, random_state=42)
     with contextlib.redirect_stderr(io.StringIO()):
@@ -95,14 +110,12 @@ def fit_hmm_bull_prob(close: pd.Series):
 
 def get_weekly_ohlcv(symbols: list, weeks: int = LOOKBACK_WEEKS) -> dict:
     """Fetch weekly OHLCV for symbols. Returns {sym: DataFrame(o,h,l,c,v)}."""
-    now = datetime.now()
     key = ("weekly", tuple(sorted(symbols)), weeks)
-    if key in _cache:
-        data, ts = _cache[key]
-        if (now - ts).total_seconds() < CACHE_TTL:
-            return data
+    return _cache.get_or_load(key, lambda: _download_weekly_ohlcv(symbols, weeks), cache_if=bool)
 
-    end = now.date()
+
+def _download_weekly_ohlcv(symbols: list, weeks: int) -> dict:
+    end = datetime.now().date()
     start = end - timedelta(weeks=weeks + 2)
     try:
         raw = yf.download(symbols, start=str(start), end=str(end), interval="1wk",
@@ -129,8 +142,6 @@ def get_weekly_ohlcv(symbols: list, weeks: int = LOOKBACK_WEEKS) -> dict:
             "low": df["Low"], "close": df["Close"],
             "volume": df["Volume"],
         }).dropna()
-
-    _cache[key] = (out, now)
     return out
 
 
@@ -409,21 +420,17 @@ def ta_score_stock(df: pd.DataFrame) -> tuple:
 
 
 # per-ticker Piotroski cache (fundamentals fetch is slow; 5-min TTL)
-_piotroski_cache = {}
+_piotroski_cache = TTLCache(ttl_seconds=CACHE_TTL, max_entries=512, name="ns3_piotroski")
 
 
 def get_piotroski(sym: str) -> tuple:
-    now = datetime.now()
-    if sym in _piotroski_cache:
-        val, ts = _piotroski_cache[sym]
-        if (now - ts).total_seconds() < CACHE_TTL:
-            return val
-    try:
-        val = piotroski_fscore(yf.Ticker(sym))
-    except Exception as e:
-        val = (0, {"error": str(e)})
-    _piotroski_cache[sym] = (val, now)
-    return val
+    def load():
+        try:
+            return piotroski_fscore(yf.Ticker(sym))
+        except Exception as e:
+            return (0, {"error": str(e)})
+
+    return _piotroski_cache.get_or_load(sym, load)
 
 
 def run_tier3() -> dict:
@@ -509,7 +516,8 @@ def run_tier3() -> dict:
 
 # ── HTTP layer ───────────────────────────────────────────────────────────────
 
-class NS3Handler(SimpleHTTPRequestHandler):
+class NS3Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 SimpleHTTPRequestHandler):
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Cache-Control', 'no-cache')
@@ -523,6 +531,9 @@ class NS3Handler(SimpleHTTPRequestHandler):
         self.wfile.write(json.dumps(data, default=lambda o: int(o) if isinstance(o, (np.bool_, np.integer)) else float(o) if isinstance(o, np.floating) else str(o)).encode())
 
     def do_GET(self):
+        if self.path in ('/metrics', '/metrics.json'):
+            return self.send_metrics(self.path)
+
         if self.path in ('/', '/ns3_dashboard.html'):
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
@@ -550,7 +561,7 @@ class NS3Handler(SimpleHTTPRequestHandler):
 if __name__ == '__main__':
     os.chdir(os.path.dirname(__file__))
     server = HTTPServer(('0.0.0.0', PORT), NS3Handler)
-    print(f"NS-3 QA running on port {PORT}")
+    print(f"NS-3 QA running on port {PORT} (ready in {metrics.mark_ready()['ready_s']:.3f}s)")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
@@ -4,12 +4,26 @@ NS-4 QA Server - stdlib + yfinance/pandas
 Exact API match with dashboard: /api/v1/all
 """
 import os
+import sys
 import json
-import yfinance as yf
-import pandas as pd
-import numpy as np
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 from datetime import datetime, timedelta
+from pathlib import Path
+
+# repo root on sys.path so the shared metrics/profiler resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+
+# yfinance/pandas/numpy load with the first /api request, not at process start
+yf = lazy_import("yfinance")
+pd = lazy_import("pandas")
+np = lazy_import("numpy")
+
+metrics.init("ns4")
 
 dashboard_path = os.path.join(os.path.dirname(__file__), "ns4_dashboard.html")
 PORT = int(os.environ.get('PORT', 9241))
@@ -151,7 +165,8 @@ def run_all():
 
     return {'ratios': results, 'timestamp': datetime.utcnow().isoformat() + 'Z'}
 
-class NS4Handler(SimpleHTTPRequestHandler):
+class NS4Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 SimpleHTTPRequestHandler):
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Cache-Control', 'no-cache')
@@ -164,6 +179,9 @@ class NS4Handler(SimpleHTTPRequestHandler):
         self.wfile.write(json.dumps(data).encode())
 
     def do_GET(self):
+        if self.path in ('/metrics', '/metrics.json'):
+            return self.send_metrics(self.path)
+
         if self.path in ('/', '/ns4_dashboard.html'):
             self.send_response(200)
             self.send_header('Content-type', 'text/html')
@@ -187,7 +205,7 @@ class NS4Handler(SimpleHTTPRequestHandler):
 if __name__ == '__main__':
     os.chdir(os.path.dirname(__file__))
     server = HTTPServer(('0.0.0.0', PORT), NS4Handler)
-    print(f"NS-4 QA running on port {PORT}")
+    print(f"NS-4 QA running on port {PORT} (ready in {metrics.mark_ready()['ready_s']:.3f}s)")
     try:
         server.serve_forever()
     except KeyboardInterrupt:
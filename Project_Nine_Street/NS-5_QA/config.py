@@ -45,6 +45,14 @@ FACTOR_DEFINITIONS = {
 }
 FACTOR_NAMES = list(FACTOR_DEFINITIONS.keys())  # ["MKT", "SMB", "HML", "MOM", "DUR"]
 
+# ---------------------------------------------------------------------------
+# Covariance (frontier.py): Ledoit-Wolf is the house standard for N ≤ 50;
+# larger universes switch to a statistical factor model (low-rank + diagonal,
+# common.risk.factor_cov) so risk and optimization scale linearly in names.
+# ---------------------------------------------------------------------------
+FACTOR_COV_MIN_NAMES = 51      # universes this wide or wider use the factor model
+FACTOR_COV_N_FACTORS = 10      # principal components kept
+
 # ---------------------------------------------------------------------------
 # Data windows (v1 roadmap — frontier-approved, do not change)
 # ---------------------------------------------------------------------------
@@ -26,6 +26,11 @@ import pandas as pd
 
 import config
 
+# repo root on sys.path so the shared Yahoo gate resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
 log = logging.getLogger("ns5.data_fetcher")
 
 # ---------------------------------------------------------------------------
@@ -34,7 +39,7 @@ log = logging.getLogger("ns5.data_fetcher")
 
 def _download(tickers, period=config.YF_PERIOD):
     """Download daily Close for tickers from Yahoo. Returns DataFrame (index=date)."""
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
     df = yf.download(
         list(tickers),
         period=period,
@@ -173,7 +178,7 @@ def get_dividend_yields(tickers) -> Dict[str, float]:
 
     Fail-open: any ticker Yahoo can't resolve yields 0.0 (no drag, no crash).
     """
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
     yields = {}
     for tk in tickers:
         try:
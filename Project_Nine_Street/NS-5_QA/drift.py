@@ -700,10 +700,9 @@ def check_frontier_drift(closes, holdings_weights: Dict[str, float],
         if rets.empty or len(rets) < 60:
             return None
         mu = rets.mean().to_numpy() * 252
-        cov = frontier_mod._cov_shrunk(rets)
-        inv = np.linalg.pinv(cov)
+        cov = frontier_mod._cov(rets)
         ones = np.ones(len(mu))
-        w = inv @ mu
+        w = frontier_mod.cov_solve(cov, mu)
         denom = ones @ w
         if abs(denom) < 1e-12:
             return None
@@ -12,11 +12,21 @@ Guardrails (frontier-set, do not change):
 - Vol uses ddof=1; correlation uses np.corrcoef
 - Signal thresholds: VOL_RATIO_THRESHOLD=1.5, CORR_SHIFT_THRESHOLD=0.3
 """
+import sys
+from pathlib import Path
+
 import numpy as np
 import pandas as pd
 
 import config
 
+# repo root on sys.path so the shared correlation engine resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.risk.correlation import rolling_pair_frame  # noqa: E402
+
 
 def rolling_vol(factor_returns: pd.DataFrame, window: int):
     """Annualized rolling vol (ddof=1), sqrt(252) scaling. DataFrame indexed by date."""
@@ -39,28 +49,30 @@ def vol_regime_series(factor_returns: pd.DataFrame):
     return ratio.replace([np.inf, -np.inf], np.nan)
 
 
+def rolling_corr_frame(factor_returns: pd.DataFrame, window: int = None):
+    """
+    Rolling pairwise correlation for every factor pair in one pass
+    (common.risk.correlation, window-sum engine). DataFrame indexed by date with
+    MultiIndex columns (f1, f2), f1 before f2 in column order.
+
+    Estimator is unchanged: cov = mean(ab) - mean(a)*mean(b) over the product of
+    ddof=1 rolling stds, each moment with min_periods = MIN_PERIODS_PCT * window.
+    """
+    window = window or config.CORR_WINDOW
+    if factor_returns.empty:
+        return pd.DataFrame()
+    return rolling_pair_frame(factor_returns, window,
+                              min_periods=int(window * config.MIN_PERIODS_PCT),
+                              moments="marginal")
+
+
 def rolling_corr(factor_returns: pd.DataFrame, window: int = None):
     """
     Rolling pairwise correlation per factor pair (window default CORR_WINDOW=120).
     Returns dict: {(f1, f2): pd.Series of correlation}. Pairs are (f1 < f2) ordered.
     """
-    window = window or config.CORR_WINDOW
-    factors = list(factor_returns.columns)
-    pairs = {}
-    min_periods = int(window * config.MIN_PERIODS_PCT)
-    for i, f1 in enumerate(factors):
-        for f2 in factors[i + 1:]:
-            # pairwise rolling corr via manual z-scoring (pandas .corr() has no rolling window)
-            a = factor_returns[f1]
-            b = factor_returns[f2]
-            mu_a = a.rolling(window, min_periods=min_periods).mean()
-            mu_b = b.rolling(window, min_periods=min_periods).mean()
-            sd_a = a.rolling(window, min_periods=min_periods).std(ddof=1)
-            sd_b = b.rolling(window, min_periods=min_periods).std(ddof=1)
-            cov = (a * b).rolling(window, min_periods=min_periods).mean() - mu_a * mu_b
-            corr = cov / (sd_a * sd_b)
-            pairs[(f1, f2)] = corr.replace([np.inf, -np.inf], np.nan)
-    return pairs
+    frame = rolling_corr_frame(factor_returns, window)
+    return {pair: frame[pair] for pair in frame.columns}
 
 
 def correlation_shift_series(factor_returns: pd.DataFrame):
@@ -69,18 +81,11 @@ def correlation_shift_series(factor_returns: pd.DataFrame):
     |shift| > CORR_SHIFT_THRESHOLD means the pairwise relationship moved materially.
     Returns DataFrame with MultiIndex columns (f1, f2), indexed by date.
     """
-    pairs_short = rolling_corr(factor_returns, config.VOL_WINDOW_SHORT)
-    pairs_long = rolling_corr(factor_returns, config.VOL_WINDOW_LONG)
-    frames = {}
-    for pair in pairs_short:
-        if pair in pairs_long:
-            shift = pairs_short[pair] - pairs_long[pair]
-            frames[pair] = shift.replace([np.inf, -np.inf], np.nan)
-    if not frames:
+    short = rolling_corr_frame(factor_returns, config.VOL_WINDOW_SHORT)
+    if short.empty:
         return pd.DataFrame()
-    out = pd.concat(frames.values(), axis=1, keys=frames.keys())
-    out.columns = pd.MultiIndex.from_tuples(out.columns)
-    return out
+    shift = short - rolling_corr_frame(factor_returns, config.VOL_WINDOW_LONG)
+    return shift.replace([np.inf, -np.inf], np.nan)
 
 
 def environment_summary(factor_returns: pd.DataFrame, as_of=None):
@@ -97,8 +102,10 @@ def environment_summary(factor_returns: pd.DataFrame, as_of=None):
     vol_long = rolling_vol(factor_returns, config.VOL_WINDOW_LONG).loc[as_of] if as_of in factor_returns.index else None
     ratio = vol_regime_series(factor_returns).loc[as_of] if as_of in factor_returns.index else None
 
-    corr = rolling_corr(factor_returns, config.CORR_WINDOW)
-    corr_now = {f"{k[0]}-{k[1]}": float(v.loc[as_of]) for k, v in corr.items() if as_of in v.index and not np.isnan(v.loc[as_of])}
+    corr = rolling_corr_frame(factor_returns, config.CORR_WINDOW)
+    corr_now = {}
+    if as_of in corr.index:
+        corr_now = {f"{k[0]}-{k[1]}": float(v) for k, v in corr.loc[as_of].items() if not np.isnan(v)}
 
     shift = correlation_shift_series(factor_returns)
     shifts = {}
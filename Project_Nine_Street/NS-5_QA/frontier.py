@@ -7,7 +7,9 @@ own asset universe, plus the current portfolio's and the policy's positions
 on the return-volatility plane.
 
 Method (per research doc §2/§3.4 — frontier methodology, do not change):
-- Covariance: Ledoit-Wolf shrinkage (sklearn) — house standard for N ≤ 50
+- Covariance: Ledoit-Wolf shrinkage (sklearn) — house standard for N ≤ 50;
+  wider universes (config.FACTOR_COV_MIN_NAMES) use a statistical factor
+  model (common.risk.factor_cov), whose w'Σw / Σw / Σ⁻¹b are O(n·k)
 - Frontier points: for a grid of target annualized returns between GMV and
   max-single-asset return, minimize w'Σw s.t. w'μ = target, Σw = 1, w ≥ 0
   (SLSQP, deterministic)
@@ -15,6 +17,8 @@ Method (per research doc §2/§3.4 — frontier methodology, do not change):
 """
 from __future__ import annotations
 
+import sys
+from pathlib import Path
 from typing import Dict, List, Optional
 
 import numpy as np
@@ -23,6 +27,16 @@ import pandas as pd
 import config
 import data_fetcher
 
+# repo root on sys.path so the shared factor-covariance module resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.risk.factor_cov import (  # noqa: E402,F401
+    FactorCovariance, cov_diag, cov_matvec, cov_solve, quad_form,
+    statistical_factor_cov,
+)
+
 
 def _cov_shrunk(returns: pd.DataFrame) -> np.ndarray:
     """Ledoit-Wolf shrunk annualized covariance of daily returns."""
@@ -32,9 +46,18 @@ def _cov_shrunk(returns: pd.DataFrame) -> np.ndarray:
     return cov_daily * 252.0
 
 
-def _portfolio_stats(weights: np.ndarray, mu: np.ndarray, cov: np.ndarray):
+def _cov(returns: pd.DataFrame):
+    """Annualized covariance for the universe: Ledoit-Wolf (dense) up to the
+    house N ≤ 50, a FactorCovariance beyond. Callers go through quad_form /
+    cov_solve / cov_diag / cov_matvec, which take either."""
+    if returns.shape[1] >= config.FACTOR_COV_MIN_NAMES:
+        return statistical_factor_cov(returns, config.FACTOR_COV_N_FACTORS).scaled(252.0)
+    return _cov_shrunk(returns)
+
+
+def _portfolio_stats(weights: np.ndarray, mu: np.ndarray, cov):
     ret = float(weights @ mu)
-    vol = float(np.sqrt(weights @ cov @ weights))
+    vol = float(np.sqrt(quad_form(cov, weights)))
     return ret, vol
 
 
@@ -65,17 +88,17 @@ def compute_frontier(closes: pd.DataFrame,
 
     mu_daily = rets.mean().to_numpy()
     mu = mu_daily * 252.0
-    cov = _cov_shrunk(rets)
+    cov = _cov(rets)
 
     # Portfolio variance for single-asset positions (for max-ret anchor)
-    single_vol = np.sqrt(np.diag(cov))
+    single_vol = np.sqrt(cov_diag(cov))
     max_idx = int(np.argmax(mu))
 
     # Global minimum variance (GMV) — closed form unconstrained, then clip ≥0
     n = len(available)
-    inv_cov = np.linalg.inv(cov)
     ones = np.ones(n)
-    w_gmv = inv_cov @ ones / (ones @ inv_cov @ ones)
+    inv_ones = cov_solve(cov, ones)
+    w_gmv = inv_ones / (ones @ inv_ones)
     w_gmv = np.clip(w_gmv, 0, 1)
     if w_gmv.sum() > 0:
         w_gmv = w_gmv / w_gmv.sum()
@@ -93,17 +116,19 @@ def compute_frontier(closes: pd.DataFrame,
     frontier = []
     for target in targets:
         # Minimize 0.5 w'Σw s.t. w'μ = target, Σw = 1, 0 ≤ w ≤ 1
+        # (analytic gradients: one Σw per step instead of n finite differences)
         def obj(w):
-            return 0.5 * w @ cov @ w
+            return 0.5 * quad_form(cov, w)
 
         cons = (
-            {"type": "eq", "fun": lambda w: w @ mu - target},
-            {"type": "eq", "fun": lambda w: w.sum() - 1.0},
+            {"type": "eq", "fun": lambda w: w @ mu - target, "jac": lambda w: mu},
+            {"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: ones},
         )
         bounds = [(0.0, 1.0)] * n
         w0 = np.full(n, 1.0 / n)
-        res = minimize(obj, w0, method="SLSQP", bounds=bounds,
-                       constraints=cons, options={"ftol": 1e-10, "maxiter": 500})
+        res = minimize(obj, w0, method="SLSQP", jac=lambda w: cov_matvec(cov, w),
+                       bounds=bounds, constraints=cons,
+                       options={"ftol": 1e-10, "maxiter": 500})
         if not res.success:
             continue
         ret, vol = _portfolio_stats(res.x, mu, cov)
@@ -132,7 +157,7 @@ def position_on_frontier(holdings: Dict[str, float],
                          tickers: List[str]) -> Dict:
     """
     Compute a portfolio's (ret, vol) position on the plane, using the same
-    Ledoit-Wolf covariance as the frontier (consistent risk measure).
+    covariance as the frontier (consistent risk measure).
 
     Returns: {ret, vol, tickers: [...]} or {"error": ...}
     """
@@ -144,7 +169,7 @@ def position_on_frontier(holdings: Dict[str, float],
         return {"error": "insufficient return data"}
 
     mu = rets.mean().to_numpy() * 252.0
-    cov = _cov_shrunk(rets)
+    cov = _cov(rets)
 
     weights = np.array([holdings.get(t, 0.0) for t in available])
     s = weights.sum()
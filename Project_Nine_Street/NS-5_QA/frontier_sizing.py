@@ -2,13 +2,13 @@
 """frontier_sizing.py — R2: frontier-based sizing of the joint universe.
 
 Replaces the equal-weight-within-sleeve stopgap with weights from NS-5's
-validated efficient-frontier machinery (Ledoit-Wolf shrunk covariance, long-only
-SLSQP). This is the "where the diversification alpha lives" step: size the joint
+validated efficient-frontier machinery (Ledoit-Wolf shrunk covariance — factor
+model for wide universes — long-only SLSQP). This is the "where the diversification alpha lives" step: size the joint
 universe (NS-7 momentum ∪ A_T value) by return/vol/correlation instead of
 averaging.
 
 Reuses frontier.py's methodology (do NOT change that module's math):
-  - _cov_shrunk / _portfolio_stats  (same risk measure as the frontier)
+  - _cov / _portfolio_stats  (same risk measure as the frontier)
   - compute_frontier  (the curve — used to pick the sizing point)
 
 This module ADDS what frontier.py does not expose: the actual weight VECTOR at
@@ -43,7 +43,7 @@ import frontier
 # ── Sizing point selection ───────────────────────────────────────────────
 def _sharpe_weights(closes: pd.DataFrame, tickers: List[str],
                     rf: float) -> Optional[Dict[str, float]]:
-    """Long-only max-Sharpe weights on the Ledoit-Wolf covariance.
+    """Long-only max-Sharpe weights on the frontier covariance.
 
     maximize (w'μ − rf)/√(w'Σw)  s.t. Σw = 1, w ≥ 0  (SLSQP, deterministic).
     Returns None if the solve fails (degenerate) → caller falls back.
@@ -55,19 +55,28 @@ def _sharpe_weights(closes: pd.DataFrame, tickers: List[str],
     if rets.empty or len(rets) < 60:
         return None
     mu = rets.mean().to_numpy() * 252.0
-    cov = frontier._cov_shrunk(rets)
+    cov = frontier._cov(rets)
     n = len(available)
 
     def neg_sharpe(w):
         ret = float(w @ mu) - rf
-        vol = float(np.sqrt(w @ cov @ w))
+        vol = float(np.sqrt(frontier.quad_form(cov, w)))
         return -ret / vol if vol > 0 else 0.0
 
+    def neg_sharpe_grad(w):
+        sw = frontier.cov_matvec(cov, w)
+        var = float(w @ sw)
+        if var <= 0:
+            return np.zeros(n)
+        vol = np.sqrt(var)
+        ret = float(w @ mu) - rf
+        return -(mu / vol - ret * sw / (var * vol))
+
     from scipy.optimize import minimize
-    cons = ({"type": "eq", "fun": lambda w: w.sum() - 1.0},)
+    cons = ({"type": "eq", "fun": lambda w: w.sum() - 1.0, "jac": lambda w: np.ones(n)},)
     bounds = [(0.0, 1.0)] * n
     w0 = np.full(n, 1.0 / n)
-    res = minimize(neg_sharpe, w0, method="SLSQP", bounds=bounds,
+    res = minimize(neg_sharpe, w0, method="SLSQP", jac=neg_sharpe_grad, bounds=bounds,
                    constraints=cons, options={"ftol": 1e-10, "maxiter": 500})
     if not res.success:
         return None
@@ -87,11 +96,10 @@ def _gmv_weights(closes: pd.DataFrame, tickers: List[str]) -> Optional[Dict[str,
     rets = data_fetcher.compute_log_returns(closes[available].copy())
     if rets.empty or len(rets) < 60:
         return None
-    cov = frontier._cov_shrunk(rets)
-    n = len(available)
-    inv = np.linalg.inv(cov)
-    ones = np.ones(n)
-    w = inv @ ones / (ones @ inv @ ones)
+    cov = frontier._cov(rets)
+    ones = np.ones(len(available))
+    w = frontier.cov_solve(cov, ones)
+    w = w / (ones @ w)
     w = np.clip(w, 0, 1)
     if w.sum() <= 0:
         return None
@@ -14,42 +14,47 @@ Roadmap Phase 5: QA on port 9251; PROD deferred until v1 stable.
 import json
 import logging
 import os
+import sys
 from datetime import datetime, timezone
 from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
 
-import concentration
 import config
-import data_fetcher
-import drift
-import environment
-import frontier
-import portfolio
 import portfolio_store
 import tax
 import theta as theta_mod
 
+# repo root on sys.path so the shared cache and metrics resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+from common.utils import TTLCache  # noqa: E402
+
+# numpy/pandas/scipy modules load on the first route that uses them
+concentration = lazy_import("concentration")
+data_fetcher = lazy_import("data_fetcher")
+drift = lazy_import("drift")
+environment = lazy_import("environment")
+frontier = lazy_import("frontier")
+portfolio = lazy_import("portfolio")
+
 PORT = int(os.environ.get("PORT", 9251))
 ENV = os.environ.get("ENV", "QA")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("ns5.qa_server")
+metrics.init("ns5")
 
-_factors_cache = None
-_factors_ts = None
 FACTORS_CACHE_TTL = 300  # seconds
+_factors_cache = TTLCache(ttl_seconds=FACTORS_CACHE_TTL, max_entries=1, name="ns5_factors")
 
 
 def _get_factors():
     """Cached factor returns (no Yahoo on the hot path — data pre-cached by cron)."""
-    global _factors_cache, _factors_ts
-    now = datetime.now()
-    if _factors_cache is not None and _factors_ts is not None:
-        if (now - _factors_ts).total_seconds() < FACTORS_CACHE_TTL:
-            return _factors_cache
-    factors, closes, rf = data_fetcher.build_factor_returns()
-    _factors_cache = factors
-    _factors_ts = now
-    return factors
+    return _factors_cache.get_or_load("factors", lambda: data_fetcher.build_factor_returns()[0])
 
 
 def _freshness_meta():
@@ -262,7 +267,8 @@ def _policies_delete(path):
 # HTTP handler
 # ---------------------------------------------------------------------------
 
-class Handler(BaseHTTPRequestHandler):
+class Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+              BaseHTTPRequestHandler):
     def _json(self, obj, status=200):
         body = json.dumps(obj, default=str).encode()
         self.send_response(status)
@@ -286,14 +292,18 @@ class Handler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         try:
-            if self.path in ("/", "/index.html", "/ns5_dashboard.html"):
+            if self.path in ("/metrics", "/metrics.json"):
+                self.send_metrics(self.path)
+            elif self.path in ("/", "/index.html", "/ns5_dashboard.html"):
                 _serve_dashboard(self)
             elif self.path in ("/health", "/health/"):
+                # Liveness must not wait on pandas: factor stats only once loaded
                 meta = _freshness_meta()
-                factors = _get_factors()
+                factors = _factors_cache.get("factors")
+                loaded = factors is not None and not factors.empty
                 self._json({"status": "ok", "service": "ns5", "env": ENV, "port": PORT,
-                            "factor_rows": int(factors.shape[0]) if not factors.empty else 0,
-                            "factor_last_date": str(factors.index[-1].date()) if not factors.empty else None,
+                            "factor_rows": int(factors.shape[0]) if loaded else None,
+                            "factor_last_date": str(factors.index[-1].date()) if loaded else None,
                             "factor_meta": meta, "as_of": datetime.now(timezone.utc).isoformat()})
             elif self.path.startswith("/api/factors"):
                 factors = _get_factors()
@@ -502,6 +512,7 @@ def main():
     portfolio_store.seed_if_missing()
     log.info("NS-5 QA server starting on port %d (env=%s)", PORT, ENV)
     server = HTTPServer(("0.0.0.0", PORT), Handler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
     try:
         server.serve_forever()
     except KeyboardInterrupt:
@@ -14,7 +14,8 @@ Four checkers feeding regime.py's grade functions:
 
 Design:
   - GMV weights: closed-form w = inv(Σ)1 / (1'inv(Σ)1), clip ≥ 0, normalize
-    (same math frontier.py uses internally — Ledoit-Wolf via _cov_shrunk)
+    (same math frontier.py uses internally — Ledoit-Wolf, or the factor
+    model for wide universes, via frontier._cov; solves via cov_solve)
   - Tangency weights: closed-form w = inv(Σ)μ / (1'inv(Σ)μ), clip ≥ 0, normalize
     (same approach as drift.py _tangency_weights)
   - All fail-open: insufficient data → empty dict / None → grade N/A
@@ -42,9 +43,9 @@ MIN_OBS = 60  # minimum return rows for covariance estimation
 # Closed-form helpers (deterministic math)
 # =============================================================================
 
-def _cov(rets: pd.DataFrame) -> np.ndarray:
-    """Ledoit-Wolf shrunk annualized covariance (house standard)."""
-    return frontier_mod._cov_shrunk(rets)
+def _cov(rets: pd.DataFrame):
+    """Annualized covariance (house standard: Ledoit-Wolf; factor model when wide)."""
+    return frontier_mod._cov(rets)
 
 
 def _gmv_weights(rets: pd.DataFrame) -> Dict[str, float]:
@@ -56,10 +57,8 @@ def _gmv_weights(rets: pd.DataFrame) -> Dict[str, float]:
         return {}
     try:
         cov = _cov(rets)
-        n = len(cov)
-        inv = np.linalg.pinv(cov)
-        ones = np.ones(n)
-        w = inv @ ones
+        ones = np.ones(len(cov))
+        w = frontier_mod.cov_solve(cov, ones)
         denom = ones @ w
         if abs(denom) < 1e-12:
             return {}
@@ -82,8 +81,7 @@ def _tangency_weights(rets: pd.DataFrame) -> Dict[str, float]:
     try:
         mu = rets.mean().to_numpy() * 252
         cov = _cov(rets)
-        inv = np.linalg.pinv(cov)
-        w = inv @ mu
+        w = frontier_mod.cov_solve(cov, mu)
         denom = np.ones(len(mu)) @ w
         if abs(denom) < 1e-12:
             return {}
@@ -106,7 +104,7 @@ def _tangency_sharpe(rets: pd.DataFrame) -> Optional[float]:
         cov = _cov(rets)
         ws = np.array([w[t] for t in rets.columns])
         ret = float(ws @ mu)
-        vol = float(np.sqrt(ws @ cov @ ws))
+        vol = float(np.sqrt(frontier_mod.quad_form(cov, ws)))
         return (ret / vol) if vol > 0 else None
     except Exception:
         return None
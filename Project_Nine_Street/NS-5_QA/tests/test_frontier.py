@@ -85,6 +85,37 @@ class TestComputeFrontier:
         assert "error" in fc
 
 
+def _make_wide_closes(n_names=120, n=300, seed=3):
+    """Synthetic wide universe: 3 common factors + idiosyncratic noise."""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=n)
+    f = rng.normal(0.0003, 0.008, (n, 3))
+    b = rng.normal(0.8, 0.4, (n_names, 3))
+    rets = f @ b.T + rng.normal(0.0, 0.01, (n, n_names))
+    return pd.DataFrame(100 * np.exp(np.cumsum(rets, axis=0)), index=dates,
+                        columns=[f"T{i:03d}" for i in range(n_names)])
+
+
+class TestWideUniverse:
+    def test_factor_cov_above_threshold(self):
+        closes = _make_wide_closes()
+        import data_fetcher
+        rets = data_fetcher.compute_log_returns(closes.copy())
+        assert isinstance(frontier._cov(rets), frontier.FactorCovariance)
+        narrow = rets.iloc[:, :config.FACTOR_COV_MIN_NAMES - 1]
+        assert isinstance(frontier._cov(narrow), np.ndarray)
+
+    def test_frontier_on_wide_universe(self):
+        closes = _make_wide_closes()
+        fc = frontier.compute_frontier(closes, list(closes.columns), n_points=8)
+        assert "error" not in fc
+        assert len(fc["tickers"]) == 120
+        assert fc["gmv"]["vol"] <= min(fc["sigma"].values()) + 1e-4
+        pos = frontier.position_on_frontier({t: 1.0 for t in closes.columns},
+                                            closes, list(closes.columns))
+        assert pos["vol"] >= fc["gmv"]["vol"] - 1e-4
+
+
 class TestPositionOnFrontier:
     def test_weights_normalized(self):
         closes = _make_closes()
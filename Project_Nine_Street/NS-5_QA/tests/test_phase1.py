@@ -190,6 +190,23 @@ class TestEnvironment:
         corr_now = pairs[("MKT", "SMB")].dropna().iloc[-1]
         assert corr_now > 0.9
 
+    def test_rolling_corr_matches_per_pair_formula(self):
+        frame = make_factor_frame(n=400)
+        frame.iloc[20:40, 1] = np.nan
+        window = 120
+        mp = int(window * config.MIN_PERIODS_PCT)
+        pairs = environment.rolling_corr(frame, window)
+        assert len(pairs) == len(frame.columns) * (len(frame.columns) - 1) // 2
+        for (f1, f2), got in pairs.items():
+            a, b = frame[f1], frame[f2]
+            mu_a = a.rolling(window, min_periods=mp).mean()
+            mu_b = b.rolling(window, min_periods=mp).mean()
+            cov = (a * b).rolling(window, min_periods=mp).mean() - mu_a * mu_b
+            sd = a.rolling(window, min_periods=mp).std(ddof=1) * b.rolling(window, min_periods=mp).std(ddof=1)
+            expected = cov / sd
+            assert (got.isna() == expected.isna()).all()
+            assert np.allclose(got.dropna(), expected.dropna(), atol=1e-10)
+
     def test_environment_summary_shape(self):
         factors = make_factor_frame()
         summary = environment.environment_summary(factors)
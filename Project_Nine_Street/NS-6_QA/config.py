@@ -187,6 +187,22 @@ THETA_DEFAULTS = {
 
         # Path ranking order (default). PM can override.
         "ranking_order": ["fewest_trades", "lowest_tax", "best_risk"],
+
+        # Optimizing planner (rebalance.plan_rebalance): one MILP over all
+        # positions and tax lots. Off by default; scenario requests opt in
+        # with {"optimize": true}. Penalties are fractions of NAV per unit:
+        # tracking per unit of L1 weight deviation, band per unit of
+        # deviation beyond the band (large = band is near-hard), trade per
+        # trade placed. Losing lots count as zero tax unless
+        # planner_harvest_losses — otherwise the credit outbids the tracking
+        # penalty and the planner sells down to the band just to harvest.
+        "planner_enabled": False,
+        "planner_harvest_losses": False,
+        "planner_tracking_penalty": 0.05,
+        "planner_band_penalty": 10.0,
+        "planner_trade_penalty": 0.0001,
+        "planner_time_limit_s": 5.0,
+        "planner_mip_gap": 0.001,
     },
 
     # ═══════════════════════════════════════════════════════════════════
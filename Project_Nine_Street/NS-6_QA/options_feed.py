@@ -7,7 +7,8 @@ Fail-open: any fetch/parse error -> None, and the caller falls back to the
 VIX parametric proxy with `pricing_source="proxy"`.
 
 Design:
-- TTL cache (default 1h) — the dashboard polls /api/enforcement/status every
+- TTL cache (default 1h, common.utils.TTLCache: bounded, concurrent polls
+  share one fetch) — the dashboard polls /api/enforcement/status every
   15s; an options chain changes slowly and A_T's endpoint forces a fresh
   yfinance fetch, so we must not hammer it per poll.
 - Unit convention matches `options.estimate_put_cost_pct`: FRACTIONS
@@ -18,17 +19,25 @@ Design:
 import json
 import logging
 import os
-import time
+import sys
 import urllib.request
+from pathlib import Path
 from typing import Dict, Optional
 
+# Repo root so `import common.utils` resolves (this service runs with NS-6_QA/ cwd).
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
+from common.utils import TTLCache  # noqa: E402
+
 log = logging.getLogger("ns6.options_feed")
 
 AT_OPTIONS_PORT = 9099 if os.environ.get("ENV", "QA") == "QA" else 9098
 AT_OPTIONS_URL = f"http://localhost:{AT_OPTIONS_PORT}/api/options"
 
 CACHE_TTL_SECONDS = 3600  # 1h — chains move slowly; advisory pricing is daily
-_cache: Dict[tuple, tuple] = {}  # key -> (timestamp, chain)
+_cache = TTLCache(ttl_seconds=CACHE_TTL_SECONDS, max_entries=128, name="ns6_options")
 
 
 def fetch_chain(ticker: str = "SPY", expiry: Optional[str] = None,
@@ -39,12 +48,14 @@ def fetch_chain(ticker: str = "SPY", expiry: Optional[str] = None,
     option record has strike/bid/ask/last/delta/... or the dict is
     {ticker, error} when no options are available.
     """
-    key = (ticker, expiry, base_url)
-    now = time.time()
-    if use_cache and key in _cache:
-        ts, data = _cache[key]
-        if now - ts < CACHE_TTL_SECONDS:
-            return data
+    if use_cache:
+        return _cache.get_or_load((ticker, expiry, base_url),
+                                  lambda: _fetch_chain(ticker, expiry, base_url),
+                                  cache_if=lambda d: d is not None)
+    return _fetch_chain(ticker, expiry, base_url)
+
+
+def _fetch_chain(ticker: str, expiry: Optional[str], base_url: Optional[str]) -> Optional[Dict]:
     url = f"{base_url or AT_OPTIONS_URL}?ticker={ticker}"
     if expiry:
         url += f"&expiry={expiry}"
@@ -56,8 +67,6 @@ def fetch_chain(ticker: str = "SPY", expiry: Optional[str] = None,
         log.warning("options feed %s failed: %s", ticker, exc)
     if not isinstance(data, dict) or "error" in data:
         return None
-    if use_cache:
-        _cache[key] = (now, data)
     return data
 
 
@@ -13,13 +13,22 @@ House rules:
 - Max drawdown uses the same running-peak math as `budget.compute_drawdown`
   (money-path formula — reused, never changed).
 - Fail-open: empty/short input -> None, never a crash or a fake number.
+
+PerformanceSeries keeps the log as growing numpy arrays so /api/performance
+appends only the rows written since the last request: since-inception
+return/vol/drawdown/benchmarks/attribution are running totals, the trailing
+windows slice at most `window` points. Cost per request is independent of
+how many years of rows exist.
 """
 
+import bisect
 import json
 import logging
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import numpy as np
+
 log = logging.getLogger("ns6.performance")
 
 TRADING_DAYS = 252
@@ -27,24 +36,37 @@ BASELINE_PATH = Path(__file__).resolve().parent / "data" / "ns6_backtest_baselin
 
 
 # ── Pure metrics ──────────────────────────────────────────────────────────
-def _rets_from_navs(navs: List[float]) -> List[float]:
+def _rets_from_navs(navs) -> List[float]:
     """Daily returns from a chronological NAV series (nav_t/nav_{t-1} - 1)."""
-    return [navs[i] / navs[i - 1] - 1.0 for i in range(1, len(navs))]
+    v = np.asarray(navs, dtype=float)
+    return (v[1:] / v[:-1] - 1.0).tolist()
 
 
-def _max_drawdown(navs: List[float]) -> float:
+def _max_drawdown(navs) -> float:
     """Worst running-peak drawdown over the series (negative fraction)."""
-    peak = navs[0]
-    dd = 0.0
-    for v in navs:
-        if v > peak:
-            peak = v
-        if peak > 0:
-            dd = min(dd, v / peak - 1.0)
-    return dd
+    v = np.asarray(navs, dtype=float)
+    peak = np.maximum.accumulate(v)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        dd = np.where(peak > 0, v / peak - 1.0, 0.0)
+    return float(min(dd.min(), 0.0))
+
 
+def _metrics_row(n, total_return, mean_r, std_r, max_dd) -> Dict:
+    ann = (1.0 + total_return) ** (TRADING_DAYS / n) - 1.0
+    vol = std_r * (TRADING_DAYS ** 0.5) if std_r is not None else None
+    sharpe = ((mean_r / std_r) * (TRADING_DAYS ** 0.5)
+              if std_r is not None and std_r > 0 else None)
+    return {
+        "n_days": n,
+        "total_return": round(total_return, 4),
+        "annualized_return": round(ann, 4),
+        "vol": round(vol, 4) if vol is not None else None,
+        "sharpe": round(sharpe, 4) if sharpe is not None else None,
+        "max_drawdown": round(max_dd, 4),
+    }
 
-def trailing_metrics(navs: List[float], window: Optional[int] = None) -> Optional[Dict]:
+
+def trailing_metrics(navs, window: Optional[int] = None) -> Optional[Dict]:
     """Trailing metrics for a chronological NAV series.
 
     window: trailing N trading days, or None for since-inception.
@@ -56,46 +78,27 @@ def trailing_metrics(navs: List[float], window: Optional[int] = None) -> Optiona
     sharpe         = mean(daily_ret)/std(daily_ret) * sqrt(252)  (rf = 0)
     max_drawdown   = worst running-peak drawdown (budget.compute_drawdown math)
     """
-    if not navs or len(navs) < 2:
+    if navs is None or len(navs) < 2:
         return None
+    seg = np.asarray(navs, dtype=float)
     # window = trailing N TRADING DAYS (returns) -> N+1 NAV points.
-    if window and len(navs) > window + 1:
-        seg = navs[-(window + 1):]
-    else:
-        seg = navs
+    if window and len(seg) > window + 1:
+        seg = seg[-(window + 1):]
     n = len(seg) - 1
     if n < 1 or seg[0] <= 0:
         return None
-    rets = _rets_from_navs(seg)
-    total_return = seg[-1] / seg[0] - 1.0
-    ann = (seg[-1] / seg[0]) ** (TRADING_DAYS / n) - 1.0
-    vol = None
-    sharpe = None
-    if len(rets) >= 2:
-        mean_r = sum(rets) / len(rets)
-        var_r = sum((r - mean_r) ** 2 for r in rets) / (len(rets) - 1)
-        std_r = var_r ** 0.5
-        vol = std_r * (TRADING_DAYS ** 0.5)
-        sharpe = (mean_r / std_r) * (TRADING_DAYS ** 0.5) if std_r > 0 else None
-    return {
-        "n_days": n,
-        "total_return": round(total_return, 4),
-        "annualized_return": round(ann, 4),
-        "vol": round(vol, 4) if vol is not None else None,
-        "sharpe": round(sharpe, 4) if sharpe is not None else None,
-        "max_drawdown": round(_max_drawdown(seg), 4),
-    }
+    rets = seg[1:] / seg[:-1] - 1.0
+    std_r = float(rets.std(ddof=1)) if n >= 2 else None
+    return _metrics_row(n, float(seg[-1] / seg[0] - 1.0), float(rets.mean()), std_r,
+                        _max_drawdown(seg))
 
 
-def compounded_return(daily_rets: List[Optional[float]]) -> Optional[float]:
+def compounded_return(daily_rets) -> Optional[float]:
     """Compounded total return from daily return fractions (None-tolerant)."""
-    vals = [r for r in daily_rets if r is not None]
-    if not vals:
+    vals = np.array([r for r in daily_rets if r is not None], dtype=float)
+    if not len(vals):
         return None
-    prod = 1.0
-    for r in vals:
-        prod *= (1.0 + r)
-    return prod - 1.0
+    return float(np.prod(1.0 + vals) - 1.0)
 
 
 def attribution(rows: List[Dict], window: Optional[int] = None) -> Dict:
@@ -109,6 +112,10 @@ def attribution(rows: List[Dict], window: Optional[int] = None) -> Dict:
     for r in seg:
         for tk, c in (r.get("contributions") or {}).items():
             agg[tk] = agg.get(tk, 0.0) + float(c)
+    return _attribution_summary(agg)
+
+
+def _attribution_summary(agg: Dict[str, float]) -> Dict:
     ordered = sorted(agg.items(), key=lambda kv: kv[1], reverse=True)
     return {
         "top": [{"ticker": t, "contribution": round(c, 6)} for t, c in ordered[:5]],
@@ -119,6 +126,146 @@ def attribution(rows: List[Dict], window: Optional[int] = None) -> Dict:
     }
 
 
+# ── Incremental series (what /api/performance serves from) ───────────────
+class PerformanceSeries:
+    """The performance log as append-only arrays plus running totals.
+
+    extend() takes chronological rows (store.query_performance_since) and
+    returns False when a row predates the last one held — a backfill; the
+    caller then reset()s and reloads. Re-sending the last date replaces it
+    (the feed re-runs idempotently on the same day).
+
+    Since-inception metrics come from running state: Welford mean/variance
+    of daily returns, running peak and worst drawdown, compounded benchmark
+    growth and per-ticker contribution sums. Trailing windows slice the NAV
+    array, so they cost O(window) whatever the history length.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.dates: List[str] = []
+        self._nav = np.empty(1024)
+        self._spy = np.empty(1024)
+        self._uni = np.empty(1024)
+        self._last_row = None
+        self._state = None
+        self._prev_state = None            # state before the last row (for replace)
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.dates[-1] if self.dates else None
+
+    @property
+    def navs(self) -> np.ndarray:
+        return self._nav[:len(self.dates)]
+
+    def extend(self, rows: List[Dict]) -> bool:
+        for row in rows:
+            date = str(row["date"])
+            if self.dates and date < self.dates[-1]:
+                return False
+            if self.dates and date == self.dates[-1]:
+                if row == self._last_row:
+                    continue
+                self._pop()
+            self._append(date, row)
+        return True
+
+    def _pop(self):
+        self.dates.pop()
+        self._state, self._prev_state = self._prev_state, None
+        self._last_row = None
+
+    def _append(self, date, row):
+        i = len(self.dates)
+        if i == len(self._nav):
+            for name in ("_nav", "_spy", "_uni"):
+                grown = np.empty(2 * i)
+                grown[:i] = getattr(self, name)
+                setattr(self, name, grown)
+        nav = float(row["nav"])
+        self._nav[i] = nav
+        self._spy[i] = np.nan if row.get("spy_ret") is None else float(row["spy_ret"])
+        self._uni[i] = np.nan if row.get("universe_ret") is None else float(row["universe_ret"])
+        self.dates.append(date)
+        self._last_row = row
+
+        st = self._state
+        self._prev_state = None if st is None else dict(st, contrib=dict(st["contrib"]))
+        if st is None:
+            st = self._state = {"nav0": nav, "peak": nav, "max_dd": 0.0, "n": 0,
+                                "mean": 0.0, "m2": 0.0, "spy": None, "uni": None,
+                                "contrib": {}}
+        else:
+            prev = self._nav[i - 1]
+            r = nav / prev - 1.0 if prev else 0.0
+            st["n"] += 1
+            delta = r - st["mean"]
+            st["mean"] += delta / st["n"]
+            st["m2"] += delta * (r - st["mean"])
+        if nav > st["peak"]:
+            st["peak"] = nav
+        if st["peak"] > 0:
+            st["max_dd"] = min(st["max_dd"], nav / st["peak"] - 1.0)
+        for key, val in (("spy", self._spy[i]), ("uni", self._uni[i])):
+            if not np.isnan(val):
+                st[key] = (1.0 if st[key] is None else st[key]) * (1.0 + val)
+        for tk, c in (row.get("contributions") or {}).items():
+            st["contrib"][tk] = st["contrib"].get(tk, 0.0) + float(c)
+
+    def _start(self, window) -> int:
+        """Index of the first NAV point of a window (None = inception)."""
+        n = len(self.dates)
+        if window == "ytd":
+            first = bisect.bisect_left(self.dates, self.dates[-1][:4] + "-01-01")
+            return max(first - 1, 0)          # prior year's last close is the base
+        if window and n > window + 1:
+            return n - (window + 1)
+        return 0
+
+    def trailing(self, window=None) -> Optional[Dict]:
+        """trailing_metrics() for window = N trading days, "ytd" or None."""
+        if len(self.dates) < 2:
+            return None
+        start = self._start(window)
+        if start:
+            return trailing_metrics(self.navs[start:])
+        st = self._state
+        if st["nav0"] <= 0:
+            return None
+        std_r = (st["m2"] / (st["n"] - 1)) ** 0.5 if st["n"] >= 2 else None
+        return _metrics_row(st["n"], float(self._nav[len(self.dates) - 1] / st["nav0"] - 1.0),
+                            st["mean"], std_r, st["max_dd"])
+
+    def benchmarks(self, window=None) -> Dict[str, Optional[float]]:
+        """Compounded SPY / universe return over the same rows as attribution()
+        slices (the last `window` rows; None values skipped)."""
+        n = len(self.dates)
+        if window == "ytd":
+            start = bisect.bisect_left(self.dates, self.dates[-1][:4] + "-01-01") if n else 0
+        else:
+            start = n - window if window and n > window else 0
+        out = {}
+        for key, running, arr in (("spy", "spy", self._spy), ("universe", "uni", self._uni)):
+            if start == 0:
+                grown = self._state[running] if self._state else None
+                out[key] = grown - 1.0 if grown is not None else None
+                continue
+            seg = arr[start:n]
+            seg = seg[~np.isnan(seg)]
+            out[key] = float(np.prod(1.0 + seg) - 1.0) if len(seg) else None
+        return out
+
+    def attribution(self) -> Dict:
+        """attribution() over every row held, from the running sums."""
+        return _attribution_summary((self._state or {}).get("contrib", {}))
+
+
 def reconcile(live_map: Dict[str, float], bt_map: Dict[str, float],
               divergence_pp: float = 5.0) -> Optional[Dict]:
     """Overlay live vs walk-forward backtest NAV on the SAME dates.
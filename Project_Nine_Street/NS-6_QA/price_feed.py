@@ -17,26 +17,45 @@ Design (matches the stack's house rules):
   exactly one place).
 - All drawdown/budget values are NEGATIVE fractions; `budget.py` owns the math
   (sign-corrected; the floor guarantee uses min()).
-- yfinance is already in the stack. Prices are cached to `data/ns6_prices.pkl`
-  (tz-naive) for offline reproducibility/debug; the live run always fetches
-  fresh and merges only missing tickers into the cache.
+- yfinance is already in the stack. Closes live in a segmented cache
+  (`data/ns6_prices/<ticker>/<year>.npz`: dates + float closes, tz-naive).
+  Tickers sharing a last cached date share one download for the bars after
+  it (plus a small overlap that catches split re-adjustments); tickers never
+  cached share one full-period download. Only the segments a run touched are
+  rewritten, each atomically, and segments older than the window are dropped.
 """
 
 import json
 import logging
+import os
+import sys
+import tempfile
+from collections import defaultdict
 from datetime import date as date_cls
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import quote, unquote
 
 import budget as budget_mod
 import config
 import enforcement as enforcement_mod
 import store
 
+# repo root on sys.path so the shared Yahoo gate resolves
+_REPO_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_REPO_ROOT) not in sys.path:
+    sys.path.insert(0, str(_REPO_ROOT))
+
 log = logging.getLogger("ns6.price_feed")
 
 DATA_DIR = Path(__file__).resolve().parent / "data"
-PRICES_CACHE = DATA_DIR / "ns6_prices.pkl"
+# Not ns6_prices.pkl: ns6_backtest.py owns that file (adjusted closes).
+# One directory per ticker, one .npz segment per calendar year.
+PRICES_CACHE = DATA_DIR / "ns6_prices"
+
+# Incremental refresh re-requests this many calendar days before the cache's
+# last date so restated closes (splits) are noticed.
+OVERLAP_DAYS = 7
 
 # NS-5 portfolio store path (decoupled file read — same derivation as qa_server).
 NS5_PORTFOLIOS_PATH = (
@@ -121,61 +140,211 @@ def current_holdings() -> Tuple[str, bool, Dict[str, float], Dict[str, float],
 
 
 # ── Price fetching ─────────────────────────────────────────────────────────
-def _load_cache() -> Dict[str, "pd.Series"]:
-    try:
-        if PRICES_CACHE.exists():
-            import pandas as pd
+def _ticker_dir(ticker: str) -> Path:
+    return PRICES_CACHE / quote(ticker, safe="")   # ^VIX -> %5EVIX
 
-            return pd.read_pickle(PRICES_CACHE)
-    except Exception as exc:  # noqa: BLE001
-        log.warning("read price cache failed: %s", exc)
-    return {}
 
+def _load_cache(tickers: Optional[Iterable[str]] = None) -> "pd.DataFrame":
+    """Cached closes of `tickers` (default: every cached ticker) as a date x
+    ticker frame (NaN before a ticker's history).
 
-def _save_cache(cache: Dict[str, "pd.Series"]) -> None:
+    Fail-open per ticker: a missing/unreadable series is simply absent (the
+    next run refetches it in full).
+    """
+    import numpy as np
+    import pandas as pd
+
+    if tickers is None:
+        tickers = (sorted(unquote(d.name) for d in PRICES_CACHE.iterdir() if d.is_dir())
+                   if PRICES_CACHE.is_dir() else [])
+    cols = {}
+    for tk in tickers:
+        try:
+            parts = []
+            for seg in sorted(_ticker_dir(tk).glob("*.npz")):
+                with np.load(seg, allow_pickle=False) as z:
+                    parts.append(pd.Series(z["closes"], index=pd.DatetimeIndex(z["dates"])))
+            if parts:
+                cols[tk] = pd.concat(parts)
+        except Exception as exc:  # noqa: BLE001
+            log.warning("read price cache for %s failed: %s", tk, exc)
+    return pd.DataFrame(cols).sort_index() if cols else pd.DataFrame()
+
+
+def _write_segment(path: Path, closes: "pd.Series") -> None:
+    """One year of closes as .npz via temp file + rename (atomic: a crash
+    mid-write leaves the previous segment intact)."""
+    import numpy as np
+
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), suffix=".tmp")
     try:
-        DATA_DIR.mkdir(parents=True, exist_ok=True)
-        import pandas as pd
+        with os.fdopen(fd, "wb") as fh:
+            np.savez(fh, dates=closes.index.values, closes=closes.to_numpy(dtype=float))
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
 
-        pd.to_pickle(cache, PRICES_CACHE)
-    except Exception as exc:  # noqa: BLE001
-        log.warning("write price cache failed: %s", exc)
 
+def _save_cache(frame: "pd.DataFrame", dirty: Dict[str, Optional["pd.Timestamp"]]) -> None:
+    """Persist the segments of `frame` that changed.
 
-def _fetch_close(ticker: str, period: str = "2y") -> Optional["pd.Series"]:
-    """Daily Close series for a ticker (tz-naive index), or None on failure."""
+    dirty maps ticker -> first changed date: that date's year segment and
+    later ones are rewritten. None rewrites the ticker's whole series and
+    drops segments it no longer covers (a full or restated refetch).
+    """
+    for tk, first in dirty.items():
+        try:
+            closes = frame[tk].dropna()
+            d = _ticker_dir(tk)
+            d.mkdir(parents=True, exist_ok=True)
+            years = closes.index.year
+            for year in sorted(set(years)):
+                if first is None or year >= first.year:
+                    _write_segment(d / f"{year}.npz", closes[years == year])
+            if first is None:
+                for seg in d.glob("*.npz"):
+                    if int(seg.stem) not in set(years):
+                        seg.unlink()
+        except Exception as exc:  # noqa: BLE001
+            log.warning("write price cache for %s failed: %s", tk, exc)
+
+
+def _prune_cache(tickers: Iterable[str], start: "pd.Timestamp") -> None:
+    """Drop whole year segments that end before `start`."""
+    for tk in tickers:
+        try:
+            for seg in _ticker_dir(tk).glob("*.npz"):
+                if int(seg.stem) < start.year:
+                    seg.unlink()
+        except Exception as exc:  # noqa: BLE001
+            log.warning("prune price cache for %s failed: %s", tk, exc)
+
+
+def _download_closes(tickers: List[str], **window) -> "pd.DataFrame":
+    """One grouped Yahoo request -> date x ticker Close frame (tz-naive).
+
+    `window` is period=... or start=...; unadjusted Close, as before. Tickers
+    Yahoo returns nothing for are absent. Fail-open: empty frame.
+    """
+    import pandas as pd
+
+    if not tickers:
+        return pd.DataFrame()
     try:
-        import yfinance as yf
-
-        df = yf.Ticker(ticker).history(period=period, auto_adjust=False)
-        if df is None or df.empty or "Close" not in df:
-            return None
-        s = df["Close"].astype(float)
-        if getattr(s.index, "tz", None) is not None:
-            s.index = s.index.tz_localize(None)  # normalize to tz-naive (skill pitfall)
-        return s
+        from common.data.yahoo import limited_yf as yf
+
+        px = yf.download(list(tickers), interval="1d", auto_adjust=False,
+                         progress=False, **window)
+        if px is None or px.empty:
+            return pd.DataFrame()
+        if isinstance(px.columns, pd.MultiIndex):
+            close = px["Close"]
+        else:
+            close = px[["Close"]].rename(columns={"Close": tickers[0]})
+        close = close.astype(float).dropna(how="all")
+        if getattr(close.index, "tz", None) is not None:
+            close.index = close.index.tz_localize(None)  # normalize to tz-naive (skill pitfall)
+        return close[[tk for tk in close.columns if close[tk].notna().any()]]
     except Exception as exc:  # noqa: BLE001
-        log.warning("fetch %s failed: %s", ticker, exc)
+        log.warning("grouped fetch %s failed: %s", ",".join(tickers), exc)
+        return pd.DataFrame()
+
+
+def _window_start(period: str, today=None) -> Optional["pd.Timestamp"]:
+    """First date yfinance's `period` covers ('2y', '6mo', '30d'); None = all."""
+    import pandas as pd
+
+    today = pd.Timestamp(today or date_cls.today())
+    n = "".join(ch for ch in period if ch.isdigit())
+    unit = period[len(n):]
+    if not n:
         return None
+    offsets = {"y": pd.DateOffset(years=int(n)), "mo": pd.DateOffset(months=int(n)),
+               "wk": pd.DateOffset(weeks=int(n)), "d": pd.DateOffset(days=int(n))}
+    return today - offsets[unit] if unit in offsets else None
 
 
-def fetch_prices(tickers: List[str], period: str = "2y") -> Dict[str, "pd.Series"]:
-    """Fetch Close series for each ticker, merging missing ones into the cache.
+def _restated(cached: "pd.DataFrame", fresh: "pd.DataFrame") -> List[str]:
+    """Tickers whose fresh bars disagree with cached closes on shared dates.
 
-    Returns only the tickers that actually have data (fail-open). The live run
-    always fetches fresh; the cache is a fallback/debug artifact.
+    The cache's newest date is left out: it may have been fetched intraday,
+    and a finalized close differing from that partial bar is not a restatement.
     """
-    cache = _load_cache()
-    out: Dict[str, "pd.Series"] = {}
+    import numpy as np
+
+    both = fresh.index.intersection(cached.index)
+    both = both[both < cached.index.max()] if len(both) else both
+    cols = [tk for tk in fresh.columns if tk in cached.columns]
+    if not len(both) or not cols:
+        return []
+    old = cached.loc[both, cols].to_numpy(dtype=float)
+    new = fresh.loc[both, cols].to_numpy(dtype=float)
+    diff = np.abs(old - new) > 1e-6 * np.maximum(1.0, np.abs(old))
+    return [tk for tk, bad in zip(cols, diff.any(axis=0)) if bad]
+
+
+def fetch_prices(tickers: List[str], period: str = "2y") -> Dict[str, "pd.Series"]:
+    """Close series for each ticker over `period`, refreshed incrementally.
+
+    Cached tickers are grouped by their own last cached date, one request per
+    group starting just before it, so a ticker that fell behind never drags
+    the rest back with it; tickers with no cached history (or whose overlap
+    bars were restated) get one grouped full-`period` request. A restated
+    ticker's cached series is replaced only once that request returns it.
+    Returns only the tickers that actually have data (fail-open: a failed
+    request leaves the cached closes in place).
+    """
+    import pandas as pd
+
+    tickers = list(dict.fromkeys(tickers))
+    cache = _load_cache(tickers)
+    known = [tk for tk in tickers if tk in cache.columns and cache[tk].notna().any()]
+    missing = [tk for tk in tickers if tk not in known]
+
+    groups = defaultdict(list)
+    for tk in known:
+        groups[cache[tk].last_valid_index()].append(tk)
+    tails, redo = [], []
+    for last, group in sorted(groups.items()):
+        tail = _download_closes(group, start=(last - pd.Timedelta(days=OVERLAP_DAYS))
+                                .strftime("%Y-%m-%d"))
+        bad = _restated(cache[group].dropna(how="all"), tail)
+        redo += bad
+        tails.append(tail.drop(columns=bad))
+    if redo:
+        log.info("closes restated for %s; refetching full history", ",".join(redo))
+    full = pd.DataFrame()
+    if missing or redo:
+        full = _download_closes(missing + redo, period=period)
+        cache = cache.drop(columns=[tk for tk in redo if tk in full.columns])
+
+    dirty: Dict[str, Optional["pd.Timestamp"]] = {}
+    for part in tails + [full]:
+        if part.empty:
+            continue
+        cache = part.combine_first(cache) if not cache.empty else part.copy()
+        for tk in part.columns:
+            dirty[tk] = None if part is full else part[tk].first_valid_index()
     for tk in tickers:
-        series = _fetch_close(tk, period)
-        if series is not None and len(series) > 0:
-            out[tk] = series
-            cache[tk] = series  # merge into cache
-        elif tk in cache:
+        if tk not in dirty and tk in cache.columns:
             log.warning("live fetch failed for %s; using cached series", tk)
-            out[tk] = cache[tk]
-    _save_cache(cache)
+    if dirty:
+        _save_cache(cache, dirty)
+
+    start = _window_start(period)
+    if start is not None:
+        _prune_cache(tickers, start)
+        if not cache.empty:
+            cache = cache.loc[cache.index >= start]
+    cache = cache.dropna(how="all", axis=1).sort_index()
+
+    out: Dict[str, "pd.Series"] = {}
+    for tk in tickers:
+        if tk in cache.columns:
+            s = cache[tk].dropna().rename("Close")
+            if len(s):
+                out[tk] = s
     return out
 
 
@@ -234,15 +403,19 @@ def compute_position_drawdowns(closes: Dict) -> Dict[str, float]:
     """Per-ticker drawdown from RUNNING PEAK (negative fraction).
 
     Reuses the closes already fetched (no second fetch). Missing/empty series
-    are skipped. Drawdown math is budget.compute_drawdown (sign-corrected).
+    are skipped. Same math as budget.compute_drawdown (last / peak - 1,
+    sign-corrected), taken for every ticker in one pass over the aligned frame.
     """
-    out: Dict[str, float] = {}
-    for tk, s in (closes or {}).items():
-        if s is None or len(s) == 0:
-            continue
-        dd = budget_mod.compute_drawdown([float(x) for x in s.tolist()])
-        out[tk] = round(dd, 4)
-    return out
+    import pandas as pd
+
+    series = {tk: s for tk, s in (closes or {}).items() if s is not None and len(s) > 0}
+    if not series:
+        return {}
+    frame = pd.DataFrame(series)
+    last = frame.ffill().iloc[-1]
+    peak = frame.max()
+    dd = (last / peak - 1.0).where(peak > 0, 0.0)
+    return {tk: round(float(dd[tk]), 4) for tk in series}
 
 
 def cross_sectional_corr(closes: Dict,
@@ -254,6 +427,7 @@ def cross_sectional_corr(closes: Dict,
     insufficient history (fail-open → the systemic breaker's corr arm can't
     fire). NaN pairwise entries are ignored.
     """
+    import numpy as np
     import pandas as pd
 
     series = {tk: s for tk, s in (closes or {}).items()
@@ -266,17 +440,10 @@ def cross_sectional_corr(closes: Dict,
     rets = frame.pct_change().dropna().tail(int(lookback))
     if len(rets) < 2:
         return None
-    cm = rets.corr()
-    n = cm.shape[0]
-    total = 0.0
-    count = 0
-    for i in range(n):
-        for j in range(i + 1, n):
-            v = cm.iloc[i, j]
-            if v is not None and v == v:  # not NaN
-                total += float(v)
-                count += 1
-    return round(total / count, 4) if count else None
+    cm = rets.corr().to_numpy()
+    upper = cm[np.triu_indices(cm.shape[0], k=1)]
+    upper = upper[~np.isnan(upper)]
+    return round(float(upper.mean()), 4) if len(upper) else None
 
 
 def compute_performance(closes: Dict[str, "pd.Series"], weights: Dict[str, float],
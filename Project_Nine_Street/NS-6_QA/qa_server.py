@@ -11,6 +11,9 @@ Endpoints:
   POST /api/scenario/add            -> add-stock scenario (JSON body)
   POST /api/scenario/remove         -> remove-stock scenario (JSON body)
   POST /api/scenario/replace        -> replace scenario (JSON body)
+  POST /api/scenario/batch          -> rank many add/remove/replace scenarios at once
+                                       ({"optimize": true} on any scenario adds the
+                                       tax-aware optimized funding path)
 
 QA on port 9261; PROD on 9260 (env-derived PORT).
 CORS emitted ONLY in end_headers() (single source — double header breaks
@@ -21,6 +24,7 @@ import json
 import logging
 import os
 import sys
+import threading
 from datetime import datetime, timezone
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
@@ -31,13 +35,15 @@ _ROOT = Path(__file__).resolve().parent.parent.parent
 if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
+from common import metrics, profiler  # noqa: E402
 from common import regime_store as regime_store_mod
+from common.lazy import lazy_import
 
 import budget as budget_mod
 import config
 import drift_alert as drift_mod
 import enforcement as enforcement_mod
-import performance as performance_mod
+performance_mod = lazy_import("performance")    # numpy, on first /api/performance
 import options as options_mod
 import options_feed as options_feed_mod
 import price_feed
@@ -66,6 +72,7 @@ A_T_SCREENER_URL = f"http://localhost:{A_T_PORT}/api/fundamentals/screen"
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("ns6.qa_server")
+metrics.init("ns6")
 
 # Default demo portfolio weights (for /api/drift + /api/enforcement/status
 # when no stored portfolio exists yet).
@@ -100,7 +107,66 @@ def _serve_dashboard(handler):
     handler.wfile.write(body)
 
 
-class NS6Handler(BaseHTTPRequestHandler):
+_perf_series = None
+_perf_mark = None       # store.performance_watermark() the series reflects
+_perf_version = 0       # bumped whenever the series changes
+_perf_recon = (None, None)
+_perf_lock = threading.Lock()
+
+
+def _performance_series():
+    """The process-wide PerformanceSeries. Nothing is read while the store's
+    write watermark holds; when it moves, rows written since are appended,
+    unless one predates the series' last day (backfilled or rewritten
+    history) — then it reloads in full. An unreadable watermark counts as
+    unchanged."""
+    global _perf_series, _perf_mark, _perf_version
+    with _perf_lock:
+        series = _perf_series
+        mark = store.performance_watermark()
+        if series is None:
+            series = _perf_series = performance_mod.PerformanceSeries()
+            series.extend(store.query_performance_since(None))
+        elif mark is None or mark == _perf_mark:
+            return series
+        elif _perf_mark is None:
+            series.reset()
+            series.extend(store.query_performance_since(None))
+        else:
+            first = store.performance_written_since(_perf_mark)
+            if first is None:
+                return series
+            if ((series.last_date is not None and first < series.last_date)
+                    or not series.extend(store.query_performance_since(series.last_date))):
+                series.reset()
+                series.extend(store.query_performance_since(None))
+        _perf_mark = mark
+        _perf_version += 1
+        return series
+
+
+def _reconciliation(series, divergence_pp):
+    """performance.reconcile against the backtest baseline, recomputed only
+    when the series or the baseline file changes."""
+    global _perf_recon
+    try:
+        baseline_mtime = performance_mod.BASELINE_PATH.stat().st_mtime
+    except OSError:
+        baseline_mtime = None
+    key = (id(series), _perf_version, baseline_mtime, divergence_pp)
+    if _perf_recon[0] == key:
+        return _perf_recon[1]
+    recon = None
+    bt_map = performance_mod.load_backtest_baseline()
+    if bt_map and len(series):
+        live_map = dict(zip(series.dates, series.navs.tolist()))
+        recon = performance_mod.reconcile(live_map, bt_map, divergence_pp=divergence_pp)
+    _perf_recon = (key, recon)
+    return recon
+
+
+class NS6Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 BaseHTTPRequestHandler):
     # ── HTTP plumbing ────────────────────────────────────────────────────
     def log_message(self, format, *args):  # quieter
         log.info("%s - %s", self.address_string(), format % args)
@@ -136,6 +202,8 @@ class NS6Handler(BaseHTTPRequestHandler):
     # ── Routes ───────────────────────────────────────────────────────────
     def do_GET(self):
         path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
         if path in ("/", "/index.html", "/ns6_dashboard.html"):
             return _serve_dashboard(self)
         if path == "/health":
@@ -164,6 +232,8 @@ class NS6Handler(BaseHTTPRequestHandler):
             return self._scenario_remove(body)
         if path == "/api/scenario/replace":
             return self._scenario_replace(body)
+        if path == "/api/scenario/batch":
+            return self._scenario_batch(body)
         if path == "/api/profile":
             return self._profile_set(body)
         if path == "/api/portfolio":
@@ -406,6 +476,13 @@ class NS6Handler(BaseHTTPRequestHandler):
         active = store.get_active_profile()
         return config.load_profile(active)[0]
 
+    def _scenario_theta(self, body):
+        """Active theta; {"optimize": true} adds the optimized funding path."""
+        theta = self._active_theta()
+        if body.get("optimize"):
+            theta["rebalancing"]["planner_enabled"] = True
+        return theta
+
     def _profile_context(self, theta):
         """Profile-dependent budget context, surfaced so the PM sees the
         effect of switching profiles (the profile overrides budget/de-risk)."""
@@ -531,35 +608,25 @@ class NS6Handler(BaseHTTPRequestHandler):
         """G2 scoreboard: trailing metrics, benchmark excess, attribution,
         and backtest-vs-live reconciliation (fail-open when no data/baseline)."""
         theta = self._active_theta()
-        rows_asc = list(reversed(store.query_performance(limit=1000)))
+        series = _performance_series()
         windows = theta.get("performance", {}).get("windows", [21, 63, 252])
-        navs = [r["nav"] for r in rows_asc]
         trailing: Dict = {}
         excess: Dict = {}
-        for w in list(windows) + [None]:
-            key = f"{w}d" if w else "inception"
-            m = performance_mod.trailing_metrics(navs, window=w)
+        for w in list(windows) + ["ytd", None]:
+            key = w if w == "ytd" else (f"{w}d" if w else "inception")
+            m = series.trailing(w)
             trailing[key] = m
             if not m:
                 excess[key] = {"spy": None, "universe": None}
                 continue
-            seg = rows_asc[-w:] if w and len(rows_asc) > w else rows_asc
-            spy = performance_mod.compounded_return([r.get("spy_ret") for r in seg])
-            uni = performance_mod.compounded_return([r.get("universe_ret") for r in seg])
-            excess[key] = {
-                "spy": round(m["total_return"] - spy, 4) if spy is not None else None,
-                "universe": round(m["total_return"] - uni, 4) if uni is not None else None,
-            }
-        attr = performance_mod.attribution(rows_asc)
-        recon = None
-        bt_map = performance_mod.load_backtest_baseline()
-        if bt_map and rows_asc:
-            live_map = {r["date"]: r["nav"] for r in rows_asc}
-            recon = performance_mod.reconcile(
-                live_map, bt_map,
-                divergence_pp=theta.get("performance", {}).get("reconcile_divergence_pp", 5.0))
+            bench = series.benchmarks(w)
+            excess[key] = {k: (round(m["total_return"] - v, 4) if v is not None else None)
+                           for k, v in bench.items()}
+        attr = series.attribution()
+        recon = _reconciliation(
+            series, theta.get("performance", {}).get("reconcile_divergence_pp", 5.0))
         self._json({
-            "as_of": rows_asc[-1]["date"] if rows_asc else None,
+            "as_of": series.last_date,
             "benchmarks": {"spy": "SPY (calibration)",
                            "universe": "Held universe (equal-weight)"},
             "trailing": trailing,
@@ -589,7 +656,7 @@ class NS6Handler(BaseHTTPRequestHandler):
         self._json({"ok": True})
 
     def _scenario_add(self, body):
-        theta = self._active_theta()
+        theta = self._scenario_theta(body)
         ticker = str(body.get("ticker", "")).strip().upper()
         if not ticker:
             return self._json({"error": "ticker required"}, 400)
@@ -606,7 +673,7 @@ class NS6Handler(BaseHTTPRequestHandler):
         self._json(result)
 
     def _scenario_remove(self, body):
-        theta = self._active_theta()
+        theta = self._scenario_theta(body)
         ticker = str(body.get("ticker", "")).strip().upper()
         if not ticker:
             return self._json({"error": "ticker required"}, 400)
@@ -621,7 +688,7 @@ class NS6Handler(BaseHTTPRequestHandler):
         self._json(result)
 
     def _scenario_replace(self, body):
-        theta = self._active_theta()
+        theta = self._scenario_theta(body)
         add = str(body.get("add", "")).strip().upper()
         rem = str(body.get("remove", "")).strip().upper()
         if not add or not rem:
@@ -638,11 +705,46 @@ class NS6Handler(BaseHTTPRequestHandler):
         result["profile_context"] = self._profile_context(theta)
         self._json(result)
 
+    def _scenario_batch(self, body):
+        """POST /api/scenario/batch — {kind, candidates[, remove, proposed_weight,
+        top_n]}: every candidate scored against one shared returns/covariance
+        context (closes from the incremental price feed, fail-open)."""
+        theta = self._scenario_theta(body)
+        kind = str(body.get("kind", "")).strip().lower()
+        if kind not in scenario_mod.BATCH_KINDS:
+            return self._json({"error": f"kind must be one of {list(scenario_mod.BATCH_KINDS)}"}, 400)
+        raw = body.get("candidates") or []
+        if not isinstance(raw, list):
+            return self._json({"error": "candidates must be a list"}, 400)
+        candidates = [str(c).strip().upper() for c in raw if str(c).strip()]
+        rem = str(body.get("remove", "")).strip().upper() or None
+        if kind == "replace" and not rem:
+            return self._json({"error": "'remove' required for kind=replace"}, 400)
+        if kind != "remove" and not candidates:
+            return self._json({"error": "candidates required"}, 400)
+        current = self._portfolio_weights(body)
+        nav = float(body.get("nav", 1_000_000))
+        proposed = float(body.get("proposed_weight", 0.03)) if kind != "remove" else None
+        universe = scenario_mod.batch_universe(kind, candidates or list(current), current, rem)
+        closes = price_feed.fetch_prices(universe, period=theta["price_feed"]["period"])
+        result = scenario_mod.analyze_batch(
+            kind, candidates, current, nav, closes=closes,
+            proposed_weight=proposed, remove=rem,
+            prices=body.get("prices") or {},
+            screener_scores=body.get("screener_scores"),
+            ns2_regimes=body.get("ns2_regimes"),
+            tax_lot_data=self._portfolio_holdings()[4], theta=theta,
+            top_n=int(body.get("top_n", scenario_mod.BATCH_TOP_N)))
+        result["profile_context"] = self._profile_context(theta)
+        self._json(result)
+
 
 def main():
     store.init_db()
     log.info("NS-6 %s server on port %d", ENV, PORT)
-    HTTPServer(("0.0.0.0", PORT), NS6Handler).serve_forever()
+    server = HTTPServer(("0.0.0.0", PORT), NS6Handler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
+    server.serve_forever()
 
 
 if __name__ == "__main__":
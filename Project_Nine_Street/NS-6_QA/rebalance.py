@@ -6,12 +6,17 @@ no I/O. All inputs pre-computed dicts.
 
 tax_cost and risk_impact are stubbed (Phase 1); real implementations land in
 Phase 3 (tax_context.py) and via NS-5 frontier projections respectively.
+
+plan_rebalance() is the optimizing alternative to the hand-coded paths: one
+mixed-integer program over every position and tax lot (scipy HiGHS), enabled
+per call with theta["rebalancing"]["planner_enabled"].
 """
 
 import logging
 from typing import Dict, List, Optional
 
 import config
+import tax_context
 
 log = logging.getLogger("ns6.rebalance")
 
@@ -63,13 +68,191 @@ def _empty_path_meta(nav: float) -> Dict:
     }
 
 
+def _realized_tax(trades, tax_lot_data, prices, tax_profile) -> float:
+    """Signed realized tax ($) of the SELL trades, lots taken HIFO — the
+    convention plan_rebalance() reports, so paths rank on one scale."""
+    sells: Dict[str, float] = {}
+    for tr in trades:
+        if tr["action"] == "SELL":
+            sells[tr["ticker"]] = sells.get(tr["ticker"], 0.0) + float(tr["shares"])
+    ltcg, stcg = tax_context.realized_gains(sells, tax_lot_data, prices)
+    return round(ltcg * tax_context._marginal_ltcg(tax_profile)
+                 + stcg * tax_context._marginal_ordinary(tax_profile), 2)
+
+
+def plan_rebalance(current_weights, target_weights, nav, prices,
+                   tax_lot_data=None, tax_profile=None, theta=None) -> Optional[FundingPath]:
+    """Tax-aware current→target plan as one mixed-integer program.
+
+    Minimizes  Σ lot tax  +  tracking·nav·Σ|w_after − t|
+               +  band·nav·Σ(excess beyond the rebalancing band)
+               +  trade·nav·(number of trades)
+    over whole-share buys/sells per ticker and continuous per-lot sells,
+    subject to: every trade ≥ min_trade_size_pct·nav or zero, no ticker both
+    bought and sold, sells ≤ held shares, buys ≤ sells + uninvested cash.
+    Lot tax is (price − cost)·rate with the LTCG/STCG rate per lot, so the
+    solver picks lots HIFO-or-better; a losing lot costs 0 in the objective
+    (a credit only with rebalancing.planner_harvest_losses, else the planner
+    would trade purely to harvest losses); shares beyond the
+    lot data are no-basis STCG as in tax_context. Band excess is penalized
+    rather than forbidden, so an infeasible band (min-trade, cash) yields a
+    `partial` plan instead of none. Tickers without a price are left alone.
+
+    Returns a funding path (name "E: Optimized (tax + tracking)") with the
+    usual keys plus tax_cost (signed realized tax, $; negative for a net
+    loss), tracking_error (L1 weight deviation
+    after trades) and solver; None when there is nothing to do or the solver
+    fails.
+    """
+    try:
+        import numpy as np
+        from scipy import sparse
+        from scipy.optimize import Bounds, LinearConstraint, milp
+    except ImportError:
+        log.warning("plan_rebalance: scipy unavailable")
+        return None
+
+    theta = theta or config.load_theta()
+    rb = theta["rebalancing"]
+    tax_profile = tax_profile or {}
+    current_weights = current_weights or {}
+    target_weights = target_weights or {}
+    prices = prices or {}
+    if not nav or nav <= 0:
+        return None
+
+    tickers = [t for t in dict.fromkeys(list(current_weights) + list(target_weights))
+               if (prices.get(t) or 0) > 0]
+    if not tickers:
+        return None
+    n = len(tickers)
+    p = np.array([float(prices[t]) for t in tickers])
+    w = np.array([float(current_weights.get(t, 0.0)) for t in tickers])
+    t = np.array([float(target_weights.get(t, 0.0)) for t in tickers])
+    a = p / nav                                    # weight per share
+    held = np.floor(np.maximum(w, 0.0) * nav / p + 1e-9)
+    cap = np.maximum(rb["band_rel"] * t, a)         # within band → no penalty
+    buy_ub = np.ceil(np.maximum(t - w + cap, 0.0) / a)
+    min_trade = rb["min_trade_size_pct"] * nav
+    cash = max(0.0, (1.0 - float(w.sum())) * nav)
+
+    lots = tax_context.lot_table(tickers, tax_lot_data or {},
+                                 held_shares=dict(zip(tickers, held)))
+    L = len(lots["pos"])
+    rate = np.where(lots["long"], tax_context._marginal_ltcg(tax_profile),
+                    tax_context._marginal_ordinary(tax_profile))
+    lot_tax = (p[lots["pos"]] - lots["cost"]) * rate
+
+    # x = [b, q, zb, zs, d, e | s]
+    B, Q, ZB, ZS, D, E, S = (k * n for k in range(7))
+    size = S + L
+    rows, cols, vals, lo, hi = [], [], [], [], []
+
+    def _block(r0, col0, coef):
+        rows.append(r0 + np.arange(n)); cols.append(col0 + np.arange(n))
+        vals.append(np.broadcast_to(np.asarray(coef, dtype=float), (n,)))
+
+    r = 0
+    # lot sells add up to the ticker's sell
+    rows.append(r + lots["pos"]); cols.append(S + np.arange(L)); vals.append(np.ones(L))
+    _block(r, Q, -1.0)
+    lo.append(np.zeros(n)); hi.append(np.zeros(n)); r += n
+    # d ≥ |w + a(b − q) − t|
+    _block(r, D, 1.0); _block(r, B, -a); _block(r, Q, a)
+    lo.append(w - t); hi.append(np.full(n, np.inf)); r += n
+    _block(r, D, 1.0); _block(r, B, a); _block(r, Q, -a)
+    lo.append(t - w); hi.append(np.full(n, np.inf)); r += n
+    # e ≥ d − cap
+    _block(r, E, 1.0); _block(r, D, -1.0)
+    lo.append(-cap); hi.append(np.full(n, np.inf)); r += n
+    # min trade / indicator links
+    _block(r, B, p); _block(r, ZB, -min_trade)
+    lo.append(np.zeros(n)); hi.append(np.full(n, np.inf)); r += n
+    _block(r, B, 1.0); _block(r, ZB, -buy_ub)
+    lo.append(np.full(n, -np.inf)); hi.append(np.zeros(n)); r += n
+    _block(r, Q, p); _block(r, ZS, -min_trade)
+    lo.append(np.zeros(n)); hi.append(np.full(n, np.inf)); r += n
+    _block(r, Q, 1.0); _block(r, ZS, -held)
+    lo.append(np.full(n, -np.inf)); hi.append(np.zeros(n)); r += n
+    # never buy and sell the same ticker
+    _block(r, ZB, 1.0); _block(r, ZS, 1.0)
+    lo.append(np.zeros(n)); hi.append(np.ones(n)); r += n
+    # buys funded by sells + uninvested cash
+    rows.append(np.full(2 * n, r)); cols.append(np.r_[B + np.arange(n), Q + np.arange(n)])
+    vals.append(np.r_[p, -p])
+    lo.append([-np.inf]); hi.append([cash]); r += 1
+
+    A = sparse.csr_matrix((np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+                          shape=(r, size))
+    c = np.zeros(size)
+    c[D:D + n] = rb["planner_tracking_penalty"] * nav
+    c[E:E + n] = rb["planner_band_penalty"] * nav
+    c[ZB:ZS + n] = rb["planner_trade_penalty"] * nav
+    c[S:] = lot_tax if rb.get("planner_harvest_losses") else np.maximum(lot_tax, 0.0)
+    upper = np.r_[buy_ub, held, np.ones(2 * n), np.full(2 * n, np.inf), lots["shares"]]
+    integrality = np.r_[np.ones(4 * n), np.zeros(2 * n + L)]
+
+    try:
+        res = milp(c, constraints=LinearConstraint(A, np.concatenate(lo), np.concatenate(hi)),
+                   bounds=Bounds(np.zeros(size), upper), integrality=integrality,
+                   options={"time_limit": rb["planner_time_limit_s"],
+                            "mip_rel_gap": rb["planner_mip_gap"]})
+    except (ValueError, TypeError) as e:
+        log.warning("plan_rebalance: solver error: %s", e)
+        return None
+    if res.x is None:
+        log.warning("plan_rebalance: no solution (%s)", res.message)
+        return None
+
+    x = res.x
+    buys = np.round(x[B:B + n]).astype(int)
+    sells = np.round(x[Q:Q + n]).astype(int)
+    lot_sold = x[S:]
+    trades = []
+    for i, tk in enumerate(tickers):
+        if buys[i] > 0:
+            trades.append({"ticker": tk, "action": "BUY", "shares": int(buys[i]),
+                           "weight_delta": round(float(buys[i] * a[i]), 4),
+                           "reason": "optimized"})
+        elif sells[i] > 0:
+            idx = np.flatnonzero((lots["pos"] == i) & (lot_sold > 1e-6))
+            trades.append({"ticker": tk, "action": "SELL", "shares": int(sells[i]),
+                           "weight_delta": round(float(-sells[i] * a[i]), 4),
+                           "reason": "optimized",
+                           "lots": [{"date": lots["date"][j],
+                                     "cost_per_share": (round(float(lots["cost"][j]), 4)
+                                                        if lots["basis"][j] else None),
+                                     "shares": round(float(lot_sold[j]), 4),
+                                     "long_term": bool(lots["long"][j])} for j in idx]})
+    if not trades:
+        return None
+
+    after = w + (buys - sells) * a
+    meta = _empty_path_meta(nav)
+    meta.update({
+        "name": "E: Optimized (tax + tracking)",
+        "trades": trades,
+        "trade_count": len(trades),
+        "tax_cost": round(float(lot_tax @ lot_sold), 2),
+        "tracking_error": round(float(np.abs(after - t).sum()), 4),
+        "partial": bool(np.any(np.abs(after - t) - cap > 1e-9)),
+        "solver": {"status": int(res.status), "message": str(res.message),
+                   "positions": n, "lots": int(L)},
+    })
+    return meta
+
+
 def generate_funding_paths(current_weights, target_weights, nav,
                            tax_lot_data=None, screener_scores=None,
-                           ns2_regimes=None, theta=None, prices=None) -> List[FundingPath]:
+                           ns2_regimes=None, theta=None, prices=None,
+                           tax_profile=None) -> List[FundingPath]:
     """Generate 3-5 ranked funding paths to move current→target weights.
 
     Returns list of paths, each: {name, trades, trade_count, tax_cost,
     risk_impact, partial}. Empty list if no valid path survives guards.
+    With rebalancing.planner_enabled, plan_rebalance()'s optimized path
+    joins the candidates and every path's tax_cost is its signed realized
+    tax, so the lowest_tax criterion compares them directly.
     """
     theta = theta or config.load_theta()
     rb = theta["rebalancing"]
@@ -232,6 +415,19 @@ def generate_funding_paths(current_weights, target_weights, nav,
         if p:
             paths.append(p)
 
+    # ── PATH E: optimized plan (opt-in) ─────────────────────────────────
+    if rb.get("planner_enabled"):
+        p = plan_rebalance(current_weights, target_weights, nav, prices,
+                           tax_lot_data=tax_lot_data, tax_profile=tax_profile,
+                           theta=theta)
+        if p:
+            # E carries a real signed tax_cost; price A–D's sells the same way
+            # so lowest_tax does not rank a loss harvest against 0.0 stubs
+            for q in paths:
+                q["tax_cost"] = _realized_tax(q["trades"], tax_lot_data, prices,
+                                              tax_profile or {})
+            paths.append(p)
+
     # ── STEP 4: rank & cap ──────────────────────────────────────────────
     # ranking_order: fewest_trades ASC → lowest_tax ASC → best_risk DESC
     priority = rb["ranking_order"]
@@ -10,6 +10,12 @@ Phase 1 is self-contained: current_weights + proposed change → target_weights
 are OPTIONAL inputs; when absent, fail-open with conservative defaults.
 
 Returns dicts matching the design-doc §5 API contract.
+
+analyze_batch() scores a whole candidate list (every screener name as an
+add, every holding as a remove, one remove against many adds) in one call:
+the scenarios share one returns/covariance context and are evaluated as a
+scenario x ticker weight matrix; funding paths are generated for the top
+ranked scenarios only.
 """
 
 import logging
@@ -22,6 +28,12 @@ import rebalance as rebalance_mod
 
 log = logging.getLogger("ns6.scenario")
 
+BATCH_KINDS = ("add", "remove", "replace")
+BATCH_LOOKBACK_DAYS = 252      # trailing daily returns behind vol / drawdown
+BATCH_MIN_HISTORY = 60         # fewer valid returns -> ticker treated as no-history
+BATCH_TOP_N = 5                # scenarios that get full funding paths
+ANN = 252
+
 
 def _target_after_change(current_weights, add=None, remove=None,
                          proposed_weight=None) -> Dict:
@@ -120,3 +132,182 @@ def _screener_block(ticker, screener_scores):
     return {"ticker": ticker,
             "agreement": screener_scores.get(ticker),
             "note": "screener verdict from A_T /api/screener (optional input)"}
+
+
+# ── Batch what-if ──────────────────────────────────────────────────────────
+def batch_universe(kind, candidates, current_weights, remove=None) -> List[str]:
+    """Tickers whose closes a batch needs (holdings + candidates + remove)."""
+    out = list(current_weights or {}) + list(candidates or [])
+    if remove:
+        out.append(remove)
+    return list(dict.fromkeys(out))
+
+
+def _batch_targets(kind, candidates, current_weights, proposed_weight, remove):
+    """[(label, add, remove, target_weights)] — one per candidate, via the same
+    _target_after_change the single-scenario endpoints use."""
+    rows = []
+    for tk in candidates:
+        if kind == "add":
+            add, rem = tk, None
+        elif kind == "remove":
+            add, rem = None, tk
+        else:
+            add, rem = tk, remove
+        target = _target_after_change(current_weights, add=add, remove=rem,
+                                      proposed_weight=proposed_weight)
+        rows.append((tk, add, rem, target))
+    return rows
+
+
+def _risk_context(closes, tickers, lookback=BATCH_LOOKBACK_DAYS):
+    """Shared returns matrix + covariance for `tickers`.
+
+    Returns (cols, R, cov): cols are the tickers with >= BATCH_MIN_HISTORY
+    daily returns in the window; R is (T x len(cols)) with missing days as 0;
+    cov is annualized. (None, None, None) when nothing is usable.
+    """
+    import numpy as np
+    import pandas as pd
+
+    series = {tk: closes[tk] for tk in tickers
+              if closes and tk in closes and closes[tk] is not None and len(closes[tk]) > 1}
+    if not series:
+        return None, None, None
+    rets = pd.DataFrame(series).sort_index().pct_change(fill_method=None).iloc[1:].tail(lookback)
+    cols = [tk for tk in rets.columns if rets[tk].notna().sum() >= BATCH_MIN_HISTORY]
+    if not cols:
+        return None, None, None
+    R = rets[cols].fillna(0.0).to_numpy(dtype=float)
+    cov = np.atleast_2d(np.cov(R, rowvar=False)) * ANN
+    return cols, R, cov
+
+
+def _max_drawdowns(R, W):
+    """Max drawdown (negative fraction) of each weight row's NAV path."""
+    import numpy as np
+
+    nav = np.cumprod(1.0 + R @ W.T, axis=0)
+    nav = np.vstack([np.ones((1, W.shape[0])), nav])
+    return (nav / np.maximum.accumulate(nav, axis=0) - 1.0).min(axis=0)
+
+
+def analyze_batch(kind, candidates, current_weights, nav, closes=None,
+                  proposed_weight=None, remove=None, prices=None,
+                  screener_scores=None, ns2_regimes=None, tax_lot_data=None,
+                  theta=None, top_n=BATCH_TOP_N) -> Dict:
+    """Score every candidate scenario at once and rank them.
+
+    kind: "add" (each candidate added at proposed_weight), "remove" (each
+    candidate dropped; default = every holding) or "replace" (`remove`
+    swapped for each candidate). closes: {ticker: Close series} for
+    holdings + candidates (price_feed.fetch_prices shape); without them the
+    risk fields are None and only the stop-cost budget is scored.
+
+    Each scenario reports ex-ante vol and trailing max drawdown of its
+    target weights (same un-normalised weights analyze_* use) and the deltas
+    vs the current portfolio, plus worst_case_stop_cost. Ranked by vol
+    delta, then drawdown delta, then stop cost; scenarios whose changed
+    ticker has no usable history sort last. The top_n ranked scenarios also
+    carry funding paths exactly as the single-scenario endpoints build them.
+    """
+    import numpy as np
+
+    if kind not in BATCH_KINDS:
+        raise ValueError(f"kind must be one of {BATCH_KINDS}")
+    theta = theta or config.load_theta()
+    current_weights = dict(current_weights or {})
+    if kind == "remove" and not candidates:
+        candidates = list(current_weights)
+    candidates = [c for c in dict.fromkeys(candidates or []) if c]
+    if kind == "replace":
+        candidates = [c for c in candidates if c != remove]
+
+    rows = _batch_targets(kind, candidates, current_weights, proposed_weight, remove)
+    stop = abs(theta["position_stops"].get("equity", theta["position_stops"]["unknown"]))
+
+    cols, R, cov = _risk_context(closes, batch_universe(kind, candidates, current_weights, remove))
+    current_risk = {"vol": None, "max_drawdown": None, "coverage": None}
+    vols = dds = cover = None
+    if cols is not None:
+        pos = {tk: j for j, tk in enumerate(cols)}
+        W = np.zeros((len(rows) + 1, len(cols)))
+        gross = np.zeros(len(rows) + 1)
+        for i, weights in enumerate([current_weights] + [r[3] for r in rows]):
+            for tk, w in weights.items():
+                gross[i] += abs(w)
+                if tk in pos:
+                    W[i, pos[tk]] = w
+        vols = np.sqrt(np.maximum(np.einsum("ij,jk,ik->i", W, cov, W), 0.0))
+        dds = _max_drawdowns(R, W)
+        cover = np.divide(np.abs(W).sum(axis=1), gross, out=np.zeros_like(gross),
+                          where=gross > 0)
+        current_risk = {"vol": round(float(vols[0]), 4),
+                        "max_drawdown": round(float(dds[0]), 4),
+                        "coverage": round(float(cover[0]), 4)}
+
+    scenarios = []
+    for i, (label, add, rem, target) in enumerate(rows, start=1):
+        changed = add if add else rem
+        has_history = cols is not None and changed in cols
+        cost = (round(target[add] * stop, 4) if add and add in target and nav else None)
+        row = {
+            "candidate": label,
+            "new_ticker": add,
+            "removed_ticker": rem,
+            "weight_changes": _weight_changes(current_weights, target),
+            "worst_case_stop_cost": cost,
+            "vol": None, "vol_delta": None,
+            "max_drawdown": None, "max_drawdown_delta": None,
+            "coverage": None,
+            "has_history": bool(has_history),
+            "screener_agreement": (screener_scores or {}).get(add) if add else None,
+        }
+        if vols is not None:
+            row.update(
+                vol=round(float(vols[i]), 4),
+                vol_delta=round(float(vols[i] - vols[0]), 4),
+                max_drawdown=round(float(dds[i]), 4),
+                max_drawdown_delta=round(float(dds[i] - dds[0]), 4),
+                coverage=round(float(cover[i]), 4),
+            )
+        scenarios.append((row, target))
+
+    def _rank_key(item):
+        row = item[0]
+        return (not row["has_history"],
+                row["vol_delta"] if row["vol_delta"] is not None else float("inf"),
+                -(row["max_drawdown_delta"] or 0.0),
+                row["worst_case_stop_cost"] or 0.0)
+
+    scenarios.sort(key=_rank_key)
+    ranked = []
+    for rank, (row, target) in enumerate(scenarios, start=1):
+        row["rank"] = rank
+        if rank <= top_n:
+            row["funding_paths"] = rebalance_mod.generate_funding_paths(
+                current_weights, target, nav,
+                screener_scores=screener_scores or {}, ns2_regimes=ns2_regimes or {},
+                theta=theta, prices=prices or {}, tax_lot_data=tax_lot_data,
+            )
+        ranked.append(row)
+
+    return {
+        "kind": kind,
+        "removed_ticker": remove if kind == "replace" else None,
+        "proposed_weight": proposed_weight,
+        "n_scenarios": len(ranked),
+        "current": current_risk,
+        "lookback_days": BATCH_LOOKBACK_DAYS,
+        "scenarios": ranked,
+    }
+
+
+def _weight_changes(current_weights, target_weights) -> Dict:
+    """{ticker: [before, after]} for the legs a scenario changes."""
+    out = {}
+    for tk in set(current_weights) | set(target_weights):
+        before, after = current_weights.get(tk, 0.0), target_weights.get(tk, 0.0)
+        if tk not in current_weights or tk not in target_weights or before != after:
+            out[tk] = [round(before, 4), round(after, 4)]
+    return out
@@ -326,26 +326,88 @@ def query_performance(limit: int = 1000) -> List[Dict]:
                 "FROM performance_log ORDER BY date DESC LIMIT ?",
                 (limit,),
             ).fetchall()
-        out: List[Dict] = []
-        for r in rows:
-            row = {
-                "date": r[0],
-                "nav": r[1],
-                "ret": r[2],
-                "spy_ret": r[3],
-                "universe_ret": r[4],
-            }
-            try:
-                row["contributions"] = json.loads(r[5]) if r[5] else {}
-            except (ValueError, TypeError):
-                row["contributions"] = {}
-            out.append(row)
-        return out
+        return [_performance_row(r) for r in rows]
     except Exception as exc:  # noqa: BLE001
         log.warning("query_performance failed: %s", exc)
         return []
 
 
+def query_performance_since(since: Optional[str] = None) -> List[Dict]:
+    """Performance rows dated on/after `since` (all when None), OLDEST first —
+    the incremental feed for performance.PerformanceSeries. Prod: Postgres."""
+    if _use_pg():
+        try:
+            import common.db
+            return [dict(r) for r in common.db.query_performance_since(since)]
+        except Exception as exc:  # noqa: BLE001
+            log.warning("pg query_performance_since failed (fallback sqlite): %s", exc)
+    try:
+        with _connect() as conn:
+            rows = conn.execute(
+                "SELECT date, nav, ret, spy_ret, universe_ret, contributions "
+                "FROM performance_log WHERE date >= ? ORDER BY date ASC",
+                (since or "",),
+            ).fetchall()
+        return [_performance_row(r) for r in rows]
+    except Exception as exc:  # noqa: BLE001
+        log.warning("query_performance_since failed: %s", exc)
+        return []
+
+
+def performance_watermark() -> Optional[int]:
+    """Write watermark of performance_log: MAX(rowid), which INSERT OR REPLACE
+    always advances (Postgres: the performance_meta version every upsert bumps
+    in its own transaction). A key lookup, not a scan. 0 for an empty table,
+    None when it cannot be read. Prod: Postgres."""
+    if _use_pg():
+        try:
+            import common.db
+            return common.db.performance_watermark()
+        except Exception as exc:  # noqa: BLE001
+            log.warning("pg performance_watermark failed (fallback sqlite): %s", exc)
+    try:
+        with _connect() as conn:
+            mark = conn.execute("SELECT MAX(rowid) FROM performance_log").fetchone()[0]
+        return int(mark or 0)
+    except Exception as exc:  # noqa: BLE001
+        log.warning("performance_watermark failed: %s", exc)
+        return None
+
+
+def performance_written_since(mark: int) -> Optional[str]:
+    """Earliest date among rows written after watermark `mark` (None when
+    none or unreadable) — older than the reader's last date means history
+    was backfilled or rewritten. Prod: Postgres."""
+    if _use_pg():
+        try:
+            import common.db
+            return common.db.performance_written_since(mark)
+        except Exception as exc:  # noqa: BLE001
+            log.warning("pg performance_written_since failed (fallback sqlite): %s", exc)
+    try:
+        with _connect() as conn:
+            return conn.execute("SELECT MIN(date) FROM performance_log WHERE rowid > ?",
+                                (mark,)).fetchone()[0]
+    except Exception as exc:  # noqa: BLE001
+        log.warning("performance_written_since failed: %s", exc)
+        return None
+
+
+def _performance_row(r) -> Dict:
+    row = {
+        "date": r[0],
+        "nav": r[1],
+        "ret": r[2],
+        "spy_ret": r[3],
+        "universe_ret": r[4],
+    }
+    try:
+        row["contributions"] = json.loads(r[5]) if r[5] else {}
+    except (ValueError, TypeError):
+        row["contributions"] = {}
+    return row
+
+
 # ── Alerts file (G5) ─────────────────────────────────────────────────────
 ALERTS_LOG = Path(__file__).resolve().parent / "logs" / "ns6_alerts.log"
 
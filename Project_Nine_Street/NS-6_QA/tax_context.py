@@ -48,6 +48,74 @@ def _holding_days(acquired: str):
 
 
 # ── Lot selection ─────────────────────────────────────────────────────────
+def lot_table(tickers, tax_lot_data, held_shares=None, now=None) -> Dict:
+    """Flatten the lots of `tickers` into parallel numpy arrays, HIFO-ordered
+    within each ticker (highest cost basis first).
+
+    Keys: pos (index into tickers), shares, cost, long (held > 365d), basis
+    (False = no cost basis: conservative cost 0, STCG), date. Shares beyond
+    the ticker's lots — all of held_shares[ticker] minus lot shares, or
+    unbounded without held_shares — sit in a trailing no-basis lot: the same
+    worst case _select_lots applies.
+    """
+    import numpy as np
+
+    now = now or datetime.now()
+    held_shares = held_shares or {}
+    pos, shares, cost, long_, basis, dates = [], [], [], [], [], []
+    for i, tk in enumerate(tickers):
+        position = tax_lot_data.get(tk) if tax_lot_data else None
+        lots = (position.get("lots") or []) if isinstance(position, dict) else []
+        covered = 0.0
+        for lot in lots:
+            n = float(lot.get("shares", 0))
+            if n <= 0:
+                continue
+            try:
+                days = (now - datetime.fromisoformat(lot.get("date"))).days
+            except (ValueError, TypeError):
+                days = None
+            pos.append(i)
+            shares.append(n)
+            cost.append(float(lot.get("cost_per_share", 0.0)))
+            long_.append(days is not None and days > STCG_HOLDING_DAYS)
+            basis.append(True)
+            dates.append(lot.get("date"))
+            covered += n
+        extra = float(held_shares.get(tk, 0.0)) - covered if held_shares else np.inf
+        if extra > 1e-9:
+            pos.append(i)
+            shares.append(extra)
+            cost.append(0.0)
+            long_.append(False)
+            basis.append(False)
+            dates.append(None)
+    table = {"pos": np.array(pos, dtype=int), "shares": np.array(shares, dtype=float),
+             "cost": np.array(cost, dtype=float), "long": np.array(long_, dtype=bool),
+             "basis": np.array(basis, dtype=bool), "date": np.array(dates, dtype=object)}
+    # HIFO within ticker; no-basis remainder lots go last
+    order = np.lexsort((~table["basis"], -table["cost"], table["pos"]))
+    return {k: v[order] for k, v in table.items()}
+
+
+def hifo_allocate(table, sell_shares):
+    """Shares taken from each lot when selling sell_shares[pos] per ticker,
+    highest cost first — one cumulative-sum pass over every lot."""
+    import numpy as np
+
+    pos, shares = table["pos"], table["shares"]
+    if not len(pos):
+        return np.zeros(0)
+    # unbounded no-basis lots are last in their ticker, so their size never
+    # enters anyone's running total
+    sized = np.where(np.isinf(shares), 0.0, shares)
+    prior = np.cumsum(sized) - sized
+    first = np.r_[True, pos[1:] != pos[:-1]]
+    before = prior - np.maximum.accumulate(np.where(first, prior, 0.0))
+    want = np.asarray(sell_shares, dtype=float)[pos]
+    return np.clip(want - before, 0.0, shares)
+
+
 def _select_lots(ticker, shares_to_sell, tax_lot_data, sell_price):
     """Allocate a sell across lots, highest cost basis first.
 
@@ -55,43 +123,28 @@ def _select_lots(ticker, shares_to_sell, tax_lot_data, sell_price):
     No lot data → worst case: entire proceeds taxable, treated as STCG.
     """
     position = tax_lot_data.get(ticker) if tax_lot_data else None
-    lots = []
-    if position and isinstance(position, dict):
-        lots = position.get("lots") or []
-
-    if not lots:
-        # no cost basis — entire proceeds are gain, STCG (conservative)
-        return sell_price * shares_to_sell, 0.0, sell_price * shares_to_sell, True
-
-    # highest cost basis first → minimise realized gain
-    lots_sorted = sorted(lots, key=lambda l: l.get("cost_per_share", 0.0), reverse=True)
-
-    total_gain = ltcg = stcg = 0.0
-    remaining = shares_to_sell
-    for lot in lots_sorted:
-        if remaining <= 0:
-            break
-        lot_shares = float(lot.get("shares", 0))
-        cost = float(lot.get("cost_per_share", 0))
-        if lot_shares <= 0:
-            continue
-        used = min(remaining, lot_shares)
-        gain = (sell_price - cost) * used
-        days = _holding_days(lot.get("date"))
-        if days is None or days <= STCG_HOLDING_DAYS:
-            stcg += gain
-        else:
-            ltcg += gain
-        total_gain += gain
-        remaining -= used
-
-    # any unsold shares (lot data insufficient) → no basis, STCG
-    if remaining > 1e-9:
-        extra = sell_price * remaining
-        total_gain += extra
-        stcg += extra
-
-    return total_gain, ltcg, stcg, False
+    unclassified = not (isinstance(position, dict) and position.get("lots"))
+    table = lot_table([ticker], tax_lot_data)
+    used = hifo_allocate(table, [float(shares_to_sell)])
+    gain = (sell_price - table["cost"]) * used
+    ltcg = float(gain[table["long"]].sum())
+    stcg = float(gain[~table["long"]].sum())
+    return ltcg + stcg, ltcg, stcg, unclassified
+
+
+def realized_gains(sells, tax_lot_data, prices):
+    """(ltcg, stcg) in $ for {ticker: shares} sold at prices, HIFO per ticker,
+    every ticker's lots allocated in one vectorized pass."""
+    import numpy as np
+
+    tickers = [tk for tk, n in sells.items() if n > 0]
+    if not tickers:
+        return 0.0, 0.0
+    table = lot_table(tickers, tax_lot_data)
+    used = hifo_allocate(table, [float(sells[tk]) for tk in tickers])
+    px = np.array([float(prices.get(tk, 0.0)) for tk in tickers])[table["pos"]]
+    gain = (px - table["cost"]) * used
+    return float(gain[table["long"]].sum()), float(gain[~table["long"]].sum())
 
 
 # ── Tax cost ──────────────────────────────────────────────────────────────
@@ -115,19 +168,12 @@ def compute_funding_tax_cost(funding_path, tax_lot_data=None, tlh_available=0.0,
     stcg_rate = _marginal_ordinary(tax_profile)
     ltcg_rate = _marginal_ltcg(tax_profile)
 
-    gross = 0.0
-    stcg_gross = 0.0
-    ltcg_gross = 0.0
+    sells: Dict[str, float] = {}
     for trade in (funding_path or {}).get("trades", []):
         if trade.get("action") != "SELL":
             continue
-        ticker = trade["ticker"]
-        shares = float(trade.get("shares", 0))
-        sell_price = float(prices.get(ticker, 0.0))
-        _, ltcg_gain, stcg_gain, _ = _select_lots(ticker, shares, tax_lot_data, sell_price)
-        ltcg_gross += ltcg_gain
-        stcg_gross += stcg_gain
-        gross += ltcg_gain + stcg_gain
+        sells[trade["ticker"]] = sells.get(trade["ticker"], 0.0) + float(trade.get("shares", 0))
+    ltcg_gross, stcg_gross = realized_gains(sells, tax_lot_data, prices)
 
     tax_stcg = stcg_gross * stcg_rate
     tax_ltcg = ltcg_gross * ltcg_rate
@@ -26,6 +26,7 @@ def temp_db(tmp_path, monkeypatch):
     store.init_db()
     monkeypatch.setattr(qa_server.regime_store_mod, "latest", lambda: None)
     monkeypatch.setattr(qa_server, "NS5_PORTFOLIOS_PATH", tmp_path / "nope.json")
+    monkeypatch.setattr(qa_server, "_perf_series", None)
     return tmp_path
 
 
@@ -176,3 +177,107 @@ def test_performance_endpoint_sane(tmp_path, monkeypatch):
     assert body["attribution"]["sum_contributions"] is not None
     # no baseline file -> reconciliation fail-open None
     assert body["reconciliation"] is None
+
+
+# ── Incremental series ────────────────────────────────────────────────────
+def _rows(n, start="2025-11-03"):
+    import random
+    rnd = random.Random(11)
+    idx = pd.bdate_range(start, periods=n)
+    nav = 1.0
+    out = []
+    for i, d in enumerate(idx):
+        nav *= 1.0 + rnd.gauss(0.0004, 0.01)
+        out.append({"date": d.strftime("%Y-%m-%d"), "nav": nav,
+                    "spy_ret": None if i % 7 == 0 else rnd.gauss(0.0003, 0.009),
+                    "universe_ret": rnd.gauss(0.0003, 0.008),
+                    "contributions": {"A": rnd.gauss(0, 0.002), f"T{i % 9}": rnd.gauss(0, 0.001)}})
+    return out
+
+
+def test_series_matches_list_metrics():
+    rows = _rows(400)
+    navs = [r["nav"] for r in rows]
+    series = performance_mod.PerformanceSeries()
+    assert series.extend(rows[:150]) and series.extend(rows[149:])   # overlap replays last day
+    assert len(series) == 400
+    for w in (21, 63, 252, None):
+        exp = performance_mod.trailing_metrics(navs, window=w)
+        got = series.trailing(w)
+        for k, v in exp.items():
+            assert got[k] == pytest.approx(v, abs=1.01e-4)
+        seg = rows[-w:] if w else rows
+        assert series.benchmarks(w)["spy"] == pytest.approx(
+            performance_mod.compounded_return([r["spy_ret"] for r in seg]))
+    assert series.attribution() == performance_mod.attribution(rows)
+    # YTD: base is the prior year's last close
+    year_start = rows[-1]["date"][:4] + "-01-01"
+    first = next(i for i, r in enumerate(rows) if r["date"] >= year_start)
+    assert series.trailing("ytd")["total_return"] == pytest.approx(
+        round(navs[-1] / navs[first - 1] - 1.0, 4))
+
+
+def test_series_replaces_last_day_and_flags_backfill():
+    rows = _rows(30)
+    series = performance_mod.PerformanceSeries()
+    series.extend(rows)
+    before = series.trailing()
+    bumped = dict(rows[-1], nav=rows[-1]["nav"] * 1.05, contributions={"A": 0.05})
+    assert series.extend([bumped])
+    assert len(series) == 30
+    fresh = performance_mod.PerformanceSeries()
+    fresh.extend(rows[:-1] + [bumped])
+    assert series.trailing() == fresh.trailing() != before
+    assert series.attribution() == fresh.attribution()
+    assert series.extend([rows[3]]) is False
+
+
+def test_performance_endpoint_appends_incrementally():
+    rows = _rows(300)
+    for r in rows[:-1]:
+        store.upsert_performance(r["date"], r["nav"], None, r["spy_ret"],
+                                 r["universe_ret"], r["contributions"])
+    h = _make_handler()
+    h._performance()
+    series = qa_server._perf_series
+    assert h._sent["body"]["as_of"] == rows[-2]["date"]
+    last = rows[-1]
+    store.upsert_performance(last["date"], last["nav"], None, last["spy_ret"],
+                             last["universe_ret"], last["contributions"])
+    h._performance()
+    body = h._sent["body"]
+    assert qa_server._perf_series is series and len(series) == 300
+    assert body["as_of"] == last["date"]
+    assert body["trailing"]["ytd"] is not None and "ytd" in body["excess"]
+    assert body["trailing"]["inception"]["n_days"] == 299
+    # a rewritten older day changes the fingerprint → full reload
+    store.upsert_performance(rows[5]["date"], rows[5]["nav"] * 2, None)
+    h._performance()
+    assert float(qa_server._perf_series.navs[5]) == pytest.approx(rows[5]["nav"] * 2)
+
+
+def test_performance_endpoint_skips_work_while_watermark_holds(tmp_path, monkeypatch):
+    import json
+    rows = _rows(40)
+    for r in rows:
+        store.upsert_performance(r["date"], r["nav"], None)
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({r["date"]: r["nav"] for r in rows}))
+    monkeypatch.setattr(performance_mod, "BASELINE_PATH", baseline)
+    reconciles = []
+    real = performance_mod.reconcile
+    monkeypatch.setattr(performance_mod, "reconcile",
+                        lambda *a, **k: reconciles.append(1) or real(*a, **k))
+    h = _make_handler()
+    h._performance()
+    first = h._sent["body"]["reconciliation"]
+    reads = []
+    monkeypatch.setattr(store, "query_performance_since",
+                        lambda since: reads.append(since) or [])
+    h._performance()
+    assert reads == [] and len(reconciles) == 1
+    assert h._sent["body"]["reconciliation"] == first
+    # an unreadable watermark counts as unchanged, not as a reason to reload
+    monkeypatch.setattr(store, "performance_watermark", lambda: None)
+    h._performance()
+    assert reads == [] and len(reconciles) == 1 and len(qa_server._perf_series) == 40
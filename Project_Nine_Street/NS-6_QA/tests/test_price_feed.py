@@ -4,7 +4,8 @@
 Covers: holdings resolution (model + NS-5 shares→weights), portfolio NAV
 drawdown (shares + weights paths), the sign-correct budget snapshot (real
 breach AND real non-breach — a "clean" case alone passes silently), staleness,
-and the run_once batch (no-data -> no row; data -> one row).
+the run_once batch (no-data -> no row; data -> one row), and the
+incremental grouped fetch + segmented per-ticker cache.
 
 Run: env -u PYTHONPATH python3 -m pytest tests/test_price_feed.py -q
 """
@@ -30,7 +31,7 @@ def temp_db(tmp_path, monkeypatch):
     """Isolated NS-6 store (temp db) — price_feed touches no other state."""
     monkeypatch.setattr(store, "DB_PATH", tmp_path / "ns6.db")
     store.init_db()
-    monkeypatch.setattr(price_feed, "PRICES_CACHE", tmp_path / "ns6_prices.pkl")
+    monkeypatch.setattr(price_feed, "PRICES_CACHE", tmp_path / "ns6_prices")
     return tmp_path
 
 
@@ -202,3 +203,162 @@ def test_run_once_low_vix_leaves_crisis_off(monkeypatch):
     snap = price_feed.run_once()
     assert snap["crisis_mode"] is False
     assert store.get_crisis_mode() is False
+
+
+# ── Incremental grouped fetch + segmented cache ────────────────────────────
+class _FakeYahoo:
+    """Stands in for _download_closes: a fixed market, one call per group."""
+
+    def __init__(self, market):
+        self.market = market
+        self.calls = []
+
+    def __call__(self, tickers, **window):
+        self.calls.append((sorted(tickers), window))
+        frame = self.market[[tk for tk in tickers if tk in self.market.columns]]
+        if "start" in window:
+            frame = frame.loc[frame.index >= pd.Timestamp(window["start"])]
+        return frame
+
+
+def _market(days=300, end=None):
+    idx = pd.bdate_range(end=end or date.today(), periods=days)
+    return pd.DataFrame({
+        "AAA": [100.0 + i for i in range(days)],
+        "BBB": [50.0 + 0.5 * i for i in range(days)],
+        "SPY": [400.0 + 0.1 * i for i in range(days)],
+    }, index=idx)
+
+
+def test_fetch_prices_one_grouped_request_then_tail_only(monkeypatch):
+    market = _market()
+    fake = _FakeYahoo(market.iloc[:-5])
+    monkeypatch.setattr(price_feed, "_download_closes", fake)
+    out = price_feed.fetch_prices(["AAA", "BBB", "SPY"], period="2y")
+    assert fake.calls == [(["AAA", "BBB", "SPY"], {"period": "2y"})]
+    assert set(out) == {"AAA", "BBB", "SPY"}
+    assert price_feed.PRICES_CACHE.exists()
+
+    fake = _FakeYahoo(market)
+    monkeypatch.setattr(price_feed, "_download_closes", fake)
+    out = price_feed.fetch_prices(["AAA", "BBB", "SPY"], period="2y")
+    assert len(fake.calls) == 1
+    tickers, window = fake.calls[0]
+    assert tickers == ["AAA", "BBB", "SPY"] and "start" in window
+    assert pd.Timestamp(window["start"]) > market.index[-20]
+    for tk in ("AAA", "BBB", "SPY"):
+        pd.testing.assert_series_equal(out[tk], market[tk].rename("Close"),
+                                       check_freq=False)
+
+
+def test_fetch_prices_new_and_restated_tickers_get_full_history(monkeypatch):
+    market = _market()
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market[["AAA", "BBB"]]))
+    price_feed.fetch_prices(["AAA", "BBB"])
+    split = market.copy()
+    split["BBB"] = split["BBB"] / 2            # 2:1 split restates history
+    fake = _FakeYahoo(split)
+    monkeypatch.setattr(price_feed, "_download_closes", fake)
+    out = price_feed.fetch_prices(["AAA", "BBB", "SPY"])
+    assert fake.calls[0][0] == ["AAA", "BBB"]
+    assert fake.calls[1] == (["BBB", "SPY"], {"period": "2y"})
+    assert out["BBB"].iloc[0] == pytest.approx(25.0)
+    assert "SPY" in out
+
+
+def test_fetch_prices_keeps_restated_ticker_until_refetch_succeeds(monkeypatch):
+    market = _market()
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market[["AAA", "BBB"]]))
+    first = price_feed.fetch_prices(["AAA", "BBB"])
+    split = market.copy()
+    split["BBB"] = split["BBB"] / 2
+    tail_only = _FakeYahoo(split)
+    monkeypatch.setattr(price_feed, "_download_closes",
+                        lambda tickers, **w: tail_only(tickers, **w) if "start" in w
+                        else pd.DataFrame())
+    out = price_feed.fetch_prices(["AAA", "BBB"])
+    pd.testing.assert_series_equal(out["BBB"], first["BBB"], check_freq=False)
+    assert list(price_feed._load_cache().columns) == ["AAA", "BBB"]
+
+
+def test_fetch_prices_partial_last_bar_is_not_a_restatement(monkeypatch):
+    market = _market()
+    intraday = market.iloc[:-5].copy()
+    intraday.iloc[-1, intraday.columns.get_loc("AAA")] += 0.37   # fetched mid-session
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(intraday))
+    price_feed.fetch_prices(["AAA", "BBB", "SPY"])
+    fake = _FakeYahoo(market)
+    monkeypatch.setattr(price_feed, "_download_closes", fake)
+    out = price_feed.fetch_prices(["AAA", "BBB", "SPY"])
+    assert len(fake.calls) == 1 and "start" in fake.calls[0][1]
+    pd.testing.assert_series_equal(out["AAA"], market["AAA"].rename("Close"),
+                                   check_freq=False)
+
+
+def test_fetch_prices_groups_tails_by_each_tickers_last_date(monkeypatch):
+    market = _market()
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market[["AAA", "BBB"]]))
+    price_feed.fetch_prices(["AAA", "BBB"])
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market.iloc[:-60]))
+    price_feed.fetch_prices(["SPY"])                  # SPY cached 60 bars behind
+    fake = _FakeYahoo(market)
+    monkeypatch.setattr(price_feed, "_download_closes", fake)
+    out = price_feed.fetch_prices(["AAA", "BBB", "SPY"])
+    starts = {tuple(tks): pd.Timestamp(w["start"]) for tks, w in fake.calls}
+    assert set(starts) == {("AAA", "BBB"), ("SPY",)}
+    assert starts[("AAA", "BBB")] > market.index[-20]   # not dragged back by SPY
+    assert starts[("SPY",)] < market.index[-60]
+    pd.testing.assert_series_equal(out["SPY"], market["SPY"].rename("Close"),
+                                   check_freq=False)
+
+
+def test_tail_refresh_rewrites_only_the_touched_segments(monkeypatch):
+    market = _market(days=600)
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market.iloc[:-5]))
+    price_feed.fetch_prices(["AAA"])
+    written = []
+    write = price_feed._write_segment
+    monkeypatch.setattr(price_feed, "_write_segment",
+                        lambda path, closes: (written.append(int(path.stem)),
+                                              write(path, closes)))
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market))
+    out = price_feed.fetch_prices(["AAA"])
+    first_touched = (market.index[-6] - pd.Timedelta(days=price_feed.OVERLAP_DAYS)).year
+    assert written == list(range(first_touched, market.index[-1].year + 1))
+    assert market.index[0].year < first_touched       # older years left alone
+    window = market["AAA"].loc[out["AAA"].index[0]:].rename("Close")
+    pd.testing.assert_series_equal(out["AAA"], window, check_freq=False)
+
+
+def test_fetch_prices_fail_open_uses_cache(monkeypatch):
+    market = _market()
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market))
+    first = price_feed.fetch_prices(["AAA", "SPY"])
+    monkeypatch.setattr(price_feed, "_download_closes", lambda *a, **k: pd.DataFrame())
+    again = price_feed.fetch_prices(["AAA", "SPY", "ZZZ"])
+    assert set(again) == {"AAA", "SPY"}
+    pd.testing.assert_series_equal(again["AAA"], first["AAA"], check_freq=False)
+
+
+def test_cache_trimmed_to_period_window(monkeypatch):
+    market = _market(days=900)
+    monkeypatch.setattr(price_feed, "_download_closes", _FakeYahoo(market))
+    out = price_feed.fetch_prices(["AAA", "BBB"], period="1y")
+    assert out["AAA"].index[0] >= pd.Timestamp(date.today()) - pd.DateOffset(years=1)
+    cached = price_feed._load_cache()
+    assert list(cached.columns) == ["AAA", "BBB"]
+    start = pd.Timestamp(date.today()) - pd.DateOffset(years=1)
+    assert cached.index[0].year == start.year         # whole older years dropped
+    segments = sorted(p.stem for p in (price_feed.PRICES_CACHE / "AAA").glob("*.npz"))
+    assert segments == [str(y) for y in range(start.year, date.today().year + 1)]
+
+
+def test_position_drawdowns_and_corr_vectorized():
+    closes = _closes(("A", [100.0, 120.0, 90.0]), ("B", [10.0, 11.0, 12.0]))
+    closes["C"] = pd.Series([50.0, 40.0], index=closes["A"].index[:2])
+    dd = price_feed.compute_position_drawdowns(closes)
+    assert dd == {"A": round(budget_mod.compute_drawdown([100, 120, 90]), 4),
+                  "B": 0.0, "C": -0.2}
+    twins = _closes(("A", [1.0, 2.0, 1.5, 3.0]), ("B", [2.0, 4.0, 3.0, 6.0]),
+                    ("C", [3.0, 1.5, 2.0, 1.0]))
+    assert price_feed.cross_sectional_corr(twins) == pytest.approx(-1 / 3, abs=1e-4)
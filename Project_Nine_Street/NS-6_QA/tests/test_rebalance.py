@@ -191,3 +191,102 @@ def test_no_changes_no_paths():
     cur = {"BIL": 1.0}
     tgt = {"BIL": 1.0}
     assert _run(cur, tgt) == []
+
+
+# ── Path E: optimized planner (opt-in) ───────────────────────────────────
+def _planner_theta(**kw):
+    th = load_theta()
+    th["rebalancing"].update(kw)
+    return th
+
+
+def test_planner_off_by_default():
+    cur = {"MSFT": 0.10, "BIL": 0.90}
+    tgt = {"NVDA": 0.10, "BIL": 0.90}
+    assert not any(p["name"].startswith("E") for p in _run(cur, tgt))
+
+
+def test_planner_sells_loss_lot_and_stays_in_band():
+    lots = {"AAPL": {"lots": [
+        {"shares": 300, "cost_per_share": 50, "date": "2018-01-01"},
+        {"shares": 300, "cost_per_share": 210, "date": "2026-06-01"}]}}
+    cur = {"AAPL": 0.12, "JPM": 0.10, "BIL": 0.78}
+    tgt = {"AAPL": 0.05, "NVDA": 0.05, "JPM": 0.10, "BIL": 0.80}
+    paths = _run(cur, tgt, tax_lot_data=lots, theta=_planner_theta(planner_enabled=True))
+    e = [p for p in paths if p["name"].startswith("E")][0]
+    trades = {t["ticker"]: t for t in e["trades"]}
+    assert trades["AAPL"]["action"] == "SELL"
+    assert [lot["cost_per_share"] for lot in trades["AAPL"]["lots"]] == [210.0]
+    assert trades["NVDA"]["action"] == "BUY"
+    assert e["tax_cost"] <= 0.0                       # signed: the 210 lot is a loss
+    assert e["partial"] is False
+    # AAPL lands at the top of its band (0.05 × 1.2), not the target
+    assert 0.05 < 0.12 + trades["AAPL"]["weight_delta"] <= 0.06 + 1e-9
+
+
+def test_planner_prices_every_path_for_lowest_tax():
+    # MSFT sold at a gain funds A; with E in the mix, A must carry that tax
+    # rather than the 0.0 stub, and lowest_tax must order by it
+    lots = {"MSFT": {"lots": [{"shares": 250, "cost_per_share": 100, "date": "2018-01-01"}]},
+            "AAPL": {"lots": [{"shares": 600, "cost_per_share": 210, "date": "2026-06-01"}]}}
+    cur = {"MSFT": 0.10, "AAPL": 0.12, "BIL": 0.78}
+    tgt = {"NVDA": 0.10, "AAPL": 0.05, "BIL": 0.85}
+    theta = _planner_theta(planner_enabled=True, ranking_order=["lowest_tax"])
+    paths = _run(cur, tgt, tax_lot_data=lots, theta=theta)
+    a = [p for p in paths if p["name"].startswith("A")][0]
+    assert a["tax_cost"] == pytest.approx(250 * (400 - 100) * 0.20, abs=0.01)
+    assert [p["tax_cost"] for p in paths] == sorted(p["tax_cost"] for p in paths)
+
+
+def test_planner_no_op_target_does_not_harvest():
+    # current == target with a deep loss lot: nothing to do unless harvesting is opted in
+    lots = {"AAPL": {"lots": [{"shares": 1000, "cost_per_share": 200, "date": "2026-06-01"}]}}
+    cur = {"AAPL": 0.5, "BIL": 0.5}
+    prices = {"AAPL": 100.0, "BIL": 100.0}
+    assert rebalance.plan_rebalance(cur, dict(cur), 200000, prices, tax_lot_data=lots,
+                                    theta=load_theta()) is None
+    p = rebalance.plan_rebalance(cur, dict(cur), 200000, prices, tax_lot_data=lots,
+                                 theta=_planner_theta(planner_harvest_losses=True))
+    assert p is not None and p["tax_cost"] < 0
+
+
+def test_planner_respects_min_trade_and_cash():
+    theta = load_theta()
+    # NVDA add (0.2%) is below the 0.5% min trade → nothing to do
+    assert rebalance.plan_rebalance({"AAPL": 0.05, "BIL": 0.95},
+                                    {"AAPL": 0.05, "NVDA": 0.002, "BIL": 0.948},
+                                    NAV, PRICES, theta=theta) is None
+    # uninvested cash funds the buy; no sells needed
+    p = rebalance.plan_rebalance({"AAPL": 0.5}, {"AAPL": 0.5, "NVDA": 0.3}, NAV, PRICES,
+                                 theta=theta)
+    assert [(t["ticker"], t["action"]) for t in p["trades"]] == [("NVDA", "BUY")]
+    assert p["trades"][0]["weight_delta"] == pytest.approx(0.3, abs=0.07)
+    # buys never exceed cash + sell proceeds → partial
+    p = rebalance.plan_rebalance({"AAPL": 0.5}, {"AAPL": 0.5, "NVDA": 0.8}, NAV, PRICES,
+                                 theta=theta)
+    flow = sum(t["shares"] * PRICES[t["ticker"]] * (1 if t["action"] == "BUY" else -1)
+               for t in p["trades"])
+    assert flow <= 0.5 * NAV
+    assert p["partial"] is True
+
+
+def test_planner_scales_to_many_lots():
+    import time
+    import numpy as np
+    rng = np.random.default_rng(7)
+    n = 300
+    tickers = [f"T{i:03d}" for i in range(n)]
+    w = rng.dirichlet(np.ones(n)) * 0.98
+    tgt = w * rng.uniform(0.3, 1.7, n)
+    tgt *= 0.98 / tgt.sum()
+    prices = dict(zip(tickers, rng.uniform(20, 500, n)))
+    lots = {t: {"lots": [{"shares": float(rng.integers(1, 80)),
+                          "cost_per_share": prices[t] * rng.uniform(0.5, 1.5),
+                          "date": str(rng.choice(["2019-05-01", "2026-08-01"]))}
+                         for _ in range(10)]} for t in tickers}
+    start = time.perf_counter()
+    p = rebalance.plan_rebalance(dict(zip(tickers, w)), dict(zip(tickers, tgt)),
+                                 10 * NAV, prices, tax_lot_data=lots, theta=load_theta())
+    assert time.perf_counter() - start < 15
+    assert p is not None and p["solver"]["lots"] >= 3000
+    assert p["tracking_error"] < float(np.abs(w - tgt).sum())
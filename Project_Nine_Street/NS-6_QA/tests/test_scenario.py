@@ -81,3 +81,107 @@ def test_scenario_none_inputs_fail_open():
     r = scenario.analyze_add("NVDA", 0.05, CUR, NAV, prices=PRICES,
                              theta=load_theta())
     assert isinstance(r["funding_paths"], list)
+
+
+# ── Batch what-if ──────────────────────────────────────────────────────────
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import pytest  # noqa: E402
+
+
+def _batch_closes(tickers, days=300, seed=11):
+    rng = np.random.RandomState(seed)
+    idx = pd.bdate_range("2025-01-02", periods=days)
+    vol = {"BIL": 0.0005, "JPM": 0.015, "MSFT": 0.02, "NVDA": 0.04}
+    return {tk: pd.Series(100 * np.exp(np.cumsum(rng.randn(days) * vol.get(tk, 0.01))),
+                          index=idx, name="Close") for tk in tickers}
+
+
+def _one_by_one(weights, closes):
+    """Reference: vol / max drawdown of one weight dict, no matrices."""
+    rets = pd.DataFrame(closes).pct_change().iloc[1:].tail(scenario.BATCH_LOOKBACK_DAYS)
+    port = sum(rets[tk] * w for tk, w in weights.items() if tk in rets)
+    vol = float(np.sqrt(np.dot(list(weights.values()),
+                               rets[list(weights)].cov().values * 252
+                               @ np.array(list(weights.values())))))
+    nav = np.concatenate([[1.0], np.cumprod(1 + port.values)])
+    return vol, float((nav / np.maximum.accumulate(nav) - 1).min())
+
+
+def test_batch_add_matches_per_scenario_math():
+    cands = ["NVDA", "AAA", "BBB"]
+    closes = _batch_closes(list(CUR) + cands)
+    r = scenario.analyze_batch("add", cands, CUR, NAV, closes=closes,
+                               proposed_weight=0.05, prices=PRICES, theta=load_theta())
+    assert r["n_scenarios"] == 3
+    vol0, dd0 = _one_by_one(CUR, closes)
+    assert r["current"]["vol"] == pytest.approx(vol0, abs=1e-4)
+    assert r["current"]["max_drawdown"] == pytest.approx(dd0, abs=1e-4)
+    for row in r["scenarios"]:
+        vol, dd = _one_by_one(dict(CUR, **{row["new_ticker"]: 0.05}), closes)
+        assert row["vol"] == pytest.approx(vol, abs=1e-4)
+        assert row["max_drawdown"] == pytest.approx(dd, abs=1e-4)
+        assert row["vol_delta"] == pytest.approx(row["vol"] - r["current"]["vol"], abs=2e-4)
+        assert row["worst_case_stop_cost"] == 0.0125
+    vols = [row["vol_delta"] for row in r["scenarios"]]
+    assert vols == sorted(vols)
+    assert r["scenarios"][-1]["new_ticker"] == "NVDA"       # the high-vol add ranks last
+
+
+def test_batch_funding_paths_match_single_scenario():
+    closes = _batch_closes(list(CUR) + ["NVDA"])
+    r = scenario.analyze_batch("add", ["NVDA"], CUR, NAV, closes=closes,
+                               proposed_weight=0.05, prices=PRICES, theta=load_theta())
+    single = scenario.analyze_add("NVDA", 0.05, CUR, NAV, prices=PRICES, theta=load_theta())
+    assert r["scenarios"][0]["funding_paths"] == single["funding_paths"]
+    assert r["scenarios"][0]["weight_changes"] == {"NVDA": [0.0, 0.05]}
+
+
+def test_batch_remove_defaults_to_every_holding_and_top_n():
+    closes = _batch_closes(list(CUR))
+    r = scenario.analyze_batch("remove", None, CUR, NAV, closes=closes,
+                               prices=PRICES, theta=load_theta(), top_n=1)
+    assert sorted(row["removed_ticker"] for row in r["scenarios"]) == sorted(CUR)
+    assert "funding_paths" in r["scenarios"][0]
+    assert all("funding_paths" not in row for row in r["scenarios"][1:])
+    assert all(row["worst_case_stop_cost"] is None for row in r["scenarios"])
+
+
+def test_batch_replace_no_history_sorts_last_and_no_closes_fail_open():
+    closes = _batch_closes(list(CUR) + ["NVDA"])
+    r = scenario.analyze_batch("replace", ["NEWCO", "NVDA", "MSFT"], CUR, NAV,
+                               closes=closes, proposed_weight=0.05, remove="MSFT",
+                               theta=load_theta())
+    assert [row["candidate"] for row in r["scenarios"]] == ["NVDA", "NEWCO"]
+    assert r["scenarios"][-1]["has_history"] is False
+    bare = scenario.analyze_batch("add", ["NVDA"], CUR, NAV, proposed_weight=0.05,
+                                  theta=load_theta())
+    assert bare["current"]["vol"] is None and bare["scenarios"][0]["vol"] is None
+    with pytest.raises(ValueError):
+        scenario.analyze_batch("swap", ["NVDA"], CUR, NAV)
+
+
+def test_batch_endpoint(tmp_path, monkeypatch):
+    import qa_server
+    import store
+    monkeypatch.setattr(store, "DB_PATH", tmp_path / "ns6.db")
+    store.init_db()
+    monkeypatch.setattr(qa_server, "NS5_PORTFOLIOS_PATH", tmp_path / "nope.json")
+    calls = []
+
+    def fake_fetch(tickers, period="2y"):
+        calls.append(list(tickers))
+        return _batch_closes(tickers)
+
+    monkeypatch.setattr(qa_server.price_feed, "fetch_prices", fake_fetch)
+    h = qa_server.NS6Handler.__new__(qa_server.NS6Handler)
+    sent = {}
+    h._json = lambda obj, status=200: sent.update(status=status, body=obj)
+    h._scenario_batch({"kind": "add", "candidates": ["nvda", "aaa"],
+                       "current_weights": CUR, "prices": PRICES})
+    assert sent["status"] == 200
+    assert sent["body"]["n_scenarios"] == 2
+    assert len(calls) == 1 and set(calls[0]) == set(CUR) | {"NVDA", "AAA"}
+    assert "profile_context" in sent["body"]
+    h._scenario_batch({"kind": "replace", "candidates": ["NVDA"]})
+    assert sent["status"] == 400
@@ -120,3 +120,33 @@ def test_call_yield_proxy_gated():
     assert tax_context.covered_call_yield_proxy(0.70, theta) == pytest.approx(0.04 * 0.25 / 252)
     # multiplier 0.90 ≥ 0.80 → full 50%: 0.04*0.50/252
     assert tax_context.covered_call_yield_proxy(0.90, theta) == pytest.approx(0.04 * 0.50 / 252)
+
+
+# ── vectorized lot allocation ────────────────────────────────────────────
+def test_lot_table_remainder_is_no_basis():
+    data = {"AAPL": {"lots": [{"shares": 10, "cost_per_share": 90, "date": "2020-01-01"},
+                              {"shares": 5, "cost_per_share": 120, "date": "2020-01-01"}]}}
+    table = tax_context.lot_table(["AAPL", "MSFT"], data, held_shares={"AAPL": 20, "MSFT": 4})
+    assert list(table["pos"]) == [0, 0, 0, 1]
+    assert list(table["cost"][:2]) == [120.0, 90.0]          # HIFO
+    assert list(table["basis"]) == [True, True, False, False]
+    assert list(table["shares"]) == [5.0, 10.0, 5.0, 4.0]
+
+
+def test_realized_gains_matches_per_ticker_walk():
+    data = {"AAPL": {"lots": [{"shares": 10, "cost_per_share": 90, "date": "2020-01-01"},
+                              {"shares": 5, "cost_per_share": 120, "date": "2099-01-01"}]},
+            "MSFT": {"lots": [{"shares": 3, "cost_per_share": 300, "date": "2020-01-01"}]}}
+    prices = {"AAPL": 100.0, "MSFT": 350.0, "JPM": 50.0}
+    sells = {"AAPL": 12, "MSFT": 5, "JPM": 2}
+    ltcg, stcg = tax_context.realized_gains(sells, data, prices)
+    exp_lt = exp_st = 0.0
+    for tk, n in sells.items():
+        _, lt, st, _ = tax_context._select_lots(tk, n, data, prices[tk])
+        exp_lt += lt
+        exp_st += st
+    assert ltcg == pytest.approx(exp_lt)
+    assert stcg == pytest.approx(exp_st)
+    # AAPL: 5 @120 ST loss (-100), 7 @90 LT (+70); MSFT: 3 LT (+150), 2 no-basis (+700)
+    assert ltcg == pytest.approx(220.0)
+    assert stcg == pytest.approx(-100.0 + 700.0 + 100.0)
@@ -241,7 +241,7 @@ def eligible(facts: Dict) -> bool:
 # ── Volume refresh (U3) ─────────────────────────────────────────────────
 def fetch_volume_yfinance(ticker: str, days: int) -> List[tuple]:
     """[(date, volume)] via yfinance for the last `days` calendar days."""
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
     df = yf.Ticker(ticker).history(
         period=f"{days + 30}d", auto_adjust=False, actions=False)
     out = []
@@ -349,7 +349,7 @@ def fetch_benchmarks() -> Dict[str, List[tuple]]:
             return json.loads(cache.read_text())
         except (ValueError, TypeError):
             pass
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
     out: Dict[str, List[tuple]] = {}
     try:
         for sym in config.BENCH_SYMBOLS:
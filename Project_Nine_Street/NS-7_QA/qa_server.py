@@ -23,6 +23,13 @@ from datetime import datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+# repo root on sys.path so the shared metrics/profiler resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics, profiler  # noqa: E402
+
 import config
 import pipeline
 import store
@@ -33,6 +40,7 @@ ENV = os.environ.get("ENV", "QA")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("ns7.qa_server")
+metrics.init("ns7")
 
 
 def _serve_dashboard(handler):
@@ -50,7 +58,8 @@ def _serve_dashboard(handler):
     handler.wfile.write(body)
 
 
-class NS7Handler(BaseHTTPRequestHandler):
+class NS7Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 BaseHTTPRequestHandler):
     # ── HTTP plumbing ────────────────────────────────────────────────────
     def log_message(self, format, *args):  # quieter
         log.info("%s - %s", self.address_string(), format % args)
@@ -77,6 +86,8 @@ class NS7Handler(BaseHTTPRequestHandler):
     # ── Routes ───────────────────────────────────────────────────────────
     def do_GET(self):
         path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
         if path in ("/", "/index.html", "/ns7_dashboard.html"):
             return _serve_dashboard(self)
         if path == "/health":
@@ -224,7 +235,9 @@ class NS7Handler(BaseHTTPRequestHandler):
 def main():
     store.init_db()
     log.info("NS-7 %s server on port %d", ENV, PORT)
-    HTTPServer(("0.0.0.0", PORT), NS7Handler).serve_forever()
+    server = HTTPServer(("0.0.0.0", PORT), NS7Handler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
+    server.serve_forever()
 
 
 if __name__ == "__main__":
@@ -26,7 +26,7 @@ def fetch_prices_yfinance(
     Returns:
         {ticker: [daily adjusted closes oldest-first]}
     """
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
 
     end = datetime.strptime(end_date, "%Y-%m-%d") if end_date else datetime.now()
     start = end - timedelta(days=lookback_days + 30)  # buffer for weekends/holidays
@@ -24,16 +24,28 @@ from datetime import datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
+# repo root on sys.path so the shared metrics/profiler resolve
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+
 import config
-import pipeline
-import store
-import walkforward
+
+# the refresh/backtest stack (pandas via common.risk.vol) loads with the first
+# route that needs it, not at process start
+pipeline = lazy_import("pipeline")
+store = lazy_import("store")
+walkforward = lazy_import("walkforward")
 
 PORT = int(os.environ.get("PORT", 9281))
 ENV = os.environ.get("ENV", "QA")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("ns8.qa_server")
+metrics.init("ns8")
 
 
 def _serve_dashboard(handler):
@@ -51,7 +63,8 @@ def _serve_dashboard(handler):
     handler.wfile.write(body)
 
 
-class NS8Handler(BaseHTTPRequestHandler):
+class NS8Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 BaseHTTPRequestHandler):
     # ── HTTP plumbing ────────────────────────────────────────────────────
     def log_message(self, format, *args):  # quieter
         log.info("%s - %s", self.address_string(), format % args)
@@ -78,6 +91,8 @@ class NS8Handler(BaseHTTPRequestHandler):
     # ── Routes ───────────────────────────────────────────────────────────
     def do_GET(self):
         path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
         if path in ("/", "/index.html", "/ns8_dashboard.html", "/dashboard"):
             return _serve_dashboard(self)
         if path == "/health":
@@ -168,7 +183,9 @@ def main():
     store.init_db()
     store.init_tranche_state()
     log.info("NS-8 %s server on port %d", ENV, PORT)
-    HTTPServer(("0.0.0.0", PORT), NS8Handler).serve_forever()
+    server = HTTPServer(("0.0.0.0", PORT), NS8Handler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
+    server.serve_forever()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
 """store.py — NS-8 SQLite Persistence Layer.
 
-Handles signals, tranche state, and audit logging. Prod: delegates to
+Handles signals, tranche state, audit logging, and the ex-ante vol checkpoint. Prod: delegates to
 PostgreSQL (common.db); sqlite retained as the fail-open fallback.
 """
 import json
@@ -75,6 +75,13 @@ def init_db() -> None:
                 order_id TEXT
             )
         """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS vol_state (
+                as_of TEXT PRIMARY KEY,
+                state_json TEXT NOT NULL,
+                saved_at TEXT NOT NULL
+            )
+        """)
         conn.commit()
     finally:
         conn.close()
@@ -291,6 +298,55 @@ def get_audit_log(limit: int = 100) -> List[Dict[str, Any]]:
         conn.close()
 
 
+# ── Ex-ante vol checkpoint ───────────────────────────────────────────────
+
+def save_vol_state(as_of: str, state: Dict[str, Any]) -> None:
+    """Checkpoint streaming EWMA vol state (vol.EWMAVol.to_state()) as of a date.
+
+    Prod: strategy_output (service=ns8, kind=vol_state). Fail-open.
+    """
+    if _use_pg():
+        try:
+            import common.db
+            common.db.write_strategy_output("ns8", "vol_state",
+                                            {"as_of": as_of, "state": state}, as_of=as_of)
+        except Exception:
+            pass  # fall through to sqlite
+        return
+    conn = _conn()
+    try:
+        conn.execute(
+            "INSERT OR REPLACE INTO vol_state VALUES (?, ?, ?)",
+            (as_of, json.dumps(state), datetime.now().isoformat(timespec="seconds"))
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def load_vol_state() -> Optional[Dict[str, Any]]:
+    """Latest vol checkpoint as {"as_of", "state"}, or None (start from scratch)."""
+    if _use_pg():
+        try:
+            import common.db
+            payload = common.db.latest_strategy_output("ns8", "vol_state")
+            if payload and "state" in payload:
+                return {"as_of": payload["as_of"], "state": payload["state"]}
+            return None
+        except Exception:
+            pass  # fall through to sqlite
+    conn = _conn()
+    try:
+        row = conn.execute(
+            "SELECT as_of, state_json FROM vol_state ORDER BY as_of DESC LIMIT 1"
+        ).fetchone()
+        if row:
+            return {"as_of": row["as_of"], "state": json.loads(row["state_json"])}
+        return None
+    finally:
+        conn.close()
+
+
 # ── Export ──────────────────────────────────────────────────────────────
 
 def export_signals_json() -> None:
@@ -24,6 +24,50 @@ def test_exante_vol_none_on_insufficient_history():
     assert vol.exante_vol([0.01, 0.01]) is None      # < 3 obs
 
 
+def test_price_history_vols_match_per_date_recompute():
+    """The one-pass vol path equals the per-date 60-day exante_vol it replaces."""
+    import random
+    import walkforward
+    rng = random.Random(7)
+    days = [f"2020-{m:02d}-{d:02d}" for m in range(1, 13) for d in range(1, 29)]
+    prices = {}
+    for k, t in enumerate(config.RISKY_ASSETS[:-1]):
+        c, series = 100.0, {}
+        for d in days[k * 20:]:                 # staggered starts
+            c *= 1 + rng.gauss(0.0003, 0.01 * (k + 1))
+            series[d] = c
+        prices[t] = series
+    hist = walkforward.price_history(prices)
+    for date in (days[30], days[90], days[200], days[-1]):
+        rets = walkforward._daily_returns_upto(date, prices, window=60)
+        for t in config.RISKY_ASSETS:
+            i = sum(1 for d in hist[t]["dates"] if d <= date)
+            got = hist[t]["vols"][i - 1] if i else None
+            want = vol.exante_vol(rets.get(t, []))
+            assert (got is None) == (want is None)
+            if want is not None:
+                assert abs(got - want) < 1e-12 * want
+        assert (walkforward.target_weights_on(date, prices, history=hist)
+                == walkforward.target_weights_on(date, prices))
+
+
+def test_vol_checkpoint_round_trip(tmp_path, monkeypatch):
+    import store
+    monkeypatch.setattr(config, "DB_PATH", tmp_path / "ns8.db")
+    store.init_db()
+    assert store.load_vol_state() is None
+    est = vol.streaming(2, window=60)
+    est.extend([[0.01 * (i % 5 - 2), 0.003 * (i % 7 - 3)] for i in range(90)])
+    store.save_vol_state("2026-10-16", est.to_state())
+    saved = store.load_vol_state()
+    assert saved["as_of"] == "2026-10-16"
+    resumed = vol.EWMAVol.from_state(saved["state"])
+    for row in ([0.02, -0.01], [-0.015, 0.004]):
+        est.update(row)
+        resumed.update(row)
+    assert resumed.vol().tolist() == est.vol().tolist()
+
+
 # ── inverse-vol weights ──────────────────────────────────────────────────
 def test_inverse_vol_sum_to_one():
     sigs = {"SPY": 1, "EFA": 1, "IEF": 0, "VNQ": 1, "DBC": 1}
@@ -116,6 +116,17 @@ def test_unknown_route_404():
         assert e.code == 404
 
 
+def test_startup_defers_pandas():
+    """Importing the server leaves pandas and the refresh stack unloaded."""
+    import subprocess
+    probe = ("import sys, qa_server; "
+             "print(sorted(m for m in ('pandas', 'numpy', 'pipeline', 'walkforward')"
+             " if m in sys.modules))")
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True,
+                         cwd=str(Path(__file__).resolve().parent.parent), check=True)
+    assert out.stdout.strip() == "[]"
+
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
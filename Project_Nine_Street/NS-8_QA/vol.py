@@ -1,37 +1,41 @@
-"""vol.py — NS-8 ex-ante volatility estimate (R8, MOP 2012 §2.4).
+"""vol.py — NS-8 ex-ante volatility (R8, re-exports common.risk.vol).
 
-EWMA variance with center-of-mass 60 trading days, annualized to 261 trading
-days. Applied at t-1 to position at t (no look-ahead) — see walkforward.py /
-signals.py for the no-lookahead application. Pure functions, stdlib only.
+The EWMA math lives in `common.risk.vol` (single source of truth, shared with
+NS-X). This module keeps the NS-8-facing names (`ewma_var`, `exante_vol`,
+`DELTA`, `ANN`) wired to NS-8's config thresholds so downstream imports are
+unchanged, plus the streaming (`streaming`) and panel (`ewma_var_panel`) forms.
 """
-from typing import List, Optional
+import sys
+from pathlib import Path
 
 import config
 
+# make the repo root importable so `common.risk.vol` resolves (decoupled read;
+# mirrors the NS-5 sys.path pattern, no cross-service module import of config).
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.risk import vol as _vol  # noqa: E402
+from common.risk.vol import EWMAVol  # noqa: E402,F401
+
 DELTA = config.VOL_DELTA        # δ/(1-δ) = 60 trading days center of mass
 ANN = config.VOL_ANN            # trading days/year
 
 
-def ewma_var(daily_returns: List[float], delta: Optional[float] = None) -> Optional[float]:
-    """Ex-ante annualized variance (MOP eq. 1) from oldest-first daily returns.
-
-    σ_t² = ANN · Σ (1-δ) δ^i (r_{t-1-i} - r̄_t)²  (exponentially weighted)
-    Returns None if there aren't enough observations to estimate.
-    """
-    delta = delta or DELTA
-    if not daily_returns:
-        return None
-    n = len(daily_returns)
-    if n < 3:                    # too few obs for a stable variance
-        return None
-    w = [(1 - delta) * (delta ** (n - 1 - i)) for i in range(n)]
-    wsum = sum(w)
-    mean_r = sum(wi * ri for wi, ri in zip(w, daily_returns)) / wsum
-    var = sum(wi * (ri - mean_r) ** 2 for wi, ri in zip(w, daily_returns)) / wsum
-    return ANN * var
-
-
-def exante_vol(daily_returns: List[float], delta: Optional[float] = None) -> Optional[float]:
-    """Annualized ex-ante volatility (sqrt of EWMA var), or None if no estimate."""
-    v = ewma_var(daily_returns, delta)
-    return v ** 0.5 if v is not None and v >= 0 else None
+def ewma_var(daily_returns, delta=None):
+    return _vol.ewma_var(daily_returns, delta if delta is not None else DELTA, ANN)
+
+
+def exante_vol(daily_returns, delta=None):
+    return _vol.exante_vol(daily_returns, delta if delta is not None else DELTA, ANN)
+
+
+def streaming(n_series=1, window=None, delta=None):
+    """Streaming EWMA state (common.risk.vol.EWMAVol) at this service's δ/ANN."""
+    return _vol.EWMAVol(n_series, delta if delta is not None else DELTA, ANN, window)
+
+
+def ewma_var_panel(returns, window=None, delta=None, min_periods=3):
+    return _vol.ewma_var_panel(returns, delta if delta is not None else DELTA, ANN,
+                               window, min_periods)
@@ -17,6 +17,7 @@ House rules preserved: fail-open (missing/insufficient history -> cash), no
 lookahead, deterministic (seeded only in tests, never in the production path).
 """
 import json
+from bisect import bisect_right
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
@@ -70,20 +71,51 @@ def _daily_returns_upto(date: str, prices: Dict[str, Dict[str, float]],
     return out
 
 
+def price_history(prices: Dict[str, Dict[str, float]],
+                  vol_window: int = 60) -> Dict[str, Dict]:
+    """Sort each risky ticker's closes once and precompute its ex-ante vol path.
+
+    {ticker: {"dates", "closes", "vols"}} where vols[i] is the MOP vol over the
+    `vol_window` returns ending at closes[i] (None while fewer are available) —
+    the same number `_daily_returns_upto` + vol.exante_vol give for that date,
+    from one vectorized pass (vol.ewma_var_panel) instead of one per date.
+    """
+    import numpy as np
+
+    out = {}
+    for t in config.RISKY_ASSETS:
+        ordered = sorted(prices.get(t, {}).items())
+        dates = [d for d, _ in ordered]
+        closes = [c for _, c in ordered]
+        vols: List[Optional[float]] = [None] * len(closes)
+        if len(closes) > vol_window:
+            c = np.asarray(closes, dtype=float)
+            var = vol.ewma_var_panel(c[1:] / c[:-1] - 1.0, window=vol_window,
+                                     min_periods=vol_window)
+            vols[1:] = [None if np.isnan(v) else float(v) ** 0.5 for v in var]
+        out[t] = {"dates": dates, "closes": closes, "vols": vols}
+    return out
+
+
 def target_weights_on(date: str, prices: Dict[str, Dict[str, float]],
-                      window: Optional[int] = None) -> Dict[str, float]:
+                      window: Optional[int] = None,
+                      history: Optional[Dict[str, Dict]] = None) -> Dict[str, float]:
     """Target weights for `date`, honoring config.SIGNAL_METHOD / SIZING_METHOD.
 
     - Signal: 200-day SMA binary (default) OR 12-month sign (R8 variant).
     - Sizing: fixed 20% (v1) OR inverse-vol equal-risk (R8 default).
     Insufficient history -> cash (fail-open). R8 applies the MOP ex-ante vol at
     t-1 (no lookahead): only data <= date is used to estimate vol.
+    `history` (price_history(prices)) lets a caller stepping through many dates
+    skip the per-date sort and vol recompute.
     """
     window = window or config.SMA_WINDOW
+    history = history or price_history(prices)
 
-    # 1. Signal
-    up_to_all = {t: [c for d, c in sorted(prices.get(t, {}).items()) if d <= date]
-                 for t in config.RISKY_ASSETS}
+    # 1. Signal — the signals only look back max(window, 252) closes
+    keep = max(window, 252)
+    idx = {t: bisect_right(history[t]["dates"], date) for t in config.RISKY_ASSETS}
+    up_to_all = {t: history[t]["closes"][max(0, i - keep):i] for t, i in idx.items()}
     if config.SIGNAL_METHOD == "sign12m":
         sigs = signals.generate_signals_sign12m(up_to_all, window_days=252)
     else:  # "sma" (default)
@@ -97,8 +129,7 @@ def target_weights_on(date: str, prices: Dict[str, Dict[str, float]],
 
     # 2. Sizing
     if config.SIZING_METHOD == "inverse_vol":
-        rets = _daily_returns_upto(date, prices, window=60)
-        vols = {t: vol.exante_vol(rets.get(t, [])) for t in config.RISKY_ASSETS}
+        vols = {t: history[t]["vols"][i - 1] if i else None for t, i in idx.items()}
         weights = signals.compute_weights_inverse_vol(sigs, vols)
     else:  # "fixed" (v1)
         weights = {t: (config.ASSET_WEIGHT if sigs[t] == 1 else 0.0)
@@ -177,11 +208,12 @@ def run_walkforward(start: Optional[str] = None, end: Optional[str] = None,
     # active_target[date] and rebalance_days[date] for month M+1.
     active_target: Dict[str, Dict[str, float]] = {}
     rebalance_days: Dict[str, List[str]] = {}
+    history = price_history(prices)
     for i, (ym, last_day) in enumerate(month_list):
         if i + 1 >= len(month_list):
             break  # no following month to trade into within the window
         nxt_ym = month_list[i + 1][0]
-        target = target_weights_on(last_day, prices)
+        target = target_weights_on(last_day, prices, history=history)
         nxt_days = [d for d in all_dates if d.startswith(nxt_ym)]
         for d in nxt_days:
             active_target[d] = target
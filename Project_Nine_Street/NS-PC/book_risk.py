@@ -0,0 +1,131 @@
+"""book_risk.py — forward-looking risk of the composed NS-PC fund book.
+
+Fetches daily history for every name in the guarded book and hands the
+date × ticker return panel to common.risk.montecarlo, which simulates the
+book jointly (factor or block-bootstrap model, optional stress overlay) and
+returns VaR / CVaR / drawdown-probability surfaces per horizon. Names with no
+history are held flat and listed under "unmodeled" — fail-open, like the
+constructor's price fallback.
+
+The adjusted-close panel is cached in process and on disk (data/nspc_closes.npz)
+for MC_HISTORY_TTL seconds: repeat /risk calls only download names the panel
+lacks. Past the TTL the book is refetched whole — adjusted closes are restated
+on every dividend, so a tail-only refresh would splice two adjustment bases.
+"""
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+import config
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from common.risk.montecarlo import simulate_book_risk  # noqa: E402
+
+log = logging.getLogger("nspc.book_risk")
+
+
+CLOSES_CACHE = config.DATA_DIR / "nspc_closes.npz"
+
+_lock = threading.Lock()
+_panel = {"closes": None, "period": None, "at": 0.0}
+
+
+def _expired(at: float) -> bool:
+    return time.time() - at > config.MC_HISTORY_TTL
+
+
+def _load_cache(period):
+    """(disk panel, fetched-at) if written for `period` and within the TTL."""
+    import numpy as np
+
+    try:
+        with np.load(CLOSES_CACHE, allow_pickle=False) as z:
+            at = float(z["at"])
+            if str(z["period"]) == period and not _expired(at):
+                return pd.DataFrame(z["closes"], index=pd.DatetimeIndex(z["dates"]),
+                                    columns=[str(t) for t in z["tickers"]]), at
+    except FileNotFoundError:
+        pass
+    except Exception as e:  # noqa: BLE001
+        log.warning("read close cache failed: %s", e)
+    return pd.DataFrame(), time.time()
+
+
+def _save_cache(closes: pd.DataFrame, period, at: float) -> None:
+    """Atomic .npz write (temp file + rename); fail-open."""
+    import numpy as np
+
+    try:
+        CLOSES_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=str(CLOSES_CACHE.parent), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez(fh, dates=closes.index.values, period=np.array(period),
+                         at=np.array(at), tickers=np.array(closes.columns, dtype=str),
+                         closes=closes.to_numpy(dtype=float))
+            os.replace(tmp, CLOSES_CACHE)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+    except Exception as e:  # noqa: BLE001
+        log.warning("write close cache failed: %s", e)
+
+
+def _download_closes(tickers, period) -> pd.DataFrame:
+    """Date × ticker adjusted closes (one grouped download); empty on failure."""
+    try:
+        from common.data.yahoo import limited_yf as yf, split_grouped
+        raw = yf.download(list(tickers), period=period, group_by="ticker",
+                          auto_adjust=True, progress=False, threads=True)
+        frames = split_grouped(raw, list(tickers))
+    except Exception as e:
+        log.warning("history download failed: %s", e)
+        return pd.DataFrame()
+    closes = {t: f["Close"] for t, f in frames.items() if not f.empty and "Close" in f}
+    return pd.DataFrame(closes).sort_index() if closes else pd.DataFrame()
+
+
+def fetch_closes(tickers, period=config.MC_HISTORY) -> pd.DataFrame:
+    """Date × ticker adjusted closes, served from the TTL'd panel cache."""
+    tickers = list(tickers)
+    with _lock:
+        closes, at = _panel["closes"], _panel["at"]
+        if closes is None or _panel["period"] != period or _expired(at):
+            closes, at = _load_cache(period)
+        missing = [t for t in tickers if t not in closes.columns]
+        if missing:
+            fresh = _download_closes(missing, period)
+            if not fresh.empty:
+                closes = fresh if closes.empty else closes.join(fresh, how="outer")
+                _save_cache(closes, period, at)
+        _panel.update(closes=closes, period=period, at=at)
+        return closes[[t for t in tickers if t in closes.columns]]
+
+
+def fetch_returns(tickers, period=config.MC_HISTORY) -> pd.DataFrame:
+    """Date × ticker daily close-to-close returns."""
+    closes = fetch_closes(tickers, period)
+    if closes.empty:
+        return pd.DataFrame()
+    return closes.pct_change(fill_method=None).iloc[1:]
+
+
+def book_risk(weights, returns=None, **kwargs) -> dict:
+    """simulate_book_risk on the composed book; kwargs override the MC_* config."""
+    weights = {t: w for t, w in weights.items() if w > 0}
+    if returns is None:
+        returns = fetch_returns(weights)
+    opts = {"n_scenarios": config.MC_SCENARIOS, "horizons": config.MC_HORIZONS,
+            "confidence": config.MC_CONFIDENCE, "dd_thresholds": config.MC_DD_THRESHOLDS,
+            "model": config.MC_MODEL}
+    opts.update({k: v for k, v in kwargs.items() if v is not None})
+    out = simulate_book_risk(returns, weights, **opts)
+    out["gross"] = round(sum(weights.values()), 6)
+    return out
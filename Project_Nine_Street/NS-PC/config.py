@@ -13,6 +13,7 @@ PORT = int(os.environ.get("PORT", 9301))    # QA; PROD 9300
 COMPOSED_MAX_NAME_W = 0.08      # per-name cap after composition
 COMPOSED_MAX_SECTOR_W = 0.40    # sector/β cap
 COMPOSED_MIN_EFF_N = 15         # baseball effective-N floor
+COMPOSED_ENFORCE_EFF_N = True   # tighten the name cap to meet the floor when reachable
 
 # ── Cash proxy ───────────────────────────────────────────────────────────
 CASH_PROXY = "BIL"              # cash-equivalent position (PM decision)
@@ -40,3 +41,13 @@ STALE_DAYS = 5                  # an input older than this → fail-open (no wri
 # NS-8's SPY/EFA etc. overlap NS-7's large-caps; the per-name cap handles the
 # numeric weight, but these are the ETF books kept separate from equity names.
 TACTICAL_ETFS = {"SPY", "EFA", "IEF", "VNQ", "DBC", "SHV", "BIL"}
+
+# ── Book risk (GET /risk — common.risk.montecarlo) ───────────────────────
+MC_SCENARIOS = 50000            # Monte Carlo paths per request
+MC_MAX_SCENARIOS = 500000       # request ceiling (?scenarios=)
+MC_HORIZONS = (1, 5, 21, 63)    # trading days
+MC_CONFIDENCE = (0.95, 0.99)
+MC_DD_THRESHOLDS = (0.05, 0.10, 0.20)
+MC_MODEL = "factor"             # "factor" | "bootstrap"
+MC_HISTORY = "2y"               # return history the models are fitted on
+MC_HISTORY_TTL = 3600           # seconds a fetched close panel is reused across /risk calls
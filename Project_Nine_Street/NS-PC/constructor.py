@@ -15,12 +15,14 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
 import config
+import guards
 
 log = logging.getLogger("nspc.constructor")
 
@@ -108,51 +110,38 @@ def compose(alloc: Dict, blend: Dict, signals: Dict) -> Dict[str, float]:
 
 # ── Guard ─────────────────────────────────────────────────────────────────
 def effective_n(weights: Dict[str, float]) -> float:
-    s = sum(weights.values())
-    if s <= 0:
-        return 0.0
-    return 1.0 / sum((w / s) ** 2 for w in weights.values())
+    return guards.effective_n(list(weights.values()))
 
 
 def apply_guards(weights: Dict[str, float]) -> Dict[str, float]:
     """Per-name cap ≤8% (cash proxy exempt), redistributing excess to cash.
 
-    Iterative: cap any risky name above the cap, redistribute the freed weight
-    to the remaining uncapped risky names proportionally; if all risky names are
-    at cap, the excess accrues to the cash proxy (BIL). A naive cap-then-
-    renormalize would RE-INFLATE the capped name — so we redistribute instead.
+    One exact water-fill (guards.project_capped): each risky name keeps
+    min(cap, λ·w), so freed weight goes to the uncapped names in proportion —
+    a naive cap-then-renormalize would RE-INFLATE the capped name. If every
+    risky name is at cap, the excess accrues to the cash proxy (BIL).
 
-    Effective-N is NOT force-flattened here: it is a *reported* diagnostic
-    (guardrails()), because silently flattening to equal weight would discard
-    the strategy signal. Concentration is reported, not silently destroyed.
+    Effective-N is met by tightening the cap (guards.cap_for_eff_n), which
+    trims the top names and leaves the rest of the signal's ordering intact
+    — never a flatten to equal weight. A floor the book cannot reach (fewer
+    names than COMPOSED_MIN_EFF_N) is a *reported* diagnostic (guardrails()):
+    concentration is reported, not silently destroyed.
     """
     w = {k: float(v) for k, v in weights.items()}
     if config.CASH_PROXY not in w:
         w[config.CASH_PROXY] = 0.0
     risky = [k for k in w if k != config.CASH_PROXY]
-
-    for _ in range(100):                             # bounded iterations
-        over = [(k, w[k] - config.COMPOSED_MAX_NAME_W) for k in risky
-                if w[k] > config.COMPOSED_MAX_NAME_W]
-        if not over:
-            break
-        excess = 0.0
-        for k, exc in over:
-            w[k] = config.COMPOSED_MAX_NAME_W
-            excess += exc
-        eligible = [k for k in risky if w[k] < config.COMPOSED_MAX_NAME_W - 1e-12]
-        if not eligible:
-            w[config.CASH_PROXY] += excess            # all at cap → cash absorbs
-            continue
-        elig_sum = sum(w[k] for k in eligible)
-        if elig_sum <= 0:
-            w[config.CASH_PROXY] += excess
-            continue
-        for k in eligible:
-            w[k] += excess * (w[k] / elig_sum)
-
-    # renormalize (cash proxy included) to 1.0
-    total = sum(w.values())
+    values = [w[k] for k in risky]
+    order = guards.descending(values)
+    cap = config.COMPOSED_MAX_NAME_W
+    if config.COMPOSED_ENFORCE_EFF_N:
+        cap = guards.cap_for_eff_n(values, cap, config.COMPOSED_MIN_EFF_N, order)
+    capped, excess = guards.project_capped(values, cap, order)
+    w.update(zip(risky, capped))
+    w[config.CASH_PROXY] += excess
+
+    # renormalize (cash proxy included) to 1.0; fsum keeps it order-independent
+    total = math.fsum(w.values())
     if total > 0:
         w = {k: v / total for k, v in w.items()}
     return w
@@ -180,17 +169,15 @@ def materialize(weights: Dict[str, float], nav: float,
                 prices: Dict[str, float]) -> Tuple[Dict, float]:
     """Convert target weights → whole-share positions + residual cash.
 
-    Returns (positions_dict, residual_cash). Whole shares: floor(nav*w/price).
+    Returns (positions_dict, residual_cash). Whole shares from
+    guards.round_shares: floor(nav*w/price), then leftover cash buys the
+    shares that cut the most dollar error, never spending past nav.
     """
     positions: Dict[str, Dict] = {}
     invested = 0.0
-    for ticker, w in sorted(weights.items()):
-        price = prices.get(ticker)
-        if price is None or price <= 0:
-            continue                                   # no price → skip (fail-open)
-        shares = int(nav * w / price)
-        if shares <= 0:
-            continue
+    for ticker, shares in sorted(guards.round_shares(weights, nav, prices).items()):
+        price = prices[ticker]
+        w = weights[ticker]
         cost = shares * price
         invested += cost
         positions[ticker] = {
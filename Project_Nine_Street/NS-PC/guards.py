@@ -0,0 +1,113 @@
+"""guards.py — exact composed-book guards for NS-PC (stdlib, O(n log n)).
+
+  project_capped()  per-name cap by one sorted water-fill: every name keeps
+                    min(cap, λ·w) with λ chosen so the book keeps its risky
+                    total; if every positive name is at the cap the rest is
+                    excess (→ cash proxy). This is the fixed point the old
+                    cap-and-redistribute loop converged to, and the closest
+                    capped book to w in relative entropy (ratios between
+                    uncapped names are untouched).
+  cap_for_eff_n()   the largest cap ≤ max_name_w whose projection reaches an
+                    effective-N floor — bisection over the cap, each probe an
+                    O(n) pass over the one sort. Trims only the top names;
+                    an unreachable floor (fewer names than the floor) leaves
+                    the cap alone and the shortfall is reported.
+  round_shares()    whole shares: floor, then spend the leftover cash on the
+                    names whose next share cuts the most dollar error
+                    (largest remainder), never exceeding NAV.
+"""
+from typing import Dict, List, Optional, Sequence, Tuple
+
+BISECT_ITERS = 60      # cap search resolution: (max_cap − floor_cap) / 2^60
+
+
+def descending(values: Sequence[float]) -> List[int]:
+    return sorted(range(len(values)), key=lambda i: (-values[i], i))
+
+
+def _water_level(values: Sequence[float], order: Sequence[int], cap: float
+                 ) -> Tuple[int, float]:
+    """(names at cap, λ) for min(cap, λ·v) summing to Σv; λ=0 when all are capped."""
+    pos = [i for i in order if values[i] > 0]
+    rest = sum(values[i] for i in pos)
+    total = rest
+    for j, i in enumerate(pos):
+        lam = (total - j * cap) / rest if rest > 0 else 0.0
+        if lam * values[i] <= cap:
+            return j, lam
+        rest -= values[i]
+    return len(pos), 0.0
+
+
+def project_capped(values: Sequence[float], cap: float,
+                   order: Optional[Sequence[int]] = None) -> Tuple[List[float], float]:
+    """Capped weights and the excess the cap frees (0 unless every name is capped).
+
+    Non-positive entries are left as they are.
+    """
+    order = descending(values) if order is None else order
+    n_capped, lam = _water_level(values, order, cap)
+    out = list(values)
+    capped = set(order[:n_capped])
+    for i, v in enumerate(values):
+        if v > 0:
+            out[i] = cap if i in capped else lam * v
+    if lam == 0.0 and n_capped:
+        return out, sum(v for v in values if v > 0) - n_capped * cap
+    return out, 0.0
+
+
+def effective_n(values: Sequence[float]) -> float:
+    s = sum(values)
+    if s <= 0:
+        return 0.0
+    return s * s / sum(v * v for v in values)
+
+
+def cap_for_eff_n(values: Sequence[float], max_cap: float, min_eff_n: float,
+                  order: Optional[Sequence[int]] = None) -> float:
+    """Largest cap ≤ max_cap whose project_capped book has eff-N ≥ min_eff_n."""
+    order = descending(values) if order is None else order
+
+    def eff(cap):
+        return effective_n([v for v in project_capped(values, cap, order)[0] if v > 0])
+
+    n_pos = sum(1 for v in values if v > 0)
+    if n_pos < min_eff_n or eff(max_cap) >= min_eff_n:
+        return max_cap
+    lo = sum(v for v in values if v > 0) / n_pos       # equal weight: eff-N = n_pos
+    hi = max_cap
+    for _ in range(BISECT_ITERS):
+        mid = 0.5 * (lo + hi)
+        if eff(mid) >= min_eff_n:
+            lo = mid
+        else:
+            hi = mid
+    return lo
+
+
+def round_shares(weights: Dict[str, float], nav: float,
+                 prices: Dict[str, float]) -> Dict[str, int]:
+    """{ticker: whole shares} closest to nav·w/price without spending past nav.
+
+    Tickers with no usable price are skipped; the order of ties is by ticker.
+    """
+    shares, frac = {}, []
+    spent = 0.0
+    for ticker, w in sorted(weights.items()):
+        price = prices.get(ticker)
+        if price is None or price <= 0 or w <= 0:
+            continue
+        exact = nav * w / price
+        n = int(exact + 1e-9)
+        shares[ticker] = n
+        spent += n * price
+        gain = (2 * (exact - n) - 1) * price          # dollar error saved by one more share
+        if gain > 0:
+            frac.append((-gain, ticker, price))
+    left = nav - spent
+    for _, ticker, price in sorted(frac):
+        if price <= left + 1e-9:
+            shares[ticker] += 1
+            left -= price
+    return {t: n for t, n in shares.items() if n > 0}
@@ -6,6 +6,8 @@ Endpoints:
   GET  /health        -> status/env/port
   GET  /portfolio     -> current paper_portfolio.json
   GET  /targets       -> the composed fund book (weights + guardrails)
+  GET  /risk          -> Monte Carlo VaR/CVaR/drawdown surfaces of the book
+                         (?scenarios=&horizon=&model=&stress=&seed=)
   POST /construct     -> fetch prices, run constructor, write portfolio
   GET  /              -> nspc_dashboard.html
 
@@ -28,18 +30,24 @@ import sys
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+
+book_risk = lazy_import("book_risk")     # pandas/numpy on the first /risk only
+
 PORT = int(os.environ.get("PORT", 9301))
 ENV = os.environ.get("ENV", "QA")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("nspc.qa_server")
+metrics.init("nspc")
 
 
 def _fetch_prices(tickers):
     """Last close for each ticker via yfinance (fallback: prior current_price)."""
     prices = {}
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
         for t in tickers:
             try:
                 h = yf.Ticker(t).history(period="5d")
@@ -66,7 +74,8 @@ def _serve_dashboard(handler):
     handler.wfile.write(body)
 
 
-class NSPCHandler(BaseHTTPRequestHandler):
+class NSPCHandler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                  BaseHTTPRequestHandler):
     def log_message(self, format, *args):
         log.info("%s - %s", self.address_string(), format % args)
 
@@ -90,6 +99,8 @@ class NSPCHandler(BaseHTTPRequestHandler):
 
     def do_GET(self):
         path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
         if path in ("/", "/index.html", "/nspc_dashboard.html", "/dashboard"):
             return _serve_dashboard(self)
         if path == "/health":
@@ -99,6 +110,8 @@ class NSPCHandler(BaseHTTPRequestHandler):
             return self._portfolio()
         if path == "/targets":
             return self._targets()
+        if path == "/risk":
+            return self._risk()
         self._json({"error": f"not found: {path}"}, 404)
 
     def do_POST(self):
@@ -127,6 +140,31 @@ class NSPCHandler(BaseHTTPRequestHandler):
         w = constructor.apply_guards(constructor.compose(alloc, blend, signals))
         self._json({"weights": w, "guardrails": constructor.guardrails(w)})
 
+    def _risk(self):
+        from urllib.parse import parse_qs, urlparse
+        q = parse_qs(urlparse(self.path).query)
+        alloc, blend, signals = constructor.read_inputs()
+        if alloc is None or blend is None or signals is None:
+            return self._json({"error": "missing/stale inputs"}, 503)
+        try:
+            scenarios = min(int(q.get("scenarios", [config.MC_SCENARIOS])[0]),
+                            config.MC_MAX_SCENARIOS)
+            horizons = ([int(h) for h in q["horizon"][0].split(",")]
+                        if "horizon" in q else None)
+            seed = int(q.get("seed", [0])[0])
+        except ValueError:
+            return self._json({"error": "scenarios/horizon/seed must be integers"}, 400)
+        if scenarios < 1:
+            return self._json({"error": "scenarios must be >= 1"}, 400)
+        w = constructor.apply_guards(constructor.compose(alloc, blend, signals))
+        try:
+            out = book_risk.book_risk(w, n_scenarios=scenarios, horizons=horizons,
+                                      model=q.get("model", [None])[0],
+                                      stress=q.get("stress", [None])[0], seed=seed)
+        except ValueError as exc:
+            return self._json({"error": str(exc)}, 400)
+        self._json(out, 503 if "error" in out else 200)
+
     def _construct(self):
         try:
             # gather the ticker universe from the three inputs
@@ -154,7 +192,9 @@ class NSPCHandler(BaseHTTPRequestHandler):
 
 def main():
     log.info("NS-PC %s server on port %d", ENV, PORT)
-    HTTPServer(("0.0.0.0", PORT), NSPCHandler).serve_forever()
+    server = HTTPServer(("0.0.0.0", PORT), NSPCHandler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
+    server.serve_forever()
 
 
 if __name__ == "__main__":
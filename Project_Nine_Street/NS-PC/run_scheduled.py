@@ -13,8 +13,10 @@ import json
 import logging
 import sys
 from datetime import datetime
+from pathlib import Path
 
 sys.path.insert(0, "/Users/chuck/Project_Alpha_POC/Project_Nine_Street/NS-PC")
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))  # common.*
 
 import config
 import constructor
@@ -28,7 +30,7 @@ def _fetch_prices(tickers):
     """Last close for each ticker via yfinance (fallback: prior current_price)."""
     prices = {}
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
         for t in tickers:
             try:
                 h = yf.Ticker(t).history(period="5d")
@@ -72,6 +72,30 @@ def test_apply_guards_redistribute_not_reinflate():
     assert abs(sum(g.values()) - 1.0) < 1e-6
 
 
+def test_apply_guards_exact_water_fill():
+    # one pass lands on the cap-and-redistribute fixed point: uncapped names
+    # keep their ratios, capped names sit exactly at the cap
+    w = {f"N{i:03d}": 1.0 / (i + 1) for i in range(400)}
+    g = constructor.apply_guards(w)
+    cap = config.COMPOSED_MAX_NAME_W
+    assert max(v for k, v in g.items() if k != config.CASH_PROXY) <= cap + 1e-12
+    assert abs(sum(g.values()) - 1.0) < 1e-9
+    assert g[config.CASH_PROXY] == 0.0
+    assert abs(g["N100"] / g["N200"] - 201 / 101) < 1e-9
+    assert g == constructor.apply_guards(dict(reversed(list(w.items()))))
+
+
+def test_apply_guards_meets_reachable_eff_n():
+    # 20 names, 12 at the 8% cap: eff-N ≈ 13, so the cap tightens just enough
+    w = {**{f"A{i:02d}": 0.0825 for i in range(12)}, **{f"N{i}": 0.00125 for i in range(8)}}
+    g = constructor.apply_guards(w)
+    gr = constructor.guardrails(g)
+    assert gr["eff_n"] >= config.COMPOSED_MIN_EFF_N - 1e-6
+    assert gr["eff_n"] < config.COMPOSED_MIN_EFF_N + 0.01       # no more than needed
+    assert g["A00"] == g["A11"] < config.COMPOSED_MAX_NAME_W
+    assert g["A00"] > g["N0"] == g["N7"]                        # ordering kept
+
+
 def test_guardrails_block():
     g = constructor.guardrails({"A": 0.5, "B": 0.5})
     assert g["n"] == 2
@@ -101,6 +125,16 @@ def test_materialize_residual_cash():
     assert abs(cash - 200.0) < 1.0
 
 
+def test_materialize_rounds_up_when_cash_allows():
+    # 3 names at 1/3: floors leave $600 residual; the closest whole share
+    # (C, 66.67 → 67) is bought, B (33.33) is not rounded up
+    w = {"A": 1 / 3, "B": 1 / 3, "C": 1 / 3}
+    prices = {"A": 100.0, "B": 1000.0, "C": 500.0}
+    pos, cash = constructor.materialize(w, 100000.0, prices)
+    assert {k: v["shares"] for k, v in pos.items()} == {"A": 333, "B": 33, "C": 67}
+    assert cash >= 0.0
+
+
 def test_materialize_skips_missing_price():
     w = {"AAPL": 0.5, "NOPRICE": 0.5}
     prices = {"AAPL": 100.0}
@@ -142,6 +176,50 @@ def test_fail_open_missing_input():
         config.NSX_ALLOC, config.NS5_BLEND, config.NS8_SIGNALS = old
 
 
+def test_book_risk_on_composed_book():
+    import numpy as np
+    import pandas as pd
+    import book_risk
+    alloc, blend, signals = _sample_inputs()
+    w = constructor.apply_guards(constructor.compose(alloc, blend, signals))
+    names = [t for t in w if t != config.CASH_PROXY]
+    rng = np.random.default_rng(3)
+    returns = pd.DataFrame(rng.normal(0.0003, 0.01, (300, len(names))), columns=names)
+    out = book_risk.book_risk(w, returns=returns, n_scenarios=4000, horizons=(1, 21))
+    assert out["unmodeled"] == [config.CASH_PROXY]
+    assert out["var"][21][0.99] < out["var"][21][0.95] < 0
+    assert out["cvar"][1][0.95] <= out["var"][1][0.95]
+    assert 0.0 <= out["drawdown_prob"][21][0.05] <= 1.0
+
+
+def test_fetch_returns_reuses_cached_panel(tmp_path, monkeypatch):
+    import pandas as pd
+    import book_risk
+    calls = []
+
+    def download(tickers, period):
+        calls.append(list(tickers))
+        idx = pd.date_range("2026-01-01", periods=30, freq="B")
+        return pd.DataFrame({t: 100.0 + pd.Series(range(30), index=idx) for t in tickers})
+
+    monkeypatch.setattr(book_risk, "CLOSES_CACHE", tmp_path / "closes.npz")
+    monkeypatch.setattr(book_risk, "_panel", {"closes": None, "period": None, "at": 0.0})
+    monkeypatch.setattr(book_risk, "_download_closes", download)
+    first = book_risk.fetch_returns(["SPY", "EFA"])
+    again = book_risk.fetch_returns(["EFA", "SPY", "IEF"])
+    assert calls == [["SPY", "EFA"], ["IEF"]]           # only the new name is fetched
+    assert list(again.columns) == ["EFA", "SPY", "IEF"]
+    pd.testing.assert_frame_equal(again[["SPY", "EFA"]], first)
+
+    # a restart reads the disk panel; past the TTL the book is refetched whole
+    monkeypatch.setattr(book_risk, "_panel", {"closes": None, "period": None, "at": 0.0})
+    book_risk.fetch_returns(["SPY"])
+    assert len(calls) == 2
+    monkeypatch.setattr(config, "MC_HISTORY_TTL", -1)
+    book_risk.fetch_returns(["SPY"])
+    assert calls[-1] == ["SPY"]
+
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
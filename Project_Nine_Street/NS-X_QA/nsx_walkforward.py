@@ -29,7 +29,7 @@ import argparse
 import json
 import sys
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Sequence
 
 import numpy as np
 
@@ -41,7 +41,7 @@ OUT = Path(__file__).resolve().parent / "data" / "nsx_walkforward_results.json"
 
 
 # ── Synthetic-but-realistic strategy streams (reproducible, seeded) ──────
-def _synth_strategies(seed: int = 42, n: int = 1200) -> Dict[str, List[float]]:
+def _synth_strategies(seed: int = 42, n: int = 1200) -> Dict[str, np.ndarray]:
     """Distinct-return strategies so rotation has something to exploit."""
     rng = np.random.default_rng(seed)
     t = np.arange(n)
@@ -57,71 +57,74 @@ def _synth_strategies(seed: int = 42, n: int = 1200) -> Dict[str, List[float]]:
     # ns8: diversifier — low correlation, moderate return
     ns8 = 0.0005 + 0.001 * np.cos((t + 90) / 200.0) + rng.normal(0, 0.006, n)
     cash = np.zeros(n)
-    return {"ns7": ns7.tolist(), "at_val": at_val.tolist(),
-            "ns8": ns8.tolist(), "cash": cash.tolist()}
+    return {"ns7": ns7, "at_val": at_val, "ns8": ns8, "cash": cash}
 
 
-def _port_return(streams: Dict[str, List[float]], weights: Dict[str, float],
-                 day: int) -> float:
-    return sum(weights.get(k, 0.0) * streams[k][day] for k in weights)
-
-
-def walk(start: int, streams: Dict[str, List[float]],
+def walk(start: int, streams: Dict[str, Sequence[float]],
          rebalance_every: int = 22) -> Dict[str, float]:
     """Run the allocator's rotation over time on synthetic streams (MECHANICS).
 
+    streams: {strategy_id: daily returns}; aligned from day 0 and cut to the
+    SHORTEST (real streams differ in length) → one day × strategy matrix.
+    Momentum is carried forward day by day (rotation.MomentumState) and the
+    equity curves come from one matrix product, so a walk costs
+    O(days × strategies) however long the history.
+
     Returns {rotation_sharpe, static_sharpe, rotation_cagr, static_cagr,
              rotation_mdd, static_mdd, annual_turnover, ...}.
     """
     roles = {s.id: s.role for s in registry.enabled_registry()
              if s.id in streams}
-
-    # momentum lookback window (in days)
-    lookback = config.MOM_LOOKBACK_DAYS + config.MOM_SKIP_DAYS
+    ids = list(streams)
+    col = {k: j for j, k in enumerate(ids)}
+    n_days = min(len(v) for v in streams.values())
+    R = np.column_stack([np.asarray(streams[k][:n_days], dtype=float) for k in ids])
 
     # static equal-weight split (excluding cash) — the benchmark
     risky = [k for k, r in roles.items() if r != "riskoff"]
     static_w = {k: 1.0 / len(risky) for k in risky}
 
-    rot_eq, static_eq = 1.0, 1.0
-    rot_curve, static_curve = [1.0], [1.0]
+    def _vec(weights: Dict[str, float]) -> np.ndarray:
+        v = np.zeros(len(ids))
+        for k, w in weights.items():
+            v[col[k]] = w
+        return v
+
+    state = rotation.MomentumState(len(ids))
+    for day in range(min(start, n_days)):
+        state.push(R[day])
+
     weights = dict(static_w)                 # start equal
     prev_weights = dict(weights)
+    held = np.zeros((max(n_days - start, 0), len(ids)))
     total_turnover = 0.0
     n_rebalances = 0
-
-    # iterate to the SHORTEST stream (real streams differ in length)
-    n_days = min(len(v) for v in streams.values())
     for day in range(start, n_days):
-        # rotation: re-compute allocation on trailing window (no look-ahead)
+        # rotation: allocation from momentum through day-1 (no look-ahead)
         if (day - start) % rebalance_every == 0:
-            trailing = {k: streams[k][max(0, day - lookback):day]
-                        for k in streams}
-            scores = {k: rotation.strategy_momentum(v) for k, v in trailing.items()}
+            scores = {k: (None if np.isnan(m) else float(m))
+                      for k, m in zip(ids, state.scores())}
             weights = rotation.weight_strategies(scores, roles)
             total_turnover += rotation.strategy_turnover(prev_weights, weights)
             n_rebalances += 1
             prev_weights = dict(weights)
-        r_ret = _port_return(streams, weights, day)
-        s_ret = _port_return(streams, static_w, day)
-        rot_eq *= (1 + r_ret)
-        static_eq *= (1 + s_ret)
-        rot_curve.append(rot_eq)
-        static_curve.append(static_eq)
-
-    def _sharpe(curve: List[float]) -> float:
-        rets = np.diff(curve) / np.array(curve[:-1])
+            w_vec = _vec(weights)
+        held[day - start] = w_vec
+        state.push(R[day])
+
+    live = R[start:n_days]
+    rot_curve = np.r_[1.0, np.cumprod(1.0 + (held * live).sum(axis=1))]
+    static_curve = np.r_[1.0, np.cumprod(1.0 + live @ _vec(static_w))]
+
+    def _sharpe(curve: np.ndarray) -> float:
+        rets = np.diff(curve) / curve[:-1]
         return float(np.mean(rets) / np.std(rets)) * np.sqrt(252) if np.std(rets) > 0 else 0.0
 
-    def _mdd(curve: List[float]) -> float:
-        peak, mdd = curve[0], 0.0
-        for v in curve:
-            peak = max(peak, v)
-            mdd = min(mdd, v / peak - 1.0 if peak else 0.0)
-        return mdd
+    def _mdd(curve: np.ndarray) -> float:
+        peak = np.maximum.accumulate(curve)
+        return float(min(0.0, np.min(np.where(peak > 0, curve / peak - 1.0, 0.0))))
 
     # annualized turnover (rebalances/yr × avg turnover per rebalance)
-    n_days = min(len(v) for v in streams.values()) - start
     rebalances_per_year = 252.0 / rebalance_every
     annual_turnover = (total_turnover / n_rebalances * rebalances_per_year
                        if n_rebalances else 0.0)
@@ -182,10 +185,10 @@ def _run_real_evidence() -> str:
     """Run the design §8 HARD GATE on REAL per-strategy streams: does rotation
     beat static equal-weight on the actual strategy P&L? Returns PASS/FAIL."""
     try:
-        reg = {s.id: s for s in registry.build_registry()}
-        streams = {sid: registry.get_returns(sid)
-                   for sid in reg if reg[sid].enabled}
-        streams = {k: v for k, v in streams.items() if v}   # drop empty
+        ids, matrix = registry.return_matrix()
+        lengths = (~np.isnan(matrix)).sum(axis=0)
+        streams = {k: matrix[:lengths[j], j] for j, k in enumerate(ids)
+                   if lengths[j]}                           # drop empty
         if len([k for k in streams if k != "cash"]) < 2:
             return "evidence_pending"                        # not enough data
         res = walk(200, streams, rebalance_every=22)          # real walk
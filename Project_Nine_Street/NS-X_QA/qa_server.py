@@ -23,16 +23,26 @@ from datetime import datetime
 from http.server import BaseHTTPRequestHandler, HTTPServer
 from pathlib import Path
 
-import allocator
+# repo root on sys.path so the shared metrics registry resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
 import config
 import registry
-import rotation
+from common import metrics, profiler  # noqa: E402
+from common.lazy import lazy_import  # noqa: E402
+
+# rotation -> vol -> common.risk (numpy/pandas): loaded by the first route that ranks
+allocator = lazy_import("allocator")
+rotation = lazy_import("rotation")
 
 PORT = int(os.environ.get("PORT", 9291))
 ENV = os.environ.get("ENV", "QA")
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(name)s %(levelname)s %(message)s")
 log = logging.getLogger("nsx.qa_server")
+metrics.init("nsx")
 
 
 def _serve_dashboard(handler):
@@ -50,7 +60,8 @@ def _serve_dashboard(handler):
     handler.wfile.write(body)
 
 
-class NSXHandler(BaseHTTPRequestHandler):
+class NSXHandler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 BaseHTTPRequestHandler):
     # ── HTTP plumbing ────────────────────────────────────────────────────
     def log_message(self, format, *args):  # quieter
         log.info("%s - %s", self.address_string(), format % args)
@@ -76,6 +87,8 @@ class NSXHandler(BaseHTTPRequestHandler):
     # ── Routes ───────────────────────────────────────────────────────────
     def do_GET(self):
         path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
         if path in ("/", "/index.html", "/nsx_dashboard.html", "/dashboard"):
             return _serve_dashboard(self)
         if path == "/health":
@@ -182,7 +195,9 @@ class NSXHandler(BaseHTTPRequestHandler):
 
 def main():
     log.info("NS-X %s server on port %d", ENV, PORT)
-    HTTPServer(("0.0.0.0", PORT), NSXHandler).serve_forever()
+    server = HTTPServer(("0.0.0.0", PORT), NSXHandler)
+    log.info("ready in %.3fs", metrics.mark_ready()["ready_s"])
+    server.serve_forever()
 
 
 if __name__ == "__main__":
@@ -22,7 +22,7 @@ from __future__ import annotations
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import config
 
@@ -130,6 +130,14 @@ def get_returns(strategy_id: str) -> List[float]:
         return []
 
 
+def return_matrix(strategy_ids: Optional[List[str]] = None) -> Tuple[List[str], "np.ndarray"]:
+    """get_returns() for the enabled strategies (or `strategy_ids`) as one
+    day × strategy matrix — strategy_data.to_matrix, NaN past each end."""
+    import strategy_data
+    ids = strategy_ids or [s.id for s in enabled_registry()]
+    return strategy_data.to_matrix({sid: get_returns(sid) for sid in ids}, ids)
+
+
 def streams_differentiated() -> bool:
     """True if the enabled risky strategies return DIFFERENT live streams.
 
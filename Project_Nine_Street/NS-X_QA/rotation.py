@@ -11,12 +11,16 @@ Design §5. Core pure logic (unit-testable, no I/O):
        - cash residual (w_cash = 1 − Σ risky), full risk-off when all floor
   4. Normalize to sum 1.0, long-only.
 
-All pure functions; allocator.py wires I/O around this.
+All pure functions; allocator.py wires I/O around this. MomentumState is the
+same momentum carried forward one day at a time across many strategies, for
+walk-forward runs.
 """
 from __future__ import annotations
 
 from typing import Dict, List, Optional
 
+import numpy as np
+
 import config
 import vol
 
@@ -68,6 +72,50 @@ def strategy_momentum(daily_returns: List[float]) -> Optional[float]:
     return skip_month_momentum(daily_returns)
 
 
+class MomentumState:
+    """strategy_momentum() for every strategy, advanced one day at a time.
+
+    Equivalent to calling strategy_momentum(returns[max(0, t−L):t]) with
+    L = lookback + skip at each day t, but O(strategies) per day instead of
+    O(L × strategies): the window's ex-ante vol is a windowed streaming EWMA
+    (vol.streaming, shared with NS-8) and the skip-month sum comes from a ring
+    of running totals.
+
+    push(row) takes one day's returns (one value per strategy, finite);
+    scores() gives momentum as of the days pushed so far (NaN = None).
+    """
+
+    def __init__(self, n_strategies: int, lookback: Optional[int] = None,
+                 skip: Optional[int] = None, delta: Optional[float] = None):
+        self.lookback = lookback or config.MOM_LOOKBACK_DAYS
+        self.skip = skip or config.MOM_SKIP_DAYS
+        self.delta = delta if delta is not None else vol.DELTA
+        self.window = self.lookback + self.skip
+        self.count = 0
+        self._vol = vol.streaming(n_strategies, window=self.window, delta=self.delta)
+        self._cum = np.zeros((self.window + 1, n_strategies))  # running-sum ring
+
+    def push(self, row) -> None:
+        r = np.asarray(row, dtype=float)
+        self._vol.update(r)
+        self._cum[(self.count + 1) % (self.window + 1)] = (
+            self._cum[self.count % (self.window + 1)] + r)
+        self.count += 1
+
+    def scores(self) -> np.ndarray:
+        n = self.count
+        out = np.full(self._cum.shape[1], np.nan)
+        if n < max(3, self.lookback + 1):
+            return out
+        sigma = self._vol.vol()
+        k = self.window + 1
+        total = self._cum[(n - self.skip - 1) % k] - self._cum[(n - self.lookback - 1) % k]
+        live = sigma > _EPS_SIGMA
+        out[:] = 0.0                                 # zero-vol → flat (momentum 0)
+        out[live] = total[live] / sigma[live]
+        return out
+
+
 # ── Weighting ────────────────────────────────────────────────────────────
 def weight_strategies(scores: Dict[str, Optional[float]],
                       roles: Dict[str, str]) -> Dict[str, float]:
@@ -23,6 +23,11 @@ period's end).
 This is a pragmatic seed, NOT the v4 centralized DB. It reads existing data
 files (decoupled, house pattern) and caches the computed daily streams to
 data/strategy_streams.json. The v4 store replaces the file reads with a real DB.
+
+Streams are built as numpy arrays; to_matrix()/stream_matrix() give the
+columnar view (day × strategy, NaN past a stream's end) that the rotation
+walk consumes. Days are positional offsets from each stream's start — the
+same alignment the list form has always used.
 """
 from __future__ import annotations
 
@@ -31,7 +36,9 @@ import logging
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 import config
 
@@ -70,43 +77,47 @@ def _load_ns7_value_yearly() -> List[dict]:
 
 # ── Daily stream builders ────────────────────────────────────────────────
 def _daily_returns_from_closes(closes: Dict[str, List[float]],
-                               weights: Optional[Dict[str, float]] = None) -> List[float]:
+                               weights: Optional[Dict[str, float]] = None) -> np.ndarray:
     """Equal-weight (or given-weight) daily book returns from aligned closes."""
     if not closes:
-        return []
+        return np.zeros(0)
     tickers = list(closes.keys())
     n = min(len(v) for v in closes.values())
     if n < 2:
-        return []
+        return np.zeros(0)
     w = weights or {t: 1.0 / len(tickers) for t in tickers}
-    rets = []
-    for i in range(1, n):
-        day_ret = 0.0
-        for t in tickers:
-            p0, p1 = closes[t][i - 1], closes[t][i]
-            if p0:
-                day_ret += w.get(t, 0.0) * (p1 / p0 - 1.0)
-        rets.append(day_ret)
-    return rets
-
-
-def _monthly_to_daily(monthly_returns: List[dict], days_per_month: int = 21) -> List[float]:
+    px = np.array([closes[t][:n] for t in tickers], dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rets = np.where(px[:, :-1] != 0, px[:, 1:] / px[:, :-1] - 1.0, 0.0)
+    return np.array([w.get(t, 0.0) for t in tickers]) @ rets
+
+
+def _monthly_to_daily(monthly_returns: List[dict], days_per_month: int = 21) -> np.ndarray:
     """Expand a monthly-return series to a daily step series (no look-ahead:
     each month's return is applied flat across that month's trading days)."""
-    daily = []
-    for m in monthly_returns:
-        r = float(m.get("strategy", 0.0))
-        daily.extend([r / days_per_month] * days_per_month)
-    return daily
+    r = np.array([float(m.get("strategy", 0.0)) for m in monthly_returns])
+    return np.repeat(r / days_per_month, days_per_month)
 
 
-def _yearly_to_daily(yearly_returns: List[dict], days_per_year: int = 252) -> List[float]:
+def _yearly_to_daily(yearly_returns: List[dict], days_per_year: int = 252) -> np.ndarray:
     """Expand a yearly-return series to a daily step series."""
-    daily = []
-    for y in yearly_returns:
-        r = float(y.get("strategy", 0.0))
-        daily.extend([r / days_per_year] * days_per_year)
-    return daily
+    r = np.array([float(y.get("strategy", 0.0)) for y in yearly_returns])
+    return np.repeat(r / days_per_year, days_per_year)
+
+
+def to_matrix(streams: Dict[str, Sequence[float]],
+              ids: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """{strategy_id: daily returns} → (ids, day × strategy float matrix).
+
+    Columns follow `ids` (default: dict order); shorter streams are NaN-padded
+    at the end, so (~isnan).sum(axis=0) recovers each stream's length.
+    """
+    ids = list(streams) if ids is None else list(ids)
+    cols = [np.asarray(streams.get(k, ()), dtype=float) for k in ids]
+    out = np.full((max((len(c) for c in cols), default=0), len(ids)), np.nan)
+    for j, c in enumerate(cols):
+        out[:len(c), j] = c
+    return ids, out
 
 
 # ── Build all streams ─────────────────────────────────────────────────────
@@ -118,17 +129,17 @@ def build_streams() -> Dict[str, Dict]:
     closes = _load_ns8_closes()
     risky = [t for t in closes if t not in ("SHV",)]
     w8 = {t: 1.0 / len(risky) for t in risky} if risky else None
-    ns8_ret = _daily_returns_from_closes(closes, w8)
+    ns8_ret = _daily_returns_from_closes(closes, w8).tolist()
     streams["ns8"] = {"returns": ns8_ret, "source": "ns8_hist_closes",
                       "label": "live" if ns8_ret else "unavailable"}
 
     # NS-7 momentum: real momentum walkforward monthly → daily
-    mom = _monthly_to_daily(_load_ns7_momentum_monthly())
+    mom = _monthly_to_daily(_load_ns7_momentum_monthly()).tolist()
     streams["ns7"] = {"returns": mom, "source": "ns7_walkforward_monthly",
                       "label": "walkforward" if mom else "unavailable"}
 
     # A_T value: real value blend yearly → daily (thinnest; fail-open if short)
-    val = _yearly_to_daily(_load_ns7_value_yearly())
+    val = _yearly_to_daily(_load_ns7_value_yearly()).tolist()
     streams["at_val"] = {"returns": val, "source": "ns7_value_blend_yearly",
                          "label": "walkforward" if len(val) > config.MOM_LOOKBACK_DAYS
                          else "too_short"}
@@ -176,6 +187,12 @@ def get_stream(strategy_id: str) -> List[float]:
     return streams.get(strategy_id, {}).get("returns", [])
 
 
+def stream_matrix(ids: Optional[List[str]] = None) -> Tuple[List[str], np.ndarray]:
+    """get_stream() for each strategy (default: every stored one), columnar."""
+    ids = list(load_streams()) if ids is None else list(ids)
+    return to_matrix({sid: get_stream(sid) for sid in ids}, ids)
+
+
 def sources() -> Dict[str, str]:
     """Honesty labels per strategy (for the alloc doc + dashboard)."""
     streams = load_streams()
@@ -68,6 +68,14 @@ def test_allocator_writes_file(tmp_path):
     assert loaded["as_of"] == "2026-08-16"
 
 
+def test_walk_cuts_to_shortest_stream():
+    streams = wf._synth_strategies(seed=3, n=900)
+    streams["ns8"] = streams["ns8"][:700]
+    res = wf.walk(200, streams, rebalance_every=5)
+    as_lists = {k: v[:700].tolist() for k, v in streams.items()}
+    assert wf.walk(200, as_lists, rebalance_every=5) == res
+    assert res != wf.walk(200, {k: v[:690] for k, v in streams.items()}, rebalance_every=5)
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
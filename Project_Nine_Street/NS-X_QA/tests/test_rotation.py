@@ -104,6 +104,25 @@ def test_deterministic():
     assert a == b
 
 
+
+# ── incremental momentum (walk-forward state) ────────────────────────────
+def test_momentum_state_matches_trailing_windows():
+    import math
+    cols = [_mk(0.001, 0.01, 400, seed=3), _mk(-0.001, 0.004, 400, seed=4),
+            [0.0] * 400, [0.01] * 400]
+    state = rotation.MomentumState(len(cols))
+    window = config.MOM_LOOKBACK_DAYS + config.MOM_SKIP_DAYS
+    for day in range(400):
+        if day % 9 == 0:
+            for k, got in enumerate(state.scores()):
+                exp = rotation.strategy_momentum(cols[k][max(0, day - window):day])
+                if exp is None:
+                    assert math.isnan(got)
+                else:
+                    assert abs(got - exp) <= 1e-9 * max(1.0, abs(exp))
+        state.push([c[day] for c in cols])
+
+
 if __name__ == "__main__":
     import pytest
     pytest.main([__file__, "-v"])
@@ -40,3 +40,19 @@ def test_get_stream_fail_open():
 def test_sources_labels():
     src = strategy_data.sources()
     assert "ns8" in src and "ns7" in src and "at_val" in src and "cash" in src
+
+
+def test_step_expansion_and_matrix():
+    import math
+    daily = strategy_data._monthly_to_daily([{"strategy": 0.21}, {"strategy": -0.042}])
+    assert len(daily) == 42 and abs(daily[0] - 0.01) < 1e-12 and abs(daily[-1] + 0.002) < 1e-12
+    ids, m = strategy_data.to_matrix({"a": [0.1, 0.2, 0.3], "b": [0.5]}, ["b", "a", "zz"])
+    assert ids == ["b", "a", "zz"] and m.shape == (3, 3)
+    assert m[0, 0] == 0.5 and math.isnan(m[1, 0]) and list(m[:, 1]) == [0.1, 0.2, 0.3]
+    assert all(math.isnan(v) for v in m[:, 2])
+
+
+def test_book_returns_from_closes():
+    rets = strategy_data._daily_returns_from_closes(
+        {"A": [100.0, 110.0, 99.0], "B": [50.0, 50.0, 55.0, 60.0]}, {"A": 0.5, "B": 0.5})
+    assert [round(r, 6) for r in rets] == [0.05, 0.0]
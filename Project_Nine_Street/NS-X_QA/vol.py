@@ -3,7 +3,7 @@
 The EWMA math lives in `common.risk.vol` (single source of truth, shared with
 NS-8). This module keeps the NS-X-facing names (`ewma_var`, `exante_vol`,
 `DELTA`, `ANN`) wired to NS-X's config thresholds so downstream imports are
-unchanged.
+unchanged, plus the streaming (`streaming`) and panel (`ewma_var_panel`) forms.
 """
 import sys
 from pathlib import Path
@@ -17,6 +17,7 @@ if str(_ROOT) not in sys.path:
     sys.path.insert(0, str(_ROOT))
 
 from common.risk import vol as _vol  # noqa: E402
+from common.risk.vol import EWMAVol  # noqa: E402,F401
 
 DELTA = config.VOL_DELTA        # δ/(1-δ) = 60 trading days center of mass
 ANN = config.VOL_ANN            # trading days/year
@@ -28,3 +29,13 @@ def ewma_var(daily_returns, delta=None):
 
 def exante_vol(daily_returns, delta=None):
     return _vol.exante_vol(daily_returns, delta if delta is not None else DELTA, ANN)
+
+
+def streaming(n_series=1, window=None, delta=None):
+    """Streaming EWMA state (common.risk.vol.EWMAVol) at this service's δ/ANN."""
+    return _vol.EWMAVol(n_series, delta if delta is not None else DELTA, ANN, window)
+
+
+def ewma_var_panel(returns, window=None, delta=None, min_periods=3):
+    return _vol.ewma_var_panel(returns, delta if delta is not None else DELTA, ANN,
+                               window, min_periods)
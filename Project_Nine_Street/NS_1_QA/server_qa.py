@@ -22,6 +22,14 @@ DASHBOARD_PATH = os.path.join(os.path.dirname(__file__), 'index.html')
 SCRIPTS_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'scripts'))
 if SCRIPTS_DIR not in sys.path:
     sys.path.insert(0, SCRIPTS_DIR)
+# Repo root so the shared Yahoo gate and metrics (`common.*`) resolve
+_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common import metrics, profiler  # noqa: E402
+
+metrics.init("ns1")
 
 ENGINES_AVAILABLE = False
 try:
@@ -124,7 +132,8 @@ PERFORMANCE_SNAPSHOT = {
 }
 
 
-class NS1Handler(SimpleHTTPRequestHandler):
+class NS1Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                 SimpleHTTPRequestHandler):
     def _json(self, code, data):
         import math
         def sanitize(obj):
@@ -147,6 +156,9 @@ class NS1Handler(SimpleHTTPRequestHandler):
         path = parsed.path
         qs = parse_qs(parsed.query)
 
+        if path in ('/metrics', '/metrics.json'):
+            return self.send_metrics(path)
+
         if path in ('/', '/index.html'):
             self.send_response(200)
             self.send_header('Content-Type', 'text/html')
@@ -222,7 +234,7 @@ class NS1Handler(SimpleHTTPRequestHandler):
 
         if path == '/api/live_feed':
             try:
-                import yfinance as yf
+                from common.data.yahoo import limited_yf as yf
                 portfolio_path = os.path.join(os.path.dirname(__file__), '..', 'scripts', 'paper_portfolio.json')
                 with open(portfolio_path, 'r') as f:
                     port = json.load(f)
@@ -246,7 +258,8 @@ class NS1Handler(SimpleHTTPRequestHandler):
 def run():
     server_address = ('0.0.0.0', PORT)
     httpd = HTTPServer(server_address, NS1Handler)
-    print(f"NS-1 Capital Preservation Server on port {PORT}")
+    print(f"NS-1 Capital Preservation Server on port {PORT} "
+          f"(ready in {metrics.mark_ready()['ready_s']:.3f}s)")
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
@@ -6,12 +6,26 @@ Aggregates Alpha Terminal + Nine Street projects.
 Default: QA environment.
 """
 import os
+import sys
 import json
+import html as _html
+import urllib.request
 import warnings
 warnings.filterwarnings("ignore")
+from concurrent.futures import ThreadPoolExecutor
 from http.server import HTTPServer, SimpleHTTPRequestHandler
 
+# repo root on sys.path so the shared metrics registry resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common import metrics, profiler  # noqa: E402
+
+metrics.init("portal")
+
 PORT = 8000
+METRICS_TIMEOUT = 2.0   # seconds per service /metrics.json scrape
 
 def _last_updated():
     """Date of the last commit touching portal.py (repo-relative), with
@@ -213,7 +227,7 @@ HTML_TEMPLATE = """<!DOCTYPE html>
 
   <div class="footer">
     <div><span class="status-dot"></span><span id="status-text">Connected</span></div>
-    <div><span id="env-display">QA</span> | Port: <span id="port-display">9099</span> | {ts}</div>
+    <div><span id="env-display">QA</span> | Port: <span id="port-display">9099</span> | <a href="/metrics/summary" target="_blank" style="color:#8b949e">Metrics</a> | {ts}</div>
   </div>
 
 <script>
@@ -323,7 +337,54 @@ def build_html():
     html = html.replace('{strategies_json}', strategies_json)
     return html
 
-class PortalHandler(SimpleHTTPRequestHandler):
+def collect_service_metrics(env='qa', timeout=METRICS_TIMEOUT):
+    """{strategy_key: /metrics.json summary | {'error': ...}} scraped concurrently.
+
+    Fail-open per service: a down or un-instrumented service reports its error.
+    """
+    def one(item):
+        key, cfg = item
+        port = cfg.get(env)
+        try:
+            with urllib.request.urlopen(f"http://localhost:{port}/metrics.json",
+                                        timeout=timeout) as resp:
+                return key, json.loads(resp.read())
+        except Exception as e:
+            return key, {"error": type(e).__name__}
+
+    with ThreadPoolExecutor(max_workers=len(STRATEGIES)) as ex:
+        return dict(ex.map(one, STRATEGIES.items()))
+
+
+def build_metrics_html(summaries):
+    """Per-service latency / error / cache table for /metrics/summary."""
+    esc = _html.escape
+    rows = []
+    for key, cfg in STRATEGIES.items():
+        m = summaries.get(key) or {}
+        name = esc(cfg['name'])
+        if 'error' in m:
+            rows.append(f"<tr><td>{name}</td><td colspan='5' class='na'>unavailable ({esc(m['error'])})</td></tr>")
+            continue
+        slow = ", ".join(f"{esc(r['route'])} {r['p95_ms']}ms" for r in m.get('routes', [])[:3]
+                         if r.get('p95_ms') is not None)
+        ups = ", ".join(f"{esc(u['upstream'])}:{esc(u['op'])} {u['mean_ms']}ms x{u['count']}"
+                        for u in m.get('upstreams', [])[:3])
+        caches = ", ".join(f"{esc(c)} {v['hit_rate']:.0%}" for c, v in sorted(m.get('caches', {}).items())
+                           if v.get('hit_rate') is not None)
+        rows.append(f"<tr><td>{name}</td><td>{m.get('requests', 0)}</td><td>{m.get('errors', 0)}</td>"
+                    f"<td>{slow or '-'}</td><td>{ups or '-'}</td><td>{caches or '-'}</td></tr>")
+    return ("<!DOCTYPE html><html><head><meta charset='UTF-8'><title>Service Metrics</title>"
+            "<style>body{font-family:-apple-system,sans-serif;background:#0a0a0f;color:#e8e8f0;padding:20px}"
+            "table{border-collapse:collapse;font-size:12px}td,th{border:1px solid #1e1e2e;padding:6px 10px;"
+            "text-align:left}th{background:#161b22}.na{color:#8b949e}</style></head><body>"
+            "<h3>Service metrics (QA)</h3><table><tr><th>Service</th><th>Requests</th><th>5xx</th>"
+            "<th>Slowest routes (p95)</th><th>Upstreams (mean)</th><th>Cache hit rate</th></tr>"
+            + "".join(rows) + "</table></body></html>")
+
+
+class PortalHandler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+                    SimpleHTTPRequestHandler):
     def end_headers(self):
         self.send_header('Access-Control-Allow-Origin', '*')
         super().end_headers()
@@ -336,6 +397,22 @@ class PortalHandler(SimpleHTTPRequestHandler):
             self.wfile.write(self._html().encode())
             return
 
+        if self.path in ('/metrics', '/metrics.json'):
+            return self.send_metrics(self.path)
+
+        if self.path in ('/api/metrics', '/metrics/summary'):
+            summaries = collect_service_metrics()
+            if self.path == '/api/metrics':
+                body, ctype = json.dumps(summaries).encode(), 'application/json'
+            else:
+                body, ctype = build_metrics_html(summaries).encode(), 'text/html'
+            self.send_response(200)
+            self.send_header('Content-type', ctype)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+
         if self.path == '/api/health':
             self.send_response(200)
             self.send_header('Content-type', 'application/json')
@@ -356,5 +433,6 @@ class PortalHandler(SimpleHTTPRequestHandler):
 
 if __name__ == '__main__':
     server = HTTPServer(('0.0.0.0', PORT), PortalHandler)
-    print(f'Trading Strategy Engine (QA): http://localhost:{PORT}')
+    print(f'Trading Strategy Engine (QA): http://localhost:{PORT} '
+          f'(ready in {metrics.mark_ready()["ready_s"]:.3f}s)')
     server.serve_forever()
\ No newline at end of file
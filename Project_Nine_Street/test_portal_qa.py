@@ -203,3 +203,25 @@ def test_health_loop_polls_all_tabs_including_ns2():
 
 if __name__ == "__main__":
     raise SystemExit(pytest.main([__file__, "-v"]))
+
+
+def test_metrics_summary_page_renders_each_service():
+    """Per-service metrics table: scraped summaries render, down services say so."""
+    summaries = {key: {"error": "URLError"} for key in portal.STRATEGIES}
+    summaries["ns5"] = {
+        "requests": 42, "errors": 1,
+        "routes": [{"route": "/api/grade", "p95_ms": 812.5}],
+        "upstreams": [{"upstream": "postgres", "op": "latest_regime", "mean_ms": 3.1, "count": 9}],
+        "caches": {"ns5_factors": {"hit_rate": 0.9}},
+    }
+    html = portal.build_metrics_html(summaries)
+    assert "/api/grade 812.5ms" in html
+    assert "postgres:latest_regime 3.1ms x9" in html
+    assert "ns5_factors 90%" in html
+    assert html.count("unavailable (URLError)") == len(portal.STRATEGIES) - 1
+
+
+def test_portal_serves_its_own_metrics(server):
+    with _get(server, "/metrics") as resp:
+        assert resp.status == 200
+        assert "http_request_duration_seconds" in resp.read().decode()
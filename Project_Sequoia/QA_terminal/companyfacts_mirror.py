@@ -0,0 +1,313 @@
+"""
+companyfacts_mirror.py — On-disk mirror of SEC XBRL companyfacts, keyed by CIK.
+
+Every consumer of companyfacts (fundamentals_history extraction, the
+/api/sec/financials view) used to pull the full JSON (several MB for a large
+filer) from data.sec.gov on every call, one company at a time. The mirror
+keeps one gzip-compressed copy per CIK plus the response validators, so:
+
+  - Reads are local: load(cik) decompresses data/companyfacts/CIK##########.json.gz.
+  - Refreshes are conditional: sync_one() sends If-None-Match /
+    If-Modified-Since from the recorded ETag / Last-Modified; an unchanged
+    filer costs one 304 with no body.
+  - Bulk ingest is concurrent: sync() fans out over a bounded worker pool
+    behind a shared token bucket that stays under the SEC fair-access
+    ceiling (10 requests/second across all workers).
+
+sync() reports which CIKs actually changed, so the nightly
+fundamentals_history sweep only re-extracts those filers.
+
+BASE_URL is overridable (argument or SEC_COMPANYFACTS_URL env) so tests can
+point the mirror at a local stub HTTP server.
+
+Run:
+  python3 companyfacts_mirror.py --tickers AAPL,MSFT     # sync two filers
+  python3 companyfacts_mirror.py --limit 50 --workers 8  # first 50 SP500
+"""
+import argparse
+import gzip
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import requests
+
+# Repo root so the shared metrics registry (`common.metrics`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics  # noqa: E402
+from common.utils import TokenBucket  # noqa: E402
+
+HEADERS = {"User-Agent": "AlphaTerminal/1.0 research@example.com"}
+BASE_URL = os.environ.get("SEC_COMPANYFACTS_URL",
+                          "https://data.sec.gov/api/xbrl/companyfacts")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+MIRROR_DIR = os.path.join(DATA_DIR, "companyfacts")
+INDEX_PATH = os.path.join(MIRROR_DIR, "index.db")
+
+SEC_MAX_RPS = 10          # SEC fair-access ceiling (all workers combined)
+DEFAULT_RPS = 8           # headroom under the ceiling
+DEFAULT_WORKERS = 8
+REQUEST_TIMEOUT = 30
+REVALIDATE_AFTER = 12 * 3600   # get(): conditional refresh when older than this
+
+_index_lock = threading.Lock()
+
+
+class RateLimiter(TokenBucket):
+    """The shared token bucket with `rate` capped at the SEC ceiling.
+
+    `burst` tokens may be taken back-to-back; after that callers block until
+    the bucket refills. Shared by every worker of one sync() run.
+    """
+
+    def __init__(self, rate=DEFAULT_RPS, burst=1):
+        super().__init__(min(rate, SEC_MAX_RPS), burst)
+
+
+# Process-wide bucket: get() fetch-throughs and sync() runs without their own
+# `rate` draw from it, so request-path reads and a sweep share one budget.
+LIMITER = RateLimiter(DEFAULT_RPS)
+
+
+class MirrorUnavailable(requests.RequestException):
+    """No usable copy: the fetch failed (network / HTTP error) and nothing is
+    mirrored yet. Distinct from a filer without XBRL, which get() returns as {}."""
+
+
+# --------------------------------------------------------------------------- #
+# Index (validators + bookkeeping per CIK)
+# --------------------------------------------------------------------------- #
+def _conn():
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    c = sqlite3.connect(INDEX_PATH, timeout=30)
+    c.execute("""
+        CREATE TABLE IF NOT EXISTS mirror (
+            cik TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            fetched_at TEXT,
+            checked_at TEXT,
+            size INTEGER,
+            status TEXT
+        )""")
+    c.commit()
+    return c
+
+
+def _norm(cik):
+    return str(cik).strip().lstrip("CIK").zfill(10)
+
+
+def _path(cik):
+    return os.path.join(MIRROR_DIR, f"CIK{_norm(cik)}.json.gz")
+
+
+def entry(cik):
+    """Index row for a CIK as a dict, or None when never synced."""
+    conn = _conn()
+    try:
+        cur = conn.execute("SELECT * FROM mirror WHERE cik = ?", (_norm(cik),))
+        row = cur.fetchone()
+        if not row:
+            return None
+        return dict(zip([d[0] for d in cur.description], row))
+    finally:
+        conn.close()
+
+
+def _record(cik, status, headers=None, size=None):
+    now = datetime.utcnow().strftime("%Y-%m-%dT%H:%M:%SZ")
+    with _index_lock:
+        conn = _conn()
+        try:
+            if headers is None:
+                # 304 / error: keep validators, only stamp the check
+                conn.execute(
+                    """INSERT INTO mirror (cik, checked_at, status) VALUES (?,?,?)
+                       ON CONFLICT(cik) DO UPDATE SET
+                         checked_at = excluded.checked_at,
+                         status = excluded.status""",
+                    (_norm(cik), now, status))
+            else:
+                conn.execute(
+                    """INSERT OR REPLACE INTO mirror
+                       (cik, etag, last_modified, fetched_at, checked_at, size, status)
+                       VALUES (?,?,?,?,?,?,?)""",
+                    (_norm(cik), headers.get("ETag"), headers.get("Last-Modified"),
+                     now, now, size, status))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+# --------------------------------------------------------------------------- #
+# Read
+# --------------------------------------------------------------------------- #
+def load(cik):
+    """Mirrored companyfacts dict for a CIK, or None when not mirrored."""
+    p = _path(cik)
+    if not os.path.exists(p):
+        return None
+    try:
+        with gzip.open(p, "rt", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(cik, body):
+    """Atomically replace the mirrored file (readers never see a partial gz)."""
+    os.makedirs(MIRROR_DIR, exist_ok=True)
+    p = _path(cik)
+    tmp = f"{p}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, "wb", compresslevel=6) as f:
+        f.write(body)
+    os.replace(tmp, p)
+    return os.path.getsize(p)
+
+
+# --------------------------------------------------------------------------- #
+# Sync
+# --------------------------------------------------------------------------- #
+_local = threading.local()
+
+
+def _session():
+    s = getattr(_local, "session", None)
+    if s is None:
+        s = requests.Session()
+        s.headers.update(HEADERS)
+        _local.session = s
+    return s
+
+
+def sync_one(cik, base_url=None, limiter=None, timeout=REQUEST_TIMEOUT):
+    """Conditionally refresh one CIK. Returns the status string:
+
+    'new' (first download), 'modified' (200 over an existing copy),
+    'not-modified' (304), 'missing' (404 — no XBRL for this filer) or
+    'error: ...' (network / HTTP failure; the existing copy is kept).
+    """
+    cik = _norm(cik)
+    url = f"{(base_url or BASE_URL).rstrip('/')}/CIK{cik}.json"
+    prev = entry(cik)
+    have_copy = os.path.exists(_path(cik))
+    req_headers = {}
+    if prev and have_copy:
+        if prev.get("etag"):
+            req_headers["If-None-Match"] = prev["etag"]
+        if prev.get("last_modified"):
+            req_headers["If-Modified-Since"] = prev["last_modified"]
+    if limiter is not None:
+        limiter.acquire()
+    try:
+        with metrics.upstream("sec", "companyfacts"):
+            r = _session().get(url, headers=req_headers, timeout=timeout)
+    except requests.RequestException as e:
+        status = f"error: {type(e).__name__}"
+        _record(cik, status)
+        return status
+    if r.status_code == 304:
+        _record(cik, "not-modified")
+        return "not-modified"
+    if r.status_code == 404:
+        _record(cik, "missing")
+        return "missing"
+    if r.status_code != 200:
+        status = f"error: HTTP {r.status_code}"
+        _record(cik, status)
+        return status
+    size = _write(cik, r.content)
+    status = "modified" if have_copy else "new"
+    _record(cik, status, headers=r.headers, size=size)
+    return status
+
+
+def sync(ciks, workers=DEFAULT_WORKERS, rate=None, base_url=None,
+         timeout=REQUEST_TIMEOUT):
+    """Conditionally refresh many CIKs concurrently. {cik: status}.
+
+    `workers` bounds the in-flight requests; the token bucket caps the
+    aggregate request rate — the process-wide LIMITER by default, or a
+    bucket of its own at `rate`/s (never above SEC_MAX_RPS).
+    """
+    uniq = sorted({_norm(c) for c in ciks if c})
+    if not uniq:
+        return {}
+    limiter = LIMITER if rate is None else RateLimiter(rate)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        statuses = ex.map(
+            lambda c: sync_one(c, base_url=base_url, limiter=limiter, timeout=timeout),
+            uniq)
+        return dict(zip(uniq, statuses))
+
+
+def changed(results):
+    """CIKs whose mirrored copy changed in a sync() result."""
+    return {c for c, s in results.items() if s in ("new", "modified")}
+
+
+def get(cik, max_age=REVALIDATE_AFTER, base_url=None):
+    """Companyfacts for a CIK via the mirror ({} for a filer without XBRL).
+
+    Serves the local copy; revalidates it (conditional GET, usually a 304)
+    when the last check is older than `max_age` seconds, and fetches through
+    on a miss, paced by the shared LIMITER. A failed refresh falls back to
+    the existing copy; with no copy it raises MirrorUnavailable.
+    """
+    cik = _norm(cik)
+    e = entry(cik)
+    stale = True
+    if e and e.get("checked_at"):
+        try:
+            checked = datetime.strptime(e["checked_at"], "%Y-%m-%dT%H:%M:%SZ")
+            stale = (datetime.utcnow() - checked).total_seconds() > max_age
+        except ValueError:
+            pass
+    if stale or not os.path.exists(_path(cik)):
+        status = sync_one(cik, base_url=base_url, limiter=LIMITER)
+        if status.startswith("error") and not os.path.exists(_path(cik)):
+            raise MirrorUnavailable(f"companyfacts CIK{cik}: {status}")
+    return load(cik) or {}
+
+
+# --------------------------------------------------------------------------- #
+# CLI
+# --------------------------------------------------------------------------- #
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--limit", type=int, default=0)
+    ap.add_argument("--tickers", default="")
+    ap.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    ap.add_argument("--rate", type=float, default=DEFAULT_RPS)
+    args = ap.parse_args()
+
+    import fundamentals_history as fh
+    if args.tickers:
+        tickers = [t.strip().upper() for t in args.tickers.split(",") if t.strip()]
+    else:
+        tickers = fh.sp500_tickers()
+        if args.limit:
+            tickers = tickers[:args.limit]
+    ciks = [c for c in fh.resolve_ciks(tickers).values() if c]
+    t0 = time.time()
+    res = sync(ciks, workers=args.workers, rate=args.rate)
+    counts = {}
+    for s in res.values():
+        key = "error" if s.startswith("error") else s
+        counts[key] = counts.get(key, 0) + 1
+    print(f"synced {len(res)} CIKs in {time.time()-t0:.1f}s: "
+          + ", ".join(f"{n} {k}" for k, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
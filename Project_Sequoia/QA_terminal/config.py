@@ -95,6 +95,7 @@ OI_BUILD_WINDOWS = (1, 5, 20)      # build-% horizons (trading-ish days, calenda
 OI_DIVERGENCE_BUILD = 0.15         # oi_build_5d >= +15% ...
 OI_DIVERGENCE_SPOT = 0.01          # ... while |spot change| <= 1% -> accumulation tell
 OI_MIN_HISTORY_DAYS = 3            # signals only after this many stored days
+OI_VOL_LOOKBACK_DAYS = 90          # vol percentile ranks today vs this many calendar days
 
 # --- Option Screener v2.4 — Polygon.io provider (free tier, delayed) ---
 POLYGON_API_KEY_ENV = "POLYGON_API_KEY"   # env-only; no key in source (news.py rule)
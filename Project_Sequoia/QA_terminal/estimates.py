@@ -19,7 +19,14 @@ Design notes:
     Handler in server.py; module registered in _discover_module_routes().
 """
 import math
+import sys
 import time
+from pathlib import Path
+
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
 CACHE_TTL = 3600  # seconds; consensus estimates move slowly
 
@@ -34,8 +41,8 @@ ROUTES = {'/api/estimates': 'handle_estimates'}
 def _yf_module():
     global _yf
     if _yf is None:
-        import yfinance
-        _yf = yfinance
+        from common.data.yahoo import limited_yf
+        _yf = limited_yf
     return _yf
 
 
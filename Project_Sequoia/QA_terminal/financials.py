@@ -1,10 +1,19 @@
 """
 Financial Data Module - Graham Analysis
 """
-import yfinance as yf
+import os
+import sys
+
 import psycopg2
 import pandas as pd
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common.data.yahoo import limited_yf as yf  # noqa: E402
+
 DB_CONN = "dbname=project_alpha user=chuck host=localhost"
 
 def get_financials(ticker, max_periods=10, period_type='Q'):
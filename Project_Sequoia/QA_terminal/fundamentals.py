@@ -29,7 +29,14 @@ Graham-specific definitions used here (the "correct" readings):
   - Earnings yield is TTM EPS / price (Graham compared this to bond yields).
 """
 
+import sys
 import time
+from pathlib import Path
+
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
 
 # --- FX cache: Yahoo 'XXX=X' quotes are UNITS-PER-USD (CNY=X 6.75 = 6.75
 # CNY per 1 USD). usd_per_unit returns USD per 1 unit (1/6.75 = 0.148). -----
@@ -51,7 +58,7 @@ def usd_per_unit(currency):
     if hit and now - hit[1] < _FX_TTL:
         return hit[0]
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
         i = yf.Ticker(f'{cur}=X').info
         rate = i.get('regularMarketPrice') or i.get('previousClose')
         if rate and float(rate) > 0:
@@ -14,8 +14,10 @@ store of annual (10-K) fundamentals, so walk-forward studies can answer
     annual row with filed <= as_of. Restatement granularity is the row's
     filing date (per-metric restatements within a filing are not tracked —
     documented v1 limitation).
-  - Incremental: existing (ticker, period_end) rows are skipped unless
-    --force. Resumable; the full S&P build is a long-running job.
+  - Incremental: companyfacts come from the local mirror
+    (companyfacts_mirror), conditionally re-synced for the whole universe
+    in one concurrent pass; only filers whose companyfacts changed (or that
+    have no rows yet) are re-extracted. --force re-extracts everything.
 
 Run:
   python3 fundamentals_history.py --limit 10              # first 10 SP500
@@ -32,6 +34,11 @@ from datetime import datetime
 
 import requests
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
 HEADERS = {"User-Agent": "AlphaTerminal/1.0 research@example.com"}
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 DB_PATH = os.path.join(DATA_DIR, "fundamentals_hist.db")
@@ -151,10 +158,13 @@ def resolve_ciks(tickers):
 # Extraction (per ticker, from companyfacts)
 # --------------------------------------------------------------------------- #
 def _fetch_companyfacts(cik):
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik.zfill(10)}.json"
-    r = requests.get(url, headers=HEADERS, timeout=60)
-    r.raise_for_status()
-    return r.json()
+    """Companyfacts via the local mirror (fetch-through on a miss).
+
+    An outage with nothing mirrored raises (companyfacts_mirror.
+    MirrorUnavailable), so main() counts the ticker as failed, not no-data.
+    """
+    import companyfacts_mirror
+    return companyfacts_mirror.get(cik)
 
 
 def _annual_facts(us_gaap, tag):
@@ -226,6 +236,11 @@ def extract_ticker(cik):
 # Store
 # --------------------------------------------------------------------------- #
 def store_ticker(ticker, cik, force=False):
+    """Extract + upsert one ticker's annual rows. (n_rows, status).
+
+    Without `force`, a ticker that already has rows is skipped ("cached");
+    main() passes force=True for filers whose mirrored companyfacts changed.
+    """
     conn = _conn()
     try:
         if not force:
@@ -328,7 +343,7 @@ def has_prices(ticker):
 
 def fetch_prices(ticker, start="2014-01-01"):
     """Daily closes via yfinance (auto_adjust), as {date_str: close}."""
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
     df = yf.Ticker(ticker).history(start=start, auto_adjust=True)
     return {d.strftime("%Y-%m-%d"): float(c)
             for d, c in df["Close"].dropna().items()}
@@ -352,6 +367,7 @@ def main():
     ap.add_argument("--limit", type=int, default=0)
     ap.add_argument("--tickers", default="")
     ap.add_argument("--force", action="store_true")
+    ap.add_argument("--workers", type=int, default=8)
     args = ap.parse_args()
 
     if args.tickers:
@@ -370,15 +386,25 @@ def main():
         print(f"no CIK for: {', '.join(missing[:10])}"
               f"{' …' if len(missing) > 10 else ''}")
 
-    ok = cached = nodata = fail = 0
+    # One concurrent, conditional pass over the mirror: unchanged filers
+    # answer 304 and drop out of the extraction sweep below.
+    import companyfacts_mirror
     t0 = time.time()
+    synced = companyfacts_mirror.sync([c for c in ciks.values() if c],
+                                      workers=args.workers)
+    changed = companyfacts_mirror.changed(synced)
+    print(f"mirror: {len(synced)} synced, {len(changed)} changed "
+          f"in {time.time()-t0:.0f}s")
+
+    ok = cached = nodata = fail = 0
     for i, t in enumerate(tickers, 1):
         cik = ciks.get(t)
         if not cik:
             fail += 1
             continue
         try:
-            n, status = store_ticker(t, cik, force=args.force)
+            n, status = store_ticker(t, cik,
+                                     force=args.force or cik.zfill(10) in changed)
             if status == "stored":
                 ok += 1
                 print(f"[{i}/{len(tickers)}] {t}: {n} annual rows")
@@ -389,7 +415,6 @@ def main():
         except Exception as e:
             fail += 1
             print(f"[{i}/{len(tickers)}] {t}: FAILED {e}")
-        time.sleep(0.15)  # SEC politeness
     print(f"done: {ok} stored, {cached} cached, {nodata} no-data, "
           f"{fail} failed in {time.time()-t0:.0f}s")
 
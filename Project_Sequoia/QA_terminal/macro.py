@@ -18,6 +18,10 @@ Design:
     minutes so the tab never pays the cold rebuild on page load (PROD
     measured 2026-08-10: 8.95s cold vs 17ms warm; the old code fetched
     ~30 FRED series + 2 Yahoo downloads sequentially inside the request).
+  - Persisted series store (common.series_store, 2026-10): an in-process
+    miss reads the on-disk copy and only asks FRED for the tail past the
+    last stored observation once that copy is older than its cadence TTL,
+    so restarts no longer trigger the full ~30-series cold fan-out.
   - Computed series: 2s10s spread, BAA-AAA spread, GDP QoQ annualized,
     stock-bond 60d corr.
   - R2: ROUTES = {'/api/macro': 'handle_macro'}; handler method on Handler
@@ -28,11 +32,20 @@ import calendar
 import json
 import logging
 import os
+import sys
 import threading
 import time
 import urllib.request
 from concurrent.futures import ThreadPoolExecutor
 from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Repo root so `common.series_store` resolves (same pattern as regime.py)
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics  # noqa: E402
 
 logger = logging.getLogger("alpha-terminal.macro")
 
@@ -110,7 +123,7 @@ def _observations(series_id, start_date, units=None):
     if units:
         url += f"&units={units}"
     try:
-        with urllib.request.urlopen(url, timeout=15) as resp:
+        with metrics.upstream("fred", "observations"), urllib.request.urlopen(url, timeout=15) as resp:
             data = json.loads(resp.read().decode())
     except Exception as e:
         logger.warning("FRED fetch failed for %s: %s", series_id, e)
@@ -133,7 +146,13 @@ def get_series(series_id):
         if not _is_stale(cache_key):
             return _cache[cache_key][1]
     start = (datetime.now() - timedelta(days=LOOKBACK_DAYS)).strftime("%Y-%m-%d")
-    obs = _observations(series_id, start, item.get("units"))
+    try:
+        from common import series_store
+        obs, _ = series_store.refresh(series_id, start, item.get("units"),
+                                      item.get("cadence"), fetch=_observations)
+    except Exception as e:   # store unavailable: fetch directly (fail-open)
+        logger.warning("series store unavailable for %s: %s", series_id, e)
+        obs = _observations(series_id, start, item.get("units"))
     with _lock:
         _cache[cache_key] = (time.time(), obs)
     return obs
@@ -267,7 +286,7 @@ def _yahoo_yield_curve():
         if cached and time.time() - cached[0] < TTL["Daily"]:
             return cached[1]
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
     except ImportError:
         logger.warning("yfinance unavailable; live yield curve skipped")
         return None
@@ -312,7 +331,7 @@ def _corr_60d():
         if cached and time.time() - cached[0] < TTL["Daily"]:
             return cached[1]
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
     except ImportError:
         logger.warning("yfinance unavailable; stock-bond corr skipped")
         return []
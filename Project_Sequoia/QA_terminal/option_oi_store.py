@@ -7,11 +7,22 @@ since no vendor (yfinance or Moomoo) provides per-contract historical OI.
 Patterns follow db.py (Alpha Terminal SQLite conventions). Data lives in
 data/option_oi.db. Signals are fail-open: no history -> None -> score
 falls back to base weights (option_screener.score_contract).
+
+Two read paths:
+  - load_ticker_history + build_signals: full history, one contract at a time
+    (reference implementation; kept for callers and tests).
+  - load_ticker_window + build_signals_batch: the screener path. Reads only
+    the lookback the signals need (idx_contract_oi_td range scan) into
+    columnar arrays sorted by (contract, date), then computes OI builds,
+    anchors, vol percentiles and divergence for every contract of the
+    ticker in one array pass — cost tracks the window, not total history.
 """
 import datetime
 import os
 import sqlite3
 
+import numpy as np
+
 import config
 
 _DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "option_oi.db")
@@ -22,6 +33,7 @@ CREATE TABLE IF NOT EXISTS contract_oi (
   oi INTEGER, vol INTEGER, mid REAL, ts INTEGER,
   PRIMARY KEY (date, ticker, expiry, strike, type));
 CREATE INDEX IF NOT EXISTS idx_contract_oi ON contract_oi (ticker, expiry, strike, type, date);
+CREATE INDEX IF NOT EXISTS idx_contract_oi_td ON contract_oi (ticker, date);
 CREATE TABLE IF NOT EXISTS ticker_spot (
   date TEXT, ticker TEXT, spot REAL, ts INTEGER,
   PRIMARY KEY (date, ticker));
@@ -140,3 +152,130 @@ def build_signals(history, spots, window=5):
         spot_chg = _spot_change_pct(spots, window)
         sig["divergence"] = spot_chg is None or abs(spot_chg) <= config.OI_DIVERGENCE_SPOT
     return sig
+
+
+# ---------------------------------------------------------------------------
+# Columnar / windowed path (option screener)
+# ---------------------------------------------------------------------------
+def signal_lookback_days():
+    """Calendar days of history the signals can see: widest build window or vol lookback."""
+    return max(max(config.OI_BUILD_WINDOWS), config.OI_VOL_LOOKBACK_DAYS)
+
+
+def load_ticker_window(ticker, lookback_days=None):
+    """Columnar OI history for one ticker, limited to the signal lookback.
+
+    Window is anchored on the ticker's newest snapshot date. Returns
+    (cols, spots) where cols = {"keys": [(expiry, strike, type), ...],
+    "group": int array (index into keys), "day": int array (date ordinal),
+    "oi": float array, "vol": float array} sorted by (contract, date), NaN
+    for NULL oi/vol; spots = [(date, spot), ...] over the same window.
+    cols is None when the ticker has no history.
+    """
+    lookback_days = signal_lookback_days() if lookback_days is None else lookback_days
+    conn = get_conn()
+    try:
+        conn.executescript(_SCHEMA)
+        newest = conn.execute("SELECT MAX(date) FROM contract_oi WHERE ticker=?",
+                              (ticker,)).fetchone()[0]
+        if not newest:
+            return None, []
+        start = (datetime.date.fromisoformat(newest)
+                 - datetime.timedelta(days=lookback_days)).isoformat()
+        rows = conn.execute(
+            "SELECT expiry, strike, type, date, oi, vol FROM contract_oi "
+            "WHERE ticker=? AND date>=? ORDER BY expiry, strike, type, date",
+            (ticker, start)).fetchall()
+        spots = [(r["date"], r["spot"]) for r in conn.execute(
+            "SELECT date, spot FROM ticker_spot WHERE ticker=? AND date>=? ORDER BY date",
+            (ticker, start)).fetchall()]
+    finally:
+        conn.close()
+
+    return _columns([(r["expiry"], r["strike"], r["type"], r["date"], r["oi"], r["vol"])
+                     for r in rows]), spots
+
+
+def to_columns(hist):
+    """{(expiry, strike, type): [(date, oi, vol), ...]} -> the columnar form of load_ticker_window."""
+    if not hist:
+        return None
+    return _columns([k + row for k in sorted(hist) for row in hist[k]])
+
+
+def _columns(rows):
+    """[(expiry, strike, type, date, oi, vol)] sorted by contract then date -> arrays."""
+    n = len(rows)
+    keys, group = [], np.empty(n, dtype=np.int64)
+    day = np.empty(n, dtype=np.int64)
+    oi = np.empty(n, dtype=np.float64)
+    vol = np.empty(n, dtype=np.float64)
+    prev = None
+    for i, (exp, strike, typ, date_str, o, v) in enumerate(rows):
+        k = (exp, strike, typ)
+        if k != prev:
+            keys.append(k)
+            prev = k
+        group[i] = len(keys) - 1
+        day[i] = datetime.date.fromisoformat(date_str).toordinal()
+        oi[i] = np.nan if o is None else o
+        vol[i] = np.nan if v is None else v
+    return {"keys": keys, "group": group, "day": day, "oi": oi, "vol": vol}
+
+
+def build_signals_batch(cols, spots, window=5):
+    """build_signals for every contract in `cols` at once -> {(expiry, strike, type): sig}.
+
+    Same semantics as build_signals per contract: anchors are the oldest row
+    within `w` days before that contract's newest row, vol percentile ranks
+    the newest non-null vol, contracts with < OI_MIN_HISTORY_DAYS rows get no
+    entry. One sorted-key searchsorted per window replaces the _anchor scans.
+    """
+    if not cols or not cols["keys"]:
+        return {}
+    g, day, oi, vol = cols["group"], cols["day"], cols["oi"], cols["vol"]
+    n_groups = len(cols["keys"])
+    counts = np.bincount(g, minlength=n_groups)
+    ends = np.cumsum(counts)                       # exclusive end per contract
+    last = ends - 1
+    newest_day = day[last]
+    newest_oi = np.nan_to_num(oi[last], nan=0.0)   # history[-1][1] or 0
+
+    # Composite sort key (contract, day): rows are already sorted by it.
+    span = int(day.max()) + 1
+    key = g * span + day
+    builds = {}
+    for w in config.OI_BUILD_WINDOWS:
+        pos = np.searchsorted(key, np.arange(n_groups) * span + (newest_day - w), side="left")
+        ok = pos < last                            # strictly older than the newest row
+        anchor_oi = np.where(ok, oi[np.minimum(pos, last)], np.nan)
+        ok &= anchor_oi > 0                        # NaN compares False
+        with np.errstate(divide="ignore", invalid="ignore"):
+            builds[w] = np.where(ok, (newest_oi - anchor_oi) / anchor_oi, np.nan)
+
+    # Vol percentile: rank of each contract's newest non-null vol in its window.
+    valid = ~np.isnan(vol)
+    idx = np.where(valid, np.arange(len(vol)), -1)
+    last_valid = np.maximum.accumulate(idx)[last]
+    has_today = last_valid >= ends - counts         # a non-null vol inside this contract
+    today = np.where(has_today, vol[np.maximum(last_valid, 0)], np.nan)
+    le = valid & (vol <= today[g])
+    n_le = np.bincount(g, weights=le, minlength=n_groups)
+    n_valid = np.bincount(g, weights=valid, minlength=n_groups)
+
+    spot_chg = _spot_change_pct(spots, window)      # ticker-level: once, not per contract
+    spot_flat = spot_chg is None or abs(spot_chg) <= config.OI_DIVERGENCE_SPOT
+
+    out = {}
+    for c in np.nonzero(counts >= config.OI_MIN_HISTORY_DAYS)[0]:
+        sig = {"oi_build_5d": None, "vol_pctile": None, "divergence": False}
+        for w in config.OI_BUILD_WINDOWS:
+            b = builds[w][c]
+            sig[f"oi_build_{w}d"] = None if np.isnan(b) else float(b)
+        if n_valid[c] >= config.OI_MIN_HISTORY_DAYS:
+            sig["vol_pctile"] = round(float(n_le[c]) / float(n_valid[c]) * 100, 1)
+        b5 = sig.get("oi_build_5d")
+        if b5 is not None and b5 >= config.OI_DIVERGENCE_BUILD:
+            sig["divergence"] = spot_flat
+        out[cols["keys"][c]] = sig
+    return out
@@ -14,11 +14,18 @@ import json
 import math
 import os
 import threading
+import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
 
 import config
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
 # ---------------------------------------------------------------------------
 # caches (module-level; server lifetime)
 # ---------------------------------------------------------------------------
@@ -157,14 +164,14 @@ def _attach_oi_signals(ticker, records):
     (or store missing) -> fields absent -> score falls back to base weights."""
     try:
         import option_oi_store
-        hist_map, spots = option_oi_store.load_ticker_history(ticker)
-        if not hist_map:
+        # Windowed + vectorized: reads only the signal lookback, one array pass
+        # for all contracts (cost independent of total stored history).
+        cols, spots = option_oi_store.load_ticker_window(ticker)
+        if not cols:
             return
+        sig_map = option_oi_store.build_signals_batch(cols, spots)
         for r in records:
-            h = hist_map.get((r.get("expiry"), r.get("strike"), r.get("type")))
-            if not h:
-                continue
-            sig = option_oi_store.build_signals(h, spots)
+            sig = sig_map.get((r.get("expiry"), r.get("strike"), r.get("type")))
             if not sig:
                 continue
             for k, v in sig.items():
@@ -200,7 +207,7 @@ def _today_plus(days):
 def _market_cap(ticker):
     """Lazy yfinance info call — ONLY for earnings-window candidates."""
     try:
-        import yfinance
+        from common.data.yahoo import limited_yf as yfinance
         return yfinance.Ticker(ticker).info.get("marketCap")
     except Exception:
         return None
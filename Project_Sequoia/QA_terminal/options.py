@@ -7,12 +7,17 @@ import time
 import datetime
 from typing import Optional
 from functools import partial
-import yfinance
+from pathlib import Path
 import sys
 import os
 
 # Add current dir to path for local imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+from common.data.yahoo import limited_yf as yfinance  # noqa: E402
 from greeks import calculate_greeks
 from vollib.black_scholes_merton.greeks.analytical import d2 as _vollib_d2
 from vollib.black_scholes_merton.greeks.analytical import N as _norm_cdf
@@ -9,10 +9,17 @@ Greek/parity/IV math in options.py is reused untouched.
 """
 import datetime as _dt
 import os
+import sys
+from pathlib import Path
 from typing import Optional
 
 import config
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
 
 class ProviderUnavailableError(Exception):
     """Raised when a requested data provider cannot serve (not built / not set up)."""
@@ -56,7 +63,7 @@ class YFinanceProvider(OptionDataProvider):
         """yfinance `calendar` is a dict on some versions ({'Earnings Date': [date,...]})
         and a DataFrame on others (index contains 'Earnings Date'). Handle both."""
         try:
-            import yfinance
+            from common.data.yahoo import limited_yf as yfinance
             import pandas as pd
             cal = yfinance.Ticker(ticker).calendar
             if cal is None:
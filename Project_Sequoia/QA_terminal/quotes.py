@@ -13,11 +13,18 @@ import time
 from datetime import datetime, timedelta
 from typing import Optional
 from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 import pandas as pd
-import yfinance
 import sys
 import traceback
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.data.yahoo import limited_yf as yfinance  # noqa: E402
+
 # Cache for quotes (5s TTL for live-ish feel)
 _cache = {}
 _cache_ttl = 5
@@ -5,12 +5,27 @@ Uses SEC XBRL API to get GAAP-compliant 10-Q and 10-K filings
 import requests
 import json
 import os
+import sys
 import time
 from datetime import datetime, timedelta
+from pathlib import Path
 from typing import List, Dict, Optional
 
+# Repo root so the shared metrics registry (`common.metrics`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common import metrics  # noqa: E402
+
 HEADERS = {"User-Agent": "AlphaTerminal/1.0 research@example.com"}
 
+
+def _sec_get(url: str, op: str, timeout: float):
+    """requests.get against SEC with the call timed under upstream="sec"."""
+    with metrics.upstream("sec", op):
+        return requests.get(url, headers=HEADERS, timeout=timeout)
+
 # SEC official ticker->CIK mapping (https://www.sec.gov/files/company_tickers.json).
 # Cached to data/ for a day; includes ADR tickers (BABA, TSM, BHP, ...).
 _TICKERS_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
@@ -40,8 +55,8 @@ def _load_ticker_map():
         except Exception:
             pass
     try:
-        resp = requests.get('https://www.sec.gov/files/company_tickers.json',
-                            headers=HEADERS, timeout=15)
+        resp = _sec_get('https://www.sec.gov/files/company_tickers.json',
+                        'company_tickers', timeout=15)
         if resp.status_code == 200:
             data = resp.json()
             try:
@@ -199,7 +214,7 @@ def _get_cik_search(ticker: str) -> Optional[str]:
            f"&forms=10-Q,10-K,20-F,6-K&dateRange=custom"
            f"&startdt=2020-01-01&enddt=2026-12-31")
     try:
-        resp = requests.get(url, headers=HEADERS, timeout=10)
+        resp = _sec_get(url, 'search', timeout=10)
         if resp.status_code == 200:
             data = resp.json()
             hits = data.get('hits', {}).get('hits', [])
@@ -215,19 +230,21 @@ def _get_cik_search(ticker: str) -> Optional[str]:
     return None
 
 def get_company_facts(cik: str) -> Dict:
-    """Get all XBRL facts for a company"""
-    cik_padded = cik.zfill(10)
-    url = f"https://data.sec.gov/api/xbrl/companyfacts/CIK{cik_padded}.json"
-    resp = requests.get(url, headers=HEADERS, timeout=30)
-    if resp.status_code == 200:
-        return resp.json()
-    return {}
+    """Get all XBRL facts for a company.
+
+    Served from the local companyfacts mirror; the mirror revalidates its
+    copy with a conditional GET when stale and fetches through on a miss.
+    Raises companyfacts_mirror.MirrorUnavailable (a requests.RequestException)
+    when SEC cannot be reached and nothing is mirrored; {} means no XBRL.
+    """
+    import companyfacts_mirror
+    return companyfacts_mirror.get(cik)
 
 def get_filings_list(cik: str) -> List[Dict]:
     """Get recent 10-Q and 10-K filings"""
     cik_padded = cik.zfill(10)
     url = f"https://data.sec.gov/submissions/CIK{cik_padded}.json"
-    resp = requests.get(url, headers=HEADERS, timeout=15)
+    resp = _sec_get(url, 'submissions', timeout=15)
     
     if resp.status_code != 200:
         return []
@@ -359,7 +376,7 @@ def extract_quarterly_data(us_gaap: Dict, tag: str, periods: int, unit: str = 'U
 def _get_stock_info(ticker: str) -> Dict:
     """Minimal market info (price, shares, market cap) for valuation metrics."""
     try:
-        import yfinance as yf
+        from common.data.yahoo import limited_yf as yf
         i = yf.Ticker(ticker).info
         return {
             'name': i.get('shortName', ticker),
@@ -488,7 +505,10 @@ def fetch_financials(ticker: str, periods: int = 8, period_type: str = 'Q') -> D
         return {'error': f'Could not find CIK for {ticker}'}
     
     # Get company facts
-    company_facts = get_company_facts(cik)
+    try:
+        company_facts = get_company_facts(cik)
+    except requests.RequestException as e:
+        return {'error': f'SEC companyfacts unavailable for {ticker}: {e}'}
     us_gaap = company_facts.get('facts', {}).get('us-gaap', {})
     
     # Get filings info
@@ -10,7 +10,8 @@
 
 Both write readings via sentiment_db.upsert_reading (idempotent natural key).
 Fail-open: any source error -> 0 rows, never a crash.
-Run: python sentiment_collect.py   (deterministic, stdout is the deliverable)
+Run: python sentiment_collect.py   (all collectors, concurrently — see
+     sentiment_scheduler.py for cadence-aware runs; stdout is the run summary)
 
 NOTE: `import sentiment` is deliberately LAZY (inside functions) — sentiment.py
 imports this module at its bottom to auto-register providers; top-level import
@@ -20,15 +21,21 @@ import datetime
 import logging
 import os
 import sqlite3
+import sys
 
 import sentiment_db as db
 
 logger = logging.getLogger(__name__)
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
 try:
-    import yfinance as yf
+    from common.data.yahoo import limited_yf as yf
 except ImportError:
-    yf = None  # fail-open: breadth collector skips when yfinance is unavailable
+    yf = None  # fail-open: breadth collector skips when the Yahoo gate is unavailable
 
 _OI_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "option_oi.db")
 
@@ -297,6 +304,12 @@ STOCKTWITS_MAX_PAGES = 20       # ~600 msgs cap; count is a volume proxy
 _STOCKTWITS_HEADERS = {"User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0 Safari/537.36"}
 
 
+def _throttle(source):
+    """Per-source token bucket shared with sentiment_scheduler (paged APIs)."""
+    import sentiment_scheduler
+    sentiment_scheduler.throttle(source)
+
+
 def _edgar_cik(ticker):
     """CIK for a ticker via the existing SEC map seam. None on miss."""
     try:
@@ -308,6 +321,7 @@ def _edgar_cik(ticker):
 
 def _edgar_fetch(url):
     import requests
+    _throttle(SOURCE_EDGAR)
     r = requests.get(url, headers=EDGAR_HEADERS, timeout=20)
     r.raise_for_status()
     return r
@@ -497,6 +511,7 @@ def _collect_stocktwits_one(ticker, sentiment):
         url = STOCKTWITS_URL.format(ticker=ticker)
         if cursor_max:
             url += f"?max={cursor_max}"
+        _throttle(SOURCE_STOCKTWITS)
         r = requests.get(url, headers=headers, timeout=20)
         r.raise_for_status()
         data = r.json()
@@ -877,13 +892,18 @@ def collect_finra_short_interest():
     return n
 
 
-def run_all(sources=None):
-    """Run registered collectors; returns {source: rows_written} (fail-open each)."""
-    import sentiment
-    return sentiment.run_collectors(sources=sources)
+def run_all(sources=None, force=True):
+    """Run registered collectors concurrently; returns {source: rows_written}.
+
+    force=False runs only collectors whose cadence is due (sentiment_scheduler);
+    skipped collectors are omitted from the result.
+    """
+    import sentiment_scheduler
+    summary = sentiment_scheduler.run(sources=sources, force=force)
+    return {n: s["rows"] for n, s in summary.items() if s["status"] != "skipped"}
 
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
-    import json
-    print(json.dumps(run_all(), indent=1))
+    import sentiment_scheduler
+    print(sentiment_scheduler.format_summary(sentiment_scheduler.run(force=True)))
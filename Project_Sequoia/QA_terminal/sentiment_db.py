@@ -5,16 +5,29 @@ Two tables:
   metric_definitions — interpretation dimension: display, unit, direction, normalization.
                        Single source of truth for how raw `value` becomes `sentiment`
                        (Hong's rule: interpretation lives here, never in collectors/UI).
+Plus drill-down detail (insider_filings, social_daily) and collector_runs, the
+scheduler's per-collector last-run state (sentiment_scheduler.py).
+
+latest_readings is a materialized "newest reading per natural key" table,
+maintained by upsert_reading in the same transaction as the readings insert,
+so the strip's latest view is an index lookup instead of a self-join over
+all history. Both tables carry ticker_uc (UPPER(COALESCE(ticker, ''))) so
+case-insensitive ticker filters hit the composite indexes. Reads borrow
+connections from a bounded process-wide pool (_read_conn).
 
 Fail-open contract: DB init is lazy and non-fatal; missing tables/DB -> empty results.
 Natural key + INSERT OR REPLACE = idempotent upsert (re-runs can't duplicate; backfill safe).
 """
+import contextlib
 import datetime
 import os
+import queue
 import sqlite3
+import threading
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 DB_PATH = os.path.join(DATA_DIR, "sentiment.db")
+SCHEMA_VERSION = 1     # PRAGMA user_version once the ticker_uc backfill has run
 
 _SCHEMA = """
 CREATE TABLE IF NOT EXISTS readings (
@@ -27,9 +40,27 @@ CREATE TABLE IF NOT EXISTS readings (
     sentiment   REAL,                   -- -1..+1, +1 = max bullish; NULL when not scored
     count       INTEGER,                -- units behind the reading (contracts/articles/respondents)
     recorded_at TEXT NOT NULL,          -- UTC fetch timestamp
+    ticker_uc   TEXT NOT NULL DEFAULT '',  -- UPPER(COALESCE(ticker, '')): indexed filter key
     PRIMARY KEY (asof_date, scope, ticker, metric, source)
 );
 
+-- Newest reading per (scope, ticker, metric, source); written alongside
+-- every readings upsert. tk = COALESCE(ticker, '') so market rows key too.
+CREATE TABLE IF NOT EXISTS latest_readings (
+    scope       TEXT NOT NULL,
+    tk          TEXT NOT NULL,
+    metric      TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    ticker      TEXT,
+    ticker_uc   TEXT NOT NULL,
+    asof_date   TEXT NOT NULL,
+    value       REAL,
+    sentiment   REAL,
+    count       INTEGER,
+    recorded_at TEXT NOT NULL,
+    PRIMARY KEY (scope, tk, metric, source)
+);
+
 CREATE TABLE IF NOT EXISTS metric_definitions (
     metric         TEXT PRIMARY KEY,
     display_name   TEXT NOT NULL,
@@ -68,16 +99,133 @@ CREATE TABLE IF NOT EXISTS social_daily (
     recorded_at TEXT NOT NULL,
     PRIMARY KEY (ticker, day)
 );
+
+-- Scheduler state (sentiment_scheduler.py): one row per collector. A
+-- collector is due when last_success + its cadence has passed.
+CREATE TABLE IF NOT EXISTS collector_runs (
+    source       TEXT PRIMARY KEY,
+    last_success TEXT,                  -- UTC ISO timestamp of the last ok run
+    last_attempt TEXT NOT NULL,         -- UTC ISO timestamp of the last run
+    last_status  TEXT NOT NULL,         -- ok | error | timeout
+    last_rows    INTEGER,
+    latency_s    REAL,
+    attempts     INTEGER,
+    error        TEXT
+);
 """
 
 
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_readings_ticker_metric
+    ON readings (ticker_uc, metric, asof_date);
+CREATE INDEX IF NOT EXISTS idx_readings_metric_source
+    ON readings (metric, source, asof_date);
+CREATE INDEX IF NOT EXISTS idx_latest_ticker_metric
+    ON latest_readings (ticker_uc, metric);
+"""
+
+_LATEST_COLS = ("scope, tk, metric, source, ticker, ticker_uc, asof_date, value, "
+                "sentiment, count, recorded_at")
+
+# Newer-or-same asof wins; an older backfilled reading never displaces it.
+_LATEST_UPSERT = (
+    "INSERT INTO latest_readings (" + _LATEST_COLS + ") VALUES (?,?,?,?,?,?,?,?,?,?,?) "
+    "ON CONFLICT(scope, tk, metric, source) DO UPDATE SET "
+    "  ticker = excluded.ticker, ticker_uc = excluded.ticker_uc, "
+    "  asof_date = excluded.asof_date, value = excluded.value, "
+    "  sentiment = excluded.sentiment, count = excluded.count, "
+    "  recorded_at = excluded.recorded_at "
+    "WHERE excluded.asof_date >= latest_readings.asof_date"
+)
+
+
+def _ticker_uc(ticker):
+    return (ticker or "").upper()
+
+
 def _connect():
     os.makedirs(DATA_DIR, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    # Collectors write concurrently (sentiment_scheduler): wait on the write
+    # lock instead of failing open after sqlite's 5s default.
+    conn = sqlite3.connect(DB_PATH, timeout=30)
     conn.row_factory = sqlite3.Row
     return conn
 
 
+READ_POOL_SIZE = 4      # idle read connections kept per DB file
+
+_read_pools = {}        # (DB_PATH, inode) -> Queue of idle read connections
+_read_pools_lock = threading.Lock()
+
+
+def _read_pool(key):
+    """The idle-connection queue for `key`; pools of a replaced file are closed."""
+    with _read_pools_lock:
+        pool = _read_pools.get(key)
+        if pool is None:
+            for old in [k for k in _read_pools if k[0] == key[0]]:
+                _close_idle(_read_pools.pop(old))
+            pool = _read_pools[key] = queue.Queue(maxsize=READ_POOL_SIZE)
+        return pool
+
+
+def _close_idle(pool):
+    while True:
+        try:
+            pool.get_nowait().close()
+        except queue.Empty:
+            return
+        except Exception:
+            pass
+
+
+@contextlib.contextmanager
+def _read_conn():
+    """Borrow a pooled read-only connection (shared across threads, per DB file).
+
+    The server starts a thread per request, so connections are pooled process-
+    wide rather than per thread: up to READ_POOL_SIZE stay open between
+    requests, and a burst beyond that gets extra connections that are closed
+    on release. Re-opened when DB_PATH changes or the file is replaced (inode
+    check). Raises when the DB does not exist (callers fail open).
+    """
+    key = (DB_PATH, os.stat(DB_PATH).st_ino)
+    pool = _read_pool(key)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = sqlite3.connect(DB_PATH, timeout=30, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.isolation_level = None          # autocommit: each SELECT sees the latest commit
+    try:
+        yield conn
+    finally:
+        with _read_pools_lock:
+            live = _read_pools.get(key) is pool
+        try:
+            if not live:
+                raise queue.Full
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def _rebuild_latest(conn):
+    """Repopulate latest_readings from readings (migration / post-dedupe)."""
+    conn.execute("DELETE FROM latest_readings")
+    conn.execute(
+        "INSERT INTO latest_readings (" + _LATEST_COLS + ") "
+        "SELECT r.scope, COALESCE(r.ticker, ''), r.metric, r.source, r.ticker, "
+        "       UPPER(COALESCE(r.ticker, '')), r.asof_date, r.value, r.sentiment, "
+        "       r.count, r.recorded_at "
+        "FROM readings r "
+        "JOIN (SELECT scope, COALESCE(ticker,'') tk, metric, source, MAX(asof_date) md "
+        "      FROM readings GROUP BY scope, COALESCE(ticker,''), metric, source) l "
+        "ON r.scope = l.scope AND COALESCE(r.ticker,'') = l.tk "
+        "AND r.metric = l.metric AND r.source = l.source AND r.asof_date = l.md"
+    )
+
+
 def init_db():
     """Create tables if missing. Idempotent; call at import time.
 
@@ -86,32 +234,53 @@ def init_db():
     """
     try:
         with _connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")   # readers never block the writers
             conn.executescript(_SCHEMA)
+            # Migration (once, tracked in user_version): pre-ticker_uc readings
+            # tables gain the column; rows still at its '' default are backfilled.
+            if conn.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+                cols = {r[1] for r in conn.execute("PRAGMA table_info(readings)")}
+                if "ticker_uc" not in cols:
+                    conn.execute("ALTER TABLE readings ADD COLUMN ticker_uc TEXT NOT NULL DEFAULT ''")
+                conn.execute("UPDATE readings SET ticker_uc = UPPER(ticker) "
+                             "WHERE ticker_uc = '' AND COALESCE(ticker, '') != ''")
+                conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             # One-time cleanup: keep newest rowid per natural key (NULL-safe).
-            conn.execute(
+            deduped = conn.execute(
                 "DELETE FROM readings WHERE rowid NOT IN ("
                 "  SELECT MAX(rowid) FROM readings "
                 "  GROUP BY asof_date, scope, COALESCE(ticker, ''), metric, source)"
-            )
+            ).rowcount
             conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_readings_key "
                          "ON readings (asof_date, scope, COALESCE(ticker, ''), metric, source)")
+            conn.executescript(_INDEXES)
+            empty_latest = conn.execute("SELECT 1 FROM latest_readings LIMIT 1").fetchone() is None
+            has_readings = conn.execute("SELECT 1 FROM readings LIMIT 1").fetchone() is not None
+            if deduped or (empty_latest and has_readings):
+                _rebuild_latest(conn)
     except Exception:
         pass  # fail-open: storage problems never crash the server
 
 
 def upsert_reading(asof_date, scope, ticker, metric, source, value, sentiment, count=None, recorded_at=None):
-    """Idempotent insert/replace by natural key. Returns True on success (fail-open)."""
+    """Idempotent insert/replace by natural key. Returns True on success (fail-open).
+
+    latest_readings is updated in the same transaction (commit or roll back together).
+    """
+    recorded_at = recorded_at or datetime.datetime.utcnow().isoformat() + "Z"
+    tuc = _ticker_uc(ticker)
     try:
         with _connect() as conn:
             conn.execute(
                 "INSERT OR REPLACE INTO readings "
-                "(asof_date, scope, ticker, metric, source, value, sentiment, count, recorded_at) "
-                "VALUES (?,?,?,?,?,?,?,?,?)",
-                (
-                    asof_date, scope, ticker, metric, source, value, sentiment, count,
-                    recorded_at or datetime.datetime.utcnow().isoformat() + "Z",
-                ),
+                "(asof_date, scope, ticker, metric, source, value, sentiment, count, recorded_at, ticker_uc) "
+                "VALUES (?,?,?,?,?,?,?,?,?,?)",
+                (asof_date, scope, ticker, metric, source, value, sentiment, count,
+                 recorded_at, tuc),
             )
+            conn.execute(_LATEST_UPSERT,
+                         (scope, ticker or "", metric, source, ticker, tuc, asof_date,
+                          value, sentiment, count, recorded_at))
         return True
     except Exception:
         return False
@@ -151,15 +320,17 @@ def query_readings(scope=None, ticker=None, metric=None, days=None, sources=None
     latest: one row per (scope, ticker, metric, source) = its most recent reading,
     regardless of source lag (NAAIM weeks old, FINRA settlement lag, FRED monthly).
     This is the strip's default view — a current sentiment snapshot, not a log.
+    Served from latest_readings, so its cost does not grow with history.
     """
     try:
-        with _connect() as conn:
-            anchor = conn.execute("SELECT MAX(asof_date) FROM readings").fetchone()[0]
+        with _read_conn() as conn:
+            # MAX(asof_date) over readings == over latest_readings (a far smaller table).
+            anchor = conn.execute("SELECT MAX(asof_date) FROM latest_readings").fetchone()[0]
             where, args = [], []
             if scope:
                 where.append("r.scope = ?"); args.append(scope)
             if ticker:
-                where.append("UPPER(r.ticker) = UPPER(?)"); args.append(ticker)
+                where.append("r.ticker_uc = ?"); args.append(_ticker_uc(ticker))
             if metric:
                 where.append("r.metric = ?"); args.append(metric)
             if sources:
@@ -169,33 +340,16 @@ def query_readings(scope=None, ticker=None, metric=None, days=None, sources=None
                 cutoff = (datetime.date.fromisoformat(anchor) - datetime.timedelta(days=days - 1)).isoformat()
                 where.append("r.asof_date >= ?"); args.append(cutoff)
 
-            if latest:
-                # One row per natural key: join to the max-asof_date per key.
-                # Filters apply to the inner latest-select so they narrow the
-                # universe BEFORE "latest" is computed.
-                inner_where = " AND ".join(where).replace("r.", "x.") if where else "1=1"
-                sql = (
-                    "SELECT r.asof_date, r.scope, r.ticker, r.metric, r.source, r.value, r.sentiment, "
-                    "r.count, r.recorded_at, m.display_name, m.unit, m.higher_is, m.normalization "
-                    "FROM readings r "
-                    "JOIN (SELECT scope, COALESCE(ticker,'') tk, metric, source, MAX(asof_date) md "
-                    "      FROM readings x WHERE " + inner_where + " "
-                    "      GROUP BY scope, COALESCE(ticker,''), metric, source) l "
-                    "ON r.scope = l.scope AND COALESCE(r.ticker,'') = l.tk "
-                    "AND r.metric = l.metric AND r.source = l.source AND r.asof_date = l.md "
-                    "LEFT JOIN metric_definitions m ON r.metric = m.metric "
-                    "ORDER BY r.asof_date DESC, r.metric, r.ticker"
-                )
-            else:
-                sql = (
-                    "SELECT r.asof_date, r.scope, r.ticker, r.metric, r.source, r.value, r.sentiment, "
-                    "r.count, r.recorded_at, "
-                    "m.display_name, m.unit, m.higher_is, m.normalization "
-                    "FROM readings r LEFT JOIN metric_definitions m ON r.metric = m.metric"
-                )
-                if where:
-                    sql += " WHERE " + " AND ".join(where)
-                sql += " ORDER BY r.asof_date DESC, r.metric, r.ticker"
+            sql = (
+                "SELECT r.asof_date, r.scope, r.ticker, r.metric, r.source, r.value, r.sentiment, "
+                "r.count, r.recorded_at, "
+                "m.display_name, m.unit, m.higher_is, m.normalization "
+                "FROM " + ("latest_readings" if latest else "readings") + " r "
+                "LEFT JOIN metric_definitions m ON r.metric = m.metric"
+            )
+            if where:
+                sql += " WHERE " + " AND ".join(where)
+            sql += " ORDER BY r.asof_date DESC, r.metric, r.ticker"
             return [dict(r) for r in conn.execute(sql, args)]
     except Exception:
         return []
@@ -208,7 +362,7 @@ def history_for(metric, limit=None):
     history (forward-only sources like CBOE P/C and FINRA short interest).
     """
     try:
-        with _connect() as conn:
+        with _read_conn() as conn:
             sql = "SELECT value FROM readings WHERE metric=? AND value IS NOT NULL ORDER BY asof_date ASC"
             if limit:
                 sql = (
@@ -227,8 +381,8 @@ def history_for(metric, limit=None):
 def latest_reading_date():
     """Newest asof_date in the strip (or None). Used as window anchor."""
     try:
-        with _connect() as conn:
-            return conn.execute("SELECT MAX(asof_date) FROM readings").fetchone()[0]
+        with _read_conn() as conn:
+            return conn.execute("SELECT MAX(asof_date) FROM latest_readings").fetchone()[0]
     except Exception:
         return None
 
@@ -239,12 +393,12 @@ def latest_reading_date_for(metric, source):
     Enables incremental collection: only dates newer than this are processed.
     """
     try:
-        with _connect() as conn:
+        with _read_conn() as conn:
             row = conn.execute(
-                "SELECT MAX(asof_date) FROM readings WHERE metric=? AND source=?",
+                "SELECT MAX(asof_date) FROM latest_readings WHERE metric=? AND source=?",
                 (metric, source),
             ).fetchone()
-            return row[0]
+        return row[0]
     except Exception:
         return None
 
@@ -327,5 +481,41 @@ def query_social_daily(ticker, limit=14):
         return []
 
 
+# ---------------------------------------------------------------------------
+# Scheduler state: collector_runs
+# ---------------------------------------------------------------------------
+
+def record_collector_run(source, status, rows=None, latency_s=None, attempts=None,
+                         error=None, at=None):
+    """Upsert a collector's last-run row; last_success only moves on 'ok'."""
+    at = at or datetime.datetime.utcnow().isoformat() + "Z"
+    try:
+        with _connect() as conn:
+            conn.execute(
+                "INSERT INTO collector_runs "
+                "(source, last_success, last_attempt, last_status, last_rows, latency_s, attempts, error) "
+                "VALUES (?,?,?,?,?,?,?,?) "
+                "ON CONFLICT(source) DO UPDATE SET "
+                "  last_success = COALESCE(excluded.last_success, collector_runs.last_success), "
+                "  last_attempt = excluded.last_attempt, last_status = excluded.last_status, "
+                "  last_rows = excluded.last_rows, latency_s = excluded.latency_s, "
+                "  attempts = excluded.attempts, error = excluded.error",
+                (source, at if status == "ok" else None, at, status, rows, latency_s,
+                 attempts, error),
+            )
+        return True
+    except Exception:
+        return False
+
+
+def collector_runs():
+    """{source: collector_runs row dict}. Fail-open -> {}."""
+    try:
+        with _connect() as conn:
+            return {r["source"]: dict(r) for r in conn.execute("SELECT * FROM collector_runs")}
+    except Exception:
+        return {}
+
+
 # Seed at import so the definitions table is always present.
 init_db()
@@ -0,0 +1,278 @@
+"""Concurrent scheduler for the sentiment-strip collectors.
+
+sentiment.run_collectors() runs every registered collector back to back, so
+one slow source (StockTwits paging, EDGAR Form 4 fetches, the CFTC zip)
+delays all the others. This scheduler runs the DUE collectors concurrently,
+each under its own policy from SCHEDULE:
+
+  cadence  — seconds between successful runs; a collector is due when its
+             last success (collector_runs table in sentiment.db) is older.
+  timeout  — wall-clock budget per attempt. On overrun the attempt's stop
+             Event is set; collectors see it at their next throttle() and
+             raise Cancelled, so the run ends as 'timeout' once the thread
+             has actually exited. A collector that does not stop within
+             STOP_GRACE_S is reported 'running' and the source is not
+             started again while that thread is alive (no second writer).
+  retries  — extra attempts after an exception (backoff 1s, 2s, 4s, ...).
+  rate     — token bucket (requests/second, burst) for that source. Gates
+             each attempt, and collectors that page through an API call
+             throttle(source) before every request (EDGAR, StockTwits); the
+             attempt's token pays for its first throttle(), so the first
+             request is not charged twice.
+
+A run returns a per-collector summary (status, rows, attempts, latency_s),
+persisted to collector_runs. Wall time ≈ the slowest due collector, not the
+sum of all of them.
+
+Run: python sentiment_scheduler.py [--force] [--sources cboe,naaim]
+"""
+import datetime
+import logging
+import sys
+import threading
+import time
+from pathlib import Path
+
+import sentiment_db as db
+
+# Repo root so the shared token bucket (`common.utils.TokenBucket`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.utils import TokenBucket  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+STOP_GRACE_S = 30.0     # how long a timed-out attempt gets to notice its stop Event
+STOP_POLL_S = 0.5       # throttle() re-checks the stop Event this often while waiting
+
+DEFAULT_POLICY = {"cadence": DAY, "timeout": 120, "retries": 1, "rate": 1.0, "burst": 1}
+
+# Per-collector policy. Cadences follow each source's publication rhythm
+# (weekly COT/AAII/NAAIM, monthly FINRA margin, biweekly short interest);
+# rates follow each host's published or observed limits (SEC 10 req/s,
+# StockTwits ~200 req/hour unauthenticated). Paged sources get a timeout sized
+# from their rate: StockTwits at 0.05/s is ~160 pages in its 1h budget, and an
+# overrun stops cleanly at the next page.
+SCHEDULE = {
+    "oi_store":      {"cadence": 6 * HOUR, "timeout": 60, "retries": 0, "rate": 1.0, "burst": 1},
+    "breadth":       {"cadence": 6 * HOUR, "timeout": 90, "retries": 2, "rate": 1.0, "burst": 1},
+    "cboe":          {"cadence": 6 * HOUR, "timeout": 60, "retries": 2, "rate": 1.0, "burst": 2},
+    "finra":         {"cadence": DAY, "timeout": 120, "retries": 2, "rate": 1.0, "burst": 2},
+    "finra_margin":  {"cadence": DAY, "timeout": 60, "retries": 2, "rate": 1.0, "burst": 1},
+    "cot":           {"cadence": DAY, "timeout": 120, "retries": 2, "rate": 1.0, "burst": 1},
+    "naaim":         {"cadence": DAY, "timeout": 60, "retries": 2, "rate": 1.0, "burst": 1},
+    "aaii":          {"cadence": DAY, "timeout": 90, "retries": 1, "rate": 0.5, "burst": 1},
+    "alphavantage":  {"cadence": DAY, "timeout": 60, "retries": 1, "rate": 0.2, "burst": 1},
+    "edgar":         {"cadence": DAY, "timeout": 600, "retries": 1, "rate": 8.0, "burst": 4},
+    "stocktwits":    {"cadence": 2 * HOUR, "timeout": HOUR, "retries": 1, "rate": 0.05, "burst": 20},
+}
+
+
+class Cancelled(BaseException):
+    """Raised by throttle() inside a collector whose attempt has timed out.
+
+    A BaseException so the collectors' fail-open `except Exception` per
+    ticker does not swallow it and carry on paging.
+    """
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+_stops = {}        # source -> stop Event of its current attempt (popped when it exits)
+_prepaid = set()   # sources whose attempt token has not been spent by throttle() yet
+_inflight = {}     # source -> thread still running past its timeout
+
+
+def policy(source):
+    return {**DEFAULT_POLICY, **SCHEDULE.get(source, {})}
+
+
+def bucket(source):
+    """The process-wide token bucket for a source (created on first use)."""
+    with _buckets_lock:
+        b = _buckets.get(source)
+        if b is None:
+            p = policy(source)
+            b = _buckets[source] = TokenBucket(p["rate"], p["burst"])
+        return b
+
+
+def throttle(source):
+    """Block until `source` may issue its next request (collector-side hook).
+
+    Raises Cancelled once the source's current attempt has been told to stop.
+    """
+    stop = _stops.get(source) or threading.Event()
+    b = bucket(source)
+    while True:
+        if stop.is_set():
+            raise Cancelled(source)
+        try:
+            _prepaid.remove(source)          # the attempt already took this token
+            return
+        except KeyError:
+            pass
+        if b.acquire(timeout=STOP_POLL_S) is not None:
+            return
+        stop.wait(STOP_POLL_S)
+
+
+def _parse_ts(ts):
+    try:
+        return datetime.datetime.fromisoformat(ts.rstrip("Z"))
+    except (AttributeError, ValueError):
+        return None
+
+
+def due(sources, now=None, state=None):
+    """Subset of `sources` whose cadence has elapsed since their last success."""
+    now = now or datetime.datetime.utcnow()
+    state = db.collector_runs() if state is None else state
+    out = []
+    for name in sources:
+        last = _parse_ts((state.get(name) or {}).get("last_success"))
+        if last is None or (now - last).total_seconds() >= policy(name)["cadence"]:
+            out.append(name)
+    return out
+
+
+def _attempt(name, collector, timeout):
+    """Run collector() on a daemon thread.
+
+    ('ok', rows) | ('error', msg) | ('timeout', None) | ('running', msg).
+    'timeout' is only returned once the thread has exited; one still alive
+    after STOP_GRACE_S is left in _inflight and reported 'running'. The stop
+    Event is removed when the thread exits, so later throttle() calls for
+    the source (e.g. sentiment.run_collectors) are not cancelled.
+    """
+    box = {}
+    stop = _stops[name] = threading.Event()
+    _prepaid.add(name)
+
+    def target():
+        try:
+            box["rows"] = collector()
+        except Cancelled:
+            box["cancelled"] = True
+        except Exception as e:   # collectors are fail-open, but guard anyway
+            box["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            _prepaid.discard(name)
+            if _stops.get(name) is stop:
+                del _stops[name]
+
+    t = threading.Thread(target=target, name=f"collector-{name}", daemon=True)
+    t.start()
+    t.join(timeout)
+    if t.is_alive():
+        stop.set()
+        t.join(STOP_GRACE_S)
+        if t.is_alive():
+            _inflight[name] = t
+            return "running", "timed out; still running after stop request"
+        return "timeout", None
+    if "error" in box:
+        return "error", box["error"]
+    if box.get("cancelled"):
+        return "timeout", None
+    return "ok", box.get("rows") or 0
+
+
+def _run_one(name, collector):
+    p = policy(name)
+    t0 = time.monotonic()
+    deadline = t0 + p["timeout"]
+    attempts = 0
+    status, detail = "error", None
+    while attempts <= p["retries"]:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or bucket(name).acquire(timeout=remaining) is None:
+            status, detail = "timeout", None
+            break
+        attempts += 1
+        status, detail = _attempt(name, collector, deadline - time.monotonic())
+        if status != "error":
+            break
+        if attempts <= p["retries"]:
+            logger.warning("collector %s attempt %d failed: %s", name, attempts, detail)
+            time.sleep(min(2 ** (attempts - 1), max(0.0, deadline - time.monotonic())))
+    latency = round(time.monotonic() - t0, 3)
+    rows = detail if status == "ok" else 0
+    error = (detail if status in ("error", "running")
+             else "timed out" if status == "timeout" else None)
+    db.record_collector_run(name, status, rows=rows, latency_s=latency,
+                            attempts=attempts, error=error)
+    return {"status": status, "rows": rows, "attempts": attempts,
+            "latency_s": latency, "error": error}
+
+
+def run(providers=None, sources=None, force=False, now=None):
+    """Run due collectors concurrently. Returns {source: summary}.
+
+    providers: {name: collector} (default: sentiment.PROVIDERS).
+    sources:   restrict to these names. force: ignore cadence (run all).
+    Collectors that are not due appear as {"status": "skipped"}.
+    """
+    if providers is None:
+        import sentiment
+        providers = sentiment.PROVIDERS
+    names = [n for n in providers if not sources or n in sources]
+    run_now = list(names) if force else due(names, now=now)
+    summary = {n: {"status": "skipped", "rows": 0, "attempts": 0, "latency_s": 0.0,
+                   "error": None} for n in names if n not in run_now}
+    for n in list(run_now):
+        t = _inflight.get(n)
+        if t is not None and t.is_alive():     # previous attempt still writing
+            run_now.remove(n)
+            summary[n] = {"status": "running", "rows": 0, "attempts": 0,
+                          "latency_s": 0.0, "error": "previous run still in progress"}
+        else:
+            _inflight.pop(n, None)
+
+    results = {}
+
+    def worker(n):
+        results[n] = _run_one(n, providers[n])
+
+    threads = [threading.Thread(target=worker, args=(n,), name=f"sched-{n}", daemon=True)
+               for n in run_now]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    summary.update(results)
+    return summary
+
+
+def format_summary(summary):
+    """Human-readable run report, slowest collector first."""
+    lines = []
+    ran = [(n, s) for n, s in summary.items() if s["status"] != "skipped"]
+    for n, s in sorted(ran, key=lambda kv: -kv[1]["latency_s"]):
+        extra = f"  ({s['error']})" if s.get("error") else ""
+        lines.append(f"{n:<14} {s['status']:<8} rows={s['rows']:<5} "
+                     f"attempts={s['attempts']} {s['latency_s']:8.2f}s{extra}")
+    skipped = sorted(n for n, s in summary.items() if s["status"] == "skipped")
+    if skipped:
+        lines.append(f"skipped (not due): {', '.join(skipped)}")
+    if ran:
+        lines.append(f"wall ≈ {max(s['latency_s'] for _, s in ran):.2f}s "
+                     f"(sum {sum(s['latency_s'] for _, s in ran):.2f}s)")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    logging.basicConfig(level=logging.INFO)
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--force", action="store_true", help="ignore cadence; run every collector")
+    ap.add_argument("--sources", default="", help="comma-separated collector names")
+    args = ap.parse_args()
+    srcs = [s.strip() for s in args.sources.split(",") if s.strip()] or None
+    print(format_summary(run(sources=srcs, force=args.force)))
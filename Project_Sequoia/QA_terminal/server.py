@@ -61,22 +61,33 @@ from logging.handlers import RotatingFileHandler
 
 # Ensure local imports work
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-
-# Third-party imports (with graceful fallback)
-try:
-    import numpy as np
-    import pandas as pd
-    import yfinance as yf
-    YFINANCE_AVAILABLE = True
-except ImportError:
-    YFINANCE_AVAILABLE = False
+# Repo root so the shared `common` package resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
+
+from common import metrics  # noqa: E402
+from common.metrics import MetricsHandlerMixin  # noqa: E402
+from common.profiler import ProfilingHandlerMixin  # noqa: E402
+from common.utils import TTLCache  # noqa: E402
+
+metrics.init('alpha-terminal')
+
+# Third-party imports (deferred: numpy/pandas/yfinance load with the first
+# data request, so /health and static files are up before they are)
+from common.lazy import available, lazy_import  # noqa: E402
+
+YFINANCE_AVAILABLE = available('numpy', 'pandas', 'yfinance')
+if YFINANCE_AVAILABLE:
+    np = lazy_import('numpy')
+    pd = lazy_import('pandas')
+    from common.data.yahoo import limited_yf as yf
+else:
     np = pd = yf = None
 
 # Local imports with fallbacks
 try:
     import config
-    from indicators import calculate_rsi, calculate_macd, calculate_bollinger_bands
-    from options import SafeJSONEncoder
 except ImportError:
     class ConfigMock:
         DEFAULT_PORT = 9098
@@ -87,16 +98,35 @@ except ImportError:
             'YTD': 'ytd', '1Y': '1y', '5Y': '5y'
         }
     config = ConfigMock()
-    def calculate_rsi(x): return [0]*len(x) if hasattr(x, '__len__') else []
-    def calculate_macd(x): return [0]*len(x), [0]*len(x), [0]*len(x)
-    def calculate_bollinger_bands(x): return [0]*len(x), [0]*len(x)
-    class SafeJSONEncoder(json.JSONEncoder):
-        def default(self, obj):
-            if np and isinstance(obj, (np.integer,)): return int(obj)
-            if np and isinstance(obj, (np.floating,)): return float(obj)
-            if np and isinstance(obj, np.ndarray): return obj.tolist()
-            if hasattr(obj, 'isoformat'): return obj.isoformat()
-            return super().default(obj)
+
+indicators = lazy_import('indicators')
+
+
+def calculate_rsi(prices, *args, **kwargs):
+    return indicators.calculate_rsi(prices, *args, **kwargs)
+
+
+def calculate_macd(prices, *args, **kwargs):
+    return indicators.calculate_macd(prices, *args, **kwargs)
+
+
+def calculate_bollinger_bands(prices, *args, **kwargs):
+    return indicators.calculate_bollinger_bands(prices, *args, **kwargs)
+
+
+class SafeJSONEncoder(json.JSONEncoder):
+    """options.SafeJSONEncoder without importing options (vollib/scipy)."""
+
+    def default(self, obj):
+        if hasattr(obj, 'item'):  # numpy scalars
+            return obj.item()
+        if hasattr(obj, 'tolist'):  # numpy arrays
+            return obj.tolist()
+        if hasattr(obj, 'to_pydatetime'):  # pandas Timestamp
+            return obj.to_pydatetime().isoformat()
+        if hasattr(obj, 'isoformat'):
+            return obj.isoformat()
+        return super().default(obj)
 
 
 # ============================================================================
@@ -132,35 +162,20 @@ logger = logging.getLogger('alpha-terminal')
 # Caching
 # ============================================================================
 
-class TTLCache:
-    """Thread-safe TTL cache."""
-    def __init__(self, ttl_seconds=300):
-        self._cache = {}
-        self._ttl = ttl_seconds
-        self._lock = threading.Lock()
-    
-    def get(self, key):
-        with self._lock:
-            if key in self._cache:
-                value, expiry = self._cache[key]
-                if time.time() < expiry:
-                    return value
-                del self._cache[key]
-            return None
-    
-    def set(self, key, value):
-        with self._lock:
-            self._cache[key] = (value, time.time() + self._ttl)
-    
-    def clear(self):
-        with self._lock:
-            self._cache.clear()
+# Shared bounded LRU+TTL cache (common.utils.TTLCache): thread-safe, and
+# concurrent misses on one key wait for a single upstream fetch.
+_quote_cache = TTLCache(ttl_seconds=CACHE_TTL, max_entries=512, name='quotes')
+# intraday chart (live-ish)
+_chart_cache_1d = TTLCache(ttl_seconds=60, max_entries=512, name='chart_1d')
+# historical charts
+_chart_cache_hist = TTLCache(ttl_seconds=300, max_entries=512, name='chart_hist')
+# last non-empty 1D session (weekend fallback)
+_chart_1d_last = TTLCache(ttl_seconds=7 * 86400, max_entries=1024, name='chart_1d_last')
+
 
 
-_quote_cache = TTLCache(ttl_seconds=CACHE_TTL)
-_chart_cache_1d = TTLCache(ttl_seconds=60)        # intraday chart (live-ish)
-_chart_cache_hist = TTLCache(ttl_seconds=300)     # historical charts
-_chart_1d_last = TTLCache(ttl_seconds=7 * 86400)  # last non-empty 1D session (weekend fallback)
+def _has_1d_session(data):
+    return bool(data.get('prices')) and any(v is not None for v in data['prices'])
 
 # ============================================================================
 # Off-thread OI snapshot worker
@@ -376,46 +391,32 @@ class ChartDataProcessor:
 # /api/ratio used to re-download BOTH tickers from Yahoo on every request —
 # the 5-pair heatmap meant 10 downloads per page load, with SPY fetched 5x.
 # Cache the daily Close per (ticker, period) with a 1h TTL (same cadence as
-# macro.py Daily; Yahoo EOD data) and a per-key lock so concurrent requests
-# (ThreadingHTTPServer) don't stampede the same ticker. Fail-open: empty
-# Series on error, never a 500 (matches macro.py philosophy).
+# macro.py Daily; Yahoo EOD data); the shared cache's single-flight load keeps
+# concurrent requests (ThreadingHTTPServer) from stampeding the same ticker.
+# Fail-open: empty Series on error, never a 500 (matches macro.py philosophy).
 # ============================================================================
 RATIO_CLOSE_TTL = 3600  # seconds
-_ratio_close_cache = {}
-_ratio_close_cache_lock = threading.Lock()
-_ratio_fetch_locks = {}
+_ratio_close_cache = TTLCache(ttl_seconds=RATIO_CLOSE_TTL, max_entries=256, name='ratio_close')
 
 
 def _ratio_close(ticker, period):
     """Cached daily Close Series for a ticker+period (fail-open, deduped)."""
-    key = ticker + ":" + period
-    with _ratio_close_cache_lock:
-        cached = _ratio_close_cache.get(key)
-        if cached and time.time() - cached[0] < RATIO_CLOSE_TTL:
-            return cached[1]
-        lock = _ratio_fetch_locks.setdefault(key, threading.Lock())
-    with lock:
-        # Re-check under the key lock: a concurrent request may have filled it.
-        with _ratio_close_cache_lock:
-            cached = _ratio_close_cache.get(key)
-            if cached and time.time() - cached[0] < RATIO_CLOSE_TTL:
-                return cached[1]
+    def load():
         try:
-            close = yf.Ticker(ticker).history(period=period)["Close"]
+            return yf.Ticker(ticker).history(period=period)["Close"]
         except Exception as e:
             logger.warning("ratio close fetch failed for %s (%s): %s",
                            ticker, period, e)
-            close = pd.Series(dtype=float)
-        with _ratio_close_cache_lock:
-            _ratio_close_cache[key] = (time.time(), close)
-        return close
+            return pd.Series(dtype=float)
+
+    return _ratio_close_cache.get_or_load(ticker + ":" + period, load)
 
 
 # ============================================================================
 # Request Handler
 # ============================================================================
 
-class Handler(SimpleHTTPRequestHandler):
+class Handler(ProfilingHandlerMixin, MetricsHandlerMixin, SimpleHTTPRequestHandler):
     """HTTP request handler with API routing."""
     protocol_version = 'HTTP/1.1'
 
@@ -478,7 +479,11 @@ class Handler(SimpleHTTPRequestHandler):
     def _route(self):
         parsed = urlparse(self.path)
         path, qs = parsed.path, parse_qs(parsed.query)
-        
+
+        if path in ('/metrics', '/metrics.json'):
+            self.send_metrics(path)
+            return
+
         # Route API calls
         if path.startswith('/api/') or path == '/health':
             # Check module routes first (R2)
@@ -640,15 +645,14 @@ class Handler(SimpleHTTPRequestHandler):
         if len(tickers) > 50:
             self.send_json({'error': 'too many tickers (max 50)'}, status=400)
             return
-        key = ','.join(tickers)
-        cached = _quote_cache.get(key)
-        if cached is not None:
-            data, ts = cached
-            self.send_json(data, headers={'X-Cache': 'HIT', 'X-Quotes-Ts': str(ts)})
-            return
-        data = get_quotes(list(tickers))
-        _quote_cache.set(key, (data, time.time()))
-        self.send_json(data, headers={'X-Cache': 'MISS', 'X-Quotes-Ts': str(time.time())})
+        loaded = []
+
+        def load():
+            loaded.append(True)
+            return get_quotes(list(tickers)), time.time()
+
+        data, ts = _quote_cache.get_or_load(','.join(tickers), load)
+        self.send_json(data, headers={'X-Cache': 'MISS' if loaded else 'HIT', 'X-Quotes-Ts': str(ts)})
     
     def handle_news_top(self, qs):
         import news
@@ -750,15 +754,10 @@ class Handler(SimpleHTTPRequestHandler):
         ticker = qs.get('ticker', ['SPY'])[0]
         tf = qs.get('tf', ['1D'])[0]
         key = f"{ticker}|{tf}"
-        cached = _chart_cache_1d.get(key) if tf == '1D' else _chart_cache_hist.get(key)
-        if cached is not None:
-            self.send_json(cached)
-            return
         if tf == '1D':
-            data = ChartDataProcessor.get_1d_chart(ticker)
-            has_data = bool(data.get('prices')) and any(v is not None for v in data['prices'])
-            if has_data:
-                _chart_cache_1d.set(key, data)
+            data = _chart_cache_1d.get_or_load(
+                key, lambda: ChartDataProcessor.get_1d_chart(ticker), cache_if=_has_1d_session)
+            if _has_1d_session(data):
                 _chart_1d_last.set(ticker, data)   # remember the last real session
             else:
                 # Market closed / weekend: show the last real session instead
@@ -768,9 +767,9 @@ class Handler(SimpleHTTPRequestHandler):
                     self.send_json(last)
                     return
         else:
-            data = ChartDataProcessor.get_historical_chart(ticker, tf)
-            if data.get('prices'):
-                _chart_cache_hist.set(key, data)
+            data = _chart_cache_hist.get_or_load(
+                key, lambda: ChartDataProcessor.get_historical_chart(ticker, tf),
+                cache_if=lambda d: bool(d.get('prices')))
         self.send_json(data)
     
     def handle_estimates(self, qs):
@@ -1029,7 +1028,8 @@ class AlphaTerminalServer:
         self.server = QuietThreadingHTTPServer((self.host, self.port), Handler)
         self.server_thread = threading.Thread(target=self._serve, daemon=True)
         self.server_thread.start()
-        logger.info(f"Alpha Terminal ({ENV}): http://{self.host}:{self.port}")
+        logger.info(f"Alpha Terminal ({ENV}): http://{self.host}:{self.port} "
+                    f"(ready in {metrics.mark_ready()['ready_s']:.3f}s)")
     
     def _serve(self):
         self.server.serve_forever(poll_interval=0.5)
@@ -6,10 +6,17 @@ and snapshot-date logic used by both year_highs.py and year_lows.py.
 """
 
 import logging
+import sys
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import config
 
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
 logger = logging.getLogger("alpha-terminal.snapshot")
 
 try:
@@ -20,7 +27,8 @@ except ImportError:
     Overview = None
 
 try:
-    import yfinance as yf
+    import yfinance  # noqa: F401  (availability probe)
+    from common.data.yahoo import limited_yf as yf
     YFINANCE_AVAILABLE = True
 except ImportError:
     YFINANCE_AVAILABLE = False
@@ -12,6 +12,10 @@ import os
 import sys
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _ROOT not in sys.path:
+    sys.path.insert(0, _ROOT)
 
 import config
 import option_oi_store
@@ -34,8 +38,8 @@ def last_trading_day(ticker):
     close). Fail-open: calendar today on any error.
     """
     try:
-        import yfinance
-        hist = yfinance.Ticker(ticker).history(period="5d")
+        from common.data.yahoo import limited_yf as yf
+        hist = yf.Ticker(ticker).history(period="5d")
         if hist is not None and len(hist):
             return hist.index[-1].date().isoformat()
     except Exception as e:
@@ -0,0 +1,183 @@
+"""
+Unit tests for companyfacts_mirror.py against a local stub HTTP server.
+
+Covers: first download + gzip round-trip, conditional refresh (ETag /
+Last-Modified -> 304 keeps the copy), modified bodies replace the copy,
+404 -> 'missing', concurrent sync() change detection, the shared token
+bucket rate ceiling, and the get() fetch-through / fresh-copy / outage paths.
+"""
+import gzip
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import companyfacts_mirror as cm
+
+
+class _StubSEC(BaseHTTPRequestHandler):
+    """Serves FACTS[cik] with a per-version ETag; honours If-None-Match."""
+    FACTS = {}
+    VERSIONS = {}
+    HITS = []
+
+    def do_GET(self):
+        cik = self.path.rsplit("/CIK", 1)[-1].replace(".json", "")
+        type(self).HITS.append((cik, self.headers.get("If-None-Match")))
+        if cik not in self.FACTS:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = f'"v{self.VERSIONS.get(cik, 1)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = json.dumps(self.FACTS[cik]).encode()
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Last-Modified", "Mon, 05 Oct 2026 10:00:00 GMT")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MirrorTestBase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), _StubSEC)
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+        cls.base = f"http://127.0.0.1:{cls.server.server_address[1]}/api/xbrl/companyfacts"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        d = os.path.join(self.tmp.name, "companyfacts")
+        self.patches = [patch.object(cm, "MIRROR_DIR", d),
+                        patch.object(cm, "INDEX_PATH", os.path.join(d, "index.db")),
+                        patch.object(cm, "BASE_URL", self.base)]
+        for p in self.patches:
+            p.start()
+        _StubSEC.FACTS = {"0000320193": {"entityName": "Apple", "facts": {"us-gaap": {}}},
+                          "0000789019": {"entityName": "Microsoft", "facts": {}}}
+        _StubSEC.VERSIONS = {}
+        _StubSEC.HITS = []
+
+    def tearDown(self):
+        for p in self.patches:
+            p.stop()
+        self.tmp.cleanup()
+
+
+class TestSyncOne(MirrorTestBase):
+    def test_first_download_is_gzipped_and_loadable(self):
+        self.assertEqual(cm.sync_one("320193"), "new")
+        with gzip.open(cm._path("320193"), "rt") as f:
+            self.assertEqual(json.load(f)["entityName"], "Apple")
+        self.assertEqual(cm.load("0000320193")["entityName"], "Apple")
+        e = cm.entry("320193")
+        self.assertEqual(e["etag"], '"v1"')
+        self.assertEqual(e["last_modified"], "Mon, 05 Oct 2026 10:00:00 GMT")
+
+    def test_unchanged_refresh_is_conditional_304(self):
+        cm.sync_one("320193")
+        self.assertEqual(cm.sync_one("320193"), "not-modified")
+        self.assertEqual(_StubSEC.HITS[-1], ("0000320193", '"v1"'))
+        self.assertEqual(cm.load("320193")["entityName"], "Apple")
+        self.assertEqual(cm.entry("320193")["etag"], '"v1"')   # validators kept
+
+    def test_modified_body_replaces_copy(self):
+        cm.sync_one("320193")
+        _StubSEC.FACTS["0000320193"] = {"entityName": "Apple Inc.", "facts": {}}
+        _StubSEC.VERSIONS["0000320193"] = 2
+        self.assertEqual(cm.sync_one("320193"), "modified")
+        self.assertEqual(cm.load("320193")["entityName"], "Apple Inc.")
+        self.assertEqual(cm.entry("320193")["etag"], '"v2"')
+
+    def test_missing_filer(self):
+        self.assertEqual(cm.sync_one("999"), "missing")
+        self.assertIsNone(cm.load("999"))
+
+    def test_network_error_keeps_copy(self):
+        cm.sync_one("320193")
+        status = cm.sync_one("320193", base_url="http://127.0.0.1:9/none", timeout=1)
+        self.assertTrue(status.startswith("error"))
+        self.assertEqual(cm.load("320193")["entityName"], "Apple")
+
+
+class TestSync(MirrorTestBase):
+    def test_changed_set_shrinks_to_modified_filers(self):
+        first = cm.sync(["320193", "789019", "999"], workers=4, rate=10)
+        self.assertEqual(cm.changed(first), {"0000320193", "0000789019"})
+        _StubSEC.VERSIONS["0000789019"] = 2
+        second = cm.sync(["320193", "789019"], workers=4, rate=10)
+        self.assertEqual(second["0000320193"], "not-modified")
+        self.assertEqual(cm.changed(second), {"0000789019"})
+
+    def test_duplicate_ciks_fetched_once(self):
+        cm.sync(["320193", "0000320193", "CIK0000320193"], workers=4)
+        self.assertEqual(len(_StubSEC.HITS), 1)
+
+
+class TestRateLimiter(unittest.TestCase):
+    def test_rate_is_capped_at_sec_ceiling(self):
+        self.assertEqual(cm.RateLimiter(rate=50).rate, cm.SEC_MAX_RPS)
+
+    def test_concurrent_acquires_respect_rate(self):
+        lim = cm.RateLimiter(rate=10)
+        t0 = time.monotonic()
+        threads = [threading.Thread(target=lim.acquire) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        # 1 burst token + 5 refills at 10/s -> at least ~0.5s
+        self.assertGreaterEqual(time.monotonic() - t0, 0.45)
+
+
+class TestGet(MirrorTestBase):
+    def test_fetch_through_on_miss_then_serves_local(self):
+        self.assertEqual(cm.get("320193")["entityName"], "Apple")
+        self.assertEqual(len(_StubSEC.HITS), 1)
+        cm.get("320193")                      # fresh copy: no request at all
+        self.assertEqual(len(_StubSEC.HITS), 1)
+
+    def test_stale_copy_revalidated(self):
+        cm.get("320193")
+        cm.get("320193", max_age=-1)
+        self.assertEqual(_StubSEC.HITS[-1][1], '"v1"')
+
+    def test_unavailable_returns_empty(self):
+        self.assertEqual(cm.get("999"), {})
+
+    def test_outage_without_copy_raises(self):
+        with self.assertRaises(cm.MirrorUnavailable):
+            cm.get("320193", base_url="http://127.0.0.1:9/none")
+
+    def test_outage_with_copy_serves_it(self):
+        cm.get("320193")
+        facts = cm.get("320193", max_age=-1, base_url="http://127.0.0.1:9/none")
+        self.assertEqual(facts["entityName"], "Apple")
+
+    def test_fetch_through_uses_shared_limiter(self):
+        with patch.object(cm.LIMITER, "acquire") as acquire:
+            cm.get("320193")
+        acquire.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -22,13 +22,18 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import macro
 
 
+from common import series_store  # noqa: E402  (repo root put on sys.path by macro)
+
+
 @pytest.fixture(autouse=True)
-def _fresh_cache(monkeypatch):
+def _fresh_cache(monkeypatch, tmp_path):
     """Module-level _cache leaks across tests — give each test a clean one.
     Also disable the background pre-warm daemon: it would otherwise start on
-    the first get_macro() call and race the per-test _cache reset."""
+    the first get_macro() call and race the per-test _cache reset. The
+    persisted series store gets a per-test temp DB for the same reason."""
     monkeypatch.setattr(macro, "_cache", {})
     monkeypatch.setattr(macro, "_prewarm_enabled", False)
+    monkeypatch.setattr(series_store, "DB_PATH", str(tmp_path / "series_store.db"))
 
 
 # --------------------------------------------------------------------------- #
@@ -119,6 +124,29 @@ def test_fail_open_fetch_error(monkeypatch):
 # --------------------------------------------------------------------------- #
 # Cache
 # --------------------------------------------------------------------------- #
+def test_store_survives_restart_and_fetches_only_tail(monkeypatch):
+    """A process restart (cold _cache) is served from the store while fresh;
+    once stale, FRED is asked only for the tail past the last stored date."""
+    monkeypatch.setenv(macro.FRED_API_KEY_ENV, "x" * 32)
+    starts = []
+    monkeypatch.setattr(macro, "_observations",
+                        lambda sid, start, units=None: starts.append(start) or
+                        [{"date": "2026-01-01", "value": 1.0},
+                         {"date": "2026-02-01", "value": 2.0}])
+    macro.get_series("UNRATE")
+    monkeypatch.setattr(macro, "_cache", {})            # restart
+    assert len(macro.get_series("UNRATE")) == 2
+    assert len(starts) == 1                             # no second request
+    monkeypatch.setattr(macro, "_cache", {})
+    conn = series_store._connect()
+    with conn:
+        conn.execute("UPDATE series SET checked_at = 0")  # age past the TTL
+    conn.close()
+    macro.get_series("UNRATE")                          # stale: tail refresh
+    assert len(starts) == 2
+    assert starts[1] > starts[0] and starts[1] < "2026-02-01"
+
+
 def test_cache_returns_cached(monkeypatch):
     monkeypatch.setenv(macro.FRED_API_KEY_ENV, "x" * 32)
     calls = []
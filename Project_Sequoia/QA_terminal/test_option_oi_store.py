@@ -108,3 +108,44 @@ def test_store_multiple_days_and_signals(tmp_db):
     sig = oistore.build_signals(hist[("2026-09-18", 100.0, "Call")], spots)
     assert sig["oi_build_5d"] == pytest.approx(140 / 100 - 1)   # 100 -> 140 over 5 days
     assert sig["vol_pctile"] is not None
+
+
+# ---------------------------------------------------------------------------
+# columnar window + vectorized batch builder
+# ---------------------------------------------------------------------------
+def test_batch_matches_per_contract_signals():
+    hist = {
+        ("2026-09-18", 100.0, "Call"): _hist([100, 100, 110, 120, 130], vols=[5, 9, 7, None, 8]),
+        ("2026-09-18", 90.0, "Put"): _hist([0, 0, 0, 0, 5]),                       # anchor oi 0
+        ("2026-10-16", 95.0, "Put"): _hist([100, None, 100, 120, 130]),
+        ("2026-10-16", 95.0, "Call"): _hist([100, 120], dates=DATES[3:]),           # too short
+        ("2026-12-18", 80.0, "Call"): _hist([200, 210, 250], dates=DATES[::2]),     # gaps
+    }
+    spots = [(d, 100.0) for d in DATES]
+    batch = oistore.build_signals_batch(oistore.to_columns(hist), spots)
+    for k, h in hist.items():
+        assert batch.get(k) == oistore.build_signals(h, spots), k
+
+
+def test_batch_empty_is_empty():
+    assert oistore.build_signals_batch(None, []) == {}
+    assert oistore.build_signals_batch(oistore.to_columns({}), []) == {}
+
+
+def test_load_window_reads_only_lookback(tmp_db):
+    start = datetime.date(2026, 1, 1)
+    for i in range(200):
+        d = (start + datetime.timedelta(days=i)).isoformat()
+        oistore.store_snapshot(d, "TEST", 100.0, [("2026-12-18", 100.0, "Call", 100 + i, i, 2.0)])
+    cols, spots = oistore.load_ticker_window("TEST", lookback_days=30)
+    assert len(cols["day"]) == 31                           # newest day + 30 back
+    assert len(spots) == 31
+    full = oistore.load_ticker_history("TEST")[0][("2026-12-18", 100.0, "Call")]
+    sig = oistore.build_signals_batch(cols, spots)[("2026-12-18", 100.0, "Call")]
+    ref = oistore.build_signals(full, spots)
+    for w in config.OI_BUILD_WINDOWS:                       # builds only need the window
+        assert sig[f"oi_build_{w}d"] == pytest.approx(ref[f"oi_build_{w}d"])
+
+
+def test_load_window_unknown_ticker(tmp_db):
+    assert oistore.load_ticker_window("NOPE") == (None, [])
@@ -151,7 +151,8 @@ def test_attach_oi_signals(monkeypatch):
     hist = {("2099-01-01", 110.0, "Call"): [("2099-08-01", 100, 10), ("2099-08-02", 110, 20),
                                             ("2099-08-03", 130, 30)]}
     spots = [("2099-08-01", 100.0), ("2099-08-02", 100.0), ("2099-08-03", 100.0)]
-    monkeypatch.setattr(option_oi_store, "load_ticker_history", lambda t: (hist, spots))
+    monkeypatch.setattr(option_oi_store, "load_ticker_window",
+                        lambda t: (option_oi_store.to_columns(hist), spots))
     recs = [{"expiry": "2099-01-01", "strike": 110.0, "type": "Call"}]
     osmod._attach_oi_signals("X", recs)
     r = recs[0]
@@ -163,7 +164,7 @@ def test_attach_oi_signals(monkeypatch):
 
 def test_attach_oi_signals_fail_open_without_store(monkeypatch):
     import option_oi_store
-    monkeypatch.setattr(option_oi_store, "load_ticker_history",
+    monkeypatch.setattr(option_oi_store, "load_ticker_window",
                         lambda t: (_ for _ in ()).throw(ImportError("no store")))
     recs = [{"expiry": "2099-01-01", "strike": 110.0, "type": "Call"}]
     osmod._attach_oi_signals("X", recs)                  # must not raise
@@ -177,7 +178,8 @@ def test_scan_ticker_with_oi_signals(monkeypatch):
             ("2099-01-01", 75.0, "Put"): [("2099-08-01", 100, 10), ("2099-08-02", 110, 20),
                                           ("2099-08-03", 120, 25)]}
     spots = [("2099-08-01", 100.0), ("2099-08-02", 100.0), ("2099-08-03", 100.0)]
-    monkeypatch.setattr(option_oi_store, "load_ticker_history", lambda t: (hist, spots))
+    monkeypatch.setattr(option_oi_store, "load_ticker_window",
+                        lambda t: (option_oi_store.to_columns(hist), spots))
     res = osmod.scan_ticker("FAKE")
     assert res and res["contracts"]
     c = res["contracts"][0]
@@ -8,7 +8,7 @@ fail-open on network error, and the get_ratio_data payload shape.
 """
 import os
 import sys
-import time
+import threading
 
 import pandas as pd
 import pytest
@@ -16,6 +16,7 @@ import pytest
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import server
+from common.utils import TTLCache
 
 
 class _FakeTicker:
@@ -29,10 +30,13 @@ class _FakeTicker:
 
 
 @pytest.fixture(autouse=True)
-def _fresh_cache(monkeypatch):
-    """Module-level caches leak across tests — give each test a clean one."""
-    monkeypatch.setattr(server, "_ratio_close_cache", {})
-    monkeypatch.setattr(server, "_ratio_fetch_locks", {})
+def clock(monkeypatch):
+    """Module-level caches leak across tests — give each test a clean one
+    on a controllable clock."""
+    now = [0.0]
+    monkeypatch.setattr(server, "_ratio_close_cache",
+                        TTLCache(ttl_seconds=server.RATIO_CLOSE_TTL, clock=lambda: now[0]))
+    return now
 
 
 def _install_fake(monkeypatch, closes):
@@ -67,16 +71,47 @@ def test_ratio_close_distinct_per_period(monkeypatch):
     assert calls == ["SPY", "SPY"]   # different period = different key
 
 
-def test_ratio_close_refetches_after_ttl(monkeypatch):
+def test_ratio_close_refetches_after_ttl(monkeypatch, clock):
     s = pd.Series([1.0], dtype=float)
     calls = _install_fake(monkeypatch, {"SPY": s})
     server._ratio_close("SPY", "1y")
     # age the entry past TTL, then force a refetch
-    server._ratio_close_cache["SPY:1y"] = (time.time() - server.RATIO_CLOSE_TTL - 1, s)
+    clock[0] += server.RATIO_CLOSE_TTL + 1
     server._ratio_close("SPY", "1y")
     assert calls == ["SPY", "SPY"]
 
 
+def test_ratio_close_concurrent_misses_download_once(monkeypatch):
+    s = pd.Series([1.0], dtype=float)
+    gate = threading.Event()
+    calls = []
+
+    class SlowTicker:
+        def history(self, period=None):
+            gate.wait(5)
+            return {"Close": s}
+
+    class FakeYf:
+        @staticmethod
+        def Ticker(sym):
+            calls.append(sym)
+            return SlowTicker()
+
+    monkeypatch.setattr(server, "yf", FakeYf())
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(server._ratio_close("SPY", "1y")))
+               for _ in range(6)]
+    for t in threads:
+        t.start()
+    while server._ratio_close_cache.stats()["coalesced"] < 5:
+        pass
+    gate.set()
+    for t in threads:
+        t.join()
+    assert calls == ["SPY"]
+    assert all(o is s for o in out)
+
+
 def test_ratio_close_fail_open(monkeypatch):
     class BoomTicker:
         def history(self, period=None):
@@ -3,11 +3,13 @@ Unit tests for sec_financials.py XBRL extraction helpers (network-free).
 
 Covers _derive_missing_year_end_quarters: fiscal-year-end quarters that only
 exist as 363-day 10-K facts (AAPL FY2025 Q4) are delta-derived so the
-quarterly view and TTM math get the correct window.
+quarterly view and TTM math get the correct window. Also: a companyfacts
+outage surfaces as an error, not an empty report.
 """
 import sys
 import os
 import unittest
+from unittest.mock import patch
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 import sec_financials as sf
@@ -158,5 +160,17 @@ class TestDeltaDeriveQuarters(unittest.TestCase):
         self.assertAlmostEqual(q4[0]['operating_cf'], 31.5e9)
 
 
+class TestCompanyFactsOutage(unittest.TestCase):
+    def test_outage_is_an_error_not_an_empty_report(self):
+        import companyfacts_mirror
+        with patch.object(sf, 'get_cik', return_value='0000320193'), \
+                patch.object(companyfacts_mirror, 'get',
+                             side_effect=companyfacts_mirror.MirrorUnavailable('down')), \
+                patch.object(sf, 'get_filings_list') as filings:
+            result = sf.fetch_financials('AAPL')
+        self.assertIn('unavailable', result['error'])
+        filings.assert_not_called()
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -105,6 +105,38 @@ class TestStorage(unittest.TestCase):
             self.assertEqual(len(rows), 1)  # replaced, not duplicated
             self.assertAlmostEqual(rows[0]["value"], 17.8)
 
+    def test_reads_share_a_bounded_connection_pool(self):
+        """A thread per request (ThreadingHTTPServer) must not mean a connection per request."""
+        import sqlite3
+        import threading
+        real, opened = sqlite3.connect, []
+
+        def counting_connect(*a, **k):
+            conn = real(*a, **k)
+            opened.append(conn)
+            return conn
+
+        with patch.object(db, "DB_PATH", self.db_path), \
+                patch.object(db.sqlite3, "connect", counting_connect):
+            for _ in range(10):
+                t = threading.Thread(target=db.latest_reading_date)
+                t.start()
+                t.join()
+            self.assertEqual(len(opened), 1)
+            barrier = threading.Barrier(db.READ_POOL_SIZE + 2)
+
+            def hold():
+                with db._read_conn():
+                    barrier.wait(timeout=5)
+
+            threads = [threading.Thread(target=hold) for _ in range(db.READ_POOL_SIZE + 2)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            pool = db._read_pools[(self.db_path, os.stat(self.db_path).st_ino)]
+            self.assertEqual(pool.qsize(), db.READ_POOL_SIZE)   # the overflow was closed
+
     def test_init_db_dedupes_legacy_duplicates(self):
         """init_db must collapse pre-index duplicate market rows (newest kept)."""
         import sqlite3
@@ -149,6 +181,68 @@ class TestStorage(unittest.TestCase):
             self.assertEqual(db.get_metrics(), [])
             self.assertFalse(db.upsert_reading("2026-08-03", "market", None, "vix", "cboe", 1, 0))
 
+    def test_latest_table_tracks_newest_per_key(self):
+        with patch.object(db, "DB_PATH", self.db_path):
+            db.upsert_reading("2026-08-03", "ticker", "AAPL", "put_call_oi_ratio", "oi_store", 0.8, 0.2)
+            db.upsert_reading("2026-08-05", "ticker", "AAPL", "put_call_oi_ratio", "oi_store", 0.7, 0.3)
+            # backfilled older reading must not displace the newest
+            db.upsert_reading("2026-08-01", "ticker", "AAPL", "put_call_oi_ratio", "oi_store", 0.9, 0.1)
+            # same-date re-collection replaces the latest value
+            db.upsert_reading("2026-08-05", "ticker", "AAPL", "put_call_oi_ratio", "oi_store", 0.75, 0.25)
+            rows = db.query_readings(ticker="aapl", latest=True)
+            self.assertEqual(len(rows), 1)
+            self.assertEqual(rows[0]["asof_date"], "2026-08-05")
+            self.assertAlmostEqual(rows[0]["value"], 0.75)
+            self.assertEqual(db.latest_reading_date_for("put_call_oi_ratio", "oi_store"), "2026-08-05")
+            self.assertEqual(len(db.query_readings(ticker="AAPL")), 3)
+
+    def test_ticker_filter_uses_index(self):
+        import sqlite3
+        with patch.object(db, "DB_PATH", self.db_path):
+            conn = sqlite3.connect(self.db_path)
+            for table in ("readings", "latest_readings"):
+                plan = " ".join(str(r) for r in conn.execute(
+                    f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE ticker_uc = ? AND metric = ?",
+                    ("AAPL", "put_call_oi_ratio")))
+                self.assertIn("USING INDEX", plan)
+            conn.close()
+
+    def test_init_db_migrates_legacy_schema(self):
+        """A pre-ticker_uc DB gains the column and a populated latest table."""
+        import sqlite3
+        legacy = self.db_path + ".legacy.db"
+        conn = sqlite3.connect(legacy)
+        conn.execute(
+            "CREATE TABLE readings (asof_date TEXT NOT NULL, scope TEXT NOT NULL, ticker TEXT, "
+            "metric TEXT NOT NULL, source TEXT NOT NULL, value REAL, sentiment REAL, "
+            "count INTEGER, recorded_at TEXT NOT NULL, "
+            "PRIMARY KEY (asof_date, scope, ticker, metric, source))")
+        conn.executemany("INSERT INTO readings VALUES (?,?,?,?,?,?,?,?,?)", [
+            ("2026-08-01", "ticker", "msft", "put_call_oi_ratio", "oi_store", 0.9, 0.1, 1, "t"),
+            ("2026-08-02", "ticker", "msft", "put_call_oi_ratio", "oi_store", 0.8, 0.2, 1, "t"),
+        ])
+        conn.commit()
+        conn.close()
+        try:
+            with patch.object(db, "DB_PATH", legacy):
+                db.init_db()
+                rows = db.query_readings(ticker="MSFT", latest=True)
+                self.assertEqual([r["asof_date"] for r in rows], ["2026-08-02"])
+                self.assertEqual(len(db.query_readings(ticker="MSFT")), 2)
+                # the backfill is one-time: a reopen leaves rows alone
+                conn = sqlite3.connect(legacy)
+                self.assertEqual(conn.execute("PRAGMA user_version").fetchone()[0],
+                                 db.SCHEMA_VERSION)
+                conn.execute("UPDATE readings SET ticker_uc = '' WHERE asof_date = '2026-08-01'")
+                conn.commit()
+                conn.close()
+                db.init_db()
+                self.assertEqual(len(db.query_readings(ticker="MSFT")), 1)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                if os.path.exists(legacy + suffix):
+                    os.unlink(legacy + suffix)
+
 
 class TestDefinitions(unittest.TestCase):
 
@@ -0,0 +1,205 @@
+"""
+Unit tests for sentiment_scheduler.py (network-free: fake collectors).
+
+Covers: concurrent execution (wall ≈ slowest, not the sum), per-attempt
+timeout, retry budget, cadence-driven due selection from persisted
+collector_runs state, and the token bucket.
+"""
+import datetime
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sentiment_db as db
+import sentiment_scheduler as sched
+
+
+def _sleeper(seconds, rows=1):
+    def collector():
+        time.sleep(seconds)
+        return rows
+    return collector
+
+
+def _pager(source, pages, rows=1):
+    """A collector that throttles before each of `pages` 20ms requests."""
+    def collector():
+        for _ in range(pages):
+            sched.throttle(source)
+            time.sleep(0.02)
+        return rows
+    return collector
+
+
+class SchedulerTestBase(unittest.TestCase):
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".db")
+        os.close(fd)
+        os.unlink(self.path)
+        self.p_db = patch.object(db, "DB_PATH", self.path)
+        self.p_db.start()
+        db.init_db()
+        self.p_sched = patch.dict(sched.SCHEDULE, {
+            "fast": {"cadence": 3600, "timeout": 5, "retries": 0, "rate": 100, "burst": 5},
+            "slow": {"cadence": 3600, "timeout": 5, "retries": 0, "rate": 100, "burst": 5},
+            "hung": {"cadence": 3600, "timeout": 0.2, "retries": 0, "rate": 100, "burst": 5},
+            "flaky": {"cadence": 3600, "timeout": 10, "retries": 2, "rate": 100, "burst": 5},
+        })
+        self.p_sched.start()
+        sched._buckets.clear()
+        sched._inflight.clear()
+        sched._stops.clear()
+        sched._prepaid.clear()
+
+    def tearDown(self):
+        self.p_sched.stop()
+        self.p_db.stop()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.unlink(self.path + suffix)
+
+
+class TestRun(SchedulerTestBase):
+    def test_collectors_run_concurrently(self):
+        providers = {"fast": _sleeper(0.05, rows=2), "slow": _sleeper(0.4, rows=3),
+                     "hung": _sleeper(0.1)}
+        t0 = time.monotonic()
+        summary = sched.run(providers, force=True)
+        wall = time.monotonic() - t0
+        self.assertLess(wall, 0.5)          # sequential would be >= 0.55
+        self.assertEqual(summary["fast"]["rows"], 2)
+        self.assertEqual(summary["slow"]["rows"], 3)
+        self.assertGreaterEqual(summary["slow"]["latency_s"], 0.4)
+
+    def test_timeout_reported_and_not_blocking(self):
+        summary = sched.run({"hung": _pager("hung", 100), "fast": _sleeper(0.0)}, force=True)
+        self.assertEqual(summary["hung"]["status"], "timeout")
+        self.assertLess(summary["hung"]["latency_s"], 1.0)
+        self.assertEqual(summary["fast"]["status"], "ok")
+        state = db.collector_runs()
+        self.assertEqual(state["hung"]["last_status"], "timeout")
+        self.assertIsNone(state["hung"]["last_success"])
+
+    def test_timed_out_collector_stops_before_timeout_is_reported(self):
+        pages = []
+
+        def collector():
+            for _ in range(100):
+                sched.throttle("hung")
+                pages.append(1)
+                time.sleep(0.02)
+            return 1
+
+        summary = sched.run({"hung": collector}, force=True)
+        self.assertEqual(summary["hung"]["status"], "timeout")
+        done = len(pages)
+        time.sleep(0.1)
+        self.assertEqual(len(pages), done)      # no writes after the report
+
+    def test_stop_event_cleared_once_attempt_exits(self):
+        summary = sched.run({"hung": _pager("hung", 100)}, force=True)
+        self.assertEqual(summary["hung"]["status"], "timeout")
+        self.assertNotIn("hung", sched._stops)
+        sched.throttle("hung")                  # sequential path is not cancelled
+
+    def test_first_request_costs_one_token(self):
+        pol = {"cadence": 3600, "timeout": 1.0, "retries": 0, "rate": 0.001, "burst": 2}
+        with patch.dict(sched.SCHEDULE, {"tok": pol}):
+            summary = sched.run({"tok": _pager("tok", 2)}, force=True)
+        self.assertEqual(summary["tok"]["status"], "ok")   # attempt + 2 pages = 2 tokens
+
+    def test_uncooperative_collector_is_not_started_twice(self):
+        calls = []
+
+        def stuck():
+            calls.append(1)
+            time.sleep(0.6)
+            return 1
+
+        with patch.object(sched, "STOP_GRACE_S", 0.05):
+            first = sched.run({"hung": stuck}, force=True)
+            second = sched.run({"hung": stuck}, force=True)
+        self.assertEqual(first["hung"]["status"], "running")
+        self.assertEqual(second["hung"]["status"], "running")
+        self.assertEqual(len(calls), 1)
+        time.sleep(0.6)
+        with patch.object(sched, "STOP_GRACE_S", 0.05):
+            sched.run({"hung": _sleeper(0.0)}, force=True)
+        self.assertNotIn("hung", sched._inflight)
+
+    def test_retry_budget(self):
+        calls = []
+
+        def flaky():
+            calls.append(1)
+            if len(calls) < 2:
+                raise RuntimeError("transient")
+            return 7
+
+        with patch.object(sched.time, "sleep"):
+            summary = sched.run({"flaky": flaky}, force=True)
+        self.assertEqual(summary["flaky"]["status"], "ok")
+        self.assertEqual(summary["flaky"]["attempts"], 2)
+        self.assertEqual(summary["flaky"]["rows"], 7)
+
+    def test_retries_exhausted(self):
+        def broken():
+            raise RuntimeError("down")
+
+        with patch.object(sched.time, "sleep"):
+            summary = sched.run({"flaky": broken}, force=True)
+        self.assertEqual(summary["flaky"]["status"], "error")
+        self.assertEqual(summary["flaky"]["attempts"], 3)
+        self.assertIn("down", summary["flaky"]["error"])
+
+    def test_only_due_collectors_run(self):
+        ran = []
+        providers = {"fast": lambda: ran.append("fast") or 1,
+                     "slow": lambda: ran.append("slow") or 1}
+        sched.run(providers, force=True)
+        ran.clear()
+        summary = sched.run(providers)          # both succeeded < cadence ago
+        self.assertEqual(ran, [])
+        self.assertEqual(summary["fast"]["status"], "skipped")
+        later = datetime.datetime.utcnow() + datetime.timedelta(hours=2)
+        sched.run(providers, now=later)
+        self.assertEqual(sorted(ran), ["fast", "slow"])
+
+    def test_failed_run_stays_due(self):
+        def broken():
+            raise RuntimeError("down")
+
+        with patch.object(sched.time, "sleep"):
+            sched.run({"fast": broken}, force=True)
+        self.assertEqual(sched.due(["fast"]), ["fast"])
+
+    def test_format_summary(self):
+        summary = sched.run({"fast": _sleeper(0.0)}, force=True)
+        summary["slow"] = {"status": "skipped", "rows": 0, "attempts": 0,
+                           "latency_s": 0.0, "error": None}
+        text = sched.format_summary(summary)
+        self.assertIn("fast", text)
+        self.assertIn("skipped (not due): slow", text)
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        b = sched.TokenBucket(rate=20, burst=3)
+        t0 = time.monotonic()
+        for _ in range(5):
+            b.acquire()
+        # 3 burst tokens free, 2 more at 20/s -> ~0.1s
+        self.assertGreaterEqual(time.monotonic() - t0, 0.08)
+
+    def test_acquire_timeout(self):
+        b = sched.TokenBucket(rate=0.1, burst=1)
+        self.assertIsNotNone(b.acquire(timeout=0.01))
+        self.assertIsNone(b.acquire(timeout=0.01))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,15 @@ Normalizes statements to the canonical schema consumed by
 fundamentals.calculate_graham_metrics() so the fallback path gets the same
 valuation scorecard as the SEC EDGAR path.
 """
-import yfinance as yf
+import sys
+from pathlib import Path
+
+# Repo root so the shared Yahoo gate (`common.data.yahoo`) resolves
+_ROOT = Path(__file__).resolve().parent.parent.parent
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from common.data.yahoo import limited_yf as yf  # noqa: E402
 
 
 def get_financials(ticker, periods=8, period_type='Q'):
@@ -0,0 +1 @@
+"""Offline benchmark suite for the hot analytical paths (see harness.py)."""
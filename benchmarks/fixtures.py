@@ -0,0 +1,156 @@
+"""
+Seeded synthetic fixtures for the benchmark suite.
+
+Every generator is a pure function of its arguments (numpy Generator seeded
+explicitly), so two runs of the same benchmark see byte-identical inputs and
+nothing here ever touches the network.
+
+  price_panel       — correlated GBM closes, DataFrame (index=business days)
+  ohlcv             — one ticker's lowercase open/high/low/close/volume frame
+  factor_returns    — daily factor returns shaped like NS-5's build_factor_returns
+  fundamentals_db   — sqlite with A_T's `annual` + `prices` tables (NS-7 reads it)
+  hist_closes_json  — NS-8's {"dates", "tickers", "closes"} history cache
+  option_chain      — option-screener contract records around a spot price
+"""
+from __future__ import annotations
+
+import datetime
+import json
+import sqlite3
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_SEED = 20260101
+START = "2004-01-02"
+
+
+def _rng(seed: int) -> np.random.Generator:
+    return np.random.default_rng(seed)
+
+
+def _tickers(n: int, prefix: str = "T") -> List[str]:
+    return [f"{prefix}{i:03d}" for i in range(n)]
+
+
+def price_panel(tickers: Sequence[str], n_days: int = 1260,
+                seed: int = DEFAULT_SEED, start: str = START) -> pd.DataFrame:
+    """Daily closes from a one-factor GBM: common market shock + idiosyncratic noise."""
+    rng = _rng(seed)
+    k = len(tickers)
+    beta = rng.uniform(0.4, 1.4, k)
+    drift = rng.uniform(0.00005, 0.0006, k)
+    idio = rng.uniform(0.006, 0.02, k)
+    market = rng.normal(0.0002, 0.01, n_days)
+    rets = drift + np.outer(market, beta) + rng.normal(0.0, 1.0, (n_days, k)) * idio
+    closes = rng.uniform(20, 400, k) * np.exp(np.cumsum(rets, axis=0))
+    idx = pd.bdate_range(start, periods=n_days)
+    return pd.DataFrame(closes, index=idx, columns=list(tickers))
+
+
+def ohlcv(n_days: int = 750, seed: int = DEFAULT_SEED, start: str = START) -> pd.DataFrame:
+    """Single-ticker bars with regime-switching volatility (so HMMs have structure)."""
+    rng = _rng(seed)
+    regime = np.repeat(rng.integers(0, 3, n_days // 60 + 1), 60)[:n_days]
+    vol = np.array([0.008, 0.015, 0.03])[regime]
+    mu = np.array([0.0008, 0.0, -0.001])[regime]
+    close = 100.0 * np.exp(np.cumsum(mu + vol * rng.normal(size=n_days)))
+    spread = close * vol * rng.uniform(0.5, 1.5, n_days)
+    open_ = close * (1 + rng.normal(0, 0.3, n_days) * vol)
+    high = np.maximum(open_, close) + spread / 2
+    low = np.minimum(open_, close) - spread / 2
+    volume = rng.lognormal(15, 0.4, n_days).round()
+    idx = pd.bdate_range(start, periods=n_days)
+    return pd.DataFrame({"open": open_, "high": high, "low": low,
+                         "close": close, "volume": volume}, index=idx)
+
+
+def factor_returns(index: pd.DatetimeIndex, names: Sequence[str],
+                   seed: int = DEFAULT_SEED) -> pd.DataFrame:
+    """Daily factor returns (MKT/SMB/...) on the given calendar."""
+    rng = _rng(seed + 1)
+    scale = rng.uniform(0.003, 0.011, len(names))
+    data = rng.normal(0.0002, 1.0, (len(index), len(names))) * scale
+    return pd.DataFrame(data, index=index, columns=list(names))
+
+
+def fundamentals_db(path, n_tickers: int = 200, n_days: int = 600,
+                    seed: int = DEFAULT_SEED, end: str = "2026-06-30") -> List[str]:
+    """Write A_T's point-in-time store: ten years of 10-K rows + daily prices.
+
+    Some filings leave eps/cfo empty so the last-known-good fill path is
+    exercised. Returns the ticker list.
+    """
+    rng = _rng(seed)
+    tickers = _tickers(n_tickers)
+    closes = price_panel(tickers, n_days, seed, start=str(
+        (pd.Timestamp(end) - pd.offsets.BDay(n_days - 1)).date()))
+    dates = [d.strftime("%Y-%m-%d") for d in closes.index]
+    Path(path).unlink(missing_ok=True)
+    conn = sqlite3.connect(str(path))
+    with conn:
+        conn.execute("CREATE TABLE annual (ticker TEXT, period_end TEXT, filed TEXT, "
+                     "eps_diluted REAL, operating_cf REAL, shares_outstanding REAL)")
+        conn.execute("CREATE TABLE prices (ticker TEXT, date TEXT, close REAL)")
+        conn.execute("CREATE INDEX idx_annual ON annual(ticker, filed)")
+        conn.execute("CREATE INDEX idx_prices ON prices(ticker, date)")
+        year_end = int(end[:4])
+        rows = []
+        for t in tickers:
+            shares = float(rng.uniform(2e8, 8e9))
+            for y in range(year_end - 10, year_end):
+                eps = float(rng.normal(4, 3))
+                cfo = float(rng.normal(5e9, 3e9))
+                rows.append((t, f"{y}-12-31", f"{y + 1}-02-{rng.integers(10, 28):02d}",
+                             None if rng.random() < 0.1 else eps,
+                             None if rng.random() < 0.1 else cfo, shares))
+        conn.executemany("INSERT INTO annual VALUES (?,?,?,?,?,?)", rows)
+        conn.executemany(
+            "INSERT INTO prices VALUES (?,?,?)",
+            ((t, d, float(c)) for t in tickers for d, c in zip(dates, closes[t].values)))
+    conn.close()
+    return tickers
+
+
+def hist_closes_json(path, tickers: Sequence[str], start: str = START,
+                     end: str = "2016-12-30", seed: int = DEFAULT_SEED) -> Dict:
+    """NS-8 history cache layout; the cash proxy (last ticker) barely moves."""
+    n_days = len(pd.bdate_range(start, end))
+    panel = price_panel(tickers, n_days, seed, start=start)
+    cash = list(tickers)[-1]
+    panel[cash] = 100.0 * np.cumprod(np.full(n_days, 1.00008))
+    doc = {"dates": [d.strftime("%Y-%m-%d") for d in panel.index],
+           "tickers": list(tickers),
+           "closes": {t: [round(float(v), 4) for v in panel[t].values] for t in tickers}}
+    Path(path).write_text(json.dumps(doc))
+    return doc
+
+
+def option_chain(n_contracts: int = 2000, spot: float = 150.0,
+                 seed: int = DEFAULT_SEED, today: datetime.date = None) -> List[Dict]:
+    """Contracts in the option screener's record shape (bid/ask/last/vol/oi/iv...)."""
+    rng = _rng(seed)
+    today = today or datetime.date(2026, 6, 1)
+    expiries = [(today + datetime.timedelta(days=int(d))).isoformat()
+                for d in (7, 14, 30, 45, 60, 90, 180, 365)]
+    out = []
+    for i in range(n_contracts):
+        opt_type = "Call" if i % 2 == 0 else "Put"
+        strike = round(spot * float(rng.uniform(0.6, 1.4)), 0)
+        mid = max(0.05, abs(spot - strike) * 0.1 + float(rng.gamma(2.0, 2.0)))
+        half = mid * float(rng.uniform(0.01, 0.08))
+        out.append({
+            "contract": f"SYN{i:06d}",
+            "type": opt_type,
+            "strike": strike,
+            "expiry": expiries[i % len(expiries)],
+            "bid": round(mid - half, 2),
+            "ask": round(mid + half, 2),
+            "last": round(mid, 2),
+            "vol": int(rng.poisson(300)) if rng.random() > 0.2 else 0,
+            "oi": int(rng.poisson(2000)),
+            "iv": round(float(rng.uniform(0.15, 0.9)), 4),
+        })
+    return out
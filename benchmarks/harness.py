@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark harness — wall time, peak memory, allocations, JSON baseline.
+
+Usage:
+    python benchmarks/harness.py list
+    python benchmarks/harness.py run [-k ns5] [--out results.json]
+    python benchmarks/harness.py save [-k ...]              # rewrite baseline.json
+    python benchmarks/harness.py compare [--results results.json] [--threshold 0.30]
+
+Every benchmark runs in a fresh interpreter (services reuse module names like
+`config`, and a warm import cache would hide startup regressions), inside a
+scratch working directory, with outbound sockets disabled. Per benchmark:
+
+  wall_s / wall_median_s  min and median of `repeat` timed calls
+  peak_kb                 tracemalloc peak during one extra traced call
+  alloc_kb / alloc_blocks memory and block count still held after that call
+  rss_kb                  process max RSS (includes imports and fixtures)
+
+`compare` exits 1 when any benchmark is slower (wall_s) or hungrier (peak_kb)
+than the baseline by more than the threshold; tiny absolute changes are
+ignored so timer noise on millisecond benchmarks does not page anyone.
+Timings are only comparable on the machine that wrote the baseline — refresh
+it with `save` after a hardware or interpreter change.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+ROOT = Path(__file__).resolve().parent.parent
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_THRESHOLD = 0.30
+MIN_WALL_DELTA_S = 0.005          # ignore regressions smaller than this…
+MIN_PEAK_DELTA_KB = 256           # …or this
+CHILD_TIMEOUT_S = 600
+
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Child side — runs exactly one benchmark
+# ═══════════════════════════════════════════════════════════════════════
+
+def _block_network():
+    """Refuse any non-loopback connection; a benchmark that phones home is a bug."""
+    real_connect = socket.socket.connect
+
+    def connect(self, address):
+        host = address[0] if isinstance(address, tuple) else address
+        if host not in ("127.0.0.1", "::1", "localhost"):
+            raise OSError(f"benchmarks run offline (attempted connect to {host})")
+        return real_connect(self, address)
+    socket.socket.connect = connect
+
+
+def measure(fn, repeat: int) -> Dict:
+    """Time `repeat` calls of fn, then one traced call for memory."""
+    fn()                                   # warm-up: lazy imports, first-call caches
+    times = []
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    tracemalloc.reset_peak()
+    base, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    current, peak = tracemalloc.get_traced_memory()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    del result
+    blocks = sum(s.count_diff for s in after.compare_to(before, "filename") if s.count_diff > 0)
+
+    return {
+        "wall_s": round(min(times), 6),
+        "wall_median_s": round(statistics.median(times), 6),
+        "repeat": len(times),
+        "peak_kb": round((peak - base) / 1024, 1),
+        "alloc_kb": round(max(current - base, 0) / 1024, 1),
+        "alloc_blocks": int(blocks),
+    }
+
+
+def _child(name: str, repeat: Optional[int]) -> Dict:
+    from benchmarks.suite import BENCHMARKS
+
+    spec = BENCHMARKS[name]
+    if spec.service:
+        sys.path.insert(0, str(ROOT / spec.service))
+    _block_network()
+    with tempfile.TemporaryDirectory(prefix="bench-") as scratch:
+        os.chdir(scratch)
+        fn = spec.setup()
+        out = measure(fn, repeat or spec.repeat)
+    try:
+        import resource
+        out["rss_kb"] = int(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except ImportError:                     # Windows
+        out["rss_kb"] = None
+    return out
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Parent side — orchestration, baseline, compare
+# ═══════════════════════════════════════════════════════════════════════
+
+def select(patterns: Optional[List[str]] = None) -> List[str]:
+    from benchmarks.suite import BENCHMARKS
+    names = list(BENCHMARKS)
+    if patterns:
+        names = [n for n in names if any(p in n for p in patterns)]
+    return names
+
+
+def run_one(name: str, repeat: Optional[int] = None) -> Dict:
+    """Run one benchmark in a fresh interpreter; errors are recorded, not raised."""
+    cmd = [sys.executable, str(Path(__file__).resolve()), "_child", name]
+    if repeat:
+        cmd += ["--repeat", str(repeat)]
+    env = dict(os.environ, PYTHONHASHSEED="0", PYTHONDONTWRITEBYTECODE="1",
+               OMP_NUM_THREADS="1", OPENBLAS_NUM_THREADS="1", MKL_NUM_THREADS="1")
+    try:
+        proc = subprocess.run(cmd, capture_output=True, text=True, env=env,
+                              timeout=CHILD_TIMEOUT_S, cwd=str(ROOT))
+    except subprocess.TimeoutExpired:
+        return {"error": f"timeout after {CHILD_TIMEOUT_S}s"}
+    lines = [ln for ln in proc.stdout.splitlines() if ln.startswith("{")]
+    if proc.returncode != 0 or not lines:
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ["no output"]
+        return {"error": tail[0][:300]}
+    return json.loads(lines[-1])
+
+
+def run(names: List[str], repeat: Optional[int] = None, verbose: bool = True) -> Dict:
+    results = {}
+    for name in names:
+        res = run_one(name, repeat)
+        results[name] = res
+        if verbose:
+            if "error" in res:
+                print(f"  {name:<28} ERROR  {res['error']}")
+            else:
+                print(f"  {name:<28} {res['wall_s'] * 1000:>10.2f} ms"
+                      f"  peak {res['peak_kb']:>10.1f} KB  blocks {res['alloc_blocks']:>7}")
+    return {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: Dict, current: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[Dict]:
+    """Rows for every benchmark present in both runs; `regression` marks failures."""
+    rows = []
+    base_b, cur_b = baseline.get("benchmarks", {}), current.get("benchmarks", {})
+    for name in sorted(set(base_b) & set(cur_b)):
+        b, c = base_b[name], cur_b[name]
+        if "error" in b or "error" in c:
+            rows.append({"name": name, "error": c.get("error") or b.get("error"),
+                         "regression": "error" in c and "error" not in b})
+            continue
+        wall_ratio = c["wall_s"] / b["wall_s"] if b["wall_s"] else 1.0
+        peak_ratio = c["peak_kb"] / b["peak_kb"] if b["peak_kb"] > 0 else 1.0
+        slow = (wall_ratio > 1 + threshold
+                and c["wall_s"] - b["wall_s"] > MIN_WALL_DELTA_S)
+        fat = (peak_ratio > 1 + threshold
+               and c["peak_kb"] - b["peak_kb"] > MIN_PEAK_DELTA_KB)
+        rows.append({"name": name, "wall_ratio": round(wall_ratio, 3),
+                     "peak_ratio": round(peak_ratio, 3),
+                     "slow": slow, "fat": fat, "regression": slow or fat})
+    return rows
+
+
+def _print_compare(rows: List[Dict], threshold: float):
+    print(f"{'benchmark':<28} {'time':>8} {'peak':>8}   (threshold +{threshold:.0%})")
+    for r in rows:
+        if "error" in r:
+            print(f"{r['name']:<28} {'ERROR':>8}           {r['error']}")
+            continue
+        flag = " <-- REGRESSION" if r["regression"] else ""
+        print(f"{r['name']:<28} {r['wall_ratio']:>7.2f}x {r['peak_ratio']:>7.2f}x{flag}")
+
+
+def _load(path) -> Dict:
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("list")
+    for cmd in ("run", "save", "compare"):
+        p = sub.add_parser(cmd)
+        p.add_argument("-k", dest="patterns", action="append",
+                       help="only benchmarks whose name contains this (repeatable)")
+        p.add_argument("--repeat", type=int, default=None)
+        if cmd == "run":
+            p.add_argument("--out", default=None, help="write results JSON here")
+        if cmd == "compare":
+            p.add_argument("--results", default=None,
+                           help="compare this results file instead of running now")
+            p.add_argument("--baseline", default=str(BASELINE_PATH))
+            p.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    child = sub.add_parser("_child")
+    child.add_argument("name")
+    child.add_argument("--repeat", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "_child":
+        print(json.dumps(_child(args.name, args.repeat)))
+        return 0
+
+    if args.cmd == "list":
+        from benchmarks.suite import BENCHMARKS
+        for name in select():
+            b = BENCHMARKS[name]
+            print(f"{name:<28} {b.service or 'common':<30} {b.description}")
+        return 0
+
+    if args.cmd == "compare" and args.results:
+        current = _load(args.results)
+    else:
+        current = run(select(args.patterns), args.repeat)
+
+    if args.cmd == "run":
+        if args.out:
+            Path(args.out).write_text(json.dumps(current, indent=2) + "\n")
+        return 0 if not any("error" in r for r in current["benchmarks"].values()) else 1
+
+    if args.cmd == "save":
+        if args.patterns and BASELINE_PATH.exists():    # partial refresh keeps the rest
+            merged = _load(BASELINE_PATH)
+            merged["benchmarks"].update(current["benchmarks"])
+            current = dict(merged, generated_at=current["generated_at"])
+        BASELINE_PATH.write_text(json.dumps(current, indent=2) + "\n")
+        print(f"baseline written: {BASELINE_PATH}")
+        return 0
+
+    rows = compare(_load(args.baseline), current, args.threshold)
+    _print_compare(rows, args.threshold)
+    return 1 if any(r["regression"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
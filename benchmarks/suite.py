@@ -0,0 +1,220 @@
+"""
+Named benchmarks for the hot analytical paths.
+
+Each benchmark is a setup function registered with @bench. Setup builds the
+fixtures and imports the service code (the harness has already put the
+service directory first on sys.path and chdir'd into a scratch dir), then
+returns the zero-argument callable that is actually timed. Setup cost is
+never part of the measurement.
+
+Services share module names (config, data_fetcher, ...), so the harness runs
+every benchmark in its own interpreter — see harness.run_one().
+"""
+from __future__ import annotations
+
+import datetime
+import os
+from typing import Callable, Dict, NamedTuple, Optional
+
+from benchmarks import fixtures
+
+
+class Benchmark(NamedTuple):
+    name: str
+    service: Optional[str]          # repo-relative dir put on sys.path, or None
+    setup: Callable[[], Callable[[], object]]
+    repeat: int
+    description: str
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def bench(name: str, service: Optional[str] = None, repeat: int = 5):
+    """Register a setup function under `name`."""
+    def deco(fn):
+        BENCHMARKS[name] = Benchmark(name, service, fn, repeat,
+                                     (fn.__doc__ or "").strip().splitlines()[0])
+        return fn
+    return deco
+
+
+NS2 = "Project_Nine_Street/NS-2_QA"
+NS5 = "Project_Nine_Street/NS-5_QA"
+NS7 = "Project_Nine_Street/NS-7_QA"
+NS8 = "Project_Nine_Street/NS-8_QA"
+NSX = "Project_Nine_Street/NS-X_QA"
+SEQUOIA = "Project_Sequoia/QA_terminal"
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# common/indicators
+# ═══════════════════════════════════════════════════════════════════════
+
+@bench("indicators.compute_all", repeat=10)
+def _indicators_compute_all():
+    """compute_all() over ten years of daily OHLCV."""
+    from common import indicators
+    df = fixtures.ohlcv(2520)
+    return lambda: indicators.compute_all(df["close"], df["high"], df["low"], df["volume"])
+
+
+@bench("indicators.compute_panel", repeat=5)
+def _indicators_compute_panel():
+    """compute_panel() for 500 tickers x five years (date x ticker matrices)."""
+    from common import indicators
+    close = fixtures.price_panel([f"T{i:03d}" for i in range(500)], 1260)
+    high, low = close * 1.01, close * 0.99
+    volume = close * 0 + 1e6
+    return lambda: indicators.compute_panel(close, high, low, volume)
+
+
+@bench("indicators.fit_hmm", repeat=10)
+def _indicators_fit_hmm():
+    """2-state HMM regime fit on three years of closes."""
+    from common import indicators
+    close = fixtures.ohlcv(756)["close"]
+    return lambda: indicators.fit_hmm(close, n_iter=200)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# NS-2 — HMM ensemble + stops
+# ═══════════════════════════════════════════════════════════════════════
+
+@bench("ns2.hmm_ensemble", service=NS2, repeat=3)
+def _ns2_hmm_ensemble():
+    """Feature build + 5-model HMM ensemble + adaptive persistence, 500 bars."""
+    import qa_server as ns2
+    raw = fixtures.ohlcv(500)
+    profile = ns2.ASSET_PROFILES["equity"]
+
+    def run():
+        df = ns2.add_rich_features(raw)
+        return ns2.get_regimes(df, use_hmm=True, profile=profile)
+    return run
+
+
+@bench("ns2.stops", service=NS2, repeat=5)
+def _ns2_stops():
+    """Signal generation, trailing ATR stops, backtest and drawdown breaker."""
+    import qa_server as ns2
+    profile = ns2.ASSET_PROFILES["equity"]
+    df = ns2.add_rich_features(fixtures.ohlcv(500))
+    regimes = ns2.assign_regimes_rule_based(df, profile=profile)
+    df["regime"] = regimes
+
+    def run():
+        out = ns2.generate_signals_v2(df, regimes, [1.0] * len(df), None, None, 0,
+                                      profile=profile)
+        out = ns2.backtest(ns2.apply_stops(out))
+        out, fired = ns2.apply_dd_breaker(out)
+        return ns2.backtest(out) if fired else out
+    return run
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# NS-5 — frontier + drift grade
+# ═══════════════════════════════════════════════════════════════════════
+
+def _ns5_universe():
+    import config
+    tickers = ["SPY", "QQQ", "IWM", "EFA", "EEM", "TLT", "IEF", "LQD", "GLD", "VNQ", "DBC", "SHY"]
+    closes = fixtures.price_panel(tickers, 1260)
+    factors = fixtures.factor_returns(closes.index[1:], config.FACTOR_NAMES)
+    return tickers, closes, factors
+
+
+@bench("ns5.frontier", service=NS5, repeat=5)
+def _ns5_frontier():
+    """Long-only efficient frontier, 12 assets x 5y, 40 points."""
+    import frontier
+    tickers, closes, _ = _ns5_universe()
+    return lambda: frontier.compute_frontier(closes, tickers, n_points=40)
+
+
+@bench("ns5.drift_grade", service=NS5, repeat=3)
+def _ns5_drift_grade():
+    """Four-level drift grade (weight, risk, style, frontier) + tweaks."""
+    import drift
+    tickers, closes, factors = _ns5_universe()
+    policy = {t: 1.0 / len(tickers) for t in tickers}
+    holdings = dict(policy, SPY=policy["SPY"] * 3, TLT=0.0)
+    total = sum(holdings.values())
+    holdings = {t: w / total for t, w in holdings.items()}
+    return lambda: drift.run_drift_grade(holdings, policy, factor_returns=factors,
+                                         closes=closes)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# NS-7 — point-in-time snapshots
+# ═══════════════════════════════════════════════════════════════════════
+
+@bench("ns7.snapshots", service=NS7, repeat=3)
+def _ns7_snapshots():
+    """facts_for + momentum window for 200 tickers from the A_T store, then rank."""
+    import config
+    import pipeline
+    import selector
+    db = os.path.abspath("fundamentals_hist.db")
+    tickers = fixtures.fundamentals_db(db, n_tickers=200)
+    config.AT_FUNDAMENTALS_DB = db
+    as_of = "2026-06-30"
+
+    def run():
+        facts, prices = {}, {}
+        for t in tickers:
+            facts[t] = pipeline.facts_for(t, as_of, in_sp500=True, volume_waived=True)
+            closes = pipeline.momentum_series(t, as_of)
+            if closes is not None:
+                prices[t] = closes
+        return selector.rank_major(prices, facts, top_n=config.TOP_N)
+    return run
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Walk-forwards — NS-8 tranched, NS-X rotation
+# ═══════════════════════════════════════════════════════════════════════
+
+@bench("ns8.walkforward", service=NS8, repeat=3)
+def _ns8_walkforward():
+    """Tranched monthly walk-forward 2006-2016 over the NS-8 universe."""
+    import walkforward
+    path = os.path.abspath("ns8_hist_closes.json")
+    fixtures.hist_closes_json(path, walkforward.TICKERS)
+    walkforward.HIST_PATH = path
+    return lambda: walkforward.run_walkforward("2006-01-01", "2016-12-30", tranched=True)
+
+
+@bench("nsx.walkforward", service=NSX, repeat=20)
+def _nsx_walkforward():
+    """Rotation allocator walk over 1200 days of synthetic strategy streams."""
+    import nsx_walkforward
+    streams = nsx_walkforward._synth_strategies(42, 1200)
+    return lambda: nsx_walkforward.walk(200, streams, 22)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Sequoia — option screener + greeks
+# ═══════════════════════════════════════════════════════════════════════
+
+@bench("sequoia.option_screener", service=SEQUOIA, repeat=5)
+def _sequoia_option_screener():
+    """Contract enrichment + cross-section z-scores + scoring, 2000 contracts."""
+    import option_screener
+    today = datetime.date.today()           # screener measures DTE from today
+    chain = fixtures.option_chain(2000, today=today)
+    earnings = (today + datetime.timedelta(days=20)).isoformat()
+    return lambda: option_screener.enrich_ticker_contracts(
+        [dict(r) for r in chain], 150.0, earnings)
+
+
+@bench("sequoia.greeks", service=SEQUOIA, repeat=10)
+def _sequoia_greeks():
+    """BSM greeks for every contract of a 2000-contract chain."""
+    import greeks
+    chain = fixtures.option_chain(2000)
+    ref = datetime.date(2026, 6, 1)
+    legs = [(r["strike"], (datetime.date.fromisoformat(r["expiry"]) - ref).days / 365.0,
+             r["iv"], r["type"].lower()) for r in chain]
+    return lambda: [greeks.calculate_greeks(150.0, k, t, 0.04, iv, kind, 0.01)
+                    for k, t, iv, kind in legs]
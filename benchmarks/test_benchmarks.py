@@ -0,0 +1,108 @@
+"""
+Benchmark harness tests — fixtures, measurement, baseline comparison.
+
+Tests for:
+  - fixtures: same seed → identical data, no network needed
+  - measure(): reports time, peak memory and retained allocations
+  - compare(): flags slow / memory-hungry / newly failing benchmarks,
+    ignores sub-threshold and tiny absolute changes
+  - run_one(): a benchmark runs in its own interpreter and returns JSON
+
+Run: pytest benchmarks/test_benchmarks.py -q
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fixtures, harness  # noqa: E402
+from benchmarks.suite import BENCHMARKS  # noqa: E402
+
+
+class TestFixtures:
+
+    def test_price_panel_is_seeded(self):
+        a = fixtures.price_panel(["A", "B", "C"], 300, seed=7)
+        b = fixtures.price_panel(["A", "B", "C"], 300, seed=7)
+        pd.testing.assert_frame_equal(a, b)
+        assert not a.equals(fixtures.price_panel(["A", "B", "C"], 300, seed=8))
+        assert (a > 0).all().all()
+
+    def test_option_chain_shape(self):
+        chain = fixtures.option_chain(50)
+        assert chain == fixtures.option_chain(50)
+        assert {r["type"] for r in chain} == {"Call", "Put"}
+        assert all(r["bid"] <= r["ask"] for r in chain)
+
+    def test_fundamentals_db_has_point_in_time_tables(self, tmp_path):
+        db = tmp_path / "f.db"
+        tickers = fixtures.fundamentals_db(db, n_tickers=3, n_days=150)
+        conn = sqlite3.connect(str(db))
+        assert conn.execute("SELECT COUNT(DISTINCT ticker) FROM annual").fetchone()[0] == 3
+        assert conn.execute("SELECT COUNT(*) FROM prices WHERE ticker = ?",
+                            (tickers[0],)).fetchone()[0] == 150
+        conn.close()
+
+
+class TestMeasure:
+
+    def test_reports_time_and_memory(self):
+        out = harness.measure(lambda: [0] * 200_000, repeat=3)
+        assert out["repeat"] == 3 and out["wall_s"] <= out["wall_median_s"]
+        assert out["peak_kb"] >= 200_000 * 8 / 1024 * 0.9
+
+
+def _doc(**benches):
+    return {"benchmarks": benches}
+
+
+def _r(wall, peak):
+    return {"wall_s": wall, "peak_kb": peak}
+
+
+class TestCompare:
+
+    def test_flags_slowdowns_beyond_threshold(self):
+        rows = harness.compare(_doc(a=_r(0.100, 1000), b=_r(0.100, 1000)),
+                               _doc(a=_r(0.140, 1000), b=_r(0.110, 1000)), threshold=0.25)
+        by = {r["name"]: r for r in rows}
+        assert by["a"]["slow"] and by["a"]["regression"]
+        assert not by["b"]["regression"]
+
+    def test_flags_memory_growth(self):
+        rows = harness.compare(_doc(a=_r(0.1, 1000)), _doc(a=_r(0.1, 2000)))
+        assert rows[0]["fat"] and rows[0]["regression"]
+
+    def test_ignores_tiny_absolute_changes(self):
+        rows = harness.compare(_doc(a=_r(0.001, 10)), _doc(a=_r(0.003, 100)))
+        assert not rows[0]["regression"]
+
+    def test_new_error_is_a_regression(self):
+        rows = harness.compare(_doc(a=_r(0.1, 10)), _doc(a={"error": "boom"}))
+        assert rows[0]["regression"]
+
+    def test_cli_compare_exit_code(self, tmp_path):
+        import json
+        base, cur = tmp_path / "base.json", tmp_path / "cur.json"
+        base.write_text(json.dumps(_doc(a=_r(0.1, 1000))))
+        cur.write_text(json.dumps(_doc(a=_r(0.5, 1000))))
+        argv = ["compare", "--baseline", str(base), "--results", str(cur)]
+        assert harness.main(argv) == 1
+        cur.write_text(json.dumps(_doc(a=_r(0.1, 1000))))
+        assert harness.main(argv) == 0
+
+
+def test_every_hot_path_is_registered():
+    prefixes = {name.split(".")[0] for name in BENCHMARKS}
+    assert prefixes >= {"indicators", "ns2", "ns5", "ns7", "ns8", "nsx", "sequoia"}
+
+
+def test_run_one_isolated_subprocess():
+    out = harness.run_one("nsx.walkforward", repeat=1)
+    assert "error" not in out, out
+    assert out["wall_s"] > 0 and out["repeat"] == 1
@@ -1,16 +1,32 @@
-from . import config
-from . import data
-from . import indicators
-from . import utils
-from . import risk
+import importlib
+
+# Submodules load on first use (PEP 562) so `from common import metrics` in a
+# service entry point does not drag in pandas/scipy/hmmlearn at startup.
+_SUBMODULES = ("config", "data", "indicators", "utils", "risk")
 
 # ── Re-exports (P6 remediation) ─────────────────────────────────────────────
 # Services import `from common import fit_hmm, rsi, macd, ...` (e.g. NS-3/NS-4
 # PROD backends). These names live in submodules; re-export at package level
 # so `from common import X` works without touching every importer.
-from .config import get_ns_config
-from .data import get_yahoo_client, get_etf_holdings
-from .indicators import (
-    sma, ema, rsi, macd, bollinger_bands, bb_position,
-    adx, atr, obv, obv_slope, fit_hmm, compute_all,
-)
+_REEXPORTS = {
+    "get_ns_config": "config",
+    "get_yahoo_client": "data", "get_etf_holdings": "data",
+    **{name: "indicators" for name in (
+        "sma", "ema", "rsi", "macd", "bollinger_bands", "bb_position",
+        "adx", "atr", "obv", "obv_slope", "fit_hmm", "compute_all",
+    )},
+}
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _REEXPORTS:
+        value = getattr(importlib.import_module(f".{_REEXPORTS[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_SUBMODULES) | set(_REEXPORTS))
@@ -198,15 +198,16 @@ def _backfill_ns6_logs() -> int:
                      r.get("cross_sectional_corr")),
                 )
                 n += 1
+            seq = db._bump_performance_version(cur) if perf else 0
             for r in perf:
                 cur.execute(
                     "INSERT INTO performance_log (date, nav, ret, spy_ret, "
-                    " universe_ret, contributions) VALUES (%s,%s,%s,%s,%s,%s) "
+                    " universe_ret, contributions, write_seq) VALUES (%s,%s,%s,%s,%s,%s,%s) "
                     "ON CONFLICT (date) DO UPDATE SET nav=EXCLUDED.nav, ret=EXCLUDED.ret, "
                     " spy_ret=EXCLUDED.spy_ret, universe_ret=EXCLUDED.universe_ret, "
-                    " contributions=EXCLUDED.contributions",
+                    " contributions=EXCLUDED.contributions, write_seq=EXCLUDED.write_seq",
                     (r["date"], r.get("nav"), r.get("ret"), r.get("spy_ret"),
-                     r.get("universe_ret"), db._jsonb(r.get("contributions"))),
+                     r.get("universe_ret"), db._jsonb(r.get("contributions")), seq),
                 )
                 n += 1
             for r in cb:
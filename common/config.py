@@ -44,6 +44,8 @@ class CommonConfig(BaseSettings):
 
     # Cache
     cache_type: str = Field(default="memory", description="Cache backend: memory or redis")
+    cache_max_entries: int = Field(default=1024, description="In-memory cache bound (entries)")
+    cache_max_mb: int = Field(default=256, description="In-memory cache bound (MB)")
     redis_url: Optional[str] = Field(default=None, description="Redis URL if using redis cache")
 
     # Database (future)
@@ -2,71 +2,327 @@
 """
 Common Data Library
 Unified Yahoo Finance client with caching and error handling.
+
+Every Yahoo request in the process goes through one YahooGate:
+  - a token bucket (YF_RATE_PER_SEC, burst YF_BURST) shared by all threads,
+    YahooClient instances and `limited_yf` callers;
+  - adaptive back-off: a 429 / rate-limit failure pauses the whole bucket
+    for an exponentially growing penalty (halved again on each success) and
+    the request is retried;
+  - request coalescing: history() calls with the same parameters arriving
+    within YF_COALESCE_WINDOW are merged into one grouped yf.download.
+
+`limited_yf` is a drop-in for the yfinance module (download / Ticker routed
+through the gate, everything else passed through). The transport is
+injectable (configure_gate(transport=...)) so the gate is testable offline.
 """
+from __future__ import annotations
+
+import importlib
 import math
+import os
+import sys
+import threading
 import time
 import warnings
 from datetime import datetime, timedelta
 from typing import Optional
 
-import numpy as np
-import pandas as pd
-import yfinance as yf
+from .. import metrics
+from ..lazy import lazy_import
+from ..utils import TTLCache, TokenBucket
+
+pd = lazy_import("pandas")
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
+YF_RATE_PER_SEC = float(os.environ.get("YF_RATE_PER_SEC", "20"))      # sustained requests/s
+YF_BURST = int(os.environ.get("YF_BURST", "40"))
+YF_COALESCE_WINDOW = float(os.environ.get("YF_COALESCE_WINDOW", "0.05"))  # seconds
+YF_MAX_BATCH = 50                                                       # tickers per grouped download
+YF_THROTTLE_RETRIES = 3
+YF_BACKOFF_BASE = 2.0                                                   # seconds, first 429 penalty
+YF_BACKOFF_MAX = 120.0
+
+
+class YahooThrottled(Exception):
+    """Yahoo refused the request for rate (HTTP 429 / YFRateLimitError)."""
+
+
+def _is_throttle(exc: BaseException) -> bool:
+    if isinstance(exc, YahooThrottled) or "RateLimit" in type(exc).__name__:
+        return True
+    text = str(exc)
+    return "429" in text or "Too Many Requests" in text or "Rate limited" in text
+
+
+class YFinanceTransport:
+    """Default transport: the yfinance module, resolved per call (so test patches apply)."""
+
+    @staticmethod
+    def module():
+        return importlib.import_module("yfinance")
+
+    def download(self, tickers, *args, **kwargs):
+        out = self.module().download(tickers, *args, **kwargs)
+        errors = getattr(sys.modules.get("yfinance.shared"), "_ERRORS", None) or {}
+        if errors and (out is None or getattr(out, "empty", False) is True) \
+                and any(_is_throttle(Exception(m)) for m in errors.values()):
+            raise YahooThrottled(next(iter(errors.values())))
+        return out
+
+    def ticker(self, symbol, *args, **kwargs):
+        return self.module().Ticker(symbol, *args, **kwargs)
+
+
+class _Batch:
+    __slots__ = ("symbols", "done", "result", "error")
+
+    def __init__(self):
+        self.symbols = []
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+def split_grouped(raw, symbols) -> dict:
+    """{symbol: frame} from a group_by="ticker" yf.download result (rows with no data dropped)."""
+    if raw is None or raw.empty:
+        return {sym: pd.DataFrame() for sym in symbols}
+    if isinstance(raw.columns, pd.MultiIndex):
+        present = set(raw.columns.get_level_values(0))
+        return {sym: raw[sym].dropna(how="all") if sym in present else pd.DataFrame()
+                for sym in symbols}
+    if len(symbols) == 1:
+        return {symbols[0]: raw.dropna(how="all")}
+    return {sym: pd.DataFrame() for sym in symbols}
+
+
+class YahooGate:
+    """Process-wide Yahoo access: token bucket + 429 back-off + history coalescing."""
+
+    def __init__(self, transport=None, rate: float = YF_RATE_PER_SEC, burst: int = YF_BURST,
+                 window: float = YF_COALESCE_WINDOW, max_batch: int = YF_MAX_BATCH,
+                 retries: int = YF_THROTTLE_RETRIES, backoff_base: float = YF_BACKOFF_BASE,
+                 backoff_max: float = YF_BACKOFF_MAX, clock=time.monotonic, sleep=time.sleep):
+        self.transport = transport or YFinanceTransport()
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self.window = window
+        self.max_batch = max_batch
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._backoff = 0.0
+        self._open = {}                    # history params -> _Batch accepting symbols
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("calls", "throttled", "retries", "waited_s", "batches", "coalesced"), 0)
+
+    def call(self, fn, *args, **kwargs):
+        """fn(*args, **kwargs) under the rate limit, retrying rate-limit failures."""
+        return self._call(getattr(fn, "__name__", "call"), fn, args, kwargs)
+
+    def _call(self, op: str, fn, args, kwargs):
+        for attempt in range(self.retries + 1):
+            waited = self.bucket.acquire()
+            with self._lock:
+                self._stats["calls"] += 1
+                self._stats["waited_s"] += waited
+            try:
+                with metrics.upstream("yahoo", op):
+                    result = fn(*args, **kwargs)
+            except Exception as e:
+                if not _is_throttle(e):
+                    raise
+                with self._lock:
+                    self._stats["throttled"] += 1
+                    self._backoff = min(self.backoff_max, max(self.backoff_base, self._backoff * 2))
+                    penalty = self._backoff
+                if attempt == self.retries:
+                    raise
+                with self._lock:
+                    self._stats["retries"] += 1
+                self.bucket.pause(penalty)
+                continue
+            if self._backoff:
+                with self._lock:
+                    self._backoff = 0.0 if self._backoff <= self.backoff_base else self._backoff / 2
+            return result
+
+    def download(self, tickers, *args, **kwargs):
+        return self.call(self.transport.download, tickers, *args, **kwargs)
+
+    def ticker(self, symbol, *args, **kwargs):
+        return LimitedTicker(self.transport.ticker(symbol, *args, **kwargs), self)
+
+    def history(self, symbol: str, period: Optional[str] = None, interval: str = "1d",
+                start=None, end=None, auto_adjust: bool = True) -> pd.DataFrame:
+        """One ticker's OHLCV history; concurrent calls with equal params share a download."""
+        params = {"interval": interval, "auto_adjust": auto_adjust}
+        if start is not None or end is not None:
+            params.update(start=start, end=end)
+        else:
+            params["period"] = period or "1mo"
+        key = tuple(sorted((k, str(v)) for k, v in params.items()))
+        with self._lock:
+            batch = self._open.get(key)
+            leader = batch is None or len(batch.symbols) >= self.max_batch
+            if leader:
+                batch = self._open[key] = _Batch()
+                self._stats["batches"] += 1
+            else:
+                self._stats["coalesced"] += 1
+            if symbol not in batch.symbols:
+                batch.symbols.append(symbol)
+        if leader:
+            self._sleep(self.window)                  # let concurrent requests join
+            with self._lock:
+                if self._open.get(key) is batch:
+                    del self._open[key]
+                symbols = list(batch.symbols)
+            try:
+                raw = self.download(symbols, group_by="ticker", actions=True, ignore_tz=False,
+                                    progress=False, threads=True, **params)
+                batch.result = split_grouped(raw, symbols)
+            except Exception as e:
+                batch.error = e
+            batch.done.set()
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+        return batch.result.get(symbol, pd.DataFrame())
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "backoff_s": self._backoff}
+
+
+class LimitedTicker:
+    """yf.Ticker proxy: method calls and network-backed properties go through the gate."""
+
+    _LOCAL = frozenset({"ticker"})
+
+    def __init__(self, ticker, gate: YahooGate):
+        self._ticker = ticker
+        self._gate = gate
+
+    def __getattr__(self, name):
+        if name.startswith("_") or name in self._LOCAL:
+            return getattr(self._ticker, name)
+        attr = getattr(type(self._ticker), name, None)
+        if isinstance(attr, property):
+            return self._gate._call(name, getattr, (self._ticker, name), {})  # info, options, ... fetch on access
+        value = getattr(self._ticker, name)
+        if callable(attr):
+            return lambda *args, **kwargs: self._gate._call(name, value, args, kwargs)
+        return value
+
+
+_gate: Optional[YahooGate] = None
+_gate_lock = threading.Lock()
+
+
+def get_gate() -> YahooGate:
+    """The process-wide YahooGate (created on first use)."""
+    global _gate
+    if _gate is None:
+        with _gate_lock:
+            if _gate is None:
+                _gate = YahooGate()
+    return _gate
+
+
+def configure_gate(**kwargs) -> YahooGate:
+    """Replace the process-wide gate (e.g. configure_gate(transport=fake) in tests)."""
+    global _gate
+    with _gate_lock:
+        _gate = YahooGate(**kwargs)
+    return _gate
+
+
+@metrics.register_collector
+def _gate_metrics() -> list:
+    """Gate counters for /metrics (empty until the gate is first used)."""
+    if _gate is None:
+        return []
+    st = _gate.stats()
+    return [(f"yahoo_gate_{k}_total", "counter", f"YahooGate {k}.", [({}, st[k])])
+            for k in ("calls", "throttled", "retries", "batches", "coalesced")] + [
+        ("yahoo_gate_wait_seconds_total", "counter", "Time spent waiting on the token bucket.",
+         [({}, round(st["waited_s"], 3))]),
+        ("yahoo_gate_backoff_seconds", "gauge", "Current 429 back-off penalty.", [({}, st["backoff_s"])]),
+    ]
+
+
+class LimitedYF:
+    """Drop-in for the `yfinance` module whose network calls go through get_gate()."""
+
+    def __getattr__(self, name):
+        return getattr(YFinanceTransport.module(), name)
+
+    def download(self, tickers, *args, **kwargs):
+        return get_gate().download(tickers, *args, **kwargs)
+
+    def Ticker(self, symbol, *args, **kwargs):
+        return get_gate().ticker(symbol, *args, **kwargs)
+
+    def history(self, symbol, **kwargs):
+        """Coalesced single-ticker history (see YahooGate.history)."""
+        return get_gate().history(symbol, **kwargs)
+
+
+limited_yf = LimitedYF()
+
 
 class YahooClient:
     """
     Unified Yahoo Finance client with:
-    - TTL caching
-    - Rate limiting
-    - Batch fetching
+    - Bounded LRU+TTL caching (concurrent misses share one fetch)
+    - Rate limiting (process-wide YahooGate; `rate_limit` is kept for
+      signature compatibility, pacing comes from YF_RATE_PER_SEC)
+    - Batch fetching (get_history calls coalesce into grouped downloads)
     - Safe value extraction
     """
 
-    def __init__(self, cache_ttl: int = 300, rate_limit: float = 0.05, timeout: int = 30, retries: int = 3):
+    def __init__(self, cache_ttl: int = 300, rate_limit: float = 0.05, timeout: int = 30, retries: int = 3,
+                 cache_max_entries: int = 1024, cache_max_mb: int = 256):
         self.cache_ttl = cache_ttl
         self.rate_limit = rate_limit
         self.timeout = timeout
         self.retries = retries
 
-        self._cache = {}
-        self._last_request = 0
-
-    def _rate_limit(self):
-        """Enforce minimum time between requests."""
-        elapsed = time.time() - self._last_request
-        if elapsed < self.rate_limit:
-            time.sleep(self.rate_limit - elapsed)
-        self._last_request = time.time()
+        self._cache = TTLCache(ttl_seconds=cache_ttl, max_entries=cache_max_entries,
+                               max_bytes=cache_max_mb * 1024 * 1024, name="yahoo")
 
     def _cache_key(self, method: str, *args, **kwargs) -> str:
         return f"{method}:{args}:{sorted(kwargs.items())}"
 
     def _get_cached(self, key: str) -> Optional[any]:
-        if key in self._cache:
-            value, expiry = self._cache[key]
-            if time.time() < expiry:
-                return value
-            del self._cache[key]
-        return None
+        return self._cache.get(key)
 
     def _set_cached(self, key: str, value: any):
-        self._cache[key] = (value, time.time() + self.cache_ttl)
+        self._cache.set(key, value)
+
+    def _cached(self, key: str, loader, cache_if=None):
+        """Cached value or loader() — one upstream fetch per key across threads."""
+        return self._cache.get_or_load(key, loader, cache_if=cache_if)
 
     def _fetch_with_retry(self, func, *args, **kwargs):
-        """Execute with retries."""
-        last_error = None
+        """Execute through the process-wide gate, with retries."""
+        return self._retry(lambda: get_gate().call(func, *args, **kwargs))
+
+    def _retry(self, fn):
+        """fn() with retries for transient failures. Throttles are not retried
+        here: the gate already backed off and retried them before raising."""
         for attempt in range(self.retries):
             try:
-                self._rate_limit()
-                return func(*args, **kwargs)
+                return fn()
             except Exception as e:
-                last_error = e
-                if attempt < self.retries - 1:
-                    time.sleep(0.5 * (attempt + 1))
-        raise last_error
+                if _is_throttle(e) or attempt == self.retries - 1:
+                    raise
+                time.sleep(0.5 * (attempt + 1))
 
     # --- Safe value extraction ---
 
@@ -100,45 +356,28 @@ class YahooClient:
 
     # --- Data fetching ---
 
-    def get_ticker(self, symbol: str) -> yf.Ticker:
-        """Get yfinance Ticker object (cached)."""
-        key = self._cache_key("ticker", symbol)
-        cached = self._get_cached(key)
-        if cached:
-            return cached
-
-        ticker = yf.Ticker(symbol)
-        self._set_cached(key, ticker)
-        return ticker
+    def get_ticker(self, symbol: str) -> "LimitedTicker":
+        """Get yfinance Ticker object (cached, gate-limited)."""
+        return self._cached(self._cache_key("ticker", symbol), lambda: get_gate().ticker(symbol), cache_if=bool)
 
     def get_info(self, symbol: str) -> dict:
         """Get ticker info dict."""
-        key = self._cache_key("info", symbol)
-        cached = self._get_cached(key)
-        if cached:
-            return cached
+        def load():
+            ticker = self.get_ticker(symbol)
+            return self._retry(lambda: ticker.info)
 
-        ticker = self.get_ticker(symbol)
-        info = self._fetch_with_retry(ticker.info)
-        self._set_cached(key, info)
-        return info
+        return self._cached(self._cache_key("info", symbol), load, cache_if=bool)
 
     def get_history(self, symbol: str, period: str = "1y", interval: str = "1d",
                     start: str = None, end: str = None) -> pd.DataFrame:
         """Get historical OHLCV data."""
-        key = self._cache_key("history", symbol, period, interval, start, end)
-        cached = self._get_cached(key)
-        if cached is not None:
-            return cached
+        def load():
+            if start and end:
+                return self._retry(lambda: get_gate().history(symbol, start=start, end=end,
+                                                              interval=interval))
+            return self._retry(lambda: get_gate().history(symbol, period=period, interval=interval))
 
-        ticker = self.get_ticker(symbol)
-        if start and end:
-            df = self._fetch_with_retry(ticker.history, start=start, end=end, interval=interval)
-        else:
-            df = self._fetch_with_retry(ticker.history, period=period, interval=interval)
-
-        self._set_cached(key, df)
-        return df
+        return self._cached(self._cache_key("history", symbol, period, interval, start, end), load)
 
     def get_weekly(self, symbol: str, weeks: int = 52) -> pd.DataFrame:
         """Get weekly data for lookback period."""
@@ -154,13 +393,11 @@ class YahooClient:
             return {}
 
         key = self._cache_key("multi_history", tuple(sorted(symbols)), period, interval)
-        cached = self._get_cached(key)
-        if cached is not None:
-            return cached
+        return self._cached(key, lambda: self._download_multiple(symbols, period, interval))
 
-        self._rate_limit()
+    def _download_multiple(self, symbols: list[str], period: str, interval: str) -> dict[str, pd.DataFrame]:
         try:
-            raw = yf.download(
+            raw = get_gate().download(
                 tickers=symbols,
                 period=period,
                 interval=interval,
@@ -178,7 +415,6 @@ class YahooClient:
                     result[sym] = self.get_history(sym, period, interval)
                 except Exception:
                     result[sym] = pd.DataFrame()
-            self._set_cached(key, result)
             return result
 
         result = {}
@@ -192,8 +428,6 @@ class YahooClient:
         else:
             # Single symbol
             result[symbols[0]] = raw.dropna()
-
-        self._set_cached(key, result)
         return result
 
     def get_quotes(self, symbols: list[str]) -> dict[str, dict]:
@@ -201,16 +435,13 @@ class YahooClient:
         results = {}
         for sym in symbols:
             results[sym.upper()] = self.get_quote(sym)
-            time.sleep(0.05)  # Small delay between quote requests
         return results
 
     def get_quote(self, symbol: str) -> dict:
         """Get comprehensive quote data for a symbol."""
-        key = self._cache_key("quote", symbol)
-        cached = self._get_cached(key)
-        if cached:
-            return cached
+        return self._cached(self._cache_key("quote", symbol), lambda: self._build_quote(symbol), cache_if=bool)
 
+    def _build_quote(self, symbol: str) -> dict:
         info = self.get_info(symbol)
 
         # Calculate returns from history
@@ -236,8 +467,6 @@ class YahooClient:
             **returns,
             "timestamp": time.time()
         }
-
-        self._set_cached(key, quote)
         return quote
 
     def _compute_returns(self, hist: pd.DataFrame) -> dict:
@@ -286,11 +515,10 @@ class YahooClient:
 
     def get_etf_holdings(self, symbol: str, limit: int = 50) -> dict[str, float]:
         """Get ETF top holdings with weights."""
-        key = self._cache_key("etf_holdings", symbol, limit)
-        cached = self._get_cached(key)
-        if cached:
-            return cached
+        return self._cached(self._cache_key("etf_holdings", symbol, limit),
+                            lambda: self._load_etf_holdings(symbol, limit), cache_if=bool)
 
+    def _load_etf_holdings(self, symbol: str, limit: int) -> dict[str, float]:
         ticker = self.get_ticker(symbol)
         holdings = {}
 
@@ -305,8 +533,6 @@ class YahooClient:
                             holdings[sym] = weight
         except Exception:
             pass
-
-        self._set_cached(key, holdings)
         return holdings
 
     def get_fundamentals(self, symbol: str) -> dict:
@@ -334,6 +560,10 @@ class YahooClient:
         """Clear all caches."""
         self._cache.clear()
 
+    def cache_stats(self) -> dict:
+        """Hit/miss/eviction counters and current size of the client cache."""
+        return self._cache.stats()
+
 
 # Singleton instance
 _yahoo_client: Optional[YahooClient] = None
@@ -349,7 +579,9 @@ def get_yahoo_client() -> YahooClient:
             cache_ttl=cfg.yfinance_cache_ttl,
             rate_limit=cfg.yfinance_rate_limit,
             timeout=cfg.yfinance_timeout,
-            retries=cfg.yfinance_retries
+            retries=cfg.yfinance_retries,
+            cache_max_entries=cfg.cache_max_entries,
+            cache_max_mb=cfg.cache_max_mb,
         )
     return _yahoo_client
 
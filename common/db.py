@@ -19,6 +19,8 @@ import json
 import os
 from typing import Any, Dict, List, Optional
 
+from . import metrics
+
 try:
     import psycopg2
     import psycopg2.extras
@@ -32,6 +34,9 @@ DSN = os.environ.get(
     "dbname=project_alpha user=chuck host=localhost",
 )
 
+# Every public call is timed as upstream="postgres", op=<function name>
+_pg = metrics.timed("postgres")
+
 _SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
 
 
@@ -45,6 +50,7 @@ def _connect():
         return None
 
 
+@_pg
 def available() -> bool:
     """True if psycopg2 is importable AND Postgres is reachable."""
     conn = _connect()
@@ -57,6 +63,7 @@ def available() -> bool:
         return False
 
 
+@_pg
 def ensure_schema() -> bool:
     """Create tables if missing (idempotent). Returns True on success."""
     conn = _connect()
@@ -78,6 +85,7 @@ def ensure_schema() -> bool:
 
 
 # ── Portfolio ──────────────────────────────────────────────────────────────
+@_pg
 def get_portfolio(name: str) -> Optional[Dict[str, Any]]:
     """Read a portfolio doc (replaces reading paper_portfolio.json).
 
@@ -149,6 +157,7 @@ def get_portfolio(name: str) -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def write_portfolio(name: str, doc: Dict[str, Any], kind: str = "live") -> bool:
     """Write a portfolio doc (replaces writing paper_portfolio.json). Returns True.
 
@@ -227,6 +236,7 @@ def write_portfolio(name: str, doc: Dict[str, Any], kind: str = "live") -> bool:
 
 
 # ── Strategy output ────────────────────────────────────────────────────────
+@_pg
 def latest_strategy_output(service: str, kind: str) -> Optional[Dict[str, Any]]:
     """Latest payload for a (service, kind) — replaces reading signals/selection/
     blend/alloc JSON. Returns the payload dict, or None."""
@@ -250,6 +260,7 @@ def latest_strategy_output(service: str, kind: str) -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def write_strategy_output(service: str, kind: str, payload: Dict[str, Any],
                           as_of: Optional[str] = None) -> bool:
     """Write a strategy output payload. as_of defaults to today."""
@@ -276,6 +287,7 @@ def write_strategy_output(service: str, kind: str, payload: Dict[str, Any],
 
 
 # ── Strategy returns ───────────────────────────────────────────────────────
+@_pg
 def strategy_returns(strategy_id: str) -> List[float]:
     """The daily return stream for a strategy (replaces strategy_streams.json).
     Fail-open: [] on missing/error."""
@@ -298,6 +310,7 @@ def strategy_returns(strategy_id: str) -> List[float]:
             pass
 
 
+@_pg
 def write_strategy_returns(strategy_id: str, rows: List[Dict[str, Any]]) -> bool:
     """Write a strategy return stream. rows = [{'date', 'return', 'source'}, ...].
     Replaces rows for this strategy (idempotent)."""
@@ -323,6 +336,7 @@ def write_strategy_returns(strategy_id: str, rows: List[Dict[str, Any]]) -> bool
             pass
 
 
+@_pg
 def append_nav(portfolio: str, date: str, nav: float, note: str = "") -> bool:
     """Append a NAV point to a portfolio's history (replaces history array push)."""
     conn = _connect()
@@ -348,6 +362,7 @@ def append_nav(portfolio: str, date: str, nav: float, note: str = "") -> bool:
 
 
 # ── NS-6 enforcement logs (mirrors NS-6_QA/store.py API) ──────────────────
+@_pg
 def upsert_drawdown(date: str, spy_dd, portfolio_dd, budget, remaining,
                     multiplier, vix_level=None, position_drawdowns=None,
                     cross_sectional_corr=None) -> bool:
@@ -381,6 +396,7 @@ def upsert_drawdown(date: str, spy_dd, portfolio_dd, budget, remaining,
             pass
 
 
+@_pg
 def latest_drawdown() -> Optional[Dict[str, Any]]:
     """Most recent drawdown row (dict) or None. Mirrors store.latest()."""
     conn = _connect()
@@ -400,6 +416,7 @@ def latest_drawdown() -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def query_drawdown(days: int = 30) -> List[Dict[str, Any]]:
     """Last N drawdown rows, newest first. Mirrors store.query_window()."""
     conn = _connect()
@@ -418,6 +435,18 @@ def query_drawdown(days: int = 30) -> List[Dict[str, Any]]:
             pass
 
 
+def _bump_performance_version(cur) -> int:
+    """Advance performance_meta.version inside the caller's transaction and
+    return it. The row lock holds until commit, so concurrent writers take
+    versions in commit order and a reader's watermark never skips a row."""
+    cur.execute(
+        "INSERT INTO performance_meta (id, version) VALUES (1, 1) "
+        "ON CONFLICT (id) DO UPDATE SET version = performance_meta.version + 1 "
+        "RETURNING version")
+    return int(cur.fetchone()[0])
+
+
+@_pg
 def upsert_performance(date: str, nav, ret, spy_ret=None, universe_ret=None,
                        contributions=None) -> bool:
     """Upsert one daily performance row. Mirrors store.upsert_performance()."""
@@ -426,13 +455,14 @@ def upsert_performance(date: str, nav, ret, spy_ret=None, universe_ret=None,
         return False
     try:
         with conn, conn.cursor() as cur:
+            seq = _bump_performance_version(cur)
             cur.execute(
                 "INSERT INTO performance_log (date, nav, ret, spy_ret, "
-                " universe_ret, contributions) VALUES (%s,%s,%s,%s,%s,%s) "
+                " universe_ret, contributions, write_seq) VALUES (%s,%s,%s,%s,%s,%s,%s) "
                 "ON CONFLICT (date) DO UPDATE SET nav=EXCLUDED.nav, ret=EXCLUDED.ret, "
                 " spy_ret=EXCLUDED.spy_ret, universe_ret=EXCLUDED.universe_ret, "
-                " contributions=EXCLUDED.contributions",
-                (date, nav, ret, spy_ret, universe_ret, _jsonb(contributions)),
+                " contributions=EXCLUDED.contributions, write_seq=EXCLUDED.write_seq",
+                (date, nav, ret, spy_ret, universe_ret, _jsonb(contributions), seq),
             )
         return True
     except Exception:
@@ -444,6 +474,7 @@ def upsert_performance(date: str, nav, ret, spy_ret=None, universe_ret=None,
             pass
 
 
+@_pg
 def query_performance(limit: int = 1000) -> List[Dict[str, Any]]:
     """Most recent performance rows (newest first). Mirrors store.query_performance()."""
     conn = _connect()
@@ -464,6 +495,70 @@ def query_performance(limit: int = 1000) -> List[Dict[str, Any]]:
             pass
 
 
+@_pg
+def query_performance_since(since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Rows dated on/after `since` (oldest first). Mirrors store.query_performance_since()."""
+    conn = _connect()
+    if conn is None:
+        return []
+    try:
+        with conn, conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+            cur.execute(
+                "SELECT date, nav, ret, spy_ret, universe_ret, contributions "
+                "FROM performance_log WHERE date >= %s ORDER BY date ASC", (since or "0001-01-01",))
+            return [dict(r) for r in cur.fetchall()]
+    except Exception:
+        return []
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@_pg
+def performance_watermark() -> Optional[int]:
+    """performance_meta.version (0 before any write), or None. A primary-key
+    lookup. Mirrors store.performance_watermark()."""
+    conn = _connect()
+    if conn is None:
+        return None
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT version FROM performance_meta WHERE id = 1")
+            row = cur.fetchone()
+            return int(row[0]) if row is not None else 0
+    except Exception:
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@_pg
+def performance_written_since(mark: int) -> Optional[str]:
+    """Earliest date among rows written after `mark` (a range scan on the
+    write_seq index). Mirrors store.performance_written_since()."""
+    conn = _connect()
+    if conn is None:
+        return None
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT MIN(date)::text FROM performance_log "
+                        "WHERE write_seq > %s", (mark,))
+            return cur.fetchone()[0]
+    except Exception:
+        return None
+    finally:
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+@_pg
 def log_circuit_breaker(breaker_type: str, ticker: Optional[str], detail: str) -> bool:
     """Append a circuit-breaker event. Mirrors store.log_circuit_breaker()."""
     conn = _connect()
@@ -487,6 +582,7 @@ def log_circuit_breaker(breaker_type: str, ticker: Optional[str], detail: str) -
             pass
 
 
+@_pg
 def query_breakers(limit: int = 50) -> List[Dict[str, Any]]:
     """Most recent circuit-breaker events (newest first). Mirrors store.query_breakers()."""
     conn = _connect()
@@ -505,6 +601,7 @@ def query_breakers(limit: int = 50) -> List[Dict[str, Any]]:
             pass
 
 
+@_pg
 def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
     """Read a settings row. Mirrors store.get_setting()."""
     conn = _connect()
@@ -524,6 +621,7 @@ def get_setting(key: str, default: Optional[str] = None) -> Optional[str]:
             pass
 
 
+@_pg
 def set_setting(key: str, value: str) -> bool:
     """Upsert a settings row. Mirrors store.set_setting()."""
     conn = _connect()
@@ -554,6 +652,7 @@ def _jsonb(v: Any) -> Any:
 
 
 # ── NS-7 league / volume / selection / meta (mirrors NS-7_QA/store.py) ────
+@_pg
 def upsert_league(ticker: str, league: str, consecutive_compliant: int,
                   consecutive_noncompliant: int, first_seen: str, last_seen: str) -> bool:
     conn = _connect()
@@ -580,6 +679,7 @@ def upsert_league(ticker: str, league: str, consecutive_compliant: int,
             pass
 
 
+@_pg
 def get_league(ticker: str) -> Optional[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -598,6 +698,7 @@ def get_league(ticker: str) -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def league_counts() -> Dict[str, int]:
     conn = _connect()
     if conn is None:
@@ -615,6 +716,7 @@ def league_counts() -> Dict[str, int]:
             pass
 
 
+@_pg
 def all_leagues() -> List[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -632,6 +734,7 @@ def all_leagues() -> List[Dict[str, Any]]:
             pass
 
 
+@_pg
 def upsert_volume_many(rows: List[tuple]) -> int:
     if not rows:
         return 0
@@ -655,6 +758,7 @@ def upsert_volume_many(rows: List[tuple]) -> int:
             pass
 
 
+@_pg
 def volume_series(ticker: str, start: str, end: str) -> List[tuple]:
     conn = _connect()
     if conn is None:
@@ -674,6 +778,7 @@ def volume_series(ticker: str, start: str, end: str) -> List[tuple]:
             pass
 
 
+@_pg
 def avg_daily_volume(ticker: str, as_of: str, window_days: int) -> Optional[float]:
     conn = _connect()
     if conn is None:
@@ -696,6 +801,7 @@ def avg_daily_volume(ticker: str, as_of: str, window_days: int) -> Optional[floa
             pass
 
 
+@_pg
 def volume_coverage(ticker: str) -> tuple:
     conn = _connect()
     if conn is None:
@@ -715,6 +821,7 @@ def volume_coverage(ticker: str) -> tuple:
             pass
 
 
+@_pg
 def save_selection(as_of: str, payload: dict) -> int:
     conn = _connect()
     if conn is None:
@@ -737,6 +844,7 @@ def save_selection(as_of: str, payload: dict) -> int:
             pass
 
 
+@_pg
 def latest_selection() -> Optional[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -759,6 +867,7 @@ def latest_selection() -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def set_meta(key: str, value: str) -> bool:
     conn = _connect()
     if conn is None:
@@ -777,6 +886,7 @@ def set_meta(key: str, value: str) -> bool:
             pass
 
 
+@_pg
 def get_meta(key: str) -> Optional[str]:
     conn = _connect()
     if conn is None:
@@ -796,6 +906,7 @@ def get_meta(key: str) -> Optional[str]:
 
 
 # ── NS-8 signals / tranche / audit (mirrors NS-8_QA/store.py) ─────────────
+@_pg
 def upsert_signal(as_of: str, signals: Dict[str, int], weights: Dict[str, float],
                   version: int, generated_at: str) -> bool:
     conn = _connect()
@@ -819,6 +930,7 @@ def upsert_signal(as_of: str, signals: Dict[str, int], weights: Dict[str, float]
             pass
 
 
+@_pg
 def get_latest_signal() -> Optional[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -844,6 +956,7 @@ def get_latest_signal() -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def get_signal(as_of: str) -> Optional[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -869,6 +982,7 @@ def get_signal(as_of: str) -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def init_tranche_state() -> bool:
     conn = _connect()
     if conn is None:
@@ -892,6 +1006,7 @@ def init_tranche_state() -> bool:
             pass
 
 
+@_pg
 def get_tranche_state() -> List[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -909,6 +1024,7 @@ def get_tranche_state() -> List[Dict[str, Any]]:
             pass
 
 
+@_pg
 def update_tranche_rebalance(tranche_idx: int, next_rebalance: str, last_rebalance: str) -> bool:
     conn = _connect()
     if conn is None:
@@ -927,6 +1043,7 @@ def update_tranche_rebalance(tranche_idx: int, next_rebalance: str, last_rebalan
             pass
 
 
+@_pg
 def log_audit(tranche_idx: int, symbol: str, side: str, qty: float,
               order_id: Optional[str] = None) -> bool:
     conn = _connect()
@@ -950,6 +1067,7 @@ def log_audit(tranche_idx: int, symbol: str, side: str, qty: float,
             pass
 
 
+@_pg
 def get_audit_log(limit: int = 100) -> List[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -968,16 +1086,30 @@ def get_audit_log(limit: int = 100) -> List[Dict[str, Any]]:
 
 
 # ── Regime history (mirrors common/regime_store.py) ───────────────────────
+_REGIME_COLS = ("regime", "confidence", "flags", "cpi_yoy", "gdp_qoq", "unrate", "curve_bp",
+                "baa_aaa_bp", "nfci", "vix", "corr", "wti", "recorded_at")
+
+
+@_pg
 def upsert_regime(date: str, row: Dict[str, Any]) -> bool:
+    return upsert_regime_many([(date, row)]) == 1
+
+
+@_pg
+def upsert_regime_many(rows: List[tuple]) -> int:
+    """rows: [(date, row_dict)] — one transaction, one multi-row statement. Returns count."""
+    if not rows:
+        return 0
     conn = _connect()
     if conn is None:
-        return False
+        return 0
     try:
         with conn, conn.cursor() as cur:
-            cur.execute(
+            psycopg2.extras.execute_values(
+                cur,
                 "INSERT INTO regime_history (date, regime, confidence, flags, "
                 " cpi_yoy, gdp_qoq, unrate, curve_bp, baa_aaa_bp, nfci, vix, corr, wti, recorded_at) "
-                "VALUES (%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s,%s) "
+                "VALUES %s "
                 "ON CONFLICT (date) DO UPDATE SET regime=EXCLUDED.regime, "
                 " confidence=EXCLUDED.confidence, flags=EXCLUDED.flags, "
                 " cpi_yoy=EXCLUDED.cpi_yoy, gdp_qoq=EXCLUDED.gdp_qoq, "
@@ -985,13 +1117,11 @@ def upsert_regime(date: str, row: Dict[str, Any]) -> bool:
                 " baa_aaa_bp=EXCLUDED.baa_aaa_bp, nfci=EXCLUDED.nfci, "
                 " vix=EXCLUDED.vix, corr=EXCLUDED.corr, wti=EXCLUDED.wti, "
                 " recorded_at=EXCLUDED.recorded_at",
-                (date, row.get("regime"), row.get("confidence"), row.get("flags"),
-                 row.get("cpi_yoy"), row.get("gdp_qoq"), row.get("unrate"), row.get("curve_bp"),
-                 row.get("baa_aaa_bp"), row.get("nfci"), row.get("vix"), row.get("corr"),
-                 row.get("wti"), row.get("recorded_at")))
-        return True
+                [(d,) + tuple(r.get(c) for c in _REGIME_COLS) for d, r in rows],
+                page_size=1000)
+        return len(rows)
     except Exception:
-        return False
+        return 0
     finally:
         try:
             conn.close()
@@ -999,6 +1129,7 @@ def upsert_regime(date: str, row: Dict[str, Any]) -> bool:
             pass
 
 
+@_pg
 def latest_regime() -> Optional[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
@@ -1017,6 +1148,7 @@ def latest_regime() -> Optional[Dict[str, Any]]:
             pass
 
 
+@_pg
 def query_regime_window(days: int = 750) -> List[Dict[str, Any]]:
     conn = _connect()
     if conn is None:
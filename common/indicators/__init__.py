@@ -9,13 +9,12 @@ from typing import Optional
 import numpy as np
 import pandas as pd
 
-# Try to import hmmlearn
+# hmmlearn pulls in sklearn + scipy.stats (~1s); probe now, import in fit_hmm()
 try:
-    from hmmlearn.hmm import GaussianHMM
-    HMM_AVAILABLE = True
-except ImportError:
+    import importlib.util
+    HMM_AVAILABLE = importlib.util.find_spec("hmmlearn") is not None
+except (ImportError, ValueError):
     HMM_AVAILABLE = False
-    GaussianHMM = None
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
@@ -86,38 +85,46 @@ def stoch(series: pd.Series, high: pd.Series, low: pd.Series, period: int = 14,
 # Trend Indicators
 # ============================================================================
 
+def true_range(high: pd.Series, low: pd.Series, close: pd.Series) -> pd.Series:
+    """max(high - low, |high - prev close|, |low - prev close|); NaN legs skipped.
+
+    Elementwise, so it works unchanged on date x ticker frames.
+    """
+    prev = close.shift()
+    return np.fmax(np.fmax(high - low, (high - prev).abs()), (low - prev).abs())
+
+
 def adx(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
     """
     Average Directional Index (Wilder's smoothing).
     """
-    tr = pd.concat([
-        high - low,
-        (high - close.shift()).abs(),
-        (low - close.shift()).abs()
-    ], axis=1).max(axis=1)
+    return _adx_atr(high, low, close, period)[0]
+
+
+def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
+    """Average True Range."""
+    return _wilder(true_range(high, low, close), period)
 
+
+def _wilder(x, period):
+    return x.ewm(alpha=1/period, adjust=False, min_periods=period).mean()
+
+
+def _adx_atr(high, low, close, period=14):
+    """(adx, atr) sharing one true-range / ATR pass."""
     dm_plus = (high - high.shift()).clip(lower=0)
     dm_minus = (low.shift() - low).clip(lower=0)
 
     dm_plus = dm_plus.where(dm_plus > dm_minus, 0)
     dm_minus = dm_minus.where(dm_minus > dm_plus, 0)
 
-    atr = tr.ewm(alpha=1/period, adjust=False, min_periods=period).mean()
-    di_plus = 100 * dm_plus.ewm(alpha=1/period, adjust=False, min_periods=period).mean() / atr.replace(0, np.nan)
-    di_minus = 100 * dm_minus.ewm(alpha=1/period, adjust=False, min_periods=period).mean() / atr.replace(0, np.nan)
+    atr_ = _wilder(true_range(high, low, close), period)
+    denom = atr_.replace(0, np.nan)
+    di_plus = 100 * _wilder(dm_plus, period) / denom
+    di_minus = 100 * _wilder(dm_minus, period) / denom
 
     dx = 100 * (di_plus - di_minus).abs() / (di_plus + di_minus).replace(0, np.nan)
-    return dx.ewm(alpha=1/period, adjust=False, min_periods=period).mean()
-
-
-def atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int = 14) -> pd.Series:
-    """Average True Range."""
-    tr = pd.concat([
-        high - low,
-        (high - close.shift()).abs(),
-        (low - close.shift()).abs()
-    ], axis=1).max(axis=1)
-    return tr.ewm(alpha=1/period, adjust=False, min_periods=period).mean()
+    return _wilder(dx, period), atr_
 
 
 def bollinger_bands(series: pd.Series, window: int = 20, num_std: float = 2.0) -> tuple[pd.Series, pd.Series, pd.Series]:
@@ -132,6 +139,10 @@ def bollinger_bands(series: pd.Series, window: int = 20, num_std: float = 2.0) -
 def bb_position(series: pd.Series, window: int = 20, num_std: float = 2.0) -> pd.Series:
     """Bollinger Band position (0 = lower band, 1 = upper band)."""
     middle, upper, lower = bollinger_bands(series, window, num_std)
+    return _band_position(series, upper, lower)
+
+
+def _band_position(series, upper, lower):
     return (series - lower) / (upper - lower).replace(0, np.nan)
 
 
@@ -170,6 +181,8 @@ def fit_hmm(close: pd.Series, n_states: int = 2, n_iter: int = 500, random_state
     if len(returns) < 20:
         return 0, 0.5, [0.5] * len(close)
 
+    from hmmlearn.hmm import GaussianHMM
+
     model = GaussianHMM(
         n_components=n_states,
         covariance_type="full",
@@ -196,6 +209,9 @@ def compute_all(close: pd.Series, high: pd.Series = None, low: pd.Series = None,
     """
     Compute all indicators at once for efficiency.
     Returns dict of Series.
+
+    Every step is a whole-object pandas op, so date x ticker DataFrames go
+    through unchanged (one vectorized pass per indicator) — see compute_panel.
     """
     result = {}
 
@@ -213,17 +229,16 @@ def compute_all(close: pd.Series, high: pd.Series = None, low: pd.Series = None,
     # RSI
     result['rsi'] = rsi(close)
 
-    # Bollinger Bands
+    # Bollinger Bands (position reuses the bands instead of recomputing them)
     middle, upper, lower = bollinger_bands(close)
     result['bb_middle'] = middle
     result['bb_upper'] = upper
     result['bb_lower'] = lower
-    result['bb_position'] = bb_position(close)
+    result['bb_position'] = _band_position(close, upper, lower)
 
-    # ADX / ATR if OHLC provided
+    # ADX / ATR if OHLC provided (one shared true-range pass)
     if high is not None and low is not None:
-        result['adx'] = adx(high, low, close)
-        result['atr'] = atr(high, low, close)
+        result['adx'], result['atr'] = _adx_atr(high, low, close)
 
     # OBV if volume provided
     if volume is not None:
@@ -232,6 +247,48 @@ def compute_all(close: pd.Series, high: pd.Series = None, low: pd.Series = None,
     return result
 
 
+# ============================================================================
+# Panels (date x ticker)
+# ============================================================================
+
+def ohlcv_panels(frames: dict, fields=("close", "high", "low", "volume")) -> dict:
+    """Per-ticker OHLCV frames -> {field: date x ticker DataFrame}.
+
+    Dates are the union across tickers; a ticker's rows before its first bar
+    (or after delisting) are NaN. Fields missing from every frame are omitted.
+    """
+    panels = {}
+    for field in fields:
+        cols = {t: df[field] for t, df in frames.items() if field in df}
+        if cols:
+            panels[field] = pd.DataFrame(cols)
+    return panels
+
+
+def compute_panel(close: pd.DataFrame, high: pd.DataFrame = None, low: pd.DataFrame = None,
+                  volume: pd.DataFrame = None, dtype=np.float64) -> dict:
+    """
+    compute_all() for a whole universe: date x ticker matrices in, one
+    date x ticker DataFrame per indicator out (same keys).
+
+    Column j of every output equals compute_all() on ticker j alone, warm-up
+    NaNs included; leading NaNs (not yet listed) shift that ticker's warm-up
+    exactly as dropping them would. high/low/volume are aligned to close.
+
+    dtype=np.float32 stores the outputs in single precision (half the memory
+    of the feature set); each indicator is still computed in float64.
+    """
+    if not isinstance(close, pd.DataFrame):
+        raise TypeError("compute_panel expects a date x ticker DataFrame; use compute_all for one series")
+    close = close.astype(np.float64)
+    high, low, volume = (None if f is None else f.reindex_like(close).astype(np.float64)
+                         for f in (high, low, volume))
+    result = compute_all(close, high, low, volume)
+    if np.dtype(dtype) != np.float64:
+        result = {k: v.astype(dtype) for k, v in result.items()}
+    return result
+
+
 # ============================================================================
 # Validation / Testing
 # ============================================================================
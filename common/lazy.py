@@ -0,0 +1,74 @@
+"""
+Deferred imports for service entry points.
+
+    pd = lazy_import("pandas")
+    drift = lazy_import("drift")
+
+binds a stand-in module object; the real import happens on first attribute
+access (pd.DataFrame, drift.run_drift_grade) — i.e. inside the first route
+that needs it — so a process serving only dashboards and /health never pays
+for pandas/scipy/sklearn. Attribute writes and deletes are forwarded, so
+monkeypatch.setattr(qa_server.drift, ...) patches the real module.
+
+Each deferred load is recorded in common.metrics (module, seconds, the route
+that triggered it) and shows up in the startup report (/metrics.json
+"startup", lazy_import_seconds in /metrics).
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+import sys
+import time
+import types
+
+from . import metrics
+
+
+class LazyModule(types.ModuleType):
+    """Module stand-in that imports `name` on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_target"] = None
+
+    def _lazy_load(self):
+        mod = self.__dict__["_lazy_target"]
+        if mod is None:
+            name = self.__name__
+            cold = name not in sys.modules
+            start = time.perf_counter()
+            mod = importlib.import_module(name)
+            if cold:
+                metrics.record_lazy_import(name, time.perf_counter() - start)
+            self.__dict__["_lazy_target"] = mod
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._lazy_load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "deferred"
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Stand-in for `import name`; the real module is the one already loaded, if any."""
+    return LazyModule(name)
+
+
+def available(*names: str) -> bool:
+    """True when every module is importable — checked without importing it."""
+    try:
+        return all(importlib.util.find_spec(n) is not None for n in names)
+    except (ImportError, ValueError):
+        return False
@@ -0,0 +1,434 @@
+"""
+Process-wide request / upstream metrics with Prometheus text exposition.
+
+One registry per process (every service is its own process):
+
+  http_request_duration_seconds{method,route}      histogram
+  http_requests_total{method,route,status}         counter
+  http_requests_in_flight                          gauge
+  upstream_request_duration_seconds{upstream,op}   histogram (yahoo/fred/sec/postgres)
+  upstream_errors_total{upstream,op}               counter
+  cache_*{cache}                                   from named common.utils.TTLCache
+  process_startup_seconds{phase}                   init (metrics.init) / ready (mark_ready)
+  lazy_import_seconds{module,route}                deferred imports (common.lazy)
+  + anything registered with register_collector() (e.g. the Yahoo gate)
+
+Servers mix MetricsHandlerMixin into their BaseHTTPRequestHandler and route
+GET /metrics (Prometheus text) and /metrics.json (summary()) to
+send_metrics(). Upstream calls are wrapped in `with upstream("fred"):` or
+decorated with @timed("postgres").
+
+Cost per request is two perf_counter() calls, one lock and a bisect — no
+allocation on the hot path beyond the label tuple. Route labels are capped
+at MAX_ROUTES distinct values (extra paths fold into "other").
+"""
+from __future__ import annotations
+
+import bisect
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+MAX_ROUTES = 200
+
+SERVICE = ""
+_started = time.time()
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram keyed by a label tuple."""
+
+    def __init__(self, name: str, help: str, labels: tuple, buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = tuple(buckets)
+        self._series = {}                 # label tuple -> [bucket counts..., +Inf, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, key: tuple, value: float):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            row = self._series.get(key)
+            if row is None:
+                row = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+            row[i] += 1
+            row[-1] += value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {k: list(v) for k, v in self._series.items()}
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """Monotonic counter keyed by a label tuple."""
+
+    def __init__(self, name: str, help: str, labels: tuple):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: tuple, n: float = 1):
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + n
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return dict(self._values)
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Request latency by route.",
+                            ("method", "route"))
+REQUESTS = Counter("http_requests_total", "Requests by route and status.",
+                   ("method", "route", "status"))
+UPSTREAM_LATENCY = Histogram("upstream_request_duration_seconds",
+                             "Upstream call latency (yahoo, fred, sec, postgres).", ("upstream", "op"))
+UPSTREAM_ERRORS = Counter("upstream_errors_total", "Upstream calls that raised.", ("upstream", "op"))
+
+_inflight = 0
+_lock = threading.Lock()
+_routes = set()
+_collectors = []
+_local = threading.local()             # .route = request being handled on this thread
+_startup = {"init_s": None, "ready_s": None}
+_lazy_loads = {}                       # module -> (seconds, route)
+
+
+def init(service: str):
+    """Name this process's service (shown in summary() and the portal)."""
+    global SERVICE
+    SERVICE = service
+    _startup["init_s"] = round(time.time() - process_start(), 4)
+
+
+def process_start() -> float:
+    """Epoch seconds the OS started this process (Linux /proc), else module load."""
+    try:
+        with open("/proc/self/stat") as fh:
+            ticks = int(fh.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/stat") as fh:
+            btime = next(int(ln.split()[1]) for ln in fh if ln.startswith("btime"))
+        return btime + ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError, StopIteration, AttributeError):
+        return _started
+
+
+def mark_ready() -> dict:
+    """Call right before serve_forever(); returns startup_report()."""
+    _startup["ready_s"] = round(time.time() - process_start(), 4)
+    return startup_report()
+
+
+def record_lazy_import(module: str, seconds: float):
+    """A deferred import finished (common.lazy); first load per module wins."""
+    if module not in _lazy_loads:
+        _lazy_loads[module] = (seconds, getattr(_local, "route", None) or "startup")
+
+
+def startup_report() -> dict:
+    """Time-to-init / time-to-ready and every deferred import with its trigger."""
+    lazy = sorted(_lazy_loads.items(), key=lambda kv: -kv[1][0])
+    return {
+        "service": SERVICE,
+        "process_started": datetime.fromtimestamp(process_start()).isoformat(timespec="seconds"),
+        "init_s": _startup["init_s"],
+        "ready_s": _startup["ready_s"],
+        "modules_loaded": len(sys.modules),
+        "lazy_imports": [{"module": m, "seconds": round(sec, 4), "route": route}
+                         for m, (sec, route) in lazy],
+    }
+
+
+def reset():
+    """Drop every recorded sample (tests)."""
+    global _inflight
+    for m in (REQUEST_LATENCY, REQUESTS, UPSTREAM_LATENCY, UPSTREAM_ERRORS):
+        m.clear()
+    with _lock:
+        _inflight = 0
+        _routes.clear()
+        _lazy_loads.clear()
+
+
+def _route_key(route: str) -> str:
+    if route in _routes:
+        return route
+    with _lock:
+        if len(_routes) >= MAX_ROUTES:
+            return "other"
+        _routes.add(route)
+    return route
+
+
+def _enter():
+    global _inflight
+    with _lock:
+        _inflight += 1
+
+
+def record_request(method: str, route: str, status, seconds: float):
+    """Record one finished request (and release its in-flight slot)."""
+    global _inflight
+    route = _route_key(route)
+    with _lock:
+        _inflight = max(0, _inflight - 1)
+    REQUEST_LATENCY.observe((method, route), seconds)
+    REQUESTS.inc((method, route, str(status or 0)))
+
+
+@contextmanager
+def upstream(name: str, op: str = ""):
+    """Time an upstream call: `with upstream("fred", "observations"): ...`."""
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.inc((name, op))
+        raise
+    finally:
+        UPSTREAM_LATENCY.observe((name, op), time.perf_counter() - start)
+
+
+def timed(name: str, op: str | None = None):
+    """Decorator form of upstream(); op defaults to the function name."""
+    def wrap(fn):
+        label = op if op is not None else fn.__name__
+
+        @functools.wraps(fn)
+        def inner(*args, **kwargs):
+            with upstream(name, label):
+                return fn(*args, **kwargs)
+        return inner
+    return wrap
+
+
+def register_collector(fn):
+    """fn() -> [(name, type, help, [(labels_dict, value), ...])] added at render time."""
+    if fn not in _collectors:
+        _collectors.append(fn)
+    return fn
+
+
+def _cache_families() -> list:
+    utils = sys.modules.get("common.utils")
+    caches = utils.TTLCache.named() if utils is not None and hasattr(utils.TTLCache, "named") else []
+    totals = {}
+    for cache in caches:
+        st = cache.stats()
+        agg = totals.setdefault(st["name"], dict.fromkeys(
+            ("hits", "misses", "evictions", "entries", "bytes", "coalesced"), 0))
+        for k in agg:
+            agg[k] += st.get(k) or 0
+    fams = []
+    for field, kind in (("hits", "counter"), ("misses", "counter"), ("evictions", "counter"),
+                        ("coalesced", "counter"), ("entries", "gauge"), ("bytes", "gauge")):
+        suffix = "_total" if kind == "counter" else ""
+        fams.append((f"cache_{field}{suffix}", kind, f"TTLCache {field}.",
+                     [({"cache": name}, agg[field]) for name, agg in sorted(totals.items())]))
+    return fams
+
+
+# ── exposition ─────────────────────────────────────────────────────────────
+def _esc(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=None) -> str:
+    pairs = [f'{n}="{_esc(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _fmt(v) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+
+def render() -> str:
+    """Prometheus text exposition (version 0.0.4) of every metric."""
+    out = []
+    for h in (REQUEST_LATENCY, UPSTREAM_LATENCY):
+        out += [f"# HELP {h.name} {h.help}", f"# TYPE {h.name} histogram"]
+        for key, row in sorted(h.snapshot().items()):
+            cum = 0
+            for bound, n in zip(h.buckets + (float("inf"),), row[:-1]):
+                cum += n
+                le = 'le="%s"' % _fmt(bound)
+                out.append(f"{h.name}_bucket{_labels(h.labels, key, le)} {cum}")
+            out.append(f"{h.name}_sum{_labels(h.labels, key)} {_fmt(row[-1])}")
+            out.append(f"{h.name}_count{_labels(h.labels, key)} {cum}")
+    for c in (REQUESTS, UPSTREAM_ERRORS):
+        out += [f"# HELP {c.name} {c.help}", f"# TYPE {c.name} counter"]
+        out += [f"{c.name}{_labels(c.labels, k)} {_fmt(v)}" for k, v in sorted(c.snapshot().items())]
+    out += ["# HELP http_requests_in_flight Requests being handled.",
+            "# TYPE http_requests_in_flight gauge", f"http_requests_in_flight {_inflight}",
+            "# HELP process_uptime_seconds Seconds since the metrics module loaded.",
+            "# TYPE process_uptime_seconds gauge",
+            f"process_uptime_seconds {_fmt(round(time.time() - _started, 3))}",
+            "# HELP process_startup_seconds Seconds from process start to init / ready.",
+            "# TYPE process_startup_seconds gauge"]
+    out += [f'process_startup_seconds{{phase="{phase[:-2]}"}} {_fmt(v)}'
+            for phase, v in _startup.items() if v is not None]
+    out += ["# HELP lazy_import_seconds Deferred import cost and the route that paid it.",
+            "# TYPE lazy_import_seconds gauge"]
+    out += [f"lazy_import_seconds{_labels(('module', 'route'), (m, r))} {_fmt(round(sec, 6))}"
+            for m, (sec, r) in sorted(_lazy_loads.items())]
+    families = _cache_families()
+    for fn in list(_collectors):
+        try:
+            families += fn()
+        except Exception:
+            continue                      # fail-open: a broken collector never breaks /metrics
+    for name, kind, help, samples in families:
+        out += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+        for labels, value in samples:
+            out.append(f"{name}{_labels(labels.keys(), labels.values())} {_fmt(value)}")
+    return "\n".join(out) + "\n"
+
+
+def quantile(buckets, row, q: float):
+    """Histogram quantile estimate (linear within the bucket), None when empty."""
+    total = sum(row[:-1])
+    if not total:
+        return None
+    rank, cum, lower = q * total, 0, 0.0
+    for bound, n in zip(tuple(buckets) + (buckets[-1],), row[:-1]):
+        if n and cum + n >= rank:
+            return lower + (bound - lower) * (rank - cum) / n
+        cum += n
+        lower = bound
+    return buckets[-1]
+
+
+def summary(top: int = 10) -> dict:
+    """Compact JSON view for the portal: totals plus the slowest routes."""
+    counts = REQUESTS.snapshot()
+    errors = {}
+    for (method, route, status), n in counts.items():
+        if status.startswith("5"):
+            errors[(method, route)] = errors.get((method, route), 0) + n
+    routes = []
+    for (method, route), row in REQUEST_LATENCY.snapshot().items():
+        n = sum(row[:-1])
+        routes.append({
+            "method": method, "route": route, "count": n,
+            "errors": errors.get((method, route), 0),
+            "mean_ms": round(1000 * row[-1] / n, 2) if n else None,
+            "p50_ms": _ms(quantile(REQUEST_LATENCY.buckets, row, 0.5)),
+            "p95_ms": _ms(quantile(REQUEST_LATENCY.buckets, row, 0.95)),
+        })
+    routes.sort(key=lambda r: (r["p95_ms"] or 0), reverse=True)
+    ups = []
+    for (name, op), row in UPSTREAM_LATENCY.snapshot().items():
+        n = sum(row[:-1])
+        ups.append({"upstream": name, "op": op, "count": n,
+                    "errors": UPSTREAM_ERRORS.snapshot().get((name, op), 0),
+                    "mean_ms": round(1000 * row[-1] / n, 2) if n else None,
+                    "p95_ms": _ms(quantile(UPSTREAM_LATENCY.buckets, row, 0.95))})
+    ups.sort(key=lambda r: r["count"] * (r["mean_ms"] or 0), reverse=True)
+    caches = {}
+    for name, _, _, samples in _cache_families():
+        if name in ("cache_hits_total", "cache_misses_total"):
+            for labels, v in samples:
+                caches.setdefault(labels["cache"], {})[name[6:-6]] = v
+    for c in caches.values():
+        looked = c.get("hits", 0) + c.get("misses", 0)
+        c["hit_rate"] = round(c.get("hits", 0) / looked, 3) if looked else None
+    return {
+        "service": SERVICE,
+        "uptime_s": round(time.time() - _started, 1),
+        "requests": sum(counts.values()),
+        "errors": sum(errors.values()),
+        "in_flight": _inflight,
+        "routes": routes[:top],
+        "upstreams": ups[:top],
+        "caches": caches,
+        "startup": startup_report(),
+    }
+
+
+def _ms(v):
+    return None if v is None else round(1000 * v, 2)
+
+
+class MetricsHandlerMixin:
+    """Per-request timing for BaseHTTPRequestHandler subclasses.
+
+    List it BEFORE the handler base: class Handler(MetricsHandlerMixin,
+    BaseHTTPRequestHandler). Timing starts once the request line parses and
+    ends after do_<METHOD> returns; the status is the first send_response().
+    Override metrics_route() for custom route grouping.
+    """
+
+    _m_start = None
+    _m_status = None
+
+    def handle_one_request(self):
+        self._m_start = None
+        try:
+            super().handle_one_request()
+        finally:
+            _local.route = None
+            if self._m_start is not None:
+                path = getattr(self, "path", "") or ""
+                record_request(self.command or "", self.metrics_route(path.split("?", 1)[0]),
+                               self._m_status, time.perf_counter() - self._m_start)
+                self._m_start = None
+
+    def parse_request(self):
+        ok = super().parse_request()
+        if ok:
+            self._m_status = None
+            self._m_start = time.perf_counter()
+            _local.route = self.path.split("?", 1)[0]
+            _enter()
+        return ok
+
+    def send_response(self, code, message=None):
+        if self._m_status is None:
+            self._m_status = code
+        super().send_response(code, message)
+
+    def metrics_route(self, path: str) -> str:
+        """Low-cardinality route label: /api paths up to 3 segments, other paths
+        up to 2, anything that looks like a file folded into "static"."""
+        parts = path.strip("/").split("/")
+        if parts[0] == "api":
+            return "/" + "/".join(parts[:3])
+        if path.endswith(".json") and path.startswith("/metrics"):
+            return path
+        if "." in parts[-1]:
+            return "static"
+        return "/" + "/".join(parts[:2])
+
+    def send_metrics(self, path: str = "/metrics"):
+        """Serve /metrics (Prometheus text) or /metrics.json (summary())."""
+        if path.endswith(".json"):
+            body = json.dumps(summary()).encode()
+            ctype = "application/json"
+        else:
+            body = render().encode()
+            ctype = "text/plain; version=0.0.4; charset=utf-8"
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
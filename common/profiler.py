@@ -0,0 +1,202 @@
+"""
+On-demand sampling profiler for single HTTP requests.
+
+A profiled request gets a background thread that samples the handler
+thread's Python stack every PROFILE_INTERVAL_MS via sys._current_frames().
+When the request finishes, the samples are written as collapsed stacks
+("root;frame;frame count" per line) — the input format of flamegraph.pl,
+speedscope and inferno. The dump's path is returned in an X-Profile
+response header; the file itself lands once the handler returns.
+
+A request is profiled when:
+  - it comes from localhost and carries `X-Profile: 1` or `?_profile=1`, or
+  - a random draw falls under PROFILE_SAMPLE_RATE (env, default 0 = off).
+
+The `_profile` parameter is stripped from handler.path before dispatch, so
+exact-match routes (`self.path == "/"`) still match a profiled request.
+
+Servers add ProfilingHandlerMixin ahead of MetricsHandlerMixin:
+    class Handler(ProfilingHandlerMixin, MetricsHandlerMixin, BaseHTTPRequestHandler)
+
+Disabled cost is one header lookup, a substring test and a float compare per
+request; no thread is started and nothing is allocated.
+"""
+from __future__ import annotations
+
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+
+from . import metrics
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_PARAM = "_profile"
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0") or 0)
+INTERVAL_S = float(os.environ.get("PROFILE_INTERVAL_MS", "2") or 2) / 1000.0
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+MAX_FILES = 200                    # oldest dumps are pruned past this
+MAX_DEPTH = 128
+
+_LOCAL = ("127.0.0.1", "::1", "::ffff:127.0.0.1")
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def profile_dir() -> str:
+    """PROFILE_DIR, or <tmp>/profiles/<service>."""
+    return PROFILE_DIR or os.path.join(tempfile.gettempdir(), "profiles",
+                                       metrics.SERVICE or "service")
+
+
+def _frame_label(code) -> str:
+    return "%s (%s:%d)" % (code.co_name, os.path.basename(code.co_filename), code.co_firstlineno)
+
+
+class SamplingProfiler:
+    """Samples one thread's stack at a fixed interval until stop()."""
+
+    def __init__(self, thread_id: int, interval: float = None):
+        self.thread_id = thread_id
+        self.interval = interval or INTERVAL_S
+        self.samples = Counter()           # stack tuple (outermost first) -> count
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+        self._labels = {}                  # code object -> label (memo)
+        self.started = self.elapsed = 0.0
+
+    def start(self) -> "SamplingProfiler":
+        self.started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter:
+        self._stop.set()
+        self._thread.join()
+        self.elapsed = time.perf_counter() - self.started
+        return self.samples
+
+    def _run(self):
+        labels = self._labels
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and len(stack) < MAX_DEPTH:
+                code = frame.f_code
+                label = labels.get(code)
+                if label is None:
+                    label = labels[code] = _frame_label(code)
+                stack.append(label)
+                frame = frame.f_back
+            if stack:
+                stack.reverse()
+                self.samples[tuple(stack)] += 1
+
+    def collapsed(self, root: str = "") -> str:
+        """Folded-stack text, heaviest stacks first."""
+        lines = []
+        for stack, n in self.samples.most_common():
+            frames = ([root] if root else []) + [f.replace(";", ",") for f in stack]
+            lines.append("%s %d" % (";".join(frames), n))
+        return "\n".join(lines) + ("\n" if lines else "")
+
+
+_seq = 0
+_seq_lock = threading.Lock()
+
+
+def profile_name(method: str, path: str) -> str:
+    """Unique, sortable dump name for one request."""
+    global _seq
+    with _seq_lock:
+        _seq += 1
+        n = _seq
+    route = _UNSAFE.sub("_", path.split("?", 1)[0].strip("/")) or "root"
+    return "%s_%d-%04d_%s_%s.folded" % (time.strftime("%Y%m%d-%H%M%S"), os.getpid(), n % 10000,
+                                        method, route[:80])
+
+
+def write_profile(prof: SamplingProfiler, method: str, path: str, name: str = None) -> str:
+    """Write prof's stacks under profile_dir(); returns the full path."""
+    out_dir = profile_dir()
+    os.makedirs(out_dir, exist_ok=True)
+    out = os.path.join(out_dir, name or profile_name(method, path))
+    with open(out, "w") as fh:
+        fh.write(prof.collapsed(root="%s %s" % (method, path.split("?", 1)[0])))
+    _prune(out_dir)
+    return out
+
+
+def _prune(out_dir: str):
+    try:
+        files = sorted(f for f in os.listdir(out_dir) if f.endswith(".folded"))
+        for f in files[:-MAX_FILES]:
+            os.remove(os.path.join(out_dir, f))
+    except OSError:
+        pass
+
+
+_PARAM_RE = re.compile(r"([?&])%s=[^&]*&?" % PROFILE_PARAM)
+
+
+def strip_profile_param(path: str) -> str:
+    """path without the ?_profile= opt-in, so exact-match routing still matches."""
+    if PROFILE_PARAM + "=" not in path:
+        return path
+    out = _PARAM_RE.sub(r"\1", path)
+    return out[:-1] if out.endswith(("?", "&")) else out
+
+
+def wants_profile(handler) -> bool:
+    """Opt-in (localhost header / query param) or random sample."""
+    path = getattr(handler, "path", "") or ""
+    forced = handler.headers.get(PROFILE_HEADER) if handler.headers else None
+    if forced or PROFILE_PARAM + "=" in path:
+        if handler.client_address and handler.client_address[0] in _LOCAL:
+            if forced:
+                return forced.strip().lower() not in ("0", "false", "no")
+            return re.search(r"[?&]%s=(1|true|yes)\b" % PROFILE_PARAM, path) is not None
+    return SAMPLE_RATE > 0 and random.random() < SAMPLE_RATE
+
+
+class ProfilingHandlerMixin:
+    """Per-request sampling profiler for BaseHTTPRequestHandler subclasses.
+
+    List it first in the bases. The profiler starts once the request line
+    and headers parse and stops after do_<METHOD> returns; the dump is
+    written after the response is sent.
+    """
+
+    _prof = None
+    _prof_name = None
+
+    def handle_one_request(self):
+        self._prof = None
+        try:
+            super().handle_one_request()
+        finally:
+            prof, self._prof = self._prof, None
+            if prof is not None:
+                prof.stop()
+                try:
+                    write_profile(prof, self.command or "", getattr(self, "path", "") or "",
+                                  self._prof_name)
+                except OSError:
+                    pass                   # a full disk never fails the request
+
+    def parse_request(self):
+        ok = super().parse_request()
+        if ok and wants_profile(self):
+            self._prof_name = profile_name(self.command or "", self.path or "")
+            self._prof = SamplingProfiler(threading.get_ident()).start()
+        if ok and self.path:
+            self.path = strip_profile_param(self.path)      # handlers route on the clean path
+        return ok
+
+    def send_response(self, code, message=None):
+        super().send_response(code, message)
+        if self._prof is not None:
+            self.send_header(PROFILE_HEADER, os.path.join(profile_dir(), self._prof_name))
@@ -9,9 +9,17 @@ FRONTIER: methodology, thresholds, detection logic in regime_model.py.
 
 Design:
   - FRED v1 API via stdlib urllib (py3.9-safe), key from env only.
-  - TTL cache per cadence: daily 1h, weekly 6h, monthly 24h, quarterly 48h.
+  - Persisted series store (common.series_store, SQLite): every FRED series
+    and the Yahoo closes remember their last observation; a refresh asks
+    only for the tail past it, stale series are fetched concurrently, and
+    series still inside their cadence TTL cost no request — also after a
+    restart. TTL per cadence: daily 1h, weekly 6h, monthly 24h, quarterly 48h.
   - Yahoo fetch for VIX/SPY/TLT via yfinance (reuse common/data/yahoo.py
-    pattern).
+    pattern); a short tail once stored, the full 2y again if the provider
+    has re-adjusted history.
+  - Derived panel is persisted too and extended incrementally: only dates
+    from the earliest added/revised input onward are recomputed (with
+    DERIVED_WARMUP_DAYS of input history for the YoY/QoQ/rolling lags).
   - Derived series: CPI_YOY, GDP_QOQ_ANN, UNRATE_3M_CHG, CPI_TREND_3M,
     2S10S, BAA_AAA, USD_MOM_PCT, STOCK_BOND_CORR (60d rolling on NYSE
     trading days only).
@@ -22,13 +30,22 @@ from __future__ import annotations
 
 import json
 import os
+import sys
 import threading
 import time
 import urllib.request
 from datetime import datetime, timedelta
+from pathlib import Path
 
 import pandas as pd
 
+# Repo root so `common.series_store` resolves regardless of the caller's cwd.
+_REPO_ROOT = str(Path(__file__).resolve().parent.parent)
+if _REPO_ROOT not in sys.path:
+    sys.path.insert(0, _REPO_ROOT)
+
+from common import series_store  # noqa: E402
+
 # ── FRED config ─────────────────────────────────────────────────────────
 FRED_API_KEY_ENV = "FRED_API_KEY"
 FRED_OBS_URL = "https://api.stlouisfed.org/fred/series/observations"
@@ -66,6 +83,13 @@ FRED_SERIES = [
 
 SERIES_BY_ID = {s["id"]: s for s in FRED_SERIES}
 
+YAHOO_TICKERS = ["SPY", "TLT", "^VIX"]
+YAHOO_TTL = TTL["Daily"]
+# Input history needed before the first recomputed derived date: CPI_TREND_3M
+# is a 3-month change of a 12-month YoY (~15 months), plus month-end slack.
+DERIVED_WARMUP_DAYS = 500
+DERIVED_PREFIX = "derived:"
+
 # ── Thread-safe cache ───────────────────────────────────────────────────
 _cache: dict = {}
 _lock = threading.Lock()
@@ -106,6 +130,9 @@ def _fetch_fred_series(series_id: str, start_date: str) -> list:
 def get_series(series_id: str, days_back: int = 800) -> list:
     """Cached FRED series observations. TTL per cadence.
 
+    Backed by the persisted series store: an in-process miss reads the store
+    and only goes to FRED (for the tail past the last stored date) when the
+    stored copy is older than the cadence TTL.
     Returns [{date, value}] or [] on failure.
     """
     item = SERIES_BY_ID.get(series_id, {})
@@ -118,7 +145,8 @@ def get_series(series_id: str, days_back: int = 800) -> list:
             return cached[1]
 
     start = (datetime.now() - timedelta(days=days_back)).strftime("%Y-%m-%d")
-    obs = _fetch_fred_series(series_id, start)
+    obs, _ = series_store.refresh(series_id, start, cadence=item.get("cadence"),
+                                  fetch=_fetch_fred_series)
     with _lock:
         _cache[cache_key] = (time.time(), obs)
     return obs
@@ -131,7 +159,8 @@ def _fetch_yahoo_prices(tickers: list, period: str = "2y") -> dict:
     Returns {ticker: pd.Series(index=date, dtype=float)} or empty on failure.
     """
     try:
-        import yfinance as yf
+        import yfinance  # noqa: F401
+        from common.data.yahoo import limited_yf as yf
     except ImportError:
         return {}
     try:
@@ -315,6 +344,117 @@ def _compute_derived_series(fred_data: dict, yahoo_data: dict) -> pd.DataFrame:
     return result
 
 
+def _sync_yahoo(tickers: list = None) -> dict:
+    """Bring the stored Yahoo closes up to date. Returns {ticker: changed_from}.
+
+    Fresh tickers are skipped. Stale ones download the shortest period that
+    overlaps the stored closes (1mo for a daily refresh); if the tail
+    disagrees with stored closes (dividend/split re-adjustment) the full 2y
+    history is fetched and rewritten. Fail-open: stored copy kept.
+    """
+    tickers = tickers or YAHOO_TICKERS
+    keys = {t: "yahoo:" + t for t in tickers}
+    stale = [t for t in tickers if not series_store.is_fresh(keys[t], YAHOO_TTL)]
+    if not stale:
+        return {t: None for t in tickers}
+    stored = [series_store.meta(keys[t]) for t in stale]
+    period = "2y"
+    if all(m and m.get("last_date") for m in stored):
+        period = _yahoo_period(min(m["last_date"] for m in stored))
+    prices = _fetch_yahoo_prices(stale, period=period)
+    if period != "2y" and any(not _tail_matches(keys[t], prices.get(t)) for t in stale):
+        period = "2y"
+        prices = _fetch_yahoo_prices(stale, period=period)
+    changed = {t: None for t in tickers}
+    for t in stale:
+        s = prices.get(t)
+        if s is None or s.empty:
+            continue
+        obs = [{"date": d.strftime("%Y-%m-%d"), "value": float(v)} for d, v in s.items()]
+        changed[t] = series_store.write(
+            keys[t], obs, source="yahoo",
+            replace_from=obs[0]["date"] if period == "2y" else None)
+    return changed
+
+
+# yfinance periods short enough for a tail refresh, with their span in days
+_YAHOO_PERIODS = [("1mo", 28), ("3mo", 89), ("6mo", 180), ("1y", 364)]
+
+
+def _yahoo_period(last_date: str) -> str:
+    """Shortest yfinance period that reaches back past last_date (overlap kept)."""
+    gap = (pd.Timestamp.now() - pd.Timestamp(last_date)).days + 7
+    for period, days in _YAHOO_PERIODS:
+        if gap <= days:
+            return period
+    return "2y"
+
+
+def _tail_matches(key: str, tail) -> bool:
+    """True when a fresh Yahoo tail agrees with the stored closes it overlaps."""
+    if tail is None or tail.empty:
+        return True
+    stored = {o["date"]: o["value"] for o in series_store.read(key, tail.index[0].strftime("%Y-%m-%d"))}
+    for d, v in tail.items():
+        old = stored.get(d.strftime("%Y-%m-%d"))
+        if old is not None and abs(old - float(v)) > 1e-6 * max(1.0, abs(old)):
+            return False
+    return True
+
+
+def _yahoo_from_store(tickers: list = None) -> dict:
+    out = {}
+    for t in tickers or YAHOO_TICKERS:
+        df = _series_to_daily_df(series_store.read("yahoo:" + t), t)
+        if not df.empty:
+            out[t] = df[t].dropna()
+    return out
+
+
+def _store_derived(df: pd.DataFrame, since: str) -> None:
+    """Persist derived columns for dates >= since (rows beyond are replaced)."""
+    tail = df[df.index >= pd.Timestamp(since)]
+    for col in df.columns:
+        obs = [{"date": d.strftime("%Y-%m-%d"), "value": v}
+               for d, v in tail[col].items()]
+        series_store.write(DERIVED_PREFIX + col, obs, start=since,
+                           source="derived", replace_from=since)
+
+
+def _derived_from_store(start: str) -> pd.DataFrame:
+    cols = series_store.read_prefix(DERIVED_PREFIX, start)
+    frames = [_series_to_daily_df(obs, col) for col, obs in cols.items() if obs]
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame()
+    return pd.concat(frames, axis=1).astype(float)
+
+
+def _update_derived(fred_data: dict, yahoo_data: dict, changed_from, start: str) -> pd.DataFrame:
+    """Derived panel from `start`, recomputing only dates >= changed_from.
+
+    changed_from: earliest added/revised input date (None = inputs unchanged).
+    Falls back to a full computation when nothing covering `start` is stored.
+    """
+    marker = series_store.meta(DERIVED_PREFIX + "CPI_YOY")
+    covered = marker is not None and (marker.get("start") or "9999") <= start
+    if covered and changed_from is None:
+        stored = _derived_from_store(start)
+        if not stored.empty:
+            return stored
+    if not covered:
+        changed_from = start
+    since = max(start, changed_from or start)
+    warm = (pd.Timestamp(since) - pd.Timedelta(days=DERIVED_WARMUP_DAYS)).strftime("%Y-%m-%d")
+    fred_tail = {sid: [o for o in obs if o["date"] >= warm] for sid, obs in fred_data.items()}
+    yahoo_tail = {t: s[s.index >= pd.Timestamp(warm)] for t, s in yahoo_data.items()}
+    df = _compute_derived_series(fred_tail, yahoo_tail)
+    if df.empty:
+        return _derived_from_store(start)
+    _store_derived(df, since)
+    return _derived_from_store(start)
+
+
 def fetch_regime_data(days_back: int = 750) -> pd.DataFrame:
     """Fetch all FRED + Yahoo data, compute derived series, return daily panel.
 
@@ -325,22 +465,31 @@ def fetch_regime_data(days_back: int = 750) -> pd.DataFrame:
     if not key:
         return pd.DataFrame()
 
-    # Fetch all 18 FRED series concurrently? No — urllib is sync.
-    # We fetch lazily: only the ones we need for computation.
     # Buffer: derived series need history BEFORE the window (CPI YoY =
     # 12-month lag, GDP QoQ = 1 quarter). Fetch with +400d buffer, trim
     # to the requested window below.
     fetch_days = days_back + 400
-    fred_data = {}
-    for s in FRED_SERIES:
-        sid = s["id"]
-        fred_data[sid] = get_series(sid, days_back=fetch_days)
-
-    # Fetch Yahoo data
-    yahoo_data = _fetch_yahoo_prices(["SPY", "TLT", "^VIX"], period="2y")
+    start = (datetime.now() - timedelta(days=fetch_days)).strftime("%Y-%m-%d")
+
+    # Stale series only, concurrently, each from its last stored date
+    changed = series_store.sync(
+        [(s["id"], None, s["cadence"]) for s in FRED_SERIES], start,
+        fetch=_fetch_fred_series)
+    fred_data = {s["id"]: series_store.read(series_store.series_key(s["id"]), start)
+                 for s in FRED_SERIES}
+
+    # Yahoo data (stored closes, tail-refreshed when stale)
+    changed.update({"yahoo:" + t: c for t, c in _sync_yahoo().items()})
+    yahoo_data = _yahoo_from_store()
+
+    # Nothing stored and nothing fetched (bogus key / FRED down): skip the
+    # derived rebuild entirely.
+    if not fred_data.get("CPIAUCSL") or not fred_data.get("GDPC1"):
+        return pd.DataFrame()
 
-    # Compute derived series
-    df = _compute_derived_series(fred_data, yahoo_data)
+    # Derived series: recompute only from the earliest changed input
+    dirty = [c for c in changed.values() if c]
+    df = _update_derived(fred_data, yahoo_data, min(dirty) if dirty else None, start)
 
     # Fail-open: without the core FRED series (CPI/GDP/UNRATE) there is
     # nothing to classify — a Yahoo-only VIX frame is not a regime panel.
@@ -22,7 +22,9 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 import numpy as np
-import pandas as pd
+
+# pandas is imported inside the two DataFrame helpers: services read
+# REGIME_THETA at startup (NS-5 theta.py) and should not pay for pandas then.
 
 # ── Validated Θ (Phase 0 walk-forward, Hong-approved 2026-08-09) ────────
 # CPI line: Federal Reserve target (2.0%). Calibration confirmed 60/40
@@ -235,6 +237,16 @@ class RegimeClassifier:
             },
         )
 
+    # Flag order in the joined `flags` string — matches classify() step order
+    FLAG_NAMES = (
+        "late cycle", "de-inverting",                          # step 2
+        "credit stress", "NFCI tight (confirm)",
+        "NFCI tight (contradict)",                              # step 3
+        "stagflation risk (WTI)", "USD squeeze",                # step 4
+        "acute (VIX)", "anomalous corr (+in R1/R3)",
+        "anomalous corr (-in R2/R4)",                           # step 5
+    )
+
     def classify_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """Batch-classify a daily panel. Adds columns: regime, confidence,
         flags, growth_above, inflation_above.
@@ -242,22 +254,90 @@ class RegimeClassifier:
         Expects each row to have the columns this classifier reads.
         The caller is responsible for preparing derived series
         (CPI_YOY, 2S10S, etc.) — this method only runs classification.
+
+        Columnar: every rule of classify() is evaluated as a boolean mask over
+        the whole frame (same thresholds, same missing/NaN handling), so the
+        output is identical to classifying row by row, at array speed. To
+        re-label a history after a Θ change, build a classifier with the new
+        Θ and call this once on the full panel.
         """
-        results = []
-        for _, row in df.iterrows():
-            data = row.to_dict()
-            r = self.classify(data)
-            results.append({
-                "regime": r.regime,
-                "confidence": r.confidence,
-                "flags": ",".join(r.flags) if r.flags else "",
-                "growth_above": r.growth_above,
-                "inflation_above": r.inflation_above,
-            })
-        result_df = pd.DataFrame(results, index=df.index)
+        import pandas as pd
+
+        if df.empty:
+            return pd.concat([df, pd.DataFrame([], index=df.index)], axis=1)
+        t = self.t
+        n = len(df)
+
+        def col(name):
+            """Float column, or all-NaN when absent (missing == omitted)."""
+            if name not in df.columns:
+                return np.full(n, np.nan)
+            return pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+
+        with np.errstate(invalid="ignore"):
+            # Step 1 — primary
+            gdp, unrate = col("GDP_QOQ_ANN"), col("UNRATE_3M_CHG")
+            ga = (gdp >= t["gdp_growth_threshold"]) | \
+                 (unrate <= t["unemployment_rising_threshold"])
+            cpi, trend = col("CPI_YOY"), col("CPI_TREND_3M")
+            ia = (cpi >= t["inflation_target_cpi"]) & (np.isnan(trend) | (trend >= -0.05))
+            r1, r2 = ga & ~ia, ga & ia
+            r3, r4 = ~ga & ~ia, ~ga & ia
+            regime = np.select([r1, r2, r3], ["R1", "R2", "R3"], "R4")
+            confidence = np.select([r1, r2, r3], [1.0, 0.9, 0.9], 0.8)
+
+            # Step 2 — monetary overlay (NaN comparisons are False)
+            curve_bp = col("2S10S") * 100
+            late = r1 & (curve_bp < t["yield_curve_inversion_bp"])
+            deinv = r3 & (curve_bp > 0) & \
+                (col("2S10S_60D_AGO") * 100 < t["yield_curve_inversion_bp"])
+            confidence = np.where(late, np.minimum(confidence, 0.7), confidence)
+            confidence = np.where(deinv, np.minimum(confidence, 0.95), confidence)
+
+            # Step 3 — credit
+            stress = col("BAA_AAA") * 100 > t["baa_aaa_spread_stress"]
+            tight = col("NFCI") > t["nfci_tight_threshold"]
+            late_cycle_regime = r3 | r4
+
+            # Step 4 — external
+            stagflation = (col("DCOILWTICO") > t["wti_stagflation_threshold"]) & (r2 | r4)
+            squeeze = np.abs(col("USD_MOM_PCT")) > t["usd_squeeze_pct_monthly"]
+
+            # Step 5 — market
+            corr = col("STOCK_BOND_CORR")
+            acute = col("VIX") > t["vix_crisis_threshold"]
+            anom_pos = (r1 | r3) & (corr > 0.1)
+            anom_neg = (r2 | r4) & (corr < -0.1)
+
+        bits = np.column_stack([
+            late, deinv, stress, tight & late_cycle_regime, tight & ~late_cycle_regime,
+            stagflation, squeeze, acute, anom_pos, anom_neg,
+        ])
+        flags = _join_flags(bits, self.FLAG_NAMES)
+
+        result_df = pd.DataFrame({
+            "regime": regime.tolist(),
+            "confidence": np.round(confidence, 2).tolist(),
+            "flags": flags,
+            "growth_above": ga.tolist(),
+            "inflation_above": ia.tolist(),
+        }, index=df.index)
         return pd.concat([df, result_df], axis=1)
 
 
+def _join_flags(bits: np.ndarray, names) -> list:
+    """Comma-joined flag names per row from a (rows × flags) bool matrix.
+
+    Rows share few distinct flag combinations, so each combination's string
+    is built once and broadcast back.
+    """
+    codes = bits.astype(np.int64) @ (1 << np.arange(bits.shape[1], dtype=np.int64))
+    uniq, inverse = np.unique(codes, return_inverse=True)
+    labels = [",".join(name for k, name in enumerate(names) if (u >> k) & 1)
+              for u in uniq.tolist()]
+    return [labels[i] for i in inverse.ravel().tolist()]
+
+
 # ── Frontier-builder utility ───────────────────────────────────────────
 def filter_regime_returns(
     returns: pd.DataFrame,
@@ -280,6 +360,8 @@ def filter_regime_returns(
     Returns:
         Filtered returns DataFrame, or empty DataFrame if insufficient data.
     """
+    import pandas as pd
+
     if current_regime is None:
         if regime_history.empty:
             return pd.DataFrame()
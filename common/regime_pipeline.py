@@ -4,18 +4,39 @@ NS-5 Regime Pipeline — fetch→classify→store integration.
 Orchestrates the full daily pipeline:
   1. fetch_regime_data() — FRED + Yahoo + derived series
   2. RegimeClassifier.classify_dataframe() — 5-step detection
-  3. Upsert each day into regime_history store
+  3. Bulk-upsert every day into the regime_history store (one transaction)
   4. Return the full regime history DataFarme
 
+relabel_history(theta) re-runs steps 2–4 with new thresholds: the input
+panel comes from the persisted series store (no network when fresh), and
+the whole history is re-classified and re-written in one pass.
+
 JUNIOR (cheap model): mechanics only.
 """
 from __future__ import annotations
 
+import math
+
+import numpy as np
 import pandas as pd
 
 from common.regime_fetcher import fetch_regime_data
-from common.regime_model import RegimeClassifier
-from common.regime_store import query_window, upsert
+from common.regime_model import REGIME_THETA, RegimeClassifier
+from common.regime_store import query_window, upsert_many
+
+# store column -> panel column (curve/spread are stored in bp)
+_STORE_COLUMNS = {
+    "cpi_yoy": "CPI_YOY",
+    "gdp_qoq": "GDP_QOQ_ANN",
+    "unrate": "UNRATE",
+    "curve_bp": "2S10S",
+    "baa_aaa_bp": "BAA_AAA",
+    "nfci": "NFCI",
+    "vix": "VIX",
+    "corr": "STOCK_BOND_CORR",
+    "wti": "DCOILWTICO",
+}
+_BP_COLUMNS = ("curve_bp", "baa_aaa_bp")
 
 
 def run_regime_pipeline(days_back: int = 750) -> pd.DataFrame:
@@ -37,35 +58,64 @@ def run_regime_pipeline(days_back: int = 750) -> pd.DataFrame:
     classifier = RegimeClassifier()
     classified = classifier.classify_dataframe(daily_df)
 
-    # 3. Store each day
-    for idx, row in classified.iterrows():
-        date_str = idx.strftime("%Y-%m-%d") if hasattr(idx, "strftime") else str(idx)[:10]
-        store_row = {
-            "regime": row.get("regime"),
-            "confidence": row.get("confidence"),
-            "flags": row.get("flags", ""),
-            "cpi_yoy": _safe_float(row.get("CPI_YOY")),
-            "gdp_qoq": _safe_float(row.get("GDP_QOQ_ANN")),
-            "unrate": _safe_float(row.get("UNRATE")),
-            "curve_bp": _safe_float(row.get("2S10S", 0) * 100 if row.get("2S10S") else None),
-            "baa_aaa_bp": _safe_float(row.get("BAA_AAA", 0) * 100 if row.get("BAA_AAA") else None),
-            "nfci": _safe_float(row.get("NFCI")),
-            "vix": _safe_float(row.get("VIX")),
-            "corr": _safe_float(row.get("STOCK_BOND_CORR")),
-            "wti": _safe_float(row.get("DCOILWTICO")),
-        }
-        upsert(date_str, store_row)
+    # 3. Store every day in one write
+    upsert_many(store_rows(classified))
 
     # 4. Return full stored history
     return query_window(days=days_back)
 
 
+def relabel_history(theta: dict | None = None, days_back: int = 750) -> pd.DataFrame:
+    """Re-classify the whole stored window under new thresholds and re-store it.
+
+    Args:
+        theta: overrides merged onto REGIME_THETA (None = defaults).
+        days_back: lookback window, as in run_regime_pipeline.
+
+    Returns:
+        DataFrame of regime history (from DB). Empty DataFrame on failure.
+    """
+    daily_df = fetch_regime_data(days_back=days_back)
+    if daily_df.empty:
+        return query_window(days=days_back)
+    classifier = RegimeClassifier({**REGIME_THETA, **(theta or {})})
+    upsert_many(store_rows(classifier.classify_dataframe(daily_df)))
+    return query_window(days=days_back)
+
+
+def store_rows(classified: pd.DataFrame) -> list:
+    """[(YYYY-MM-DD, store row)] for a classified panel, built column-wise."""
+    n = len(classified)
+    if n == 0:
+        return []
+    idx = classified.index
+    dates = (idx.strftime("%Y-%m-%d") if hasattr(idx, "strftime")
+             else [str(i)[:10] for i in idx])
+    cols = {}
+    for key, src in _STORE_COLUMNS.items():
+        if src not in classified.columns:
+            cols[key] = [None] * n
+            continue
+        values = pd.to_numeric(classified[src], errors="coerce").to_numpy(dtype=float)
+        if key in _BP_COLUMNS:
+            # a zero spread is stored as missing, as before
+            values = np.where(values != 0, values * 100, np.nan)
+        cols[key] = [_safe_float(v) for v in values.tolist()]
+    regimes = classified["regime"].tolist()
+    confidences = classified["confidence"].tolist()
+    flags = (classified["flags"].tolist() if "flags" in classified.columns else [""] * n)
+    return [
+        (dates[i], {"regime": regimes[i], "confidence": confidences[i], "flags": flags[i],
+                    **{key: col[i] for key, col in cols.items()}})
+        for i in range(n)
+    ]
+
+
 def _safe_float(val) -> float | None:
     """Convert to float, return None for NaN/inf."""
     if val is None:
         return None
     try:
-        import math
         f = float(val)
         if math.isnan(f) or math.isinf(f):
             return None
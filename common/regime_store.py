@@ -17,7 +17,9 @@ import sqlite3
 import sys
 from pathlib import Path
 
-import pandas as pd
+from .lazy import lazy_import
+
+pd = lazy_import("pandas")      # latest()/writes serve services that never touch pandas
 
 # Store in common/data/ alongside sentiment_db (pattern match)
 DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
@@ -84,6 +86,10 @@ def init_db():
         pass  # fail-open
 
 
+_COLUMNS = ("regime", "confidence", "flags", "cpi_yoy", "gdp_qoq", "unrate",
+            "curve_bp", "baa_aaa_bp", "nfci", "vix", "corr", "wti")
+
+
 def upsert(date: str, row: dict) -> bool:
     """Insert or replace a regime row by date. Returns True on success.
 
@@ -92,43 +98,40 @@ def upsert(date: str, row: dict) -> bool:
         row: dict with keys {regime, confidence, flags, cpi_yoy, gdp_qoq,
              unrate, curve_bp, baa_aaa_bp, nfci, vix, corr, wti}
     """
+    return upsert_many([(date, row)]) == 1
+
+
+def upsert_many(rows) -> int:
+    """Insert or replace many regime rows in one transaction. Returns count written.
+
+    Args:
+        rows: iterable of (date, row) pairs, same shapes as upsert(). A date
+              repeated in the batch keeps its last row.
+    """
+    rows = list(dict(rows).items())
+    if not rows:
+        return 0
+    recorded_at = datetime.datetime.utcnow().isoformat() + "Z"
     if _use_pg():
         try:
             import common.db
-            recorded_at = datetime.datetime.utcnow().isoformat() + "Z"
-            full = dict(row)
-            full["recorded_at"] = recorded_at
-            return bool(common.db.upsert_regime(date, full))
+            full = [(date, dict(row, recorded_at=recorded_at)) for date, row in rows]
+            return int(common.db.upsert_regime_many(full))
         except Exception:
             pass  # fall through to sqlite
     try:
-        recorded_at = datetime.datetime.utcnow().isoformat() + "Z"
         with _connect() as conn:
-            conn.execute(
+            conn.executemany(
                 "INSERT OR REPLACE INTO regime_history "
                 "(date, regime, confidence, flags, cpi_yoy, gdp_qoq, unrate, "
                 " curve_bp, baa_aaa_bp, nfci, vix, corr, wti, recorded_at) "
                 "VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)",
-                (
-                    date,
-                    row.get("regime"),
-                    row.get("confidence"),
-                    row.get("flags"),
-                    row.get("cpi_yoy"),
-                    row.get("gdp_qoq"),
-                    row.get("unrate"),
-                    row.get("curve_bp"),
-                    row.get("baa_aaa_bp"),
-                    row.get("nfci"),
-                    row.get("vix"),
-                    row.get("corr"),
-                    row.get("wti"),
-                    recorded_at,
-                ),
+                [(date,) + tuple(row.get(c) for c in _COLUMNS) + (recorded_at,)
+                 for date, row in rows],
             )
-        return True
+        return len(rows)
     except Exception:
-        return False
+        return 0
 
 
 def query_window(days: int = 750) -> pd.DataFrame:
@@ -80,8 +80,16 @@ def cvar(returns: pd.Series, confidence: float = 0.95) -> float:
     return float(tail.mean()) if len(tail) > 0 else float(var_val)
 
 
-def risk_parity_weights(cov_matrix: pd.DataFrame) -> pd.Series:
-    """Risk parity weights (inverse volatility)."""
+def risk_parity_weights(cov_matrix) -> pd.Series:
+    """Risk parity weights (inverse volatility).
+
+    Takes a covariance DataFrame or a factor_cov.FactorCovariance (diagonal
+    read in O(n·k), indexed by its names).
+    """
+    from .factor_cov import FactorCovariance
+    if isinstance(cov_matrix, FactorCovariance):
+        inv_vol = 1 / np.sqrt(cov_matrix.diag())
+        return pd.Series(inv_vol / inv_vol.sum(), index=cov_matrix.names)
     inv_vol = 1 / np.sqrt(np.diag(cov_matrix))
     weights = inv_vol / inv_vol.sum()
     return pd.Series(weights, index=cov_matrix.index)
@@ -0,0 +1,170 @@
+"""common.risk.correlation — all-pairs rolling correlation from window sums.
+
+pandas `rolling().corr()` builds a (date × ticker, ticker) MultiIndex frame
+one pair at a time, and callers then walk it date by date. This engine
+computes every pair in one pass from rolling cross-product sums (cumulative
+sums differenced at the window edge) and returns a compact (date, pair)
+array, so threshold and convergence rules reduce to vectorized masks.
+
+Two estimators:
+  moments="pairwise"  Pearson over the observations where both series are
+                      present (pandas rolling corr / np.corrcoef semantics).
+  moments="marginal"  E_w[ab] − μ_a·μ_b over (σ_a·σ_b, ddof=1), each moment
+                      over its own valid observations with its own
+                      min_periods — the NS-5 environment estimator.
+
+For the pairwise estimator inputs are demeaned per column before summing
+(it is shift-invariant), which keeps the differenced cumulative sums well
+conditioned. The marginal estimator is only shift-invariant on gap-free
+data, so it sums the raw values. Pure numpy; the DataFrame helpers take/return pandas objects.
+"""
+from typing import Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+PAIR_CHUNK = 4096          # pairs per block (bounds memory to T × PAIR_CHUNK)
+
+
+def pair_indices(n: int, diagonal: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Upper-triangle (i, j) index arrays for n series, i < j (i <= j with diagonal)."""
+    return np.triu_indices(n, 0 if diagonal else 1)
+
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-row sums of a (T, K) array (partial windows at the start)."""
+    c = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=c[1:])
+    ends = np.arange(1, x.shape[0] + 1)
+    return c[ends] - c[np.maximum(ends - window, 0)]
+
+
+def _pairwise_block(x, valid, li, ri, window, min_periods):
+    a, b = x[:, li], x[:, ri]
+    m = valid[:, li] & valid[:, ri]
+    a = np.where(m, a, 0.0)
+    b = np.where(m, b, 0.0)
+    n = _window_sums(m.astype(float), window)
+    sa, sb = _window_sums(a, window), _window_sums(b, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        var_a = _window_sums(a * a, window) - sa * sa / n
+        var_b = _window_sums(b * b, window) - sb * sb / n
+        cov = _window_sums(a * b, window) - sa * sb / n
+        corr = cov / np.sqrt(var_a * var_b)
+    bad = (n < min_periods) | (var_a <= 0) | (var_b <= 0) | ~np.isfinite(corr)
+    corr[bad] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _marginal_block(x, valid, li, ri, window, min_periods, series):
+    n_s, mu_s, sd_s = series
+    m = valid[:, li] & valid[:, ri]
+    n_ab = _window_sums(m.astype(float), window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        e_ab = _window_sums(np.where(m, x[:, li] * x[:, ri], 0.0), window) / n_ab
+        e_ab[n_ab < min_periods] = np.nan
+        corr = (e_ab - mu_s[:, li] * mu_s[:, ri]) / (sd_s[:, li] * sd_s[:, ri])
+    corr[~np.isfinite(corr)] = np.nan
+    return corr
+
+
+def _marginal_moments(x, valid, window, min_periods):
+    """Per-series rolling count, mean and ddof=1 std (NaN below min_periods)."""
+    xz = np.where(valid, x, 0.0)
+    n = _window_sums(valid.astype(float), window)
+    s = _window_sums(xz, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mu = s / n
+        var = (_window_sums(xz * xz, window) - s * mu) / (n - 1)
+    short = n < min_periods
+    mu[short] = np.nan
+    var[short | (n < 2)] = np.nan
+    return n, mu, np.sqrt(np.maximum(var, 0.0))
+
+
+def rolling_pair_corr(values, window: int, min_periods: Optional[int] = None,
+                      pairs: Optional[Tuple[Sequence[int], Sequence[int]]] = None,
+                      moments: str = "pairwise") -> np.ndarray:
+    """Rolling correlation for every pair at once. Returns a (T, P) float array.
+
+    values: (T, N) array-like, NaN = missing. pairs: (left, right) column
+    index arrays (default: all i < j). min_periods defaults to `window`.
+    Rows/pairs without enough observations (or a flat series) are NaN.
+    """
+    x = np.asarray(values, dtype=float)
+    if x.ndim != 2:
+        raise ValueError("values must be a 2-D (dates × series) array")
+    if moments not in ("pairwise", "marginal"):
+        raise ValueError(f"unknown moments estimator: {moments!r}")
+    min_periods = window if min_periods is None else max(int(min_periods), 1)
+    left, right = pair_indices(x.shape[1]) if pairs is None else pairs
+    left, right = np.asarray(left, dtype=int), np.asarray(right, dtype=int)
+
+    valid = np.isfinite(x)
+    if moments == "pairwise":
+        counts = valid.sum(axis=0)
+        x = x - np.where(valid, x, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    x = np.where(valid, x, 0.0)
+    series = _marginal_moments(x, valid, window, min_periods) if moments == "marginal" else None
+
+    out = np.empty((x.shape[0], len(left)))
+    for lo in range(0, len(left), PAIR_CHUNK):
+        li, ri = left[lo:lo + PAIR_CHUNK], right[lo:lo + PAIR_CHUNK]
+        if moments == "pairwise":
+            out[:, lo:lo + len(li)] = _pairwise_block(x, valid, li, ri, window, min_periods)
+        else:
+            out[:, lo:lo + len(li)] = _marginal_block(x, valid, li, ri, window, min_periods, series)
+    return out
+
+
+def rolling_pair_frame(returns: pd.DataFrame, window: int, min_periods: Optional[int] = None,
+                       moments: str = "pairwise") -> pd.DataFrame:
+    """rolling_pair_corr over a returns frame: date index × (a, b) pair columns, a before b."""
+    cols = list(returns.columns)
+    left, right = pair_indices(len(cols))
+    corr = rolling_pair_corr(returns.to_numpy(dtype=float), window, min_periods,
+                             (left, right), moments)
+    columns = pd.MultiIndex.from_arrays([[cols[i] for i in left], [cols[j] for j in right]])
+    return pd.DataFrame(corr, index=returns.index, columns=columns)
+
+
+def pair_matrix_frame(returns: pd.DataFrame, window: int,
+                      min_periods: Optional[int] = None) -> pd.DataFrame:
+    """Full (date, ticker) × ticker matrices in the `returns.rolling().corr()` layout."""
+    cols = list(returns.columns)
+    n, t = len(cols), len(returns)
+    left, right = pair_indices(n, diagonal=True)
+    corr = rolling_pair_corr(returns.to_numpy(dtype=float), window, min_periods, (left, right))
+    diag = left == right
+    corr[:, diag] = np.where(np.isnan(corr[:, diag]), np.nan, 1.0)
+    full = np.empty((t, n, n))
+    full[:, left, right] = corr
+    full[:, right, left] = corr
+    index = pd.MultiIndex.from_product([returns.index, cols],
+                                       names=[returns.index.name, returns.columns.name])
+    return pd.DataFrame(full.reshape(t * n, n), index=index,
+                        columns=pd.Index(cols, name=returns.columns.name))
+
+
+def anchor_mean(pair_frame: pd.DataFrame, anchor, members: Iterable) -> pd.Series:
+    """Per-date mean correlation of `anchor` against `members` from a pair frame.
+
+    Pairs are matched in either orientation; members absent from the frame are
+    ignored, and a date with any NaN member correlation averages to NaN.
+    """
+    cols = []
+    for m in members:
+        if (anchor, m) in pair_frame.columns:
+            cols.append((anchor, m))
+        elif (m, anchor) in pair_frame.columns:
+            cols.append((m, anchor))
+    if not cols:
+        return pd.Series(np.nan, index=pair_frame.index)
+    return pair_frame[cols].mean(axis=1, skipna=False)
+
+
+def threshold_mask(values, threshold: float, above: bool = True, absolute: bool = False):
+    """Boolean mask of values beyond `threshold` (NaN never triggers)."""
+    v = np.abs(values) if absolute else values
+    with np.errstate(invalid="ignore"):
+        return (v > threshold) if above else (v < threshold)
@@ -0,0 +1,174 @@
+"""common.risk.factor_cov — low-rank-plus-diagonal (factor model) covariance.
+
+    Σ = B·F·Bᵀ + diag(d)      B: n × k loadings, F: k × k factor covariance,
+                              d: n specific variances
+
+A dense sample or Ledoit-Wolf Σ is n² numbers, costs O(n²) per w'Σw and
+O(n³) per solve, and is rank-deficient once names outnumber observations
+(500 S&P names, 2 years of history). FactorCovariance stores O(n·k), and
+every operation the optimizers need is linear in n:
+
+  matvec(x)  Σx = B(F(Bᵀx)) + d∘x                          O(n·k)
+  quad(w)    w'Σw = (Bᵀw)'F(Bᵀw) + Σ dᵢwᵢ²                  O(n·k)
+  solve(b)   Σ⁻¹b by Woodbury, one k × k solve              O(n·k + k³)
+  diag()     per-name variance                             O(n·k)
+
+Estimators:
+  statistical_factor_cov(returns, n_factors)   principal components of the
+      return panel (SVD of the T × n matrix — O(T²·n) for T < n)
+  fundamental_factor_cov(returns, factors)     time-series OLS of each name
+      on observed factor returns (e.g. NS-5 MKT/SMB/HML/MOM/DUR)
+
+quad_form / cov_matvec / cov_solve / cov_diag accept either a dense ndarray
+or a FactorCovariance, so optimizers take both without branching.
+"""
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+SPECIFIC_FLOOR = 1e-10     # specific variance floor (keeps D invertible)
+
+
+class FactorCovariance:
+    """Σ = B·F·Bᵀ + diag(d), held as its factors."""
+
+    def __init__(self, loadings, factor_cov, specific,
+                 names: Optional[Sequence[str]] = None):
+        self.loadings = np.asarray(loadings, dtype=float)          # n × k
+        self.factor_cov = np.asarray(factor_cov, dtype=float)      # k × k
+        self.specific = np.maximum(np.asarray(specific, dtype=float), SPECIFIC_FLOOR)
+        self.names = list(names) if names is not None else None
+
+    @property
+    def shape(self):
+        n = len(self.specific)
+        return (n, n)
+
+    def __len__(self):
+        return len(self.specific)
+
+    @property
+    def n_factors(self) -> int:
+        return self.loadings.shape[1]
+
+    def scaled(self, c: float) -> "FactorCovariance":
+        """c·Σ (e.g. 252 to annualize a daily estimate)."""
+        return FactorCovariance(self.loadings, self.factor_cov * c, self.specific * c, self.names)
+
+    def subset(self, idx) -> "FactorCovariance":
+        """Σ restricted to the names at positions idx."""
+        idx = np.asarray(idx)
+        names = [self.names[i] for i in idx] if self.names is not None else None
+        return FactorCovariance(self.loadings[idx], self.factor_cov, self.specific[idx], names)
+
+    def diag(self) -> np.ndarray:
+        return ((self.loadings @ self.factor_cov) * self.loadings).sum(axis=1) + self.specific
+
+    def matvec(self, x) -> np.ndarray:
+        x = np.asarray(x, dtype=float)
+        d = self.specific if x.ndim == 1 else self.specific[:, None]
+        return self.loadings @ (self.factor_cov @ (self.loadings.T @ x)) + d * x
+
+    __matmul__ = matvec
+
+    def quad(self, w) -> float:
+        w = np.asarray(w, dtype=float)
+        f = self.loadings.T @ w
+        return float(f @ self.factor_cov @ f + (self.specific * w * w).sum())
+
+    def solve(self, b) -> np.ndarray:
+        """Σ⁻¹b via Woodbury: D⁻¹b − D⁻¹B(I + F·BᵀD⁻¹B)⁻¹F·BᵀD⁻¹b.
+
+        This form never inverts F, so a singular factor covariance is fine.
+        """
+        b = np.asarray(b, dtype=float)
+        dinv = 1.0 / self.specific
+        if b.ndim > 1:
+            dinv = dinv[:, None]
+        y = dinv * b
+        bt_dinv_b = self.loadings.T @ (self.loadings / self.specific[:, None])   # k × k
+        inner = np.eye(self.n_factors) + self.factor_cov @ bt_dinv_b
+        z = np.linalg.solve(inner, self.factor_cov @ (self.loadings.T @ y))
+        return y - dinv * (self.loadings @ z)
+
+    def dense(self) -> np.ndarray:
+        """The full n × n matrix (small universes / tests only)."""
+        return self.loadings @ self.factor_cov @ self.loadings.T + np.diag(self.specific)
+
+    def __array__(self, dtype=None, copy=None):
+        out = self.dense()
+        return out.astype(dtype) if dtype is not None else out
+
+
+def _panel(returns) -> np.ndarray:
+    x = returns.to_numpy(dtype=float) if isinstance(returns, pd.DataFrame) else np.asarray(returns, float)
+    mean = np.nanmean(x, axis=0)
+    return np.where(np.isnan(x), 0.0, x - mean)         # missing → the column mean
+
+
+def statistical_factor_cov(returns, n_factors: int = 10) -> FactorCovariance:
+    """PCA factor model of a T × n return panel (daily units).
+
+    Loadings are the top n_factors principal directions scaled by their
+    singular values (F = I); specific variance is each name's sample
+    variance minus its factor part, floored at SPECIFIC_FLOOR.
+    """
+    x = _panel(returns)
+    t, n = x.shape
+    k = max(1, min(n_factors, n - 1, t - 1))
+    _, s, vt = np.linalg.svd(x, full_matrices=False)
+    loadings = vt[:k].T * (s[:k] / np.sqrt(t - 1))
+    total = (x * x).sum(axis=0) / (t - 1)
+    specific = total - (loadings * loadings).sum(axis=1)
+    names = list(returns.columns) if isinstance(returns, pd.DataFrame) else None
+    return FactorCovariance(loadings, np.eye(k), specific, names)
+
+
+def fundamental_factor_cov(returns, factor_returns) -> FactorCovariance:
+    """Factor model from observed factor returns (same T rows as returns).
+
+    Each name is regressed on the factors with an intercept (one lstsq for
+    the whole panel); F is the factors' sample covariance and d the residual
+    variance (ddof = k + 1).
+    """
+    x = _panel(returns)
+    f = _panel(factor_returns)
+    t, k = f.shape
+    design = np.column_stack([np.ones(t), f])
+    coef, *_ = np.linalg.lstsq(design, x, rcond=None)
+    resid = x - design @ coef
+    specific = (resid * resid).sum(axis=0) / max(1, t - k - 1)
+    factor_cov = np.atleast_2d(np.cov(f, rowvar=False))
+    names = list(returns.columns) if isinstance(returns, pd.DataFrame) else None
+    return FactorCovariance(coef[1:].T, factor_cov, specific, names)
+
+
+# ── Dense-or-factor helpers ──────────────────────────────────────────────
+
+def quad_form(cov, w) -> float:
+    """w'Σw."""
+    if isinstance(cov, FactorCovariance):
+        return cov.quad(w)
+    w = np.asarray(w, dtype=float)
+    return float(w @ cov @ w)
+
+
+def cov_matvec(cov, x) -> np.ndarray:
+    """Σx."""
+    return cov.matvec(x) if isinstance(cov, FactorCovariance) else np.asarray(cov) @ x
+
+
+def cov_diag(cov) -> np.ndarray:
+    """Per-name variances."""
+    return cov.diag() if isinstance(cov, FactorCovariance) else np.diag(cov)
+
+
+def cov_solve(cov, b) -> np.ndarray:
+    """Σ⁻¹b; a singular dense Σ gets the minimum-norm (pseudo-inverse) answer."""
+    if isinstance(cov, FactorCovariance):
+        return cov.solve(b)
+    try:
+        return np.linalg.solve(cov, b)
+    except np.linalg.LinAlgError:
+        return np.linalg.lstsq(cov, b, rcond=None)[0]
@@ -0,0 +1,247 @@
+"""common.risk.montecarlo — forward-looking VaR / CVaR / drawdown for a whole book.
+
+Simulates the held portfolio jointly, scenario × day, from one of two models
+fitted on a date × ticker daily-return panel:
+
+  model="bootstrap"  stationary block bootstrap of historical days — every
+                     name moves with its real cross-section on the sampled day
+  model="factor"     r = μ + B·f + ε from a FactorCovariance (common.risk.
+                     factor_cov); optional Student-t tails (df)
+
+Only the book's own return is ever materialized: bootstrap draws index the
+historical portfolio-return series, and the factor model draws k factors plus
+the aggregate specific term w'ε ~ N(0, Σ wᵢ²dᵢ), so a scenario-day costs O(k),
+not O(names).
+
+Stress overlays (Stress, STRESS_PRESETS) apply on top of either model:
+  vol_mult  scale every deviation from the mean (VIX-spike regimes)
+  corr      push pairwise correlations toward 1 by this fraction, keeping
+            each name's vol: r ← √(1−ρ)·r + √ρ·(Σ wᵢσᵢ)·z, z common
+  shock     one-off day-1 return per ticker (or one number for every name)
+
+Output surfaces, per horizon h (trading days):
+  var[h][c], cvar[h][c]   c-confidence VaR and CVaR of the h-day book return
+                          (return space, ≤ 0 for a loss, like common.risk.var)
+  drawdown_prob[h][x]     P(max drawdown within h days ≥ x)
+
+Scenarios run in chunks of CHUNK on a thread pool (numpy releases the GIL in
+the draws, matmuls and scans); each chunk has its own SeedSequence child, so
+results depend on `seed`, never on the worker count. VaR/CVaR are streamed
+exactly: each horizon keeps only the smallest ⌊(1−c_min)·(N−1)⌋+2 returns (and
+ties) seen so far, merged chunk by chunk with np.partition, so memory is bounded by
+workers × CHUNK × horizon plus the tail buffers.
+"""
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .factor_cov import statistical_factor_cov
+
+CHUNK = 5000                          # scenarios per work unit
+DEFAULT_HORIZONS = (1, 5, 21, 63)
+DEFAULT_CONFIDENCE = (0.95, 0.99)
+DEFAULT_DD_THRESHOLDS = (0.05, 0.10, 0.20)
+
+
+class Stress:
+    """A stress overlay: vol multiplier, correlation break, day-1 shock."""
+
+    def __init__(self, name: str = "custom", vol_mult: float = 1.0, corr: float = 0.0,
+                 shock=None):
+        self.name = name
+        self.vol_mult = float(vol_mult)
+        self.corr = min(max(float(corr), 0.0), 1.0)
+        self.shock = shock                  # None | float | {ticker: return}
+
+    def to_dict(self) -> Dict:
+        return {"name": self.name, "vol_mult": self.vol_mult, "corr": self.corr,
+                "shock": self.shock}
+
+
+STRESS_PRESETS = {
+    "vix_spike": Stress("vix_spike", vol_mult=2.5),
+    "corr_break": Stress("corr_break", corr=0.6),
+    "crash": Stress("crash", vol_mult=2.0, corr=0.5, shock=-0.07),
+}
+
+
+def resolve_stress(stress) -> Optional[Stress]:
+    """None | preset name | dict of Stress kwargs | Stress → Stress or None."""
+    if stress is None or isinstance(stress, Stress):
+        return stress
+    if isinstance(stress, str):
+        if stress not in STRESS_PRESETS:
+            raise ValueError(f"unknown stress preset: {stress}")
+        return STRESS_PRESETS[stress]
+    return Stress(**stress)
+
+
+class _Model:
+    """What a chunk needs: how to draw (m, H) daily book returns."""
+
+    def __init__(self, returns: pd.DataFrame, weights: np.ndarray, model: str,
+                 block: int, n_factors: int, df: Optional[float],
+                 stress: Optional[Stress]):
+        x = returns.to_numpy(dtype=float)
+        x = np.where(np.isnan(x), 0.0, x)
+        self.kind = model
+        self.block = max(1, int(block))
+        self.df = df
+        self.stress = stress
+        self.mu = float(x.mean(axis=0) @ weights)
+        if model == "bootstrap":
+            self.hist = x @ weights                          # historical book returns
+        elif model == "factor":
+            fc = statistical_factor_cov(x, n_factors)
+            self.exposure = fc.loadings.T @ weights          # k
+            self.factor_chol = np.linalg.cholesky(
+                fc.factor_cov + 1e-18 * np.eye(fc.n_factors))
+            self.spec_sd = math.sqrt(float((fc.specific * weights * weights).sum()))
+        else:
+            raise ValueError(f"unknown model: {model}")
+        sd = x.std(axis=0, ddof=1) if len(x) > 1 else np.zeros(x.shape[1])
+        self.common_sd = float(np.abs(weights) @ sd)         # Σ|wᵢ|σᵢ for corr breaks
+        shock = stress.shock if stress is not None else None
+        if isinstance(shock, dict):
+            self.shock = float(sum(weights[i] * float(shock.get(t, 0.0))
+                                   for i, t in enumerate(returns.columns)))
+        else:
+            self.shock = float(shock or 0.0) * float(weights.sum())
+
+    def draw(self, rng: np.random.Generator, m: int, horizon: int) -> np.ndarray:
+        if self.kind == "bootstrap":
+            n = len(self.hist)
+            nb = -(-horizon // self.block)
+            starts = rng.integers(0, n, size=(m, nb, 1))
+            idx = (starts + np.arange(self.block)).reshape(m, -1)[:, :horizon] % n
+            dev = self.hist[idx] - self.mu
+        else:
+            k = len(self.exposure)
+            z = rng.standard_normal((m, horizon, k)) @ self.factor_chol.T
+            dev = z @ self.exposure + self.spec_sd * rng.standard_normal((m, horizon))
+            if self.df:
+                dev *= np.sqrt((self.df - 2) / rng.chisquare(self.df, size=(m, horizon)))
+        s = self.stress
+        if s is not None:
+            if s.vol_mult != 1.0:
+                dev *= s.vol_mult
+            if s.corr > 0:
+                common = self.common_sd * (s.vol_mult or 1.0) * rng.standard_normal((m, horizon))
+                dev = math.sqrt(1 - s.corr) * dev + math.sqrt(s.corr) * common
+        r = self.mu + dev
+        if self.shock:
+            r[:, 0] += self.shock
+        return r
+
+
+def _run_chunk(model: _Model, seed_seq, m: int, horizons: Sequence[int],
+               thresholds: Sequence[float]):
+    rng = np.random.default_rng(seed_seq)
+    h_max = max(horizons)
+    r = model.draw(rng, m, h_max)
+    wealth = np.cumprod(1.0 + r, axis=1)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=1), 1.0)
+    max_dd = np.maximum.accumulate(1.0 - wealth / peak, axis=1)
+    cols = [h - 1 for h in horizons]
+    horizon_ret = wealth[:, cols] - 1.0                      # (m, n_horizons)
+    dd = max_dd[:, cols]
+    dd_counts = np.stack([(dd >= x).sum(axis=0) for x in thresholds], axis=1)
+    return horizon_ret, dd_counts, horizon_ret.sum(axis=0)
+
+
+def _keep_smallest(buf: Optional[np.ndarray], new: np.ndarray, k: int) -> np.ndarray:
+    """Per column, the k smallest values of buf ∪ new, sorted, NaN-padded.
+
+    Every value tied with the k-th smallest is kept too: bootstrap paths
+    repeat historical days, and CVaR averages every return ≤ VaR.
+    """
+    both = new if buf is None else np.concatenate([buf, new])
+    if len(both) <= k:
+        return both
+    keep = both <= np.partition(both, k - 1, axis=0)[k - 1]
+    return np.sort(np.where(keep, both, np.nan), axis=0)[:keep.sum(axis=0).max()]
+
+
+def simulate_book_risk(returns: pd.DataFrame, weights, n_scenarios: int = 50000,
+                       horizons: Iterable[int] = DEFAULT_HORIZONS,
+                       confidence: Iterable[float] = DEFAULT_CONFIDENCE,
+                       dd_thresholds: Iterable[float] = DEFAULT_DD_THRESHOLDS,
+                       model: str = "factor", stress=None, seed: int = 0,
+                       block: int = 5, n_factors: int = 10, df: Optional[float] = None,
+                       workers: Optional[int] = None, chunk: Optional[int] = None) -> Dict:
+    """Monte Carlo VaR / CVaR / drawdown-probability surfaces for a weighted book.
+
+    returns: date × ticker daily returns (history for the model fit);
+    weights: {ticker: weight} or a Series — tickers without history are
+    reported under "unmodeled" and held flat (cash-like). Weights are used as
+    given (they need not sum to 1; the remainder is flat cash).
+
+    Raises ValueError for n_scenarios < 1 or a Student-t df ≤ 2 (no finite
+    variance to rescale to).
+    """
+    n_scenarios = int(n_scenarios)
+    if n_scenarios < 1:
+        raise ValueError(f"n_scenarios must be >= 1, got {n_scenarios}")
+    if df is not None and df <= 2:
+        raise ValueError(f"df must be > 2, got {df}")
+    horizons = sorted({int(h) for h in horizons if int(h) > 0})
+    confidence = sorted({float(c) for c in confidence})
+    thresholds = sorted({float(x) for x in dd_thresholds})
+    weights = pd.Series(weights, dtype=float)
+    cols = [t for t in weights.index if t in returns.columns]
+    unmodeled = [t for t in weights.index if t not in returns.columns]
+    hist = returns[cols].dropna(how="all")
+    if not cols or len(hist) < 20 or not horizons:
+        return {"error": "insufficient return history for the book",
+                "unmodeled": unmodeled}
+    stress = resolve_stress(stress)
+    mdl = _Model(hist, weights[cols].to_numpy(), model, block, n_factors, df, stress)
+
+    chunk = max(1, int(chunk or CHUNK))
+    sizes = [min(chunk, n_scenarios - lo) for lo in range(0, n_scenarios, chunk)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    q_min = 1.0 - confidence[0]
+    k = min(n_scenarios, int(q_min * (n_scenarios - 1)) + 2)
+
+    tail, dd_counts, ret_sum = None, np.zeros((len(horizons), len(thresholds))), 0.0
+    workers = workers or min(len(sizes), os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        for horizon_ret, counts, s in ex.map(
+                lambda a: _run_chunk(mdl, a[0], a[1], horizons, thresholds),
+                zip(seeds, sizes)):
+            tail = _keep_smallest(tail, horizon_ret, k)
+            dd_counts += counts
+            ret_sum = ret_sum + s
+
+    tail = np.sort(tail, axis=0)                           # NaN padding sorts last
+    var_s, cvar_s, dd_s = {}, {}, {}
+    for j, h in enumerate(horizons):
+        var_s[h], cvar_s[h] = {}, {}
+        for c in confidence:
+            pos = (1.0 - c) * (n_scenarios - 1)              # np.quantile 'linear'
+            lo = int(pos)
+            hi = min(lo + 1, len(tail) - 1)
+            v = float(tail[lo, j] + (pos - lo) * (tail[hi, j] - tail[lo, j]))
+            t = tail[:, j][tail[:, j] <= v]
+            var_s[h][c] = round(v, 6)
+            cvar_s[h][c] = round(float(t.mean()) if len(t) else v, 6)
+        dd_s[h] = {x: round(float(dd_counts[j, i]) / n_scenarios, 6)
+                   for i, x in enumerate(thresholds)}
+    return {
+        "model": model,
+        "n_scenarios": n_scenarios,
+        "horizons": horizons,
+        "expected_return": {h: round(float(ret_sum[j]) / n_scenarios, 6)
+                            for j, h in enumerate(horizons)},
+        "var": var_s,
+        "cvar": cvar_s,
+        "drawdown_prob": dd_s,
+        "stress": stress.to_dict() if stress is not None else None,
+        "n_names": len(cols),
+        "history_days": int(len(hist)),
+        "unmodeled": unmodeled,
+    }
@@ -0,0 +1,268 @@
+"""common.risk.panel — every risk metric for every column of a return panel.
+
+The single-series functions in `common.risk` (sharpe_ratio, sortino_ratio,
+max_drawdown, var, cvar, kelly_fraction) take one pd.Series; callers looping
+them over strategies × tickers × windows pay one pandas round-trip per cell.
+This module takes a date × asset return DataFrame and answers for all columns
+at once:
+
+  summary(returns)            one row per column: sharpe, sortino, volatility,
+                              max_drawdown, var, cvar, kelly — same numbers as
+                              the single-series functions
+  rolling_metrics(returns, w) {metric: date × asset DataFrame} over trailing
+                              windows of w returns
+
+Moments come from window sums (cumulative sums differenced at the window
+edge, NaN-aware counts), the trailing peak for rolling drawdown from a
+block prefix/suffix running max (van Herk / Gil-Werman, O(T) per column for
+any window), and rolling VaR/CVaR/max-drawdown from sorted or scanned window
+views processed in bounded chunks (CHUNK_CELLS).
+
+NaN returns are missing observations: skipped by the moments and quantiles,
+a flat day for the wealth path behind drawdowns.
+"""
+from statistics import NormalDist
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+ANN = 252                  # matches sharpe_ratio / sortino_ratio / volatility
+CHUNK_CELLS = 1 << 22      # window-view cells materialized per chunk
+
+
+def _frame(returns) -> pd.DataFrame:
+    return returns.to_frame() if isinstance(returns, pd.Series) else returns
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(1 - confidence)
+
+
+# ── Full-sample panel (pandas column ops) ────────────────────────────────
+
+def sharpe(returns: pd.DataFrame, risk_free: float = 0.0) -> pd.Series:
+    """Annualized Sharpe per column (sharpe_ratio semantics: NaN on zero std)."""
+    excess = _frame(returns) - risk_free / ANN
+    std = excess.std()
+    return (np.sqrt(ANN) * excess.mean() / std.where(std != 0)).astype(float)
+
+
+def sortino(returns: pd.DataFrame, risk_free: float = 0.0) -> pd.Series:
+    """Annualized Sortino per column (downside deviation of the negative days)."""
+    returns = _frame(returns)
+    excess = returns - risk_free / ANN
+    down = returns.where(returns < 0).std()
+    return (np.sqrt(ANN) * excess.mean() / down.where(down != 0)).astype(float)
+
+
+def volatility(returns: pd.DataFrame, annualize: bool = True) -> pd.Series:
+    vol = _frame(returns).std()
+    return vol * np.sqrt(ANN) if annualize else vol
+
+
+def wealth(returns: pd.DataFrame) -> pd.DataFrame:
+    """Growth of 1 per column; a missing return is a flat day."""
+    return (1.0 + _frame(returns).fillna(0.0)).cumprod()
+
+
+def max_drawdown(prices: pd.DataFrame) -> pd.Series:
+    """Maximum drawdown per column, in percent (max_drawdown semantics)."""
+    prices = _frame(prices)
+    return ((prices - prices.cummax()) / prices.cummax()).min() * 100
+
+
+def var(returns: pd.DataFrame, confidence: float = 0.95) -> pd.Series:
+    """Parametric VaR per column: mean + z·std (common.risk.var)."""
+    returns = _frame(returns)
+    return returns.mean() + _z(confidence) * returns.std()
+
+
+def cvar(returns: pd.DataFrame, confidence: float = 0.95) -> pd.Series:
+    """Mean of the returns at or below the parametric VaR (common.risk.cvar)."""
+    returns = _frame(returns)
+    v = var(returns, confidence)
+    tail = returns.where(returns.le(v, axis=1)).mean()
+    return tail.fillna(v)
+
+
+def kelly(returns: pd.DataFrame) -> pd.Series:
+    """kelly_fraction from each column's win rate and average win / average loss."""
+    returns = _frame(returns)
+    wins, losses = returns.where(returns > 0), returns.where(returns < 0)
+    n = returns.count()
+    win_rate = wins.count() / n.where(n > 0)
+    ratio = wins.mean().fillna(0.0) / (-losses.mean()).fillna(0.0).abs()   # no losses → inf
+    f = (win_rate - (1 - win_rate) / ratio).clip(lower=0.0)
+    return f.where(ratio > 0, 0.0).fillna(0.0)
+
+
+def summary(returns: pd.DataFrame, risk_free: float = 0.0,
+            confidence: float = 0.95) -> pd.DataFrame:
+    """One row per column with every full-sample metric.
+
+    max_drawdown is taken on the growth-of-1 path starting at 1 (the level
+    before the first return), in percent like common.risk.max_drawdown.
+    """
+    returns = _frame(returns)
+    w = wealth(returns)
+    start = pd.DataFrame(1.0, index=[0], columns=returns.columns)
+    return pd.DataFrame({
+        "sharpe": sharpe(returns, risk_free),
+        "sortino": sortino(returns, risk_free),
+        "volatility": volatility(returns),
+        "max_drawdown": max_drawdown(pd.concat([start, w], ignore_index=True)),
+        "var": var(returns, confidence),
+        "cvar": cvar(returns, confidence),
+        "kelly": kelly(returns),
+    })
+
+
+# ── Rolling panel (numpy window engines) ─────────────────────────────────
+
+def _window_sums(x: np.ndarray, window: int) -> np.ndarray:
+    """Trailing `window`-row sums of a (T, K) array (partial windows at the start)."""
+    c = np.zeros((x.shape[0] + 1,) + x.shape[1:])
+    np.cumsum(x, axis=0, out=c[1:])
+    ends = np.arange(1, x.shape[0] + 1)
+    return c[ends] - c[np.maximum(ends - window, 0)]
+
+
+def _moments(x: np.ndarray, window: int):
+    """(count, mean, sample std) over trailing windows, skipping NaN."""
+    valid = ~np.isnan(x)
+    z = np.where(valid, x, 0.0)
+    shift = z[0] if len(z) else 0.0              # std is shift-invariant; keeps sums small
+    z = np.where(valid, z - shift, 0.0)
+    n = _window_sums(valid.astype(float), window)
+    s1 = _window_sums(z, window)
+    s2 = _window_sums(z * z, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / n
+        ss = np.maximum(s2 - s1 * mean, 0.0)
+        std = np.sqrt(ss / (n - 1))
+    std[n < 2] = np.nan
+    return n, mean + shift, std
+
+
+def sliding_max(x: np.ndarray, window: int) -> np.ndarray:
+    """Max over the trailing `window` rows of a (T, K) array, O(T·K) for any window.
+
+    Rows before the first full window see only what is available. Blocks of
+    `window` rows get a prefix and a suffix running max; each window spans at
+    most two blocks, so its max is max(suffix[start], prefix[end]).
+    """
+    t, k = x.shape
+    pad = np.full((window - 1, k), -np.inf)
+    a = np.concatenate([pad, x])
+    nb = -(-len(a) // window)
+    blocks = np.full((nb * window, k), -np.inf)
+    blocks[:len(a)] = a
+    blocks = blocks.reshape(nb, window, k)
+    prefix = np.maximum.accumulate(blocks, axis=1).reshape(-1, k)
+    suffix = np.maximum.accumulate(blocks[:, ::-1], axis=1)[:, ::-1].reshape(-1, k)
+    ends = np.arange(window - 1, window - 1 + t)
+    return np.maximum(suffix[ends - window + 1], prefix[ends])
+
+
+def _windows(x: np.ndarray, window: int, fill: float):
+    """Yield (row_slice, views[rows, K, window]) over front-padded trailing windows."""
+    t, k = x.shape
+    padded = np.concatenate([np.full((window - 1, k), fill), x])
+    view = np.lib.stride_tricks.sliding_window_view(padded, window, axis=0)
+    step = max(1, CHUNK_CELLS // max(1, k * window))
+    for lo in range(0, t, step):
+        yield slice(lo, min(t, lo + step)), view[lo:lo + step]
+
+
+def _tail(x: np.ndarray, window: int, confidence: float, method: str,
+          var_path: Optional[np.ndarray] = None):
+    """Rolling (VaR, CVaR) arrays; the CVaR is the mean of window returns <= VaR."""
+    t, k = x.shape
+    v_out = np.full((t, k), np.nan)
+    c_out = np.full((t, k), np.nan)
+    q = 1 - confidence
+    for rows, win in _windows(x, window, np.nan):
+        if method == "historical":
+            s = np.sort(win, axis=-1)                 # NaN sorts last
+            n = (~np.isnan(s)).sum(axis=-1)
+            pos = q * np.maximum(n - 1, 0)
+            lo = np.floor(pos).astype(int)
+            hi = np.minimum(lo + 1, np.maximum(n - 1, 0))
+            a = np.take_along_axis(s, lo[..., None], -1)[..., 0]
+            b = np.take_along_axis(s, hi[..., None], -1)[..., 0]
+            v = a + (pos - lo) * (b - a)              # np.percentile 'linear'
+        else:
+            s = win
+            v = var_path[rows]
+        with np.errstate(invalid="ignore"):
+            hit = s <= v[..., None]
+        cnt = hit.sum(axis=-1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = np.where(hit, s, 0.0).sum(axis=-1) / cnt
+        v_out[rows] = v
+        c_out[rows] = np.where(cnt > 0, c, v)
+    return v_out, c_out
+
+
+def _max_dd(w: np.ndarray, window: int) -> np.ndarray:
+    """Worst peak-to-trough (fraction) inside each trailing window of wealth points."""
+    out = np.empty(w.shape)
+    for rows, win in _windows(w, window, 1.0):
+        peak = np.maximum.accumulate(win, axis=-1)
+        out[rows] = (win / peak - 1.0).min(axis=-1)
+    return out
+
+
+def rolling_metrics(returns: pd.DataFrame, window: int, risk_free: float = 0.0,
+                    confidence: float = 0.95, min_periods: Optional[int] = None,
+                    var_method: str = "parametric") -> Dict[str, pd.DataFrame]:
+    """Every metric over trailing `window`-return windows, for every column.
+
+    Keys: sharpe, sortino, volatility (annualized), var, cvar, drawdown (from
+    the window's peak to today), max_drawdown (worst inside the window); the
+    drawdowns are fractions (≤ 0), measured on the growth-of-1 path including
+    the level before the window's first return. var_method "parametric"
+    matches common.risk.var/cvar; "historical" is the empirical quantile
+    (np.percentile, linear) of the window. Cells with fewer than min_periods
+    (default: window) returns are NaN.
+    """
+    returns = _frame(returns)
+    x = returns.to_numpy(dtype=float)
+    min_periods = min_periods or window
+    n, mean, std = _moments(x, window)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ex = mean - risk_free / ANN
+        sharpe_ = np.where(std > 0, np.sqrt(ANN) * ex / std, np.nan)
+        _, _, down = _moments(np.where(x < 0, x, np.nan), window)
+        sortino_ = np.where(down > 0, np.sqrt(ANN) * ex / down, np.nan)
+    vol_ = std * np.sqrt(ANN)
+    par_var = mean + _z(confidence) * std
+    var_, cvar_ = _tail(x, window, confidence, var_method, par_var)
+
+    w = np.concatenate([np.ones((1, x.shape[1])), np.cumprod(1.0 + np.nan_to_num(x), axis=0)])
+    peak = sliding_max(w, window + 1)[1:]
+    dd_ = w[1:] / peak - 1.0
+    mdd_ = _max_dd(w, window + 1)[1:]
+
+    short = n < min_periods
+    out = {}
+    for name, arr in (("sharpe", sharpe_), ("sortino", sortino_), ("volatility", vol_),
+                      ("var", var_), ("cvar", cvar_), ("drawdown", dd_),
+                      ("max_drawdown", mdd_)):
+        arr = np.where(short, np.nan, arr)
+        out[name] = pd.DataFrame(arr, index=returns.index, columns=returns.columns)
+    return out
+
+
+def rolling_var(returns: pd.DataFrame, window: int, confidence: float = 0.95,
+                method: str = "historical",
+                min_periods: Optional[int] = None) -> pd.DataFrame:
+    """Rolling VaR alone (historical by default), date × asset."""
+    returns = _frame(returns)
+    x = returns.to_numpy(dtype=float)
+    n, mean, std = _moments(x, window)
+    v, _ = _tail(x, window, confidence, method, mean + _z(confidence) * std)
+    v[n < (min_periods or window)] = np.nan
+    return pd.DataFrame(v, index=returns.index, columns=returns.columns)
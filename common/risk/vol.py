@@ -1,15 +1,26 @@
 """common.risk.vol — shared ex-ante volatility (MOP 2012 §2.4).
 
-EWMA variance with a configurable center-of-mass, annualized. Pure stdlib, no
-service config import — callers pass `delta` and `ann` (or use the defaults).
-This is the single source of truth for ex-ante vol across NS-8 (R8 inverse-vol
+EWMA variance with a configurable center-of-mass, annualized. No service
+config import — callers pass `delta` and `ann` (or use the defaults). This is
+the single source of truth for ex-ante vol across NS-8 (R8 inverse-vol
 sizing) and NS-X (risk-adjusted momentum), replacing the two byte-identical
 `NS-*_QA/vol.py` copies.
 
+Three forms of the same estimator:
+  ewma_var / exante_vol  one list of returns → one number (reference, stdlib)
+  EWMAVol                streaming state over k series, O(k) per new day,
+                         checkpointable via to_state()/from_state()
+  ewma_var_panel         T×k returns → T×k variance path in one vectorized pass
+`window` (EWMAVol, ewma_var_panel) limits the estimate to the trailing
+`window` returns, i.e. ewma_var(returns[-window:]).
+
 delta default: 60/61 → 60-trading-day center of mass (MOP convention).
 ann  default: 261 trading days/year.
 """
-from typing import List, Optional
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
 
 DEFAULT_DELTA = 60 / 61
 DEFAULT_ANN = 261
@@ -43,3 +54,139 @@ def exante_vol(daily_returns: List[float],
     """Annualized ex-ante volatility (sqrt of EWMA var), or None if no estimate."""
     v = ewma_var(daily_returns, delta, ann)
     return v ** 0.5 if v is not None and v >= 0 else None
+
+
+class EWMAVol:
+    """Streaming EWMA variance for k return series, carried forward one day at a time.
+
+    Keeps the decayed sums Σw·x and Σw·x² of each series' returns, shifted by
+    the first return seen (variance is shift-invariant; the shift keeps a flat
+    series exactly at zero). With a `window`, the return leaving the window is
+    dropped from the sums through a ring of the last `window` returns.
+
+    update(row) takes one day's returns (scalar or k values, finite);
+    var()/vol() give the annualized estimate per series (NaN below min_periods).
+    """
+
+    def __init__(self, n_series: int = 1, delta: Optional[float] = None,
+                 ann: Optional[float] = None, window: Optional[int] = None):
+        self.n_series = n_series
+        self.delta = delta if delta is not None else DEFAULT_DELTA
+        self.ann = ann if ann is not None else DEFAULT_ANN
+        self.window = window
+        self.count = 0
+        self._shift = None
+        self._sx = np.zeros(n_series)                   # Σ w·x
+        self._sxx = np.zeros(n_series)                  # Σ w·x²
+        self._x = np.zeros((window, n_series)) if window else None  # ring
+        self._drop = (1 - self.delta) * self.delta ** window if window else 0.0
+
+    def update(self, row) -> None:
+        r = np.asarray(row, dtype=float).reshape(self.n_series)
+        if self._shift is None:
+            self._shift = r.copy()
+        x = r - self._shift
+        d = self.delta
+        self._sx = d * self._sx + (1 - d) * x
+        self._sxx = d * self._sxx + (1 - d) * x * x
+        if self.window:
+            slot = self.count % self.window
+            if self.count >= self.window:               # x[slot] leaves the window
+                old = self._x[slot]
+                self._sx -= self._drop * old
+                self._sxx -= self._drop * old * old
+            self._x[slot] = x
+        self.count += 1
+
+    def extend(self, rows) -> "EWMAVol":
+        for row in rows:
+            self.update(row)
+        return self
+
+    def var(self, min_periods: int = 3) -> np.ndarray:
+        out = np.full(self.n_series, np.nan)
+        if self.count < max(3, min_periods):
+            return out
+        m = min(self.count, self.window) if self.window else self.count
+        wsum = 1.0 - self.delta ** m
+        mean = self._sx / wsum
+        out[:] = np.maximum(self.ann * (self._sxx / wsum - mean * mean), 0.0)
+        return out
+
+    def vol(self, min_periods: int = 3) -> np.ndarray:
+        return np.sqrt(self.var(min_periods))
+
+    def to_state(self) -> Dict:
+        """JSON-safe checkpoint; from_state() resumes exactly where this left off."""
+        return {
+            "n_series": self.n_series, "delta": self.delta, "ann": self.ann,
+            "window": self.window, "count": self.count,
+            "shift": None if self._shift is None else self._shift.tolist(),
+            "sx": self._sx.tolist(), "sxx": self._sxx.tolist(),
+            "ring": None if self._x is None else self._x.tolist(),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "EWMAVol":
+        est = cls(state["n_series"], state["delta"], state["ann"], state["window"])
+        est.count = state["count"]
+        if state["shift"] is not None:
+            est._shift = np.asarray(state["shift"], dtype=float)
+        est._sx = np.asarray(state["sx"], dtype=float)
+        est._sxx = np.asarray(state["sxx"], dtype=float)
+        if state["ring"] is not None:
+            est._x = np.asarray(state["ring"], dtype=float).reshape(est._x.shape)
+        return est
+
+
+def _decayed_sum(x: np.ndarray, delta: float) -> np.ndarray:
+    """S_t = δ·S_{t-1} + (1-δ)·x_t down axis 0, in closed-form blocks.
+
+    Within a block S_{t0+j} = δ^{j+1}·S_{t0-1} + (1-δ)·δ^j·Σ_{i≤j} δ^{-i}·x_{t0+i};
+    blocks are short enough that δ^{-i} stays below ~1e4.
+    """
+    out = np.empty_like(x)
+    block = max(1, min(256, int(9.2 / -math.log(delta)))) if 0 < delta < 1 else 1
+    j = np.arange(block, dtype=float)
+    up = (delta ** -j)[:, None]
+    down = (delta ** j)[:, None]
+    carry = np.zeros(x.shape[1:])
+    for t0 in range(0, len(x), block):
+        n = min(block, len(x) - t0)
+        part = (1 - delta) * down[:n] * np.cumsum(up[:n] * x[t0:t0 + n], axis=0)
+        part += delta * down[:n] * carry
+        out[t0:t0 + n] = part
+        carry = part[-1]
+    return out
+
+
+def ewma_var_panel(returns, delta: Optional[float] = None, ann: Optional[float] = None,
+                   window: Optional[int] = None, min_periods: int = 3) -> np.ndarray:
+    """Annualized EWMA variance path for a T×k panel of oldest-first returns.
+
+    Row t equals ewma_var(returns[:t+1, j]) per column j (or its trailing
+    `window` returns); NaN while fewer than min_periods returns are in. A 1-D
+    input gives a length-T path. Returns must be finite.
+    """
+    delta = delta if delta is not None else DEFAULT_DELTA
+    ann = ann if ann is not None else DEFAULT_ANN
+    r = np.asarray(returns, dtype=float)
+    flat = r.ndim == 1
+    r = r.reshape(len(r), -1)
+    out = np.full(r.shape, np.nan)
+    if len(r):
+        x = r - r[0]
+        sx = _decayed_sum(x, delta)
+        sxx = _decayed_sum(x * x, delta)
+        count = np.arange(1, len(r) + 1)
+        if window:
+            lag = delta ** window
+            sx[window:] -= lag * sx[:-window].copy()
+            sxx[window:] -= lag * sxx[:-window].copy()
+            count = np.minimum(count, window)
+        wsum = (1.0 - delta ** count)[:, None]
+        mean = sx / wsum
+        var = np.maximum(ann * (sxx / wsum - mean * mean), 0.0)
+        live = np.arange(1, len(r) + 1) >= max(3, min_periods)
+        out[live] = var[live]
+    return out[:, 0] if flat else out
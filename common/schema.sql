@@ -118,8 +118,19 @@ CREATE TABLE IF NOT EXISTS performance_log (
     ret           DOUBLE PRECISION,
     spy_ret       DOUBLE PRECISION,
     universe_ret  DOUBLE PRECISION,
-    contributions JSONB
+    contributions JSONB,
+    write_seq     BIGINT NOT NULL DEFAULT 0    -- performance_meta.version of the last write
 );
+ALTER TABLE performance_log ADD COLUMN IF NOT EXISTS write_seq BIGINT NOT NULL DEFAULT 0;
+CREATE INDEX IF NOT EXISTS performance_log_write_seq_idx ON performance_log (write_seq);
+
+-- Write watermark for performance_log: bumped in the same transaction as every
+-- upsert; the row lock orders writers, so versions commit in sequence.
+CREATE TABLE IF NOT EXISTS performance_meta (
+    id      SMALLINT PRIMARY KEY CHECK (id = 1),
+    version BIGINT NOT NULL
+);
+INSERT INTO performance_meta (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
 
 -- ── NS-7 (from ns7.db) ─────────────────────────────────────────────────
 CREATE TABLE IF NOT EXISTS ns7_league (
@@ -0,0 +1,282 @@
+"""
+Persisted observation store for macro series (FRED, Yahoo closes, derived).
+
+Both FRED consumers (common.regime_fetcher for /api/regime and the NS-5
+pipeline, Sequoia macro.py for /api/macro) used to hold observations only in
+an in-process TTL cache, so every restart and every TTL expiry re-pulled each
+series' full lookback window one request at a time. This store keeps every
+observation in SQLite with per-series bookkeeping:
+
+  series(key PK, source, start, last_date, checked_at)
+  observations(key, date, value)  PK (key, date)
+
+  - key is "<series_id>:<units>" (units '' for the raw series), matching the
+    macro cache key; Yahoo closes use "yahoo:<ticker>", derived columns
+    "derived:<column>".
+  - refresh() skips the network while the last check is inside the cadence
+    TTL, even across restarts. A stale series is re-requested only from
+    last_date minus a revision overlap (OVERLAP_DAYS), not its whole window.
+  - sync() refreshes many series concurrently on a bounded worker pool.
+  - write() reports the earliest date whose value was added or revised, so
+    callers can rebuild derived series from that point only.
+
+fetch_fred() is the default transport. FRED_OBS_URL is module-level (and
+env-overridable) so tests can point it at a stub HTTP endpoint. Fail-open:
+a failed fetch keeps the stored copy and leaves the series due for retry.
+
+JUNIOR (cheap model): mechanics only.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from . import metrics
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+DB_PATH = os.path.join(DATA_DIR, "series_store.db")
+
+FRED_API_KEY_ENV = "FRED_API_KEY"
+FRED_OBS_URL = os.environ.get("FRED_OBS_URL",
+                              "https://api.stlouisfed.org/fred/series/observations")
+
+# Per-cadence freshness TTL (seconds) — same values as the in-process caches
+TTL = {"Daily": 3600, "Weekly": 21600, "Monthly": 86400, "Quarterly": 172800}
+DEFAULT_TTL = 3600
+# Re-request this many days before last_date so revisions are picked up
+OVERLAP_DAYS = {"Daily": 10, "Weekly": 35, "Monthly": 190, "Quarterly": 370}
+DEFAULT_OVERLAP = 10
+DEFAULT_WORKERS = 8
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    key        TEXT PRIMARY KEY,
+    source     TEXT,
+    start      TEXT,          -- earliest observation_start requested (YYYY-MM-DD)
+    last_date  TEXT,          -- newest stored observation
+    checked_at REAL           -- unix time of the last successful fetch
+);
+CREATE TABLE IF NOT EXISTS observations (
+    key   TEXT NOT NULL,
+    date  TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (key, date)
+) WITHOUT ROWID;
+"""
+
+_write_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Get a DB connection (creates dir + schema if missing)."""
+    os.makedirs(os.path.dirname(DB_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(DB_PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def series_key(series_id: str, units: str | None = None) -> str:
+    return f"{series_id}:{units or ''}"
+
+
+def meta(key: str) -> dict | None:
+    """Bookkeeping row for a key, or None when never stored."""
+    try:
+        conn = _connect()
+        try:
+            row = conn.execute(
+                "SELECT key, source, start, last_date, checked_at FROM series WHERE key = ?",
+                (key,)).fetchone()
+        finally:
+            conn.close()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    return dict(zip(("key", "source", "start", "last_date", "checked_at"), row))
+
+
+def read(key: str, start: str | None = None) -> list:
+    """Stored observations [{date, value}] oldest first (value None = missing)."""
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT date, value FROM observations WHERE key = ? AND date >= ? ORDER BY date",
+                (key, start or "")).fetchall()
+        finally:
+            conn.close()
+    except Exception:
+        return []
+    return [{"date": d, "value": v} for d, v in rows]
+
+
+def read_prefix(prefix: str, start: str | None = None) -> dict:
+    """{key_suffix: [{date, value}]} for every key starting with `prefix`."""
+    out: dict = {}
+    try:
+        conn = _connect()
+        try:
+            rows = conn.execute(
+                "SELECT key, date, value FROM observations "
+                "WHERE key >= ? AND key < ? AND date >= ? ORDER BY key, date",
+                (prefix, prefix + "\uffff", start or "")).fetchall()
+        finally:
+            conn.close()
+    except Exception:
+        return out
+    for key, d, v in rows:
+        out.setdefault(key[len(prefix):], []).append({"date": d, "value": v})
+    return out
+
+
+def write(key: str, obs: list, start: str | None = None, source: str = "fred",
+          replace_from: str | None = None) -> str | None:
+    """Merge observations into the store and stamp the series as checked.
+
+    replace_from: stored rows dated >= this that `obs` does not carry are
+    dropped (full rewrite of a tail). Returns the earliest date whose value
+    was added, changed or dropped, or None when nothing changed.
+    """
+    obs = [{"date": o["date"], "value": _num(o["value"])} for o in obs]
+    dates = {o["date"] for o in obs}
+    bounds = [d for d in (min(dates) if dates else None, replace_from) if d]
+    with _write_lock:
+        conn = _connect()
+        try:
+            old = {}
+            if bounds:
+                old = dict(conn.execute(
+                    "SELECT date, value FROM observations WHERE key = ? AND date >= ?",
+                    (key, min(bounds))).fetchall())
+            changed = [o["date"] for o in obs
+                       if o["date"] not in old or not _same(old[o["date"]], o["value"])]
+            with conn:
+                if replace_from is not None:
+                    gone = [d for d in old if d >= replace_from and d not in dates]
+                    changed += gone
+                    conn.executemany("DELETE FROM observations WHERE key = ? AND date = ?",
+                                     [(key, d) for d in gone])
+                conn.executemany(
+                    "INSERT INTO observations (key, date, value) VALUES (?,?,?) "
+                    "ON CONFLICT(key, date) DO UPDATE SET value = excluded.value",
+                    [(key, o["date"], o["value"]) for o in obs])
+                last = conn.execute("SELECT MAX(date) FROM observations WHERE key = ?",
+                                    (key,)).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO series (key, source, start, last_date, checked_at) "
+                    "VALUES (?,?,?,?,?) ON CONFLICT(key) DO UPDATE SET "
+                    " source = excluded.source,"
+                    " start = CASE WHEN series.start IS NULL OR excluded.start < series.start"
+                    "              THEN excluded.start ELSE series.start END,"
+                    " last_date = excluded.last_date, checked_at = excluded.checked_at",
+                    (key, source, start or (min(dates) if dates else None), last, time.time()))
+        finally:
+            conn.close()
+    return min(changed) if changed else None
+
+
+def _num(v):
+    """float, or None for missing / NaN (SQLite stores NaN as NULL anyway)."""
+    if v is None:
+        return None
+    v = float(v)
+    return None if v != v else v
+
+
+def _same(a, b) -> bool:
+    if a is None or b is None:
+        return a is None and b is None
+    return abs(a - b) <= 1e-12 * max(1.0, abs(a), abs(b))
+
+
+def is_fresh(key: str, ttl: float, start: str | None = None) -> bool:
+    """True when the key was fetched within `ttl` seconds and covers `start`."""
+    m = meta(key)
+    if not m or m.get("checked_at") is None:
+        return False
+    if start and (m.get("start") or "9999") > start:
+        return False
+    return time.time() - m["checked_at"] < ttl
+
+
+def fetch_fred(series_id: str, start_date: str, units: str | None = None,
+               timeout: float = 15) -> list:
+    """FRED observations [{date, value}] from start_date. [] on any failure."""
+    key = os.environ.get(FRED_API_KEY_ENV, "")
+    if not key:
+        return []
+    params = {"series_id": series_id, "api_key": key, "file_type": "json",
+              "observation_start": start_date, "sort_order": "asc"}
+    if units:
+        params["units"] = units
+    try:
+        with metrics.upstream("fred", "observations"), \
+                urllib.request.urlopen(f"{FRED_OBS_URL}?{urllib.parse.urlencode(params)}",
+                                       timeout=timeout) as resp:
+            data = json.loads(resp.read().decode())
+    except Exception:
+        return []
+    out = []
+    for obs in data.get("observations", []):
+        try:
+            v = float(obs["value"])
+        except (TypeError, ValueError):
+            continue
+        out.append({"date": obs["date"], "value": v})
+    return out
+
+
+def refresh(series_id: str, start: str, units: str | None = None,
+            cadence: str | None = None, fetch=None, force: bool = False):
+    """Bring one FRED series up to date in the store. Returns (obs, changed_from).
+
+    obs: stored observations from `start`. changed_from: earliest added or
+    revised date (None when unchanged, skipped as fresh, or the fetch failed).
+    fetch(series_id, start_date, units) defaults to fetch_fred.
+    """
+    key = series_key(series_id, units)
+    fetch = fetch or fetch_fred
+    m = meta(key)
+    if not force and is_fresh(key, TTL.get(cadence or "", DEFAULT_TTL), start):
+        return read(key, start), None
+    fetch_start = start
+    if m and m.get("last_date") and (m.get("start") or "9999") <= start:
+        back = datetime.strptime(m["last_date"], "%Y-%m-%d") - timedelta(
+            days=OVERLAP_DAYS.get(cadence or "", DEFAULT_OVERLAP))
+        fetch_start = max(start, back.strftime("%Y-%m-%d"))
+    obs = fetch(series_id, fetch_start, units) if units else fetch(series_id, fetch_start)
+    if not obs:
+        return read(key, start), None      # fail-open: keep the stored copy
+    changed = write(key, obs, start=fetch_start if fetch_start == start else None)
+    return read(key, start), changed
+
+
+def sync(specs, start: str, fetch=None, workers: int = DEFAULT_WORKERS,
+         force: bool = False) -> dict:
+    """Refresh many series concurrently. specs: [(series_id, units, cadence)].
+
+    Returns {key: changed_from}; fresh series are skipped without a request.
+    """
+    specs = list(specs)
+    if not specs:
+        return {}
+
+    def one(spec):
+        sid, units, cadence = spec
+        try:
+            return refresh(sid, start, units, cadence, fetch=fetch, force=force)[1]
+        except Exception:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(specs)))) as ex:
+        changed = list(ex.map(one, specs))
+    return {series_key(s[0], s[1]): c for s, c in zip(specs, changed)}
@@ -10,6 +10,8 @@ Run:  pytest common/test_common.py
 """
 import sys
 import os
+import threading
+import time
 import numpy as np
 import pandas as pd
 import pytest
@@ -19,6 +21,7 @@ sys.path.insert(0, os.path.dirname(__file__))
 from indicators import (  # noqa: E402
     sma, ema, rsi, macd, stoch, adx, atr,
     bollinger_bands, bb_position, obv, obv_slope, fit_hmm,
+    compute_all, compute_panel, ohlcv_panels,
 )
 from risk import (  # noqa: E402
     sharpe_ratio, sortino_ratio, max_drawdown, volatility,
@@ -26,6 +29,18 @@ from risk import (  # noqa: E402
     equal_weight_returns, kelly_fraction, position_size_kelly,
     position_size_vol_target,
 )
+from risk import panel as risk_panel  # noqa: E402
+from risk.factor_cov import (  # noqa: E402
+    cov_solve, fundamental_factor_cov, quad_form,
+    statistical_factor_cov,
+)
+from risk import montecarlo  # noqa: E402
+from risk.vol import EWMAVol, ewma_var, ewma_var_panel  # noqa: E402
+from risk.correlation import (  # noqa: E402
+    rolling_pair_corr, rolling_pair_frame, pair_matrix_frame,
+    anchor_mean, threshold_mask,
+)
+from utils import TTLCache  # noqa: E402
 
 
 # ---------------------------------------------------------------------------
@@ -150,6 +165,50 @@ def test_fit_hmm_runs_and_returns_probs():
     assert 0 < len(probs) <= len(s)
 
 
+@pytest.fixture
+def ohlcv_frames():
+    # three tickers with staggered listing dates and a flat one
+    rng = np.random.RandomState(3)
+    idx = pd.bdate_range("2022-01-03", periods=300)
+    frames = {}
+    for name, start in (("AAA", 0), ("BBB", 40), ("FLAT", 250)):
+        n = len(idx) - start
+        close = 50 * np.exp(np.cumsum(rng.randn(n) * 0.01)) if name != "FLAT" else np.full(n, 20.0)
+        frames[name] = pd.DataFrame({
+            "close": close, "high": close * 1.01, "low": close * 0.99,
+            "volume": rng.randint(1000, 5000, n).astype(float),
+        }, index=idx[start:])
+    return frames
+
+
+def test_compute_panel_matches_per_ticker(ohlcv_frames):
+    panels = ohlcv_panels(ohlcv_frames)
+    out = compute_panel(panels["close"], panels["high"], panels["low"], panels["volume"])
+    for name, df in ohlcv_frames.items():
+        single = compute_all(df["close"], df["high"], df["low"], df["volume"])
+        assert set(single) == set(out)
+        for key, series in single.items():
+            pd.testing.assert_series_equal(out[key][name].loc[df.index], series,
+                                           check_names=False)
+        # rows before listing stay empty
+        assert out["rsi"][name].loc[:df.index[0]].iloc[:-1].isna().all()
+
+
+def test_compute_panel_float32(ohlcv_frames):
+    close = ohlcv_panels(ohlcv_frames, fields=("close",))["close"]
+    out64 = compute_panel(close)
+    out32 = compute_panel(close, dtype=np.float32)
+    assert "adx" not in out32 and "obv" not in out32
+    assert all((v.dtypes == np.float32).all() for v in out32.values())
+    np.testing.assert_allclose(out32["ema_50"].values, out64["ema_50"].values, rtol=1e-6)
+    assert out32["sma_200"].memory_usage().sum() < out64["sma_200"].memory_usage().sum()
+
+
+def test_compute_panel_rejects_series(close):
+    with pytest.raises(TypeError):
+        compute_panel(close)
+
+
 # ---------------------------------------------------------------------------
 # Risk
 # ---------------------------------------------------------------------------
@@ -208,6 +267,82 @@ def test_cvar_not_above_var(returns):
     assert c <= v + 1e-9
 
 
+def test_ewma_var_panel_matches_prefix_recompute():
+    r = np.random.RandomState(3).normal(0.0005, 0.01, (400, 2))
+    full = ewma_var_panel(r)
+    win = ewma_var_panel(r, window=60, min_periods=60)
+    assert np.isnan(full[:2]).all() and np.isnan(win[:59]).all()
+    for t in (2, 59, 60, 61, 250, 399):
+        for j in range(2):
+            assert full[t, j] == pytest.approx(ewma_var(list(r[:t + 1, j])), rel=1e-10)
+            if t >= 59:
+                assert win[t, j] == pytest.approx(
+                    ewma_var(list(r[t - 59:t + 1, j])), rel=1e-10)
+    assert ewma_var_panel([0.01] * 30)[-1] == 0.0       # flat series -> exactly 0
+
+
+def test_ewma_streaming_matches_panel_across_checkpoint():
+    r = np.random.RandomState(4).normal(0.0, 0.02, (300, 3))
+    expected = ewma_var_panel(r, window=126)
+    est = EWMAVol(3, window=126).extend(r[:170])
+    est = EWMAVol.from_state(est.to_state())             # resume from a checkpoint
+    est.extend(r[170:])
+    assert est.count == 300
+    assert est.var() == pytest.approx(expected[-1], rel=1e-10)
+    assert np.isnan(EWMAVol().extend([0.01, 0.02]).vol()).all()
+
+
+@pytest.fixture
+def return_panel():
+    rng = np.random.RandomState(11)
+    df = pd.DataFrame(rng.randn(400, 3) * 0.012 + 0.0004, columns=["a", "b", "c"])
+    df.iloc[10:14, 1] = np.nan
+    return df
+
+
+def test_panel_summary_matches_single_series(return_panel):
+    out = risk_panel.summary(return_panel)
+    for col, r in return_panel.items():
+        wealth = pd.concat([pd.Series([1.0]), (1 + r.fillna(0)).cumprod()], ignore_index=True)
+        row = out.loc[col]
+        assert row["sharpe"] == pytest.approx(sharpe_ratio(r))
+        assert row["sortino"] == pytest.approx(sortino_ratio(r))
+        assert row["max_drawdown"] == pytest.approx(max_drawdown(wealth))
+        assert row["var"] == pytest.approx(var(r))
+        assert row["cvar"] == pytest.approx(cvar(r))
+        assert 0.0 <= row["kelly"] <= 1.0
+
+
+def test_panel_rolling_matches_per_window(return_panel):
+    w = 60
+    out = risk_panel.rolling_metrics(return_panel, w)
+    assert out["sharpe"].iloc[:w - 1].isna().all().all()
+    assert np.isnan(out["sharpe"].iloc[70]["b"])          # gap leaves < w returns
+    for t in (59, 150, 399):
+        for col in ("a", "c"):
+            r = return_panel[col].iloc[t - w + 1:t + 1]
+            wealth = np.concatenate([[1.0], (1 + r).cumprod()])
+            assert out["sharpe"].iloc[t][col] == pytest.approx(sharpe_ratio(r), rel=1e-9)
+            assert out["sortino"].iloc[t][col] == pytest.approx(sortino_ratio(r), rel=1e-9)
+            assert out["cvar"].iloc[t][col] == pytest.approx(cvar(r), rel=1e-9)
+            assert out["drawdown"].iloc[t][col] == pytest.approx(wealth[-1] / wealth.max() - 1)
+            assert out["max_drawdown"].iloc[t][col] == pytest.approx(
+                max_drawdown(pd.Series(wealth)) / 100)
+
+
+def test_panel_rolling_historical_var_matches_percentile(return_panel):
+    got = risk_panel.rolling_var(return_panel, 40)
+    want = return_panel.rolling(40).apply(lambda x: np.percentile(x, 5), raw=True)
+    pd.testing.assert_frame_equal(got, want, check_exact=False, atol=1e-15)
+
+
+def test_sliding_max_any_window():
+    x = np.random.RandomState(5).randn(97, 2)
+    for w in (1, 4, 13, 97, 150):
+        want = np.array([x[max(0, i - w + 1):i + 1].max(axis=0) for i in range(len(x))])
+        assert np.array_equal(risk_panel.sliding_max(x, w), want)
+
+
 def test_risk_parity_weights_sum_to_one():
     cov = pd.DataFrame(
         [[0.04, 0.01], [0.01, 0.09]],
@@ -218,6 +353,86 @@ def test_risk_parity_weights_sum_to_one():
     assert (w > 0).all()
 
 
+@pytest.fixture
+def factor_panel():
+    rng = np.random.RandomState(8)
+    f = rng.randn(250, 3) * 0.01
+    b = rng.randn(80, 3) * 0.5 + 1.0
+    r = f @ b.T + rng.randn(250, 80) * 0.008
+    return pd.DataFrame(r, columns=[f"N{i}" for i in range(80)]), pd.DataFrame(f), b
+
+
+def test_factor_cov_ops_match_dense(factor_panel):
+    returns, _, _ = factor_panel
+    fc = statistical_factor_cov(returns, n_factors=5)
+    dense = fc.dense()
+    rng = np.random.RandomState(1)
+    w, x = rng.rand(80), rng.rand(80, 2)
+    assert fc.quad(w) == pytest.approx(w @ dense @ w, rel=1e-12)
+    assert np.allclose(fc.matvec(x), dense @ x, rtol=1e-12, atol=0)
+    assert np.allclose(dense @ fc.solve(x), x, atol=1e-9)
+    assert np.allclose(fc.diag(), np.diag(dense))
+    # PCA split keeps each name's total sample variance
+    assert np.allclose(fc.diag(), returns.var().to_numpy())
+    assert quad_form(dense, w) == pytest.approx(quad_form(fc, w))
+    assert np.allclose(cov_solve(dense, w), cov_solve(fc, w), rtol=1e-8)
+
+
+def test_fundamental_factor_cov_recovers_loadings(factor_panel):
+    returns, factors, b = factor_panel
+    fc = fundamental_factor_cov(returns, factors)
+    assert fc.loadings.shape == (80, 3)
+    assert np.abs(fc.loadings - b).max() < 0.35
+    assert fc.specific == pytest.approx(np.full(80, 0.008 ** 2), rel=0.4)
+    sub = fc.subset([0, 5]).scaled(252)
+    assert sub.names == ["N0", "N5"]
+    assert sub.dense() == pytest.approx(fc.dense()[np.ix_([0, 5], [0, 5])] * 252)
+
+
+def test_risk_parity_accepts_factor_cov(factor_panel):
+    returns, _, _ = factor_panel
+    fc = statistical_factor_cov(returns, n_factors=4)
+    dense = pd.DataFrame(fc.dense(), index=fc.names, columns=fc.names)
+    pd.testing.assert_series_equal(risk_parity_weights(fc), risk_parity_weights(dense))
+
+
+def test_montecarlo_streamed_tail_is_exact(factor_panel):
+    returns, _, _ = factor_panel
+    w = pd.Series(1 / 80, index=returns.columns)
+    out = montecarlo.simulate_book_risk(returns, w, n_scenarios=2300, horizons=(1, 5),
+                                        model="bootstrap", chunk=500, seed=4)
+    # replay the same chunks in full and compare with np.quantile
+    mdl = montecarlo._Model(returns, w.to_numpy(), "bootstrap", 5, 10, None, None)
+    seeds = np.random.SeedSequence(4).spawn(5)
+    full = np.concatenate([montecarlo._run_chunk(mdl, s, m, [1, 5], [0.05])[0]
+                           for s, m in zip(seeds, [500, 500, 500, 500, 300])])
+    for j, h in enumerate((1, 5)):
+        for c in (0.95, 0.99):
+            v = np.quantile(full[:, j], 1 - c)
+            assert out["var"][h][c] == pytest.approx(v, abs=1e-6)
+            assert out["cvar"][h][c] == pytest.approx(full[full[:, j] <= v, j].mean(), abs=1e-6)
+
+
+def test_montecarlo_stress_and_worker_independence(factor_panel):
+    returns, _, _ = factor_panel
+    w = {c: 0.01 for c in returns.columns}
+    kw = dict(n_scenarios=6000, horizons=(1, 21), chunk=1000)
+    base = montecarlo.simulate_book_risk(returns, w, workers=1, **kw)
+    assert montecarlo.simulate_book_risk(returns, w, workers=4, **kw) == base
+    crash = montecarlo.simulate_book_risk(returns, w, stress="crash", **kw)
+    assert crash["var"][1][0.99] < base["var"][1][0.99] - 0.04
+    assert crash["drawdown_prob"][21][0.05] > base["drawdown_prob"][21][0.05]
+    assert montecarlo.simulate_book_risk(returns, {"ZZZ": 1.0})["unmodeled"] == ["ZZZ"]
+
+
+@pytest.mark.parametrize("kw", [{"n_scenarios": 0}, {"n_scenarios": -5},
+                                {"df": 2.0}, {"df": 1.5}])
+def test_montecarlo_rejects_bad_arguments(factor_panel, kw):
+    returns, _, _ = factor_panel
+    with pytest.raises(ValueError):
+        montecarlo.simulate_book_risk(returns, {c: 0.01 for c in returns.columns}, **kw)
+
+
 def test_equal_weight_returns():
     a = pd.Series([0.01, 0.02, 0.03])
     b = pd.Series([0.02, 0.01, 0.04])
@@ -246,3 +461,106 @@ def test_position_size_vol_target_zero_asset_vol():
 def test_position_size_vol_target_leverage_capped():
     size = position_size_vol_target(100000, 0.1, 0.05, max_leverage=1.0)
     assert size <= 100000.0 + 1e-9
+
+
+# ---------------------------------------------------------------------------
+# Rolling pair correlation engine
+# ---------------------------------------------------------------------------
+@pytest.fixture
+def panel():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame(rng.normal(0, 0.01, (200, 4)), columns=list("ABCD"),
+                      index=pd.bdate_range("2025-01-01", periods=200))
+    df.iloc[10:25, 2] = np.nan          # gap in one series
+    return df
+
+
+def test_pair_matrix_matches_pandas_rolling_corr(panel):
+    ref = panel.rolling(30).corr()
+    got = pair_matrix_frame(panel, 30)
+    assert got.shape == ref.shape
+    assert (got.isna().values == ref.isna().values).all()
+    assert np.nanmax(np.abs(got.values - ref.values)) < 1e-10
+
+
+def test_marginal_estimator_matches_per_series_moments(panel):
+    a, b, w, mp = panel["A"], panel["C"], 40, 32
+    mu_a, mu_b = a.rolling(w, min_periods=mp).mean(), b.rolling(w, min_periods=mp).mean()
+    cov = (a * b).rolling(w, min_periods=mp).mean() - mu_a * mu_b
+    ref = cov / (a.rolling(w, min_periods=mp).std() * b.rolling(w, min_periods=mp).std())
+    got = rolling_pair_frame(panel, w, min_periods=mp, moments="marginal")[("A", "C")]
+    pd.testing.assert_series_equal(got, ref, check_names=False, atol=1e-10)
+
+
+def test_flat_series_and_short_windows_are_nan():
+    x = np.column_stack([np.ones(10), np.arange(10.0), np.arange(10.0) ** 2])
+    out = rolling_pair_corr(x, 5)
+    assert np.isnan(out[:4]).all()                # fewer than min_periods rows
+    assert np.isnan(out[4:, 0]).all()             # flat series has no correlation
+    assert (np.abs(out[4:, 2]) <= 1.0).all()
+
+
+def test_anchor_mean_and_threshold_mask(panel):
+    pf = rolling_pair_frame(panel, 30)
+    avg = anchor_mean(pf, "D", ["A", "B", "ZZZ"])   # both orientations, unknown ignored
+    expected = pf[[("A", "D"), ("B", "D")]].mean(axis=1, skipna=False)
+    pd.testing.assert_series_equal(avg, expected)
+    mask = threshold_mask(avg, 0.0)
+    assert not mask[avg.isna()].any()
+    assert (mask[avg.notna()] == (avg[avg.notna()] > 0)).all()
+
+
+# ---------------------------------------------------------------------------
+# utils.TTLCache
+# ---------------------------------------------------------------------------
+def test_cache_ttl_and_lru_eviction():
+    now = [0.0]
+    c = TTLCache(ttl_seconds=10, max_entries=2, clock=lambda: now[0])
+    c.set("a", 1)
+    c.set("b", 2)
+    assert c.get("a") == 1                        # a is now most recent
+    c.set("c", 3)                                 # evicts b (least recently used)
+    assert "b" not in c and c.get("a") == 1 and c.get("c") == 3
+    now[0] = 10.0
+    assert c.get("a") is None                     # expired
+    st = c.stats()
+    assert (st["evictions"], st["expired"], st["entries"]) == (1, 1, 1)
+
+
+def test_cache_max_bytes_bound():
+    c = TTLCache(ttl_seconds=None, max_entries=None, max_bytes=1000)
+    for i in range(5):
+        c.set(i, np.zeros(50))                    # 400 bytes each
+    assert len(c) == 2 and c.stats()["bytes"] <= 1000
+    c.set("big", np.zeros(1000))                  # larger than the bound: not cached
+    assert "big" not in c and len(c) == 2
+
+
+def test_cache_single_flight_and_errors_not_cached():
+    c = TTLCache(ttl_seconds=60)
+    calls, gate = [], threading.Event()
+
+    def loader():
+        calls.append(1)
+        gate.wait(5)
+        return "v"
+
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(c.get_or_load("k", loader)))
+               for _ in range(8)]
+    for t in threads:
+        t.start()
+    while c.stats()["coalesced"] < 7:
+        time.sleep(0.001)
+    gate.set()
+    for t in threads:
+        t.join()
+    assert out == ["v"] * 8 and len(calls) == 1
+    assert c.get_or_load("k", loader) == "v" and len(calls) == 1
+
+    def boom():
+        raise OSError("upstream down")
+    with pytest.raises(OSError):
+        c.get_or_load("e", boom)
+    assert "e" not in c
+    assert c.get_or_load("e", lambda: [], cache_if=bool) == [] and "e" not in c
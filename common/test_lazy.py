@@ -0,0 +1,104 @@
+"""
+Deferred-import tests — lazy stand-ins, lazy `common` package, startup report.
+
+Tests for:
+  - lazy_import(): nothing imported until first attribute access; writes
+    reach the real module; the cold load is recorded in metrics
+  - available(): presence check without importing
+  - `import common` does not pull pandas/scipy/hmmlearn
+  - metrics.mark_ready()/startup_report() and the /metrics gauges
+
+Run: pytest common/test_lazy.py -q
+"""
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import metrics  # noqa: E402
+from common.lazy import LazyModule, available, lazy_import  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _fresh(code):
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                         capture_output=True, text=True, timeout=60)
+    assert out.returncode == 0, out.stderr
+    return out.stdout.strip()
+
+
+def test_lazy_module_defers_until_attribute_access():
+    out = _fresh(
+        "import sys\n"
+        "from common.lazy import lazy_import\n"
+        "m = lazy_import('colorsys')\n"
+        "print('colorsys' in sys.modules, repr(m).endswith('(deferred)>'))\n"
+        "m.rgb_to_hsv(0.1, 0.2, 0.3)\n"
+        "print('colorsys' in sys.modules, repr(m).endswith('(loaded)>'))\n"
+    )
+    assert out.splitlines() == ["False True", "True True"]
+
+
+def test_setattr_reaches_real_module():
+    import json
+    proxy = lazy_import("json")
+    assert isinstance(proxy, LazyModule)
+    proxy._lazy_test_marker = 1
+    try:
+        assert json._lazy_test_marker == 1
+        assert "dumps" in dir(proxy)
+    finally:
+        del proxy._lazy_test_marker
+    assert not hasattr(json, "_lazy_test_marker")
+
+
+def test_cold_load_is_recorded():
+    metrics.reset()
+    sys.modules.pop("wave", None)
+    _ = lazy_import("wave").Wave_read
+    report = metrics.startup_report()
+    assert [row["module"] for row in report["lazy_imports"]] == ["wave"]
+    assert "lazy_import_seconds" in metrics.render()
+    metrics.reset()
+
+
+def test_available_does_not_import():
+    out = _fresh(
+        "import sys\n"
+        "from common.lazy import available\n"
+        "print(available('colorsys'), available('no_such_module_xyz'), "
+        "'colorsys' in sys.modules)\n"
+    )
+    assert out == "True False False"
+    assert available("json")
+
+
+def test_import_common_is_light():
+    out = _fresh(
+        "import sys\n"
+        "import common\n"
+        "from common import metrics, profiler\n"
+        "from common.utils import TTLCache\n"
+        "print(sorted(m for m in ('numpy', 'pandas', 'scipy', 'sklearn', 'hmmlearn')"
+        " if m in sys.modules))\n"
+    )
+    assert out == "[]"
+
+
+def test_reexports_resolve_on_demand():
+    import common
+    assert callable(common.get_ns_config)
+    assert "fit_hmm" in dir(common)
+
+
+def test_mark_ready_reports_startup():
+    metrics.init("test-lazy")
+    report = metrics.mark_ready()
+    assert report["ready_s"] >= report["init_s"] >= 0
+    assert metrics.summary()["startup"]["ready_s"] == report["ready_s"]
+    assert 'process_startup_seconds{phase="ready"}' in metrics.render()
+    metrics.reset()
@@ -0,0 +1,178 @@
+"""
+Metrics registry tests — request timing mixin, upstream timers, exposition.
+
+Tests for:
+  - MetricsHandlerMixin: per-route latency + status counts from a live
+    stdlib server, /metrics and /metrics.json served by send_metrics()
+  - route labels stay low-cardinality (static files folded, MAX_ROUTES cap)
+  - upstream(): durations and error counts per (upstream, op)
+  - render(): Prometheus text format incl. named TTLCache stats
+  - summary(): quantile estimates and cache hit rates
+
+ALL tests are offline — servers bind 127.0.0.1 on an ephemeral port.
+Run: pytest common/test_metrics.py -q
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import metrics  # noqa: E402
+from common.utils import TTLCache  # noqa: E402
+
+
+class _Handler(metrics.MetricsHandlerMixin, BaseHTTPRequestHandler):
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        if path in ("/metrics", "/metrics.json"):
+            return self.send_metrics(path)
+        if path == "/api/slow":
+            time.sleep(0.03)
+        if path.startswith("/api/"):
+            body = b"{}"
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            return
+        self.send_error(404)
+
+
+@pytest.fixture
+def server():
+    metrics.reset()
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+    metrics.reset()
+
+
+def _settle(n, timeout=2.0):
+    """Wait until n requests are recorded (recording finishes after the body is sent)."""
+    deadline = time.time() + timeout
+    while sum(metrics.REQUESTS.snapshot().values()) < n and time.time() < deadline:
+        time.sleep(0.005)
+
+
+def _get(url):
+    try:
+        with urllib.request.urlopen(url, timeout=5) as resp:
+            return resp.status, resp.read().decode()
+    except urllib.error.HTTPError as e:
+        return e.code, ""
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Request timing
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestRequests:
+
+    def test_routes_statuses_and_latency(self, server):
+        for _ in range(3):
+            _get(server + "/api/fast?x=1")
+        _get(server + "/api/slow")
+        _get(server + "/nope.html")
+        _settle(5)
+        counts = metrics.REQUESTS.snapshot()
+        assert counts[("GET", "/api/fast", "200")] == 3
+        assert counts[("GET", "static", "404")] == 1
+        slow = metrics.REQUEST_LATENCY.snapshot()[("GET", "/api/slow")]
+        assert sum(slow[:-1]) == 1 and slow[-1] >= 0.03
+
+    def test_metrics_endpoint_is_prometheus_text(self, server):
+        _get(server + "/api/fast")
+        _settle(1)
+        status, text = _get(server + "/metrics")
+        assert status == 200
+        assert "# TYPE http_request_duration_seconds histogram" in text
+        assert 'http_requests_total{method="GET",route="/api/fast",status="200"} 1' in text
+        assert 'http_request_duration_seconds_bucket{method="GET",route="/api/fast",le="+Inf"} 1' in text
+
+    def test_metrics_json_summary(self, server):
+        metrics.init("unit")
+        _get(server + "/api/slow")
+        _settle(1)
+        status, text = _get(server + "/metrics.json")
+        data = json.loads(text)
+        assert status == 200 and data["service"] == "unit"
+        route = next(r for r in data["routes"] if r["route"] == "/api/slow")
+        assert route["count"] == 1 and route["p95_ms"] >= 25
+
+    def test_route_labels_are_capped(self, monkeypatch):
+        metrics.reset()
+        monkeypatch.setattr(metrics, "MAX_ROUTES", 3)
+        for i in range(5):
+            metrics._enter()
+            metrics.record_request("GET", f"/api/r{i}", 200, 0.001)
+        routes = {k[1] for k in metrics.REQUESTS.snapshot()}
+        assert routes == {"/api/r0", "/api/r1", "/api/r2", "other"}
+        metrics.reset()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Upstreams, caches, exposition
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestUpstreamAndCaches:
+
+    def test_upstream_times_and_counts_errors(self):
+        metrics.reset()
+        with metrics.upstream("fred", "observations"):
+            pass
+        with pytest.raises(ValueError):
+            with metrics.upstream("fred", "observations"):
+                raise ValueError("boom")
+
+        @metrics.timed("postgres")
+        def latest_regime():
+            return 1
+
+        assert latest_regime() == 1
+        lat = metrics.UPSTREAM_LATENCY.snapshot()
+        assert sum(lat[("fred", "observations")][:-1]) == 2
+        assert sum(lat[("postgres", "latest_regime")][:-1]) == 1
+        assert metrics.UPSTREAM_ERRORS.snapshot() == {("fred", "observations"): 1}
+
+    def test_named_caches_are_exported(self):
+        cache = TTLCache(ttl_seconds=60, name="unit_cache")
+        cache.set("a", 1)
+        cache.get("a")
+        cache.get("b")
+        text = metrics.render()
+        assert 'cache_hits_total{cache="unit_cache"} 1' in text
+        assert 'cache_misses_total{cache="unit_cache"} 1' in text
+        assert metrics.summary()["caches"]["unit_cache"]["hit_rate"] == 0.5
+
+    def test_quantile_interpolates_within_bucket(self):
+        buckets = (0.1, 0.2)
+        row = [0, 10, 0, 1.5]          # ten samples in (0.1, 0.2]
+        assert metrics.quantile(buckets, row, 0.5) == pytest.approx(0.15)
+        assert metrics.quantile(buckets, [0, 0, 0, 0.0], 0.5) is None
+
+    def test_record_overhead_is_microseconds(self):
+        metrics.reset()
+        n = 20000
+        start = time.perf_counter()
+        for _ in range(n):
+            metrics._enter()
+            metrics.record_request("GET", "/api/x", 200, 0.004)
+        per_call = (time.perf_counter() - start) / n
+        metrics.reset()
+        assert per_call < 50e-6
@@ -0,0 +1,166 @@
+"""
+Request profiler tests — opt-in rules, folded-stack dumps, disabled cost.
+
+Tests for:
+  - wants_profile(): header / query opt-in honoured from localhost only,
+    explicit opt-out, PROFILE_SAMPLE_RATE sampling
+  - ProfilingHandlerMixin on a live stdlib server: X-Profile header points
+    at a collapsed-stack dump that contains the slow handler frame
+  - unprofiled requests write nothing; MAX_FILES pruning
+
+ALL tests are offline — servers bind 127.0.0.1 on an ephemeral port.
+Run: pytest common/test_profiler.py -q
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common import metrics, profiler  # noqa: E402
+
+
+def _busy_handler_work(seconds):
+    end = time.perf_counter() + seconds
+    x = 0
+    while time.perf_counter() < end:
+        x += 1
+    return x
+
+
+class _Handler(profiler.ProfilingHandlerMixin, metrics.MetricsHandlerMixin,
+               BaseHTTPRequestHandler):
+    seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        _Handler.seen.append(self.path)
+        if self.path.startswith("/api/slow"):
+            _busy_handler_work(0.08)
+        body = b"{}"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiler, "INTERVAL_S", 0.001)
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}", tmp_path
+    srv.shutdown()
+    srv.server_close()
+    metrics.reset()
+
+
+def _get(url, headers=None):
+    req = urllib.request.Request(url, headers=headers or {})
+    with urllib.request.urlopen(req, timeout=5) as resp:
+        resp.read()
+        return resp.headers
+
+
+def _wait_for(path, timeout=2.0):
+    deadline = time.time() + timeout
+    while not os.path.exists(path) and time.time() < deadline:
+        time.sleep(0.005)
+    return os.path.exists(path)
+
+
+class _Fake:
+    def __init__(self, path="/api/x", headers=None, client="127.0.0.1"):
+        self.path = path
+        self.headers = headers or {}
+        self.client_address = (client, 50000)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Opt-in rules
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestWantsProfile:
+
+    def test_localhost_header_and_query(self):
+        assert profiler.wants_profile(_Fake(headers={"X-Profile": "1"}))
+        assert profiler.wants_profile(_Fake(path="/api/x?a=1&_profile=1"))
+        assert not profiler.wants_profile(_Fake(headers={"X-Profile": "0"}))
+        assert not profiler.wants_profile(_Fake(path="/api/x?_profile=0"))
+        assert not profiler.wants_profile(_Fake())
+
+    def test_remote_clients_cannot_force(self):
+        assert not profiler.wants_profile(_Fake(headers={"X-Profile": "1"}, client="10.0.0.7"))
+        assert not profiler.wants_profile(_Fake(path="/api/x?_profile=1", client="10.0.0.7"))
+
+    def test_sample_rate(self, monkeypatch):
+        monkeypatch.setattr(profiler, "SAMPLE_RATE", 1.0)
+        assert profiler.wants_profile(_Fake(client="10.0.0.7"))
+        monkeypatch.setattr(profiler, "SAMPLE_RATE", 0.0)
+        assert not profiler.wants_profile(_Fake(client="10.0.0.7"))
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Live server
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestDumps:
+
+    def test_profiled_request_writes_folded_stacks(self, server):
+        url, out_dir = server
+        headers = _get(url + "/api/slow?q=1", {"X-Profile": "1"})
+        dump = headers["X-Profile"]
+        assert os.path.dirname(dump) == str(out_dir)
+        assert _wait_for(dump)
+        lines = open(dump).read().splitlines()
+        assert lines
+        total = 0
+        for line in lines:
+            stack, count = line.rsplit(" ", 1)
+            assert stack.startswith("GET /api/slow;")
+            total += int(count)
+        assert total > 0
+        assert any("_busy_handler_work (test_profiler.py" in ln for ln in lines)
+
+    def test_profile_param_is_stripped_before_routing(self, server):
+        url, _ = server
+        _Handler.seen.clear()
+        assert "X-Profile" in _get(url + "/?_profile=1")
+        _get(url + "/api/fast?a=1&_profile=1&b=2")
+        assert _Handler.seen == ["/", "/api/fast?a=1&b=2"]
+        assert profiler.strip_profile_param("/api/x?a=1&_profile=1") == "/api/x?a=1"
+        assert profiler.strip_profile_param("/api/x?a=1") == "/api/x?a=1"
+
+    def test_unprofiled_requests_write_nothing(self, server):
+        url, out_dir = server
+        headers = _get(url + "/api/slow")
+        assert "X-Profile" not in headers
+        time.sleep(0.05)
+        assert os.listdir(out_dir) == []
+
+    def test_old_dumps_are_pruned(self, server, monkeypatch):
+        url, out_dir = server
+        monkeypatch.setattr(profiler, "MAX_FILES", 2)
+        dumps = [_get(url + "/api/fast", {"X-Profile": "1"})["X-Profile"] for _ in range(4)]
+        assert _wait_for(dumps[-1])
+        time.sleep(0.05)
+        assert sorted(os.listdir(out_dir)) == sorted(os.path.basename(d) for d in dumps[-2:])
+
+
+def test_disabled_check_is_cheap():
+    fake = _Fake(path="/api/ns6/portfolio?x=1", headers={"Accept": "*/*"})
+    n = 20000
+    start = time.perf_counter()
+    for _ in range(n):
+        profiler.wants_profile(fake)
+    assert (time.perf_counter() - start) / n < 20e-6
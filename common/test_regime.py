@@ -404,6 +404,34 @@ class TestClassifyDataFrame:
         assert result["regime"].iloc[0] == "R1"
         assert result["confidence"].iloc[0] == 1.0
 
+    def test_matches_row_by_row_classify(self):
+        """Columnar labels/scores/flags equal classify() on every row, incl. NaN + missing columns."""
+        rng = np.random.default_rng(7)
+        center = {**_make_data(), "2S10S_60D_AGO": -0.2}
+        spread = {"GDP_QOQ_ANN": 1.5, "CPI_YOY": 1.0, "CPI_TREND_3M": 0.1,
+                  "UNRATE_3M_CHG": 0.3, "2S10S": 0.5, "2S10S_60D_AGO": 0.5,
+                  "BAA_AAA": 0.6, "NFCI": 0.3, "DCOILWTICO": 25.0, "USD_MOM_PCT": 4.0,
+                  "VIX": 8.0, "STOCK_BOND_CORR": 0.3}
+        n = 2000
+        df = pd.DataFrame({k: rng.normal(center[k], spread[k], n) for k in spread},
+                          index=pd.date_range("2000-01-01", periods=n, freq="D"))
+        df = df.mask(rng.random(df.shape) < 0.1)
+        c = RegimeClassifier()
+        for panel in (df, df.drop(columns=["CPI_TREND_3M", "VIX"])):
+            result = c.classify_dataframe(panel)
+            for (_, row), (_, out) in zip(panel.iterrows(), result.iterrows()):
+                expected = c.classify(row.to_dict())
+                assert out["regime"] == expected.regime
+                assert out["confidence"] == round(expected.confidence, 2)
+                assert out["flags"] == ",".join(expected.flags)
+                assert out["growth_above"] == expected.growth_above
+                assert out["inflation_above"] == expected.inflation_above
+        assert result["flags"].str.len().gt(0).any()
+
+    def test_empty_panel_passes_through(self):
+        df = pd.DataFrame({"GDP_QOQ_ANN": []}, dtype=float)
+        assert RegimeClassifier().classify_dataframe(df).empty
+
 
 # ═══════════════════════════════════════════════════════════════════════
 # filter_regime_returns()
@@ -521,9 +549,11 @@ class TestFetcherFailOpen:
             if old_key:
                 os.environ["FRED_API_KEY"] = old_key
 
-    def test_fetch_with_bogus_key_returns_empty(self, monkeypatch):
-        """Bogus key + mocked Yahoo → empty DataFrame."""
+    def test_fetch_with_bogus_key_returns_empty(self, monkeypatch, tmp_path):
+        """Bogus key + mocked Yahoo + empty series store → empty DataFrame."""
         import common.regime_fetcher as fetcher
+        from common import series_store
+        monkeypatch.setattr(series_store, "DB_PATH", str(tmp_path / "series_store.db"))
         old_key = os.environ.get("FRED_API_KEY")
         os.environ["FRED_API_KEY"] = "bogus_not_real_key"
         try:
@@ -604,6 +634,18 @@ class TestRegimeStore:
         df = store.query_window(days=5)
         assert len(df) <= 5
 
+    def test_upsert_many_single_write(self):
+        """upsert_many writes a batch; a repeated date keeps its last row."""
+        import common.regime_store as store
+        rows = [(f"2024-06-{i+1:02d}", {"regime": "R1", "confidence": 1.0, "flags": ""})
+                for i in range(10)]
+        rows.append(("2024-06-10", {"regime": "R4", "confidence": 0.8, "flags": "acute (VIX)"}))
+        assert store.upsert_many(rows) == 10
+        df = store.query_window(days=30)
+        assert len(df) == 10
+        assert df["regime"].iloc[-1] == "R4"
+        assert store.upsert_many([]) == 0
+
     def test_empty_db_returns_empty(self):
         """Querying fresh DB returns empty DataFrame."""
         import common.regime_store as store
@@ -665,6 +707,23 @@ class TestPipelineIntegration:
         assert row is not None
         assert row["regime"] == "R1"
 
+    def test_relabel_history_rewrites_under_new_theta(self, monkeypatch):
+        """A Θ change re-labels and re-stores the whole window in one pass."""
+        import common.regime_pipeline as pipeline
+        import common.regime_store as store
+
+        dates = pd.date_range("2024-01-01", periods=60, freq="D")
+        df = pd.DataFrame({k: [v] * 60 for k, v in _make_data().items()}, index=dates)
+        monkeypatch.setattr(pipeline, "fetch_regime_data", lambda days_back=750: df)
+
+        assert set(pipeline.run_regime_pipeline(days_back=750)["regime"]) == {"R1"}
+        # CPI 1.5 now counts as above target → R2 everywhere
+        history = pipeline.relabel_history({"inflation_target_cpi": 1.0}, days_back=750)
+        assert len(history) == 60
+        assert set(history["regime"]) == {"R2"}
+        assert history["curve_bp"].iloc[0] == 50.0
+        assert store.latest()["confidence"] == 0.9
+
     def test_pipeline_fail_open_on_empty_fetch(self, monkeypatch):
         """Pipeline returns empty DataFrame when fetch fails."""
         import common.regime_pipeline as pipeline
@@ -0,0 +1,205 @@
+"""
+Series store + incremental regime fetch tests — against a stub FRED endpoint.
+
+Tests for:
+  - series_store.refresh: first fetch, fresh skip, tail-only refetch,
+    revision detection (changed_from), fail-open on a dead endpoint
+  - series_store.sync: concurrent fan-out, nothing requested when fresh
+  - regime_fetcher.fetch_regime_data: a restart is served from the store,
+    and an incremental derived extension equals a full recomputation
+
+ALL tests are offline — a local ThreadingHTTPServer stands in for FRED and
+Yahoo closes are synthetic.
+Run: pytest common/test_series_store.py -q
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import common.regime_fetcher as fetcher  # noqa: E402
+from common import series_store  # noqa: E402
+
+CADENCE_FREQ = {"Daily": "B", "Weekly": "W-FRI", "Monthly": "MS", "Quarterly": "QS"}
+
+
+def _value(series_id: str, d: pd.Timestamp) -> float:
+    """Deterministic, smoothly trending synthetic value per (series, date)."""
+    seed = sum(ord(c) for c in series_id)
+    t = d.toordinal() - 738000
+    return round(100 + (seed % 17) + 0.01 * t + np.sin(t / 37.0 + seed), 6)
+
+
+class _StubFRED(BaseHTTPRequestHandler):
+    """FRED observations endpoint: series up to END, honours observation_start."""
+    END = pd.Timestamp.now().normalize()
+    REVISED = {}          # {(series_id, 'YYYY-MM-DD'): value}
+    HITS = []
+
+    def do_GET(self):
+        q = dict(urllib.parse.parse_qsl(urllib.parse.urlparse(self.path).query))
+        sid, start = q["series_id"], q.get("observation_start", "2000-01-01")
+        type(self).HITS.append((sid, start))
+        cadence = fetcher.SERIES_BY_ID.get(sid, {}).get("cadence", "Daily")
+        dates = pd.date_range(start, self.END, freq=CADENCE_FREQ[cadence])
+        obs = []
+        for d in dates:
+            key = (sid, d.strftime("%Y-%m-%d"))
+            obs.append({"date": key[1], "value": str(self.REVISED.get(key, _value(sid, d)))})
+        body = json.dumps({"observations": obs}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _yahoo(tickers, period="2y"):
+    days = {"1mo": 31, "3mo": 92, "6mo": 183, "1y": 365}.get(period, 730)
+    idx = pd.bdate_range(_StubFRED.END - pd.Timedelta(days=days), _StubFRED.END)
+    return {t: pd.Series([_value(t, d) for d in idx], index=idx) for t in tickers}
+
+
+@pytest.fixture(scope="module")
+def fred_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubFRED)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/fred/series/observations"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def stub(monkeypatch, tmp_path, fred_url):
+    monkeypatch.setattr(series_store, "DB_PATH", str(tmp_path / "series_store.db"))
+    monkeypatch.setattr(fetcher, "FRED_OBS_URL", fred_url)
+    monkeypatch.setattr(series_store, "FRED_OBS_URL", fred_url)
+    monkeypatch.setattr(fetcher, "_fetch_yahoo_prices", _yahoo)
+    monkeypatch.setenv("FRED_API_KEY", "stub")
+    monkeypatch.setattr(_StubFRED, "END", pd.Timestamp.now().normalize())
+    monkeypatch.setattr(_StubFRED, "REVISED", {})
+    monkeypatch.setattr(_StubFRED, "HITS", [])
+    fetcher.clear_cache()
+    yield _StubFRED
+    fetcher.clear_cache()
+
+
+def _age_store():
+    conn = series_store._connect()
+    with conn:
+        conn.execute("UPDATE series SET checked_at = 0")
+    conn.close()
+
+
+def _start(days):
+    return (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Store mechanics
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestRefresh:
+
+    def test_first_fetch_then_fresh_skip(self, stub):
+        start = _start(200)
+        obs, changed = series_store.refresh("DGS10", start, cadence="Daily")
+        assert obs and changed == obs[0]["date"]
+        assert len(stub.HITS) == 1
+        again, changed = series_store.refresh("DGS10", start, cadence="Daily")
+        assert again == obs and changed is None
+        assert len(stub.HITS) == 1                        # fresh: no request
+
+    def test_stale_series_requests_only_tail(self, stub):
+        start = _start(400)
+        obs, _ = series_store.refresh("DGS10", start, cadence="Daily")
+        _age_store()
+        series_store.refresh("DGS10", start, cadence="Daily")
+        tail_start = stub.HITS[-1][1]
+        expected = (pd.Timestamp(obs[-1]["date"])
+                    - pd.Timedelta(days=series_store.OVERLAP_DAYS["Daily"])).strftime("%Y-%m-%d")
+        assert tail_start == expected
+
+    def test_revision_reports_changed_from(self, stub):
+        start = _start(400)
+        obs, _ = series_store.refresh("UNRATE", start, cadence="Monthly")
+        revised = obs[-2]["date"]
+        stub.REVISED[("UNRATE", revised)] = 9.9
+        _age_store()
+        obs, changed = series_store.refresh("UNRATE", start, cadence="Monthly")
+        assert changed == revised
+        assert {o["date"]: o["value"] for o in obs}[revised] == 9.9
+
+    def test_wider_window_refetches_from_new_start(self, stub):
+        series_store.refresh("DGS2", _start(100), cadence="Daily")
+        series_store.refresh("DGS2", _start(300), cadence="Daily")
+        assert stub.HITS[-1][1] == _start(300)
+
+    def test_dead_endpoint_keeps_stored_copy(self, stub, monkeypatch):
+        start = _start(200)
+        obs, _ = series_store.refresh("DGS10", start, cadence="Daily")
+        _age_store()
+        monkeypatch.setattr(series_store, "FRED_OBS_URL", "http://127.0.0.1:9/none")
+        again, changed = series_store.refresh("DGS10", start, cadence="Daily")
+        assert again == obs and changed is None
+        assert not series_store.is_fresh("DGS10:", 3600)   # still due for retry
+
+
+class TestSync:
+
+    def test_fan_out_then_nothing_when_fresh(self, stub):
+        specs = [(s["id"], None, s["cadence"]) for s in fetcher.FRED_SERIES]
+        changed = series_store.sync(specs, _start(300))
+        assert len(stub.HITS) == len(specs)
+        assert all(changed.values())
+        assert all(v is None for v in series_store.sync(specs, _start(300)).values())
+        assert len(stub.HITS) == len(specs)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Regime fetcher on top of the store
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestRegimeFetch:
+
+    def test_restart_served_from_store(self, stub):
+        first = fetcher.fetch_regime_data(days_back=400)
+        assert not first.empty
+        hits = len(stub.HITS)
+        fetcher.clear_cache()                             # restart
+        second = fetcher.fetch_regime_data(days_back=400)
+        assert len(stub.HITS) == hits                     # no FRED requests
+        pd.testing.assert_frame_equal(first, second)
+
+    def test_incremental_extension_matches_full_compute(self, stub, tmp_path, monkeypatch):
+        end = stub.END
+        stub.END = end - pd.Timedelta(days=45)
+        fetcher.fetch_regime_data(days_back=400)          # build store at END-45d
+
+        stub.END = end                                    # 45 new days + a revision
+        stub.REVISED[("CPIAUCSL", (end - pd.DateOffset(months=2)).strftime("%Y-%m-01"))] = 500.0
+        _age_store()
+        incremental = fetcher.fetch_regime_data(days_back=400)
+
+        monkeypatch.setattr(series_store, "DB_PATH", str(tmp_path / "fresh.db"))
+        full = fetcher.fetch_regime_data(days_back=400)
+
+        assert not incremental.empty
+        cols = sorted(full.columns)
+        assert sorted(incremental.columns) == cols
+        pd.testing.assert_frame_equal(incremental[cols], full[cols], check_freq=False,
+                                      check_names=False, rtol=1e-9)
@@ -0,0 +1,232 @@
+"""
+Yahoo gate tests — token bucket, 429 back-off, history coalescing.
+
+Tests for:
+  - TokenBucket: burst then steady-rate pacing, pause() penalty window
+  - YahooGate.call: rate-limit failures back off and retry, other errors
+    propagate untouched, retries are bounded
+  - YahooGate.history: concurrent requests for different tickers become one
+    grouped download, each caller gets its own frame
+  - limited_yf / YahooClient route through the process-wide gate
+
+ALL tests are offline — a fake transport stands in for yfinance.
+Run: pytest common/test_yahoo.py -q
+"""
+from __future__ import annotations
+
+import os
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from common.data import yahoo  # noqa: E402
+from common.data.yahoo import TokenBucket, YahooGate, YahooThrottled  # noqa: E402
+
+
+class _Clock:
+    """Fake monotonic clock; sleep() advances it and records the wait."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, s):
+        self.sleeps.append(s)
+        self.now += s
+
+
+def _frame(sym, n=3):
+    idx = pd.date_range("2026-01-05", periods=n, freq="B", tz="America/New_York")
+    base = 100.0 + sum(map(ord, sym)) % 50
+    return pd.DataFrame({"Open": base, "High": base + 1, "Low": base - 1,
+                         "Close": base + np.arange(n), "Volume": 1000.0}, index=idx)
+
+
+class FakeTransport:
+    """yf-shaped transport: grouped downloads, scripted 429s, call log."""
+
+    def __init__(self, fail=0, error=None):
+        self.downloads = []
+        self.fail = fail
+        self.error = error or YahooThrottled("429 Too Many Requests")
+        self.lock = threading.Lock()
+
+    def download(self, tickers, **kwargs):
+        tickers = [tickers] if isinstance(tickers, str) else list(tickers)
+        with self.lock:
+            self.downloads.append((tickers, kwargs))
+            if self.fail:
+                self.fail -= 1
+                raise self.error
+        return pd.concat({t: _frame(t) for t in tickers}, axis=1)
+
+    def ticker(self, symbol):
+        transport = self
+
+        class T:
+            def history(self, **kwargs):
+                transport.downloads.append(([symbol], kwargs))
+                return _frame(symbol)
+        return T()
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Token bucket
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestTokenBucket:
+
+    def test_burst_then_steady_rate(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=10, burst=2, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire() == 0 and bucket.acquire() == 0
+        assert bucket.acquire() == pytest.approx(0.1)
+        assert bucket.acquire() == pytest.approx(0.1)
+
+    def test_pause_holds_callers(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=100, burst=5, clock=clock, sleep=clock.sleep)
+        bucket.pause(3.0)
+        assert bucket.acquire() >= 3.0
+
+    def test_acquire_timeout_takes_no_token(self):
+        clock = _Clock()
+        bucket = TokenBucket(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+        assert bucket.acquire(timeout=0.5) == 0
+        assert bucket.acquire(timeout=0.5) is None and clock.sleeps == []
+        assert bucket.acquire(timeout=2.0) == pytest.approx(1.0)
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Back-off
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestBackoff:
+
+    def _gate(self, transport, **kw):
+        clock = _Clock()
+        gate = YahooGate(transport, rate=1000, burst=10, clock=clock, sleep=clock.sleep,
+                         backoff_base=2.0, **kw)
+        return gate, clock
+
+    def test_throttle_backs_off_and_retries(self):
+        transport = FakeTransport(fail=2)
+        gate, clock = self._gate(transport)
+        out = gate.download(["SPY"])
+        assert not out.empty and len(transport.downloads) == 3
+        st = gate.stats()
+        assert (st["throttled"], st["retries"]) == (2, 2)
+        assert sum(clock.sleeps) >= 2.0 + 4.0          # exponential penalties
+        assert st["backoff_s"] == 2.0                   # halved on success
+
+    def test_rate_limit_error_type_is_recognised(self):
+        class YFRateLimitError(Exception):
+            pass
+        transport = FakeTransport(fail=1, error=YFRateLimitError("Rate limited. Try after a while."))
+        gate, _ = self._gate(transport)
+        gate.download(["SPY"])
+        assert gate.stats()["throttled"] == 1
+
+    def test_other_errors_are_not_retried(self):
+        transport = FakeTransport(fail=1, error=ValueError("bad ticker"))
+        gate, _ = self._gate(transport)
+        with pytest.raises(ValueError):
+            gate.download(["SPY"])
+        assert len(transport.downloads) == 1
+
+    def test_retries_are_bounded(self):
+        transport = FakeTransport(fail=10)
+        gate, _ = self._gate(transport, retries=2)
+        with pytest.raises(YahooThrottled):
+            gate.download(["SPY"])
+        assert len(transport.downloads) == 3
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Coalescing
+# ═══════════════════════════════════════════════════════════════════════
+
+class TestCoalescing:
+
+    def test_concurrent_history_is_one_grouped_download(self):
+        transport = FakeTransport()
+        gate = YahooGate(transport, rate=1000, burst=100, window=0.3)
+        symbols = ["SPY", "QQQ", "TLT", "GLD", "XLE"]
+        out, barrier = {}, threading.Barrier(len(symbols))
+
+        def one(sym):
+            barrier.wait()
+            out[sym] = gate.history(sym, period="1y")
+
+        threads = [threading.Thread(target=one, args=(s,)) for s in symbols]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(transport.downloads) == 1
+        assert sorted(transport.downloads[0][0]) == sorted(symbols)
+        assert transport.downloads[0][1]["group_by"] == "ticker"
+        for sym in symbols:
+            pd.testing.assert_frame_equal(out[sym], _frame(sym), check_names=False)
+        assert gate.stats()["coalesced"] == len(symbols) - 1
+
+    def test_different_params_are_not_merged(self):
+        transport = FakeTransport()
+        gate = YahooGate(transport, rate=1000, burst=100, window=0.0)
+        gate.history("SPY", period="1y")
+        gate.history("SPY", period="5y")
+        assert [d[1]["period"] for d in transport.downloads] == ["1y", "5y"]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+# Process-wide routing
+# ═══════════════════════════════════════════════════════════════════════
+
+@pytest.fixture
+def fake_gate():
+    transport = FakeTransport()
+    gate = yahoo.configure_gate(transport=transport, rate=1000, burst=100, window=0.0)
+    yield gate, transport
+    yahoo.configure_gate()
+
+
+def test_limited_yf_routes_through_gate(fake_gate):
+    gate, transport = fake_gate
+    yahoo.limited_yf.download(["SPY", "QQQ"], period="1mo")
+    yahoo.limited_yf.Ticker("IWM").history(period="5d")
+    assert [d[0] for d in transport.downloads] == [["SPY", "QQQ"], ["IWM"]]
+    assert gate.stats()["calls"] == 2
+
+
+def test_yahoo_client_history_uses_gate(fake_gate):
+    gate, transport = fake_gate
+    client = yahoo.YahooClient(retries=1)
+    df = client.get_history("SPY", period="1y")
+    assert client.get_history("SPY", period="1y") is df      # cached
+    assert len(transport.downloads) == 1 and gate.stats()["batches"] == 1
+
+
+def test_yahoo_client_leaves_throttle_retries_to_gate(monkeypatch):
+    clock = _Clock()
+    transport = FakeTransport(fail=10)
+    yahoo.configure_gate(transport=transport, rate=1000, burst=10, clock=clock,
+                         sleep=clock.sleep, retries=2)
+    monkeypatch.setattr(yahoo.time, "sleep", lambda s: None)
+    try:
+        client = yahoo.YahooClient(retries=3)
+        with pytest.raises(YahooThrottled):
+            client._fetch_with_retry(transport.download, ["SPY"])
+        assert len(transport.downloads) == 3             # the gate's 1 + 2, not 3 × 3
+        transport.fail, transport.error = 1, ConnectionError("reset by peer")
+        assert not client._fetch_with_retry(transport.download, ["SPY"]).empty
+        assert len(transport.downloads) == 5             # transient errors still retried
+    finally:
+        yahoo.configure_gate()
@@ -8,25 +8,39 @@ import logging
 import math
 import os
 import sys
+import threading
+import weakref
+from collections import OrderedDict
 from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Optional
+
+
+def _np_pd():
+    """numpy / pandas if some caller already imported them, else None.
+
+    A value can only be a numpy/pandas object once its library is loaded, so
+    the type checks below never force the (slow) import themselves.
+    """
+    return sys.modules.get("numpy"), sys.modules.get("pandas")
 
 
 class SafeJSONEncoder(json.JSONEncoder):
     """JSON encoder that handles numpy types, NaN, inf, datetime."""
 
     def default(self, obj):
-        if isinstance(obj, (np.integer,)):
-            return int(obj)
-        if isinstance(obj, (np.floating,)):
-            return None if math.isnan(obj) or math.isinf(obj) else float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
+        np, pd = _np_pd()
+        if np is not None:
+            if isinstance(obj, (np.integer,)):
+                return int(obj)
+            if isinstance(obj, (np.floating,)):
+                return None if math.isnan(obj) or math.isinf(obj) else float(obj)
+            if isinstance(obj, np.ndarray):
+                return obj.tolist()
         if hasattr(obj, 'isoformat'):
             return obj.isoformat()
-        if isinstance(obj, (pd.Timestamp, pd.Timedelta)):
+        if pd is not None and isinstance(obj, (pd.Timestamp, pd.Timedelta)):
             return str(obj)
         return super().default(obj)
 
@@ -88,26 +102,238 @@ def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
 
 
+_MISSING = object()
+
+
+def approx_size(value: Any, _depth: int = 0) -> int:
+    """Rough in-memory size in bytes (pandas/numpy buffers, containers one level deep)."""
+    np, pd = _np_pd()
+    if pd is not None:
+        if isinstance(value, pd.DataFrame):
+            return int(value.memory_usage(index=True).sum())
+        if isinstance(value, pd.Series):
+            return int(value.memory_usage(index=True))
+    if np is not None and isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if _depth < 2 and isinstance(value, dict):
+        return sys.getsizeof(value) + sum(approx_size(k, _depth + 1) + approx_size(v, _depth + 1)
+                                          for k, v in value.items())
+    if _depth < 2 and isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(approx_size(v, _depth + 1) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    """One in-progress load that concurrent misses on the same key wait on."""
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
 class TTLCache:
-    """Thread-safe TTL cache."""
+    """
+    Thread-safe bounded LRU cache with per-entry TTL and single-flight loading.
 
-    def __init__(self, ttl_seconds: int = 300):
-        self._cache = {}
+    - get/set/clear: plain TTL cache (get returns None on miss or expiry).
+    - get_or_load(key, loader): on a miss exactly one caller runs loader();
+      concurrent callers for the same key block on that load and share its
+      result (or its exception — failures are not cached).
+    - Bounded by max_entries and/or max_bytes (sizes from `sizeof`, default
+      approx_size); least-recently-used entries are evicted first.
+    - stats(): hits / misses / evictions / expired / loads / coalesced.
+
+    ttl_seconds=None never expires. `clock` is injectable for tests. Named
+    caches are listed by TTLCache.named() (exported by common.metrics).
+    """
+
+    _named = weakref.WeakSet()
+
+    def __init__(self, ttl_seconds: Optional[float] = 300, max_entries: Optional[int] = 1024,
+                 max_bytes: Optional[int] = None, sizeof: Optional[Callable[[Any], int]] = None,
+                 name: str = "", clock: Callable[[], float] = None):
         self._ttl = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.name = name
+        self._sizeof = sizeof or approx_size
+        self._clock = clock or time.monotonic
+        self._cache = OrderedDict()          # key -> (value, expiry, size)
+        self._bytes = 0
+        self._inflight = {}                  # key -> _Flight
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ("hits", "misses", "evictions", "expired", "loads", "load_errors", "coalesced"), 0)
+        if name:
+            TTLCache._named.add(self)
 
-    def get(self, key: str) -> Optional[Any]:
-        if key in self._cache:
-            value, expiry = self._cache[key]
-            if time.time() < expiry:
-                return value
+    @classmethod
+    def named(cls) -> list:
+        """Live caches created with a name (for metrics export)."""
+        return list(cls._named)
+
+    # --- internals (caller holds the lock) ---
+
+    def _lookup(self, key):
+        entry = self._cache.get(key)
+        if entry is None:
+            return _MISSING
+        value, expiry, size = entry
+        if expiry is not None and self._clock() >= expiry:
             del self._cache[key]
-        return None
+            self._bytes -= size
+            self._stats["expired"] += 1
+            return _MISSING
+        self._cache.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        ttl = self._ttl if ttl is None else ttl
+        size = self._sizeof(value) if self.max_bytes is not None else 0
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._bytes -= old[2]
+        if self.max_bytes is not None and size > self.max_bytes:
+            return                                # would evict everything else; don't cache
+        self._cache[key] = (value, None if ttl is None else self._clock() + ttl, size)
+        self._bytes += size
+        while self._cache and (
+                (self.max_entries is not None and len(self._cache) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)):
+            _, (_, _, evicted) = self._cache.popitem(last=False)
+            self._bytes -= evicted
+            self._stats["evictions"] += 1
+
+    # --- public API ---
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+            if value is _MISSING:
+                self._stats["misses"] += 1
+                return default
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        with self._lock:
+            self._store(key, value, ttl)
 
-    def set(self, key: str, value: Any):
-        self._cache[key] = (value, time.time() + self._ttl)
+    def get_or_load(self, key, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    cache_if: Optional[Callable[[Any], bool]] = None):
+        """Cached value for key, else loader() — run once across concurrent misses.
+
+        cache_if(value) -> False returns the loaded value without caching it
+        (e.g. an empty upstream response).
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                self._stats["hits"] += 1
+                return value
+            self._stats["misses"] += 1
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self._stats["coalesced"] += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = loader()
+        except BaseException as e:
+            flight.error = e
+            with self._lock:
+                self._stats["load_errors"] += 1
+                self._inflight.pop(key, None)
+            flight.done.set()
+            raise
+        with self._lock:
+            self._stats["loads"] += 1
+            if cache_if is None or cache_if(flight.value):
+                self._store(key, flight.value, ttl)
+            self._inflight.pop(key, None)
+        flight.done.set()
+        return flight.value
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._cache.pop(key, None)
+            if entry is None:
+                return default
+            self._bytes -= entry[2]
+            return entry[0]
 
     def clear(self):
-        self._cache.clear()
+        with self._lock:
+            self._cache.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"name": self.name, "entries": len(self._cache), "bytes": self._bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                    **self._stats}
+
+    def __len__(self):
+        return len(self._cache)
+
+    def __contains__(self, key):
+        with self._lock:
+            return self._lookup(key) is not _MISSING
+
+
+class TokenBucket:
+    """Thread-safe token bucket: `rate` tokens/second, up to `burst` banked.
+
+    pause() empties the bucket and holds every caller for a penalty window.
+    """
+
+    def __init__(self, rate: float, burst: int = 1, clock: Optional[Callable] = None,
+                 sleep: Optional[Callable] = None):
+        self.rate = float(rate)
+        self.burst = float(max(1, burst))
+        self._clock = clock or time.monotonic
+        self._sleep = sleep or time.sleep
+        self._tokens = self.burst
+        self._stamp = self._clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[float]:
+        """Take one token, blocking as needed. Returns seconds waited, or None
+        (no token taken) when the wait would run past `timeout`."""
+        deadline = None if timeout is None else self._clock() + timeout
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                elif self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                else:
+                    wait = (1.0 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return None
+            self._sleep(wait)
+            waited += wait
+
+    def pause(self, seconds: float):
+        with self._lock:
+            self._paused_until = max(self._paused_until, self._clock() + seconds)
+            self._tokens = 0.0
 
 
 class HealthCheck:
@@ -135,6 +361,4 @@ class HealthCheck:
 
 
 # Import time here to avoid circular imports
-import time
-import numpy as np
-import pandas as pd
\ No newline at end of file
+import time
\ No newline at end of file
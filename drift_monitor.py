@@ -1,6 +1,7 @@
 import sqlite3
 import pandas as pd
-import numpy as np
+
+from common.risk.correlation import pair_matrix_frame, threshold_mask
 
 # --- Configuration ---
 DATABASE_PATH = 'sector_etfs.db'
@@ -56,18 +57,23 @@ def get_returns_from_db(db_path, tickers, lookback_days):
 def calculate_rolling_correlation_matrix(returns_df, window):
     """
     Calculates a rolling correlation matrix for the given returns DataFrame.
+    All pairs come from one pass of the shared window-sum engine
+    (common.risk.correlation), laid out like returns_df.rolling(window).corr():
+    a (date, ticker) MultiIndex with one column per ticker.
     """
     if returns_df.empty:
         return None
     print(f"Calculating rolling {window}-day correlation matrix...")
-    # This will return a Series of DataFrames, one for each window
-    rolling_corr = returns_df.rolling(window=window).corr()
-    return rolling_corr
+    return pair_matrix_frame(returns_df, window)
 
 def detect_convergence(rolling_corr, defensive_assets, market_asset, threshold):
     """
     Detects convergence (style drift) by monitoring the average correlation
     between defensive assets and the market asset.
+
+    Evaluated for every date at once: the market asset's row of each daily
+    matrix gives a (date x defensive asset) frame, and the threshold rule is a
+    mask over its row means.
     """
     if rolling_corr is None or rolling_corr.empty:
         print("Cannot detect convergence: rolling correlation matrix is empty.")
@@ -75,34 +81,18 @@ def detect_convergence(rolling_corr, defensive_assets, market_asset, threshold):
 
     print("Detecting convergence...")
     alerts = []
-    
-    # Iterate through the dates (which are the first level of the multi-index)
-    for date in rolling_corr.index.get_level_values(0).unique():
-        # Get the correlation matrix for the current date
-        daily_corr_matrix = rolling_corr.loc[date]
-        
-        # Calculate the average correlation between defensive assets and the market asset
-        # Ensure all assets are present in the correlation matrix for the given day
-        
-        # Filter for market_asset vs defensive_assets
-        # Need to handle cases where an asset might not be in the matrix
-        valid_defensive_assets = [a for a in defensive_assets if a in daily_corr_matrix.columns and market_asset in daily_corr_matrix.index]
-        if not valid_defensive_assets:
-            continue
-            
-        correlations = [daily_corr_matrix.loc[market_asset, asset] for asset in valid_defensive_assets if market_asset in daily_corr_matrix.index and asset in daily_corr_matrix.columns]
-
-        if correlations:
-            avg_correlation = np.mean(correlations)
-            # For "increases significantly", we need a baseline. For now, assume a simple threshold check.
-            # In a real scenario, you'd compare against a historical average or a dynamically calculated baseline.
-            # For the first pass, let's just alert if it's above a certain value, indicating high correlation.
-            # The prompt says "increases significantly", so this implies comparing current to previous.
-            # For simplicity in this first version, I will just check if the average correlation is above a certain value.
-            # Hong can refine this 'significant increase' definition later.
-            if avg_correlation > threshold:
-                alerts.append(f"ALERT on {date.strftime('%Y-%m-%d')}: Average correlation between defensive assets ({', '.join(defensive_assets)}) and {market_asset} is {avg_correlation:.4f}, which is above the threshold of {threshold:.4f}. Style Drift detected.")
-    
+
+    # Only assets present in the matrix count; dates without a market row are skipped
+    valid_defensive_assets = [a for a in defensive_assets if a in rolling_corr.columns]
+    if valid_defensive_assets and market_asset in rolling_corr.index.get_level_values(1):
+        market_rows = rolling_corr.xs(market_asset, level=1)[valid_defensive_assets]
+        # For "increases significantly", we need a baseline. For now, assume a simple threshold check.
+        # In a real scenario, you'd compare against a historical average or a dynamically calculated baseline.
+        # Hong can refine this 'significant increase' definition later.
+        avg_correlation = market_rows.mean(axis=1, skipna=False)
+        for date, value in avg_correlation[threshold_mask(avg_correlation, threshold)].items():
+            alerts.append(f"ALERT on {date.strftime('%Y-%m-%d')}: Average correlation between defensive assets ({', '.join(defensive_assets)}) and {market_asset} is {value:.4f}, which is above the threshold of {threshold:.4f}. Style Drift detected.")
+
     if alerts:
         for alert in alerts:
             print(alert)
@@ -1,81 +1,213 @@
 
-import yfinance as yf
+import argparse
 import sqlite3
+from collections import defaultdict
+from common.data.yahoo import limited_yf as yf
 import pandas as pd
 from datetime import datetime, timedelta
 
 DB_NAME = "sector_etfs.db"
+TICKERS = [
+    "XLB", "XLC", "XLE", "XLF", "XLI", "XLK", "XLP", "XLRE", "XLU", "XLV", "XLY", "GLD", "SPY"
+]
+HISTORY_DAYS = 5 * 365  # first load / --full: 5 years of data
 
-def fetch_and_ingest_historical_data():
-    tickers = [
-        "XLB", "XLC", "XLE", "XLF", "XLI", "XLK", "XLP", "XLRE", "XLU", "XLV", "XLY", "GLD", "SPY"
-    ]
-    end_date = datetime.today()
-    start_date = end_date - timedelta(days=5*365) # 5 years of data
+UPSERT_SQL = """
+    INSERT INTO daily_prices (ticker, date, raw_close, adj_close, volume)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (ticker, date) DO UPDATE SET
+        raw_close = excluded.raw_close,
+        adj_close = excluded.adj_close,
+        volume = excluded.volume
+"""
 
-    print(f"Fetching data from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
 
-    try:
-        data = yf.download(tickers, start=start_date, end=end_date)
-        if data.empty:
-            print("No data downloaded. Check tickers or date range.")
-            return
-
-        conn = sqlite3.connect(DB_NAME)
-        cursor = conn.cursor()
-
-        for ticker in tickers:
-            # Check if 'Adj Close' column exists for the ticker
-            if ('Adj Close', ticker) in data.columns:
-                ticker_adj_close_data = data.loc[:, ('Adj Close', ticker)].dropna()
-            elif ('Close', ticker) in data.columns: # Fallback to 'Close' if 'Adj Close' is not found
-                print(f"Warning: ('Adj Close', '{ticker}') not found. Using ('Close', '{ticker}') for adjusted close.")
-                ticker_adj_close_data = data.loc[:, ('Close', ticker)].dropna()
-            else:
-                print(f"Error: Neither 'Adj Close' nor 'Close' found for {ticker}. Skipping.")
-                continue
-            
-            # Ensure 'Close' and 'Volume' columns exist
-            if ('Close', ticker) in data.columns:
-                raw_close_data = data.loc[:, ('Close', ticker)].dropna()
-            else:
-                print(f"Error: ('Close', '{ticker}') not found. Skipping.")
-                continue
+def ensure_schema(conn):
+    """
+    Creates daily_prices with a (ticker, date) primary key. A legacy table
+    without the key is rebuilt in place, keeping the last-written row per
+    (ticker, date), so re-runs can no longer accumulate duplicates.
+    """
+    pk_cols = [r[1] for r in sorted(conn.execute("PRAGMA table_info(daily_prices)"), key=lambda r: r[5]) if r[5]]
+    if pk_cols == ['ticker', 'date']:
+        return
+    with conn:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS daily_prices_new (
+                ticker TEXT NOT NULL,
+                date TEXT NOT NULL,
+                raw_close REAL,
+                adj_close REAL,
+                volume INTEGER,
+                PRIMARY KEY (ticker, date)
+            )
+        """)
+        legacy = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'daily_prices'").fetchone()
+        if legacy:
+            print("Migrating daily_prices to a (ticker, date) primary key...")
+            conn.execute("""
+                INSERT OR REPLACE INTO daily_prices_new (ticker, date, raw_close, adj_close, volume)
+                SELECT ticker, date, raw_close, adj_close, volume FROM daily_prices ORDER BY rowid
+            """)
+            conn.execute("DROP TABLE daily_prices")
+        conn.execute("ALTER TABLE daily_prices_new RENAME TO daily_prices")
+
+
+def last_stored_dates(conn, tickers):
+    """Returns {ticker: 'YYYY-MM-DD'} of the newest stored bar per ticker (absent = none)."""
+    placeholders = ', '.join('?' for _ in tickers)
+    cur = conn.execute(
+        f"SELECT ticker, MAX(date) FROM daily_prices WHERE ticker IN ({placeholders}) GROUP BY ticker",
+        list(tickers))
+    return {ticker: last for ticker, last in cur.fetchall() if last}
+
+
+def stored_tails(conn, tickers, n=2):
+    """Returns {ticker: [(date, adj_close), ...]} — the newest n stored bars, oldest first."""
+    out = {}
+    for ticker in tickers:
+        cur = conn.execute(
+            "SELECT date, adj_close FROM daily_prices WHERE ticker = ? ORDER BY date DESC LIMIT ?",
+            (ticker, n))
+        tail = cur.fetchall()[::-1]
+        if tail:
+            out[ticker] = tail
+    return out
+
+
+def restated(data, ticker, bars):
+    """
+    True when the fetched adj_close disagrees with stored bars on shared
+    dates — the vendor re-based the series (split/dividend) since the last run.
+    """
+    col = ('Adj Close', ticker) if ('Adj Close', ticker) in data.columns else ('Close', ticker)
+    if col not in data.columns:
+        return False
+    fresh = data[col].dropna()
+    fresh.index = fresh.index.strftime('%Y-%m-%d')
+    for date, old in bars:
+        if date in fresh.index and old is not None:
+            if abs(float(fresh[date]) - old) > 1e-6 * max(1.0, abs(old)):
+                return True
+    return False
 
-            if ('Volume', ticker) in data.columns:
-                volume_data = data.loc[:, ('Volume', ticker)].dropna()
-            else:
-                print(f"Error: ('Volume', '{ticker}') not found. Skipping.")
-                continue
 
-            # Align indices to ensure dates match for adj_close, raw_close, and volume
-            aligned_data = pd.DataFrame({
-                'adj_close': ticker_adj_close_data,
-                'raw_close': raw_close_data,
-                'volume': volume_data
-            }).dropna()
+def ticker_rows(data, ticker, since=None):
+    """
+    Extracts (ticker, date, raw_close, adj_close, volume) rows for one ticker
+    from a multi-ticker yf.download frame, keeping bars dated >= since.
+    """
+    # Check if 'Adj Close' column exists for the ticker
+    if ('Adj Close', ticker) in data.columns:
+        ticker_adj_close_data = data.loc[:, ('Adj Close', ticker)]
+    elif ('Close', ticker) in data.columns: # Fallback to 'Close' if 'Adj Close' is not found
+        print(f"Warning: ('Adj Close', '{ticker}') not found. Using ('Close', '{ticker}') for adjusted close.")
+        ticker_adj_close_data = data.loc[:, ('Close', ticker)]
+    else:
+        print(f"Error: Neither 'Adj Close' nor 'Close' found for {ticker}. Skipping.")
+        return []
 
-            if aligned_data.empty:
-                print(f"No aligned data for {ticker}. Skipping.")
+    # Ensure 'Close' and 'Volume' columns exist
+    if ('Close', ticker) not in data.columns:
+        print(f"Error: ('Close', '{ticker}') not found. Skipping.")
+        return []
+    if ('Volume', ticker) not in data.columns:
+        print(f"Error: ('Volume', '{ticker}') not found. Skipping.")
+        return []
+
+    # Align indices to ensure dates match for adj_close, raw_close, and volume
+    aligned_data = pd.DataFrame({
+        'adj_close': ticker_adj_close_data,
+        'raw_close': data.loc[:, ('Close', ticker)],
+        'volume': data.loc[:, ('Volume', ticker)]
+    }).dropna()
+    if since is not None:
+        aligned_data = aligned_data[aligned_data.index >= pd.Timestamp(since)]
+
+    dates = aligned_data.index.strftime('%Y-%m-%d')
+    return list(zip(
+        [ticker] * len(aligned_data),
+        dates,
+        aligned_data['raw_close'].astype(float),
+        aligned_data['adj_close'].astype(float),
+        aligned_data['volume'].astype('int64').tolist(),
+    ))
+
+
+def fetch_and_ingest_historical_data(tickers=None, db_name=None, full=False):
+    """
+    Incrementally ingests daily bars into daily_prices.
+
+    Each ticker resumes from its second-newest stored bar: the newest one is
+    re-fetched so a partial intraday bar gets finalized, and the one before
+    it (a settled close) must match what the vendor now serves. A mismatch
+    means the series was re-adjusted after a split or dividend, so that
+    ticker is fully reloaded (its rows replaced) rather than left on two
+    adjustment bases. Tickers with no history, or every ticker with
+    full=True, load HISTORY_DAYS. Tickers sharing a start date share one
+    yf.download call, so a new ticker does not drag the whole basket back
+    HISTORY_DAYS; all rows are written in a single transaction. Returns the
+    number of rows written.
+    """
+    tickers = list(tickers or TICKERS)
+    conn = sqlite3.connect(db_name or DB_NAME)
+    try:
+        ensure_schema(conn)
+        end_date = datetime.today()
+        today = end_date.strftime('%Y-%m-%d')
+        default_start = (end_date - timedelta(days=HISTORY_DAYS)).strftime('%Y-%m-%d')
+        tails = {} if full else stored_tails(conn, tickers)
+        since = {t: tails[t][0][0] if t in tails else default_start for t in tickers}
+        groups = defaultdict(list)
+        for t in tickers:
+            if since[t] < today:
+                groups[since[t]].append(t)
+        if not groups:
+            print("All tickers up to date.")
+            return 0
+
+        rows, reload = [], []
+        for start_date, group in sorted(groups.items()):
+            print(f"Fetching data from {start_date} to {today} for {len(group)} tickers")
+            data = yf.download(group, start=start_date, end=end_date, group_by='column', progress=False)
+            if data is None or data.empty:
+                print(f"No data downloaded for {', '.join(group)}.")
                 continue
+            for ticker in group:
+                if restated(data, ticker, tails.get(ticker, [])[:-1]):
+                    print(f"{ticker} was restated by the vendor; reloading its full history.")
+                    reload.append(ticker)
+                    continue
+                new_rows = ticker_rows(data, ticker, since[ticker])
+                if not new_rows:
+                    print(f"No new data for {ticker}.")
+                rows.extend(new_rows)
 
-            for date, row in aligned_data.iterrows():
-                cursor.execute("""
-                    INSERT OR REPLACE INTO daily_prices (ticker, date, raw_close, adj_close, volume)
-                    VALUES (?, ?, ?, ?, ?)
-                """, (
-                    ticker,
-                    date.strftime('%Y-%m-%d'),
-                    row['raw_close'],
-                    row['adj_close'],
-                    row['volume']
-                ))
-        conn.commit()
-        conn.close()
-        print(f"Successfully ingested historical data for {len(tickers)} tickers into {DB_NAME}")
+        reloaded = []
+        if reload:
+            data = yf.download(reload, start=default_start, end=end_date, group_by='column', progress=False)
+            if data is not None and not data.empty:
+                for ticker in reload:
+                    new_rows = ticker_rows(data, ticker)
+                    if new_rows:                  # keep the old basis rather than nothing
+                        reloaded.append(ticker)
+                        rows.extend(new_rows)
 
+        with conn:
+            conn.executemany("DELETE FROM daily_prices WHERE ticker = ?", [(t,) for t in reloaded])
+            conn.executemany(UPSERT_SQL, rows)
+        print(f"Ingested {len(rows)} rows for {len(tickers)} tickers into {db_name or DB_NAME}")
+        return len(rows)
     except Exception as e:
         print(f"An error occurred during data ingestion: {e}")
+        return 0
+    finally:
+        conn.close()
+
 
 if __name__ == "__main__":
-    fetch_and_ingest_historical_data()
+    parser = argparse.ArgumentParser(description="Incrementally ingest sector ETF daily bars.")
+    parser.add_argument("--full", action="store_true", help=f"re-download {HISTORY_DAYS} days for every ticker")
+    args = parser.parse_args()
+    fetch_and_ingest_historical_data(full=args.full)
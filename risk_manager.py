@@ -1,8 +1,9 @@
 import sqlite3
 import pandas as pd
-import numpy as np
 import os
 
+from common.risk.panel import rolling_var
+
 # --- Configuration (from PROJECT_PROFILE.md) ---
 DATABASE_PATH = 'sector_etfs.db'
 # Added XLP for comparison as a potential XLV replacement
@@ -14,8 +15,9 @@ VaR_CONFIDENCE = 0.95
 BASE_WEIGHT = 0.25 # Assuming equal weight for defensive sleeve as a starting point
 
 def calculate_var(returns, window=60):
-    """Calculates Historical Value at Risk (95%)."""
-    return returns.rolling(window=window).apply(lambda x: np.percentile(x, (1-VaR_CONFIDENCE)*100))
+    """Calculates Historical Value at Risk (95%) for a series or every column of a frame."""
+    out = rolling_var(returns, window, VaR_CONFIDENCE, method="historical")
+    return out.iloc[:, 0] if isinstance(returns, pd.Series) else out
 
 def calculate_drift_adjusted_weight(base_weight, current_corr, target_corr=0.10):
     """
@@ -144,6 +144,26 @@ class TestDriftMonitor(unittest.TestCase):
         self.assertFalse(alert_triggered)
         self.assertIsNone(messages)
 
+    def test_detect_convergence_matches_per_date_scan(self):
+        # Vectorized rule vs. the per-date mean of market-vs-defensive correlations
+        rng = np.random.default_rng(11)
+        market = rng.normal(0, 0.01, 150)
+        returns_data = pd.DataFrame({
+            'SPY': market,
+            'XLU': 0.5 * market + rng.normal(0, 0.01, 150),
+            'GLD': rng.normal(0, 0.01, 150),
+        }, index=pd.date_range(start='2026-01-01', periods=150))
+        with patch('builtins.print'):
+            rolling_corr = calculate_rolling_correlation_matrix(returns_data, 30)
+            _, messages = detect_convergence(rolling_corr, ['XLU', 'GLD'], 'SPY', 0.2)
+        expected = []
+        for date in returns_data.index[29:]:
+            avg = rolling_corr.loc[(date, 'SPY'), ['XLU', 'GLD']].mean()
+            if avg > 0.2:
+                expected.append(date.strftime('%Y-%m-%d'))
+        self.assertTrue(expected)
+        self.assertEqual([m[9:19] for m in messages], expected)
+
     def test_detect_convergence_empty_matrix(self):
         alert_triggered, messages = detect_convergence(None, ['XLU', 'GLD'], 'SPY', 0.5)
         self.assertFalse(alert_triggered)
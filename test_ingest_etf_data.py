@@ -0,0 +1,127 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+
+import ingest_etf_data
+from ingest_etf_data import ensure_schema, fetch_and_ingest_historical_data, last_stored_dates
+
+
+def make_download(dates, tickers, close_offset=0.0):
+    """Builds a yf.download-shaped frame: (field, ticker) MultiIndex columns."""
+    index = pd.DatetimeIndex(pd.to_datetime(dates), name='Date')
+    data = {}
+    for i, t in enumerate(tickers):
+        base = 100.0 + 10 * i + close_offset + np.arange(len(index))
+        data[('Adj Close', t)] = base - 1
+        data[('Close', t)] = base
+        data[('Volume', t)] = np.full(len(index), 1000 + i, dtype=float)
+    return pd.DataFrame(data, index=index)
+
+
+class TestIngestEtfData(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.db = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+        os.unlink(self.db)
+        self.print_patch = patch('builtins.print')
+        self.print_patch.start()
+
+    def tearDown(self):
+        self.print_patch.stop()
+        if os.path.exists(self.db):
+            os.unlink(self.db)
+
+    def rows(self):
+        conn = sqlite3.connect(self.db)
+        try:
+            return conn.execute(
+                "SELECT ticker, date, raw_close, adj_close, volume FROM daily_prices ORDER BY ticker, date"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    def test_first_run_loads_history_in_one_download(self):
+        frame = make_download(['2026-01-02', '2026-01-05'], ['XLE', 'SPY'])
+        with patch.object(ingest_etf_data.yf, 'download', return_value=frame) as dl:
+            n = fetch_and_ingest_historical_data(['XLE', 'SPY'], db_name=self.db)
+        self.assertEqual(n, 4)
+        dl.assert_called_once()
+        self.assertEqual(self.rows()[0], ('SPY', '2026-01-02', 110.0, 109.0, 1001))
+
+    def test_incremental_run_refetches_open_bar_without_reload(self):
+        first = make_download(['2026-01-02', '2026-01-05'], ['XLE', 'SPY'])
+        with patch.object(ingest_etf_data.yf, 'download', return_value=first):
+            fetch_and_ingest_historical_data(['XLE', 'SPY'], db_name=self.db)
+
+        # The settled 01-02 bar matches; the (possibly partial) 01-05 bar is finalized
+        second = make_download(['2026-01-02', '2026-01-05', '2026-01-06'], ['XLE', 'SPY'])
+        second.loc['2026-01-05', ('Close', 'XLE')] = 101.5
+        with patch.object(ingest_etf_data.yf, 'download', return_value=second) as dl:
+            n = fetch_and_ingest_historical_data(['XLE', 'SPY'], db_name=self.db)
+        dl.assert_called_once()
+        self.assertEqual(dl.call_args.kwargs['start'], '2026-01-02')
+        self.assertEqual(n, 6)
+        rows = self.rows()
+        self.assertEqual(len(rows), 6)   # no duplicate (ticker, date) rows
+        self.assertIn(('XLE', '2026-01-05', 101.5, 100.0, 1000), rows)
+
+    def test_incremental_run_reloads_restated_ticker(self):
+        first = make_download(['2026-01-02', '2026-01-05'], ['XLE', 'SPY'])
+        with patch.object(ingest_etf_data.yf, 'download', return_value=first):
+            fetch_and_ingest_historical_data(['XLE', 'SPY'], db_name=self.db)
+
+        # Vendor re-based XLE (dividend): the settled overlap bar no longer matches
+        second = make_download(['2026-01-02', '2026-01-05', '2026-01-06'], ['XLE', 'SPY'])
+        second.loc[:, ('Adj Close', 'XLE')] -= 0.5
+        full = make_download(['2025-12-31', '2026-01-02', '2026-01-05', '2026-01-06'], ['XLE'])
+        full.loc[:, ('Adj Close', 'XLE')] -= 0.5
+        with patch.object(ingest_etf_data.yf, 'download', side_effect=[second, full]) as dl:
+            fetch_and_ingest_historical_data(['XLE', 'SPY'], db_name=self.db)
+        self.assertEqual(dl.call_count, 2)
+        self.assertEqual(dl.call_args_list[1].args[0], ['XLE'])
+        self.assertLess(dl.call_args_list[1].kwargs['start'], '2026-01-01')
+        xle = [r for r in self.rows() if r[0] == 'XLE']
+        self.assertEqual([r[1] for r in xle], ['2025-12-31', '2026-01-02', '2026-01-05', '2026-01-06'])
+        self.assertEqual([r[3] for r in xle], [98.5, 99.5, 100.5, 101.5])   # one adjustment basis
+
+    def test_new_ticker_backfills_without_rewriting_others(self):
+        with patch.object(ingest_etf_data.yf, 'download',
+                          return_value=make_download(['2026-01-05'], ['SPY'])):
+            fetch_and_ingest_historical_data(['SPY'], db_name=self.db)
+        frame = make_download(['2026-01-02', '2026-01-05', '2026-01-06'], ['SPY', 'GLD'])
+        with patch.object(ingest_etf_data.yf, 'download', return_value=frame) as dl:
+            n = fetch_and_ingest_historical_data(['SPY', 'GLD'], db_name=self.db)
+        self.assertEqual(n, 3 + 2)       # all GLD history, SPY from its last date
+        # one download per start date: SPY is not dragged back HISTORY_DAYS
+        self.assertEqual(sorted(c.args[0] for c in dl.call_args_list), [['GLD'], ['SPY']])
+        conn = sqlite3.connect(self.db)
+        try:
+            self.assertEqual(last_stored_dates(conn, ['SPY', 'GLD']),
+                             {'SPY': '2026-01-06', 'GLD': '2026-01-06'})
+        finally:
+            conn.close()
+
+    def test_legacy_table_without_primary_key_is_deduplicated(self):
+        conn = sqlite3.connect(self.db)
+        conn.execute("CREATE TABLE daily_prices (ticker TEXT, date TEXT, raw_close REAL, "
+                     "adj_close REAL, volume INTEGER)")
+        conn.executemany("INSERT INTO daily_prices VALUES (?, ?, ?, ?, ?)", [
+            ('SPY', '2026-01-02', 1.0, 1.0, 1),
+            ('SPY', '2026-01-02', 2.0, 2.0, 2),
+        ])
+        conn.commit()
+        ensure_schema(conn)
+        self.assertEqual(conn.execute("SELECT raw_close FROM daily_prices").fetchall(), [(2.0,)])
+        with self.assertRaises(sqlite3.IntegrityError):
+            conn.execute("INSERT INTO daily_prices VALUES ('SPY', '2026-01-02', 3, 3, 3)")
+        conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()